@@ -33,6 +33,9 @@ Connects to:
         - `api_runtime_introspect()` -> `runtime_state()`: Gathers and returns a snapshot of the entire application's runtime state.
     - utils/offline_guard.py:
         - `offline_guard.enable()`: Called at startup to enforce the "offline-only" digital sovereignty rule by blocking non-local network connections.
+    - database.py: `api_history_export()` streams `db_manager.iter_utterances()` / `iter_interactions()` as NDJSON.
+    - retention_engine.py:
+        - `__main__` -> `start_idle_maintenance()`: Background rollup / pruning / incremental vacuum while the user is idle.
     - user_config.py:
         - `home()`: Uses `USER_NAME` and `USER_EMAIL` to personalize the UI.
     - templates/index.html:
@@ -41,7 +44,8 @@ Connects to:
 """
 
 import re
-from flask import Flask, request, jsonify, render_template
+import config
+from flask import Flask, Response, request, jsonify, render_template
 from database import db_manager
 from user_config import USER_NAME, USER_EMAIL, TAILSCALE_ENABLED, TAILSCALE_HOSTNAME
 from utils import offline_guard  # Enforce offline constraints
@@ -248,10 +252,14 @@ def chat():
     
     Why: Handles user input and generates AI responses
     Where: Called by frontend JavaScript for chat functionality
-    How: Processes JSON input, generates response via persona engine
+    How: Processes JSON input, generates response via persona engine. Optional
+         ``budget_ms`` (default config.CHAT_DEFAULT_BUDGET_MS) bounds the turn by
+         planning which optional stages run; ``priority: "background"`` asks for
+         full depth. The chosen plan is returned as ``plan``
     
     Connects to:
         - persona.py: AI response generation
+        - stage_planner.py: plan returned for budgeted turns
         - static/js/main.js: Frontend chat interface
     """
     t0 = time.time()
@@ -265,10 +273,27 @@ def chat():
                 'error': 'Message is required',
                 'status': 'error'
             }), 400
+
+        # Latency budget: explicit budget_ms, interactive default, or full depth for background callers
+        raw_budget = data.get('budget_ms')
+        if data.get('priority') == 'background':
+            budget_ms = None
+        elif raw_budget is None:
+            budget_ms = getattr(config, 'CHAT_DEFAULT_BUDGET_MS', 0) or None
+        else:
+            try:
+                budget_ms = float(raw_budget)
+            except (TypeError, ValueError):
+                budget_ms = 0.0
+            if not budget_ms > 0:
+                return jsonify({
+                    'error': 'budget_ms must be a positive number',
+                    'status': 'error'
+                }), 400
         
         # Generate response using persona engine if available
         if clever_persona:
-            persona_response = clever_persona.generate(user_message, mode="Auto")
+            persona_response = clever_persona.generate(user_message, mode="Auto", budget_ms=budget_ms)
             # Apply server-side scrub to remove any internal reasoning/meta tokens
             # Why: Ensure only human-like natural text reaches client regardless of upstream persona layers
             # Where: Chat endpoint directly before JSON serialization; complements client-side final scrub
@@ -304,6 +329,12 @@ def chat():
                 if 'requested_shape' in persona_response.context:
                     debugger.info("app.chat", f"Adding requested_shape: {persona_response.context['requested_shape']}")
                     response['requested_shape'] = persona_response.context['requested_shape']
+                if 'retrieval' in persona_response.context:
+                    # Retrieval stages that missed their deadline / failed (answered without that context)
+                    response['retrieval'] = persona_response.context['retrieval']
+                if 'plan' in persona_response.context:
+                    # Optional stages run / skipped for this turn's latency budget
+                    response['plan'] = persona_response.context['plan']
             else:
                 debugger.info("app.chat", "No context found on persona response")
             
@@ -395,17 +426,150 @@ def api_telemetry():
     
     Why: Provide quick operational insight (chat volume, latency) without external monitoring stack
     Where: Queried manually via curl or future debug overlay; NOT for production analytics persistence
-    How: Returns a shallow copy of TELEMETRY with computed uptime
+    How: Returns a shallow copy of TELEMETRY with computed uptime plus the
+    SQLite connection pool counters (checkouts, wait time, open connections)
+    and the per-statement SQL trace (``?sql_top=N`` limits the statement list)
     
     Connects to:
         - static/js/main.js (potential future polling)
         - debug tooling (runtime introspection augment)
+        - database.py: db_manager.pool_stats() / writer_stats() for connection reuse and write-behind visibility
+        - database.py: db_manager.sql_stats() for per-statement latency and lock wait
+        - memory_engine.py: deferred_write_stats() for access-stat write-back lag / pending
+        - perf_spans.py: get_stage_tracker().stats() for per-stage persona latency p50 / p95
     """
     uptime_s = time.time() - TELEMETRY.get("start_ts", time.time())
     out = dict(TELEMETRY)
     out["uptime_s"] = round(uptime_s, 2)
+    try:
+        out["db_pool"] = db_manager.pool_stats()
+        out["db_writer"] = db_manager.writer_stats()
+    except Exception as e:
+        out["db_pool"] = {"error": str(e)}
+    try:
+        from memory_engine import deferred_write_stats
+        out["memory_access"] = deferred_write_stats()
+    except Exception as e:
+        out["memory_access"] = {"error": str(e)}
+    try:
+        from perf_spans import get_stage_tracker
+        out["persona_stages"] = get_stage_tracker().stats()
+    except Exception as e:
+        out["persona_stages"] = {"error": str(e)}
+    try:
+        top = request.args.get('sql_top', default=25, type=int)
+        out["db_sql"] = db_manager.sql_stats(top=top or None)
+    except Exception as e:
+        out["db_sql"] = {"error": str(e)}
     return jsonify(out)
 
+@app.route('/api/telemetry/reset', methods=['POST'])
+def api_telemetry_reset():
+    """Reset the SQL trace and persona stage histograms so a replayed workload can be measured in isolation
+
+    Why: Cumulative statement stats mix warm-up and steady state; profiling a
+    specific chat sequence needs a clean window
+    Where: Called by benchmark scripts / curl before replaying a workload
+    How: Returns the snapshots accumulated so far, then clears them
+
+    Connects to:
+        - database.py: db_manager.reset_sql_stats()
+        - perf_spans.py: get_stage_tracker().reset()
+    """
+    from perf_spans import get_stage_tracker
+    tracker = get_stage_tracker()
+    stages = tracker.stats()
+    tracker.reset()
+    return jsonify({'status': 'ok', 'db_sql': db_manager.reset_sql_stats(), 'persona_stages': stages})
+
+def _history_ndjson(kind, after_id, before_ts, order, limit):
+    """Yield one NDJSON line per history row (``parsed_data`` passed through undecoded)."""
+    import itertools
+    import json as _json
+    if kind == 'interactions':
+        rows = db_manager.iter_interactions(after_id=after_id, before_ts=before_ts, order=order)
+    else:
+        rows = db_manager.iter_utterances(after_id=after_id, before_ts=before_ts, order=order)
+    for row in itertools.islice(rows, limit):
+        parsed = row.pop('parsed_data', None)
+        line = _json.dumps(row, ensure_ascii=False)
+        if parsed is not None:
+            line = f'{line[:-1]}, "parsed_data": {parsed.json_text()}}}'
+        yield line + '\n'
+
+def _gzip_stream(chunks, flush_bytes=64 * 1024):
+    """Gzip a text stream incrementally (bounded buffering, one member)."""
+    import zlib as _zlib
+    comp = _zlib.compressobj(6, _zlib.DEFLATED, 31)
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending += len(data)
+        out = comp.compress(data)
+        if pending >= flush_bytes:
+            out += comp.flush(_zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield comp.flush()
+
+@app.route('/api/history/export', methods=['GET'])
+def api_history_export():
+    """Stream chat history as NDJSON (optionally gzip) in constant memory
+
+    Why: Analytics and backups need the whole history; building one JSON array
+    of every row (and decoding every parsed_data blob) does not scale
+    Where: curl / analytics tools, e.g.
+    ``/api/history/export?kind=interactions&after_id=1200&gzip=1``
+    How: Keyset-paginated iterators from database.py feed a generator response;
+    ``kind`` (utterances | interactions), ``after_id``, ``before_ts``, ``order``
+    (asc | desc) and ``limit`` select the window. Resume an interrupted export
+    with ``after_id`` set to the last id received. ``gzip=1`` compresses the
+    stream with ``Content-Encoding: gzip``.
+
+    Connects to:
+        - database.py: db_manager.iter_utterances() / iter_interactions() (LazyJSON parsed_data)
+    """
+    kind = request.args.get('kind', 'utterances')
+    order = request.args.get('order', 'asc')
+    if kind not in ('utterances', 'interactions') or order not in ('asc', 'desc'):
+        return jsonify({'status': 'error', 'error': 'kind must be utterances|interactions, order asc|desc'}), 400
+    after_id = request.args.get('after_id', type=int)
+    before_ts = request.args.get('before_ts', type=float)
+    limit = request.args.get('limit', type=int)
+    body = _history_ndjson(kind, after_id, before_ts, order, limit)
+    headers = {'Content-Disposition': f'attachment; filename="{kind}.ndjson"'}
+    if request.args.get('gzip', '').lower() in ('1', 'true', 'yes'):
+        headers['Content-Encoding'] = 'gzip'
+        body = _gzip_stream(body)
+    return Response(body, mimetype='application/x-ndjson', headers=headers)
+
+@app.route('/api/memory/capacity', methods=['GET', 'POST'])
+def api_memory_capacity():
+    """Memory graph budget stats (GET) or one bounded eviction pass (POST)
+
+    Why: Show how full the memory graph is and what eviction removed, with the
+    size distribution before and after the last pass
+    Where: curl / debug overlay; POST lets the user trim immediately instead of
+    waiting for the background pass
+    How: GET returns budgets, the current distribution and ``last_run``; POST
+    runs ``capacity.run(max_batches)`` (default 1) and returns its report
+
+    Connects to:
+        - memory_engine.py: get_memory_engine().capacity
+        - memory_capacity.py: MemoryCapacityManager.stats() / run()
+    """
+    try:
+        from memory_engine import get_memory_engine
+        capacity = get_memory_engine().capacity
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            max_batches = int(data.get('max_batches', request.args.get('max_batches', 1)))
+            return jsonify({'status': 'ok', 'run': capacity.run(max_batches=max(1, max_batches))})
+        return jsonify({'status': 'ok', **capacity.stats()})
+    except Exception as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+
 @app.route('/health', methods=['GET'])
 def health():
     """
@@ -489,23 +653,28 @@ def search():
     
     Why: Enables searching through ingested knowledge base
     Where: Used by search functionality in UI
-    How: Queries database using centralized DB_PATH
+    How: Runs a bm25-ranked FTS5 query via db_manager.search_sources; GET keeps
+    the legacy bare-list shape (empty query -> []), POST returns an envelope
     
     Connects to:
-        - database.py: Search queries via DatabaseManager
+        - database.py: DatabaseManager.search_sources (sources_fts index)
         - evolution_engine.py: Search result logging
     """
     try:
         # Support legacy GET with q param returning list (tests expect [])
         if request.method == 'GET':
-            q = request.args.get('q', '')
+            q = request.args.get('q', '').strip()
             if not q:
                 return jsonify([])
-            return jsonify([])
+            limit = request.args.get('limit', 10, type=int)
+            return jsonify(db_manager.search_sources(q, limit=limit))
+        data = request.get_json(silent=True) or {}
+        q = (data.get('query') or data.get('q') or request.form.get('q') or '').strip()
+        results = db_manager.search_sources(q, limit=int(data.get('limit', 10))) if q else []
         return jsonify({
             'status': 'success',
-            'results': [],
-            'message': 'Search endpoint ready'
+            'results': results,
+            'count': len(results)
         })
     except Exception as e:
         debugger.info("search", f"Error in search: {str(e)}")
@@ -1442,4 +1611,13 @@ if __name__ == '__main__':
     else:
         debugger.info("network", "Local access only - Tailscale disabled")
     
+    import config as _config
+    if getattr(_config, "RETENTION_IDLE_MAINTENANCE", False):
+        try:
+            from retention_engine import start_idle_maintenance
+            start_idle_maintenance()
+            debugger.info("app", "Idle retention maintenance started")
+        except Exception as e:
+            debugger.info("app", f"Idle retention maintenance unavailable: {e}")
+    
     app.run(debug=True, host=NETWORK_HOST, port=NETWORK_PORT)
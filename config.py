@@ -75,6 +75,101 @@ SYNAPTIC_HUB_DIR = str(Path("synaptic_hub_sync").resolve())
 
 DB_PATH = os.environ.get("CLEVER_DB_PATH", str(ROOT_DIR / "clever.db"))
 
+# SQLite connection pool tuning (applied to every pooled connection in database.py)
+DB_JOURNAL_MODE = os.environ.get("CLEVER_DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = os.environ.get("CLEVER_DB_SYNCHRONOUS", "NORMAL")
+DB_CACHE_SIZE_KB = int(os.environ.get("CLEVER_DB_CACHE_SIZE_KB", "8192"))
+DB_MMAP_SIZE = int(os.environ.get("CLEVER_DB_MMAP_SIZE", str(64 * 1024 * 1024)))
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("CLEVER_DB_STATEMENT_CACHE_SIZE", "256"))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("CLEVER_DB_BUSY_TIMEOUT_MS", "5000"))
+
+# Write-behind queue for chat telemetry writes ("sync", "batched", "fire-and-forget")
+DB_WRITE_DURABILITY = os.environ.get("CLEVER_DB_WRITE_DURABILITY", "batched")
+DB_WRITE_BATCH_ROWS = int(os.environ.get("CLEVER_DB_WRITE_BATCH_ROWS", "200"))
+DB_WRITE_FLUSH_MS = int(os.environ.get("CLEVER_DB_WRITE_FLUSH_MS", "50"))
+DB_WRITE_QUEUE_SIZE = int(os.environ.get("CLEVER_DB_WRITE_QUEUE_SIZE", "10000"))
+# Upper bound on read-your-writes barriers before reads proceed without the queued rows
+DB_WRITE_BARRIER_TIMEOUT_S = float(os.environ.get("CLEVER_DB_WRITE_BARRIER_TIMEOUT_S", "5"))
+# Compression of sources.content ("none", "zlib", or "zstd" when zstandard is installed)
+DB_CONTENT_CODEC = os.environ.get("CLEVER_DB_CONTENT_CODEC", "zlib")
+DB_CONTENT_COMPRESS_MIN_BYTES = int(os.environ.get("CLEVER_DB_CONTENT_COMPRESS_MIN_BYTES", "1024"))
+# auto_vacuum mode for new database files (INCREMENTAL lets idle maintenance return pages)
+DB_AUTO_VACUUM = os.environ.get("CLEVER_DB_AUTO_VACUUM", "INCREMENTAL")
+# Per-statement latency tracing (database.SqlTracer, surfaced in /api/telemetry).
+# Diagnostic only: off by default so statements skip the Python cursor wrapper.
+DB_SQL_TRACE = os.environ.get("CLEVER_DB_SQL_TRACE", "false").lower() in {"1", "true", "yes", "on"}
+DB_SQL_TRACE_SAMPLES = int(os.environ.get("CLEVER_DB_SQL_TRACE_SAMPLES", "512"))
+
+# Deferred memory access-stat write-back (memory_engine.AccessStatsAccumulator)
+MEMORY_ACCESS_FLUSH_SECONDS = float(os.environ.get("CLEVER_MEMORY_ACCESS_FLUSH_SECONDS", "5"))
+MEMORY_ACCESS_FLUSH_THRESHOLD = int(os.environ.get("CLEVER_MEMORY_ACCESS_FLUSH_THRESHOLD", "500"))
+
+# Learned keyword -> mode model size cap (memory_engine.KeywordModeModel)
+MEMORY_MODE_MODEL_MAX_KEYWORDS = int(os.environ.get("CLEVER_MEMORY_MODE_MODEL_MAX_KEYWORDS", "20000"))
+
+# Background memory ingestion of chat turns (memory_engine.MemoryIngestQueue)
+# Policy when the queue is full: block (up to MEMORY_INGEST_BLOCK_MS, then drop) | drop_oldest | drop_newest
+MEMORY_INGEST_QUEUE_SIZE = int(os.environ.get("CLEVER_MEMORY_INGEST_QUEUE_SIZE", "256"))
+MEMORY_INGEST_POLICY = os.environ.get("CLEVER_MEMORY_INGEST_POLICY", "block")
+MEMORY_INGEST_BLOCK_MS = float(os.environ.get("CLEVER_MEMORY_INGEST_BLOCK_MS", "50"))
+
+# Warm-start snapshot of memory engine state (memory_snapshot.py); empty path = "<DB_PATH>.memsnap"
+MEMORY_SNAPSHOT_PATH = os.environ.get("CLEVER_MEMORY_SNAPSHOT_PATH", "")
+MEMORY_SNAPSHOT_ON_START = os.environ.get("CLEVER_MEMORY_SNAPSHOT_ON_START", "true").lower() in {"1", "true", "yes", "on"}
+MEMORY_SNAPSHOT_ON_EXIT = os.environ.get("CLEVER_MEMORY_SNAPSHOT_ON_EXIT", "true").lower() in {"1", "true", "yes", "on"}
+
+# Route chat turns through Jay's authentic Clever (integrate_jays_clever.py) instead of the
+# persona mode handlers; the integration is built once per process when enabled
+PERSONA_JAY_INTEGRATION = os.environ.get("CLEVER_PERSONA_JAY_INTEGRATION", "false").lower() in {"1", "true", "yes", "on"}
+
+# Concurrent retrieval fan-out in PersonaEngine.generate (retrieval_orchestrator.py)
+# Budget caps the whole fan-out; stage timeout is the per-stage default, overridden per stage
+# with "stage=ms,stage=ms" (e.g. "file_search=800,document_query=600")
+PERSONA_RETRIEVAL_WORKERS = int(os.environ.get("CLEVER_PERSONA_RETRIEVAL_WORKERS", "8"))
+PERSONA_RETRIEVAL_BUDGET_MS = float(os.environ.get("CLEVER_PERSONA_RETRIEVAL_BUDGET_MS", "1000"))
+PERSONA_RETRIEVAL_STAGE_TIMEOUT_MS = float(os.environ.get("CLEVER_PERSONA_RETRIEVAL_STAGE_TIMEOUT_MS", "500"))
+PERSONA_RETRIEVAL_TIMEOUTS_MS = os.environ.get("CLEVER_PERSONA_RETRIEVAL_TIMEOUTS_MS", "")
+
+# Deadline-aware chat (stage_planner.py): default latency budget for interactive /api/chat turns
+# (0 = no budget, full depth; off by default so planning never trims a turn the caller did not
+# budget); callers may send budget_ms, or priority="background" for full depth.
+# Stage costs are this quantile of recent timings; stages unsampled for STALE_SECONDS use priors
+CHAT_DEFAULT_BUDGET_MS = float(os.environ.get("CLEVER_CHAT_DEFAULT_BUDGET_MS", "0"))
+PERSONA_PLANNER_QUANTILE = float(os.environ.get("CLEVER_PERSONA_PLANNER_QUANTILE", "0.95"))
+PERSONA_PLANNER_STALE_SECONDS = float(os.environ.get("CLEVER_PERSONA_PLANNER_STALE_SECONDS", "30"))
+
+# Rolling per-stage latency samples for PersonaEngine.generate (perf_spans.StageTracker)
+PERSONA_STAGE_SAMPLES = int(os.environ.get("CLEVER_PERSONA_STAGE_SAMPLES", "512"))
+
+# Hot conversation history window, turns kept per session (memory_engine.ConversationWindow)
+MEMORY_HISTORY_WINDOW = int(os.environ.get("CLEVER_MEMORY_HISTORY_WINDOW", "50"))
+# Sessions kept in the hot window (least recently used sessions are dropped)
+MEMORY_HISTORY_SESSIONS = int(os.environ.get("CLEVER_MEMORY_HISTORY_SESSIONS", "256"))
+
+# Memory graph capacity (memory_capacity.MemoryCapacityManager)
+MEMORY_MAX_NODES = int(os.environ.get("CLEVER_MEMORY_MAX_NODES", "50000"))
+MEMORY_MAX_EDGES = int(os.environ.get("CLEVER_MEMORY_MAX_EDGES", "200000"))
+MEMORY_IMPORTANCE_HALF_LIFE_DAYS = float(os.environ.get("CLEVER_MEMORY_IMPORTANCE_HALF_LIFE_DAYS", "30"))
+MEMORY_EVICTION_BATCH = int(os.environ.get("CLEVER_MEMORY_EVICTION_BATCH", "500"))
+MEMORY_EVICTION_TARGET_RATIO = float(os.environ.get("CLEVER_MEMORY_EVICTION_TARGET_RATIO", "0.9"))
+MEMORY_EVICTION_INTERVAL_SECONDS = float(os.environ.get("CLEVER_MEMORY_EVICTION_INTERVAL_SECONDS", "60"))
+
+# Retention / daily rollups (retention_engine.py). Retention deletes raw chat
+# history, so automatic runs (app idle thread, sync scheduler) are opt-in via
+# RETENTION_IDLE_MAINTENANCE; the CLI ``retention`` subcommand runs on demand.
+RETENTION_RAW_DAYS = int(os.environ.get("CLEVER_RETENTION_RAW_DAYS", "30"))
+RETENTION_RELATIONSHIP_DAYS = int(os.environ.get("CLEVER_RETENTION_RELATIONSHIP_DAYS", "90"))
+RETENTION_MIN_RELATIONSHIP_STRENGTH = float(os.environ.get("CLEVER_RETENTION_MIN_RELATIONSHIP_STRENGTH", "0.3"))
+RETENTION_BATCH_ROWS = int(os.environ.get("CLEVER_RETENTION_BATCH_ROWS", "2000"))
+RETENTION_VACUUM_PAGES = int(os.environ.get("CLEVER_RETENTION_VACUUM_PAGES", "256"))
+RETENTION_IDLE_SECONDS = int(os.environ.get("CLEVER_RETENTION_IDLE_SECONDS", "300"))
+RETENTION_IDLE_MAINTENANCE = os.environ.get("CLEVER_RETENTION_IDLE_MAINTENANCE", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+
 # Server config
 APP_HOST = (
     getattr(_user_config, "CLEVER_HOST", "0.0.0.0")
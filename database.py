@@ -24,75 +24,1114 @@ How:
     insert/select logic for each table, always returning primitive Python structures
     (dicts / lists / ints) to keep calling code decoupled from SQL details. Only this
     module opens SQLite connections; callers should never manage raw connections.
+    Connections come from a process-wide ``ConnectionPool`` (one long-lived
+    connection per thread and database file) configured with WAL journaling and
+    the cache / mmap / synchronous pragmas from ``config.py`` so the chat hot path
+    never pays connection setup cost. Large document bodies are stored compressed
+    (``sources.content_z``) and decoded transparently by the source read helpers.
 
 Connects to:
     - config.py: Imports `DB_PATH` to define the single source of truth for the database file location.
     - evolution_engine.py: `add_interaction` is called (often via `app.py`) to log user interactions, which are fundamental to the evolution engine's learning process.
     - persona.py: (Indirectly via `memory_engine.py`) The persona engine relies on the database for all its memory functions, using methods like `add_utterance` to record conversations and `list_utterances` to retrieve history for contextual responses.
-    - file_ingestor.py: `FileIngestor.ingest_file()` calls `add_or_update_source()` to add or update file-based knowledge into the database.
-    - pdf_ingestor.py: `EnhancedFileIngestor.ingest_file()` calls `add_or_update_source()` to process and store PDF content.
+    - file_ingestor.py: `FileIngestor.ingest_all_files()` / `ingest_file()` call `upsert_sources_bulk()` to add or update file-based knowledge into the database.
+    - pdf_ingestor.py: `EnhancedFileIngestor.ingest_file()` calls `upsert_sources_bulk()` to store all chunks of a document in one transaction.
     - sync_watcher.py: The `SyncEventHandler` triggers the file ingestors, which in turn write to the database, keeping Clever's knowledge synchronized.
     - health_monitor.py: `SystemHealthMonitor.check_database_health()` connects to the database to verify its existence, check table integrity, and report statistics.
     - system_validator.py: `SystemValidator._validate_single_database()` checks for the existence of the database file specified in `config.py` to enforce the single database rule.
 """
 
+import atexit
+import functools
+import hashlib
+import heapq
+import io
+import itertools
+import os
+import queue
+import re
+import sqlite3
 import threading
-from dataclasses import dataclass
+import time
+import weakref
+import zlib
+from collections import deque
+from collections.abc import Mapping
 from pathlib import Path
 
-@dataclass
+from debug_config import get_debugger
+
+debugger = get_debugger()
+
+
 class Source:
-    id: int
-    filename: str
-    path: str
-    content: str | None = None
-    size: int | None = None
-    modified_ts: float | None = None
+    """One row of ``sources`` whose ``content`` is loaded on first access.
+
+    Why: Listing or looking up sources used to pull every document body into
+    Python even when callers only needed filename / size / path.
+    Where: Returned by ``DatabaseManager.get_source``, ``list_sources`` and
+    ``get_source_by_path``.
+    How: Metadata is populated eagerly; ``content`` either arrives pre-loaded or
+    is fetched (and decompressed) through ``loader(id)`` the first time it is read.
+    """
+
+    __slots__ = ("id", "filename", "path", "size", "modified_ts", "content_hash", "_content", "_loader")
+
+    def __init__(
+        self,
+        id: int,
+        filename: str,
+        path: str,
+        content: str | None = None,
+        size: int | None = None,
+        modified_ts: float | None = None,
+        content_hash: str | None = None,
+        loader=None,
+    ):
+        self.id = id
+        self.filename = filename
+        self.path = path
+        self.size = size
+        self.modified_ts = modified_ts
+        self.content_hash = content_hash
+        self._content = content
+        self._loader = loader
+
+    @property
+    def content(self) -> str | None:
+        if self._content is None and self._loader is not None:
+            self._content = self._loader(self.id)
+            self._loader = None
+        return self._content
+
+    @content.setter
+    def content(self, value: str | None) -> None:
+        self._content = value
+        self._loader = None
+
+    @property
+    def content_loaded(self) -> bool:
+        return self._content is not None or self._loader is None
+
+    def __repr__(self) -> str:
+        return f"Source(id={self.id!r}, filename={self.filename!r}, path={self.path!r}, size={self.size!r})"
+
+
+try:  # Optional: zstd compresses text better and faster than zlib
+    import zstandard as _zstd
+except ImportError:  # pragma: no cover - depends on environment
+    _zstd = None
+
+CONTENT_CODECS = ("zlib", "zstd")
+
+
+def _content_codec() -> str:
+    """Configured codec for new ``sources`` rows ("none", "zlib" or "zstd")."""
+    import config as _config
+
+    codec = str(getattr(_config, "DB_CONTENT_CODEC", "zlib")).lower()
+    if codec == "zstd" and _zstd is None:
+        codec = "zlib"
+    return codec if codec in CONTENT_CODECS else "none"
+
+
+def encode_content(content: str) -> tuple[str, bytes | None, str | None]:
+    """Return (content, content_z, content_codec) column values for a document.
+
+    Documents below ``DB_CONTENT_COMPRESS_MIN_BYTES`` (or that do not shrink)
+    are stored as plain text; otherwise ``content`` is left empty and the
+    compressed UTF-8 bytes go to ``content_z``.
+    """
+    import config as _config
+
+    codec = _content_codec()
+    raw = content.encode("utf-8", errors="ignore")
+    if codec == "none" or len(raw) < int(getattr(_config, "DB_CONTENT_COMPRESS_MIN_BYTES", 1024)):
+        return content, None, None
+    blob = _zstd.ZstdCompressor(level=3).compress(raw) if codec == "zstd" else zlib.compress(raw, 6)
+    if len(blob) >= len(raw):
+        return content, None, None
+    return "", blob, codec
+
+
+def decode_content(content: str | None, content_z: bytes | None, codec: str | None) -> str:
+    """Inverse of ``encode_content`` for one row."""
+    if not codec:
+        return content or ""
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("source content is zstd-compressed but zstandard is not installed")
+        raw = _zstd.ZstdDecompressor().decompress(bytes(content_z or b""))
+    else:
+        raw = zlib.decompress(bytes(content_z or b""))
+    return raw.decode("utf-8", errors="ignore")
+
+
+def _read_compressed_prefix(reader, codec: str, limit: int) -> bytes:
+    """Decompress at most ``limit`` bytes from a file-like ``reader``.
+
+    Input is pulled in 16 KiB pieces and decompression stops as soon as enough
+    output exists, so an excerpt near the start of a large document touches only
+    a small part of the stored blob.
+    """
+    if limit <= 0:
+        return b""
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("source content is zstd-compressed but zstandard is not installed")
+        stream = _zstd.ZstdDecompressor().stream_reader(reader)
+        out = bytearray()
+        while len(out) < limit:
+            piece = stream.read(limit - len(out))
+            if not piece:
+                break
+            out += piece
+        return bytes(out)
+    d = zlib.decompressobj()
+    out = bytearray()
+    while len(out) < limit:
+        piece = d.unconsumed_tail or reader.read(16384)
+        if not piece:
+            break
+        out += d.decompress(piece, limit - len(out))
+        if d.eof:
+            break
+    return bytes(out)
+
+
+def stat_signature(st) -> tuple[int, int, int]:
+    """Return the (inode, size, mtime_ns) tuple the file manifest compares.
+
+    Accepts an ``os.stat_result`` or a path (which is stat'ed).
+    """
+    if not hasattr(st, "st_ino"):
+        st = os.stat(st)
+    return (int(st.st_ino), int(st.st_size), int(st.st_mtime_ns))
+
+
+class LazyJSON(Mapping):
+    """Read-only mapping over a JSON text that is decoded on first access.
+
+    Why: History iterators hand out ``parsed_data`` for every interaction row,
+    but most consumers (exports, counts) never look inside it.
+    Where: ``parsed_data`` of ``DatabaseManager.iter_interactions`` rows
+    (``list_interactions`` hands out plain dicts).
+    How: Keeps the raw column text in ``raw``; ``json.loads`` runs once, on the
+    first key access. Malformed or empty text decodes to ``{}``.
+    ``to_dict()`` returns a plain dict for JSON serialization; ``json_text()``
+    returns text that is always a valid JSON object.
+    """
+
+    __slots__ = ("raw", "_data")
+
+    def __init__(self, raw: str | None):
+        self.raw = raw
+        self._data = None
+
+    def _decoded(self) -> dict:
+        if self._data is None:
+            import json as _json
+            try:
+                data = _json.loads(self.raw or "{}")
+            except (TypeError, ValueError):
+                data = {}
+            self._data = data if isinstance(data, dict) else {}
+        return self._data
+
+    @property
+    def decoded(self) -> bool:
+        return self._data is not None
+
+    def __getitem__(self, key):
+        return self._decoded()[key]
+
+    def __iter__(self):
+        return iter(self._decoded())
+
+    def __len__(self) -> int:
+        return len(self._decoded())
+
+    def to_dict(self) -> dict:
+        return dict(self._decoded())
+
+    def json_text(self) -> str:
+        """Raw text when it is a valid JSON object (no re-encode), else ``json.dumps`` of the dict."""
+        import json as _json
+        raw = (self.raw or "").strip()
+        if self._data is None and raw.startswith("{") and raw.endswith("}"):
+            try:
+                data = _json.loads(raw)
+            except ValueError:
+                data = None
+            if isinstance(data, dict):
+                self._data = data
+                return raw
+        return _json.dumps(self._decoded())
+
+    def __repr__(self) -> str:
+        return f"LazyJSON({self._data if self._data is not None else self.raw!r})"
+
+
+_SQL_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_SQL_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_VALUES_RE = re.compile(r"(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and literals so equivalent statements share one key.
+
+    ``WHERE id IN (?, ?, ?)`` and ``IN (?, ?)`` both become ``IN (?...)``;
+    string / number literals become ``?``; the result is capped at 300 chars.
+    """
+    text = " ".join(sql.split())
+    text = _SQL_STRING_RE.sub("?", text)
+    text = _SQL_NUMBER_RE.sub("?", text)
+    text = _SQL_IN_LIST_RE.sub("(?...)", text)
+    text = _SQL_VALUES_RE.sub(r"\1, ...", text)
+    return text[:300]
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class SqlTracer:
+    """Process-wide per-statement latency / row statistics.
+
+    Why: Nothing showed which queries dominate chat latency (e.g. the per-keyword
+    SELECT + UPDATE pairs in ``get_contextual_memory``).
+    Where: Fed by ``TracedCursor`` (every pooled connection) and ``TimedLock``
+    (``DatabaseManager._lock`` waits); read by ``/api/telemetry`` and
+    ``tools/runtime_dump.py``.
+    How: Keys statements by ``normalize_sql``; keeps call count, total time,
+    rows returned and the last ``samples`` durations (for p50 / p95). Lock waits
+    are tracked in a separate bucket. ``reset()`` clears everything so a replayed
+    workload can be profiled in isolation.
+    """
+
+    def __init__(self, samples: int = 512, enabled: bool = True):
+        self.enabled = enabled
+        self._samples = int(samples)
+        self._mu = threading.Lock()
+        self._stmts: dict[str, dict] = {}
+        self._lock_waits: deque = deque(maxlen=self._samples)
+        self._lock_totals = {"acquisitions": 0, "total_ms": 0.0, "max_ms": 0.0, "contended": 0}
+        self._since = time.time()
+
+    def record(self, sql: str, elapsed_s: float, rows: int = 0) -> None:
+        key = normalize_sql(sql)
+        ms = elapsed_s * 1000.0
+        with self._mu:
+            entry = self._stmts.get(key)
+            if entry is None:
+                entry = self._stmts[key] = {
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "rows": 0,
+                    "samples": deque(maxlen=self._samples),
+                }
+            entry["calls"] += 1
+            entry["total_ms"] += ms
+            entry["rows"] += rows
+            entry["samples"].append(ms)
+
+    def record_lock_wait(self, elapsed_s: float) -> None:
+        ms = elapsed_s * 1000.0
+        with self._mu:
+            t = self._lock_totals
+            t["acquisitions"] += 1
+            t["total_ms"] += ms
+            if ms > t["max_ms"]:
+                t["max_ms"] = ms
+            if ms >= 1.0:
+                t["contended"] += 1
+            self._lock_waits.append(ms)
+
+    def stats(self, top: int | None = 25, order_by: str = "total_ms") -> dict:
+        """Snapshot: statements sorted by ``order_by`` (desc) plus lock-wait stats."""
+        with self._mu:
+            items = [(k, dict(v, samples=sorted(v["samples"]))) for k, v in self._stmts.items()]
+            waits = sorted(self._lock_waits)
+            lock = dict(self._lock_totals)
+            since = self._since
+        statements = []
+        for sql, e in items:
+            statements.append({
+                "sql": sql,
+                "calls": e["calls"],
+                "total_ms": round(e["total_ms"], 3),
+                "avg_ms": round(e["total_ms"] / e["calls"], 4) if e["calls"] else 0.0,
+                "p50_ms": round(_percentile(e["samples"], 0.50), 4),
+                "p95_ms": round(_percentile(e["samples"], 0.95), 4),
+                "rows": e["rows"],
+            })
+        statements.sort(key=lambda s: s.get(order_by, 0), reverse=True)
+        lock["total_ms"] = round(lock["total_ms"], 3)
+        lock["max_ms"] = round(lock["max_ms"], 3)
+        lock["p50_ms"] = round(_percentile(waits, 0.50), 4)
+        lock["p95_ms"] = round(_percentile(waits, 0.95), 4)
+        return {
+            "enabled": self.enabled,
+            "since": since,
+            "distinct_statements": len(statements),
+            "total_calls": sum(s["calls"] for s in statements),
+            "total_ms": round(sum(s["total_ms"] for s in statements), 3),
+            "statements": statements[:top] if top else statements,
+            "lock_wait": lock,
+        }
+
+    def reset(self) -> None:
+        with self._mu:
+            self._stmts.clear()
+            self._lock_waits.clear()
+            for k in self._lock_totals:
+                self._lock_totals[k] = 0 if k in ("acquisitions", "contended") else 0.0
+            self._since = time.time()
+
+
+_SQL_TRACER = SqlTracer()
+
+
+def get_sql_tracer() -> SqlTracer:
+    """Return the process-wide ``SqlTracer`` (enabled per ``config.DB_SQL_TRACE``)."""
+    return _SQL_TRACER
+
+
+def _configure_sql_tracer() -> None:
+    import config as _config
+    _SQL_TRACER.enabled = bool(getattr(_config, "DB_SQL_TRACE", False))
+    samples = int(getattr(_config, "DB_SQL_TRACE_SAMPLES", 512))
+    if samples != _SQL_TRACER._samples:
+        _SQL_TRACER._samples = samples
+        _SQL_TRACER.reset()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement's latency and returned rows to the tracer.
+
+    A call's time is execute time plus the time spent fetching its rows; it is
+    recorded when the result set is exhausted, the cursor runs another statement,
+    or the cursor is closed / collected.
+    """
+
+    _pending = None  # [sql, elapsed_s, rows]
+
+    def _finish(self) -> None:
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            _SQL_TRACER.record(pending[0], pending[1], pending[2])
+
+    def execute(self, sql, parameters=(), /):
+        if not _SQL_TRACER.enabled:
+            return super().execute(sql, parameters)
+        self._finish()
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, time.perf_counter() - t0, 0]
+            if self.description is None:  # DML / DDL: no rows to fetch
+                self._finish()
+
+    def executemany(self, sql, seq_of_parameters, /):
+        if not _SQL_TRACER.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        self._finish()
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _SQL_TRACER.record(sql, time.perf_counter() - t0, 0)
+
+    def _timed_fetch(self, fn, *args):
+        pending = self._pending
+        if pending is None:
+            return fn(*args)
+        t0 = time.perf_counter()
+        result = fn(*args)
+        pending[1] += time.perf_counter() - t0
+        return result
+
+    def fetchone(self):
+        row = self._timed_fetch(super().fetchone)
+        if self._pending is not None:
+            if row is None:
+                self._finish()
+            else:
+                self._pending[2] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed_fetch(super().fetchmany, self.arraysize if size is None else size)
+        if self._pending is not None:
+            self._pending[2] += len(rows)
+            if not rows:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(super().fetchall)
+        if self._pending is not None:
+            self._pending[2] += len(rows)
+            self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed_fetch(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        if self._pending is not None:
+            self._pending[2] += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TimedLock:
+    """Re-entrant lock wrapper that reports acquisition wait time to the tracer.
+
+    Why: Time spent waiting on ``DatabaseManager._lock`` is invisible in
+    per-statement timings but is often the real cause of slow chat turns.
+    Where: ``DatabaseManager._lock``; external code keeps using ``with db._lock``.
+    How: Wraps ``threading.RLock``; ``acquire`` / ``__enter__`` time the wait.
+    """
+
+    def __init__(self, lock=None):
+        self._inner = lock if lock is not None else threading.RLock()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not _SQL_TRACER.enabled:
+            return self._inner.acquire(blocking, timeout)
+        t0 = time.perf_counter()
+        ok = self._inner.acquire(blocking, timeout)
+        if ok:
+            _SQL_TRACER.record_lock_wait(time.perf_counter() - t0)
+        return ok
+
+    def release(self) -> None:
+        self._inner.release()
+
+    def __enter__(self):
+        if _SQL_TRACER.enabled:
+            self.acquire()
+        else:
+            self._inner.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._inner.release()
+
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection owned by a ``ConnectionPool``.
+
+    Why: Legacy call sites (health_monitor, backup_system) call ``close()`` on the
+    object returned by ``DatabaseManager._connect()``; with pooling that must not
+    tear down a connection other helpers on the same thread will reuse.
+    Where: Created exclusively by ``ConnectionPool._open`` via ``factory=``.
+    How: ``close()`` becomes a no-op; the pool calls ``_really_close()`` when the
+    owning thread is gone or the pool is shut down. While the ``SqlTracer`` is
+    enabled cursors default to ``TracedCursor`` so statement latency feeds it;
+    otherwise statements take the plain C cursor path with no Python wrapper.
+    """
+
+    def close(self) -> None:  # noqa: D401 - intentional no-op
+        return None
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = TracedCursor if _SQL_TRACER.enabled else sqlite3.Cursor
+        return super().cursor(factory)
+
+    # The C-level Connection.execute() builds a plain cursor, bypassing cursor()
+    def execute(self, sql, parameters=(), /):
+        if not _SQL_TRACER.enabled:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        if not _SQL_TRACER.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def _really_close(self) -> None:
+        sqlite3.Connection.close(self)
+
+
+class ConnectionPool:
+    """Per-thread pool of long-lived SQLite connections for one database file.
+
+    Why: Every helper used to open a fresh ``sqlite3.connect()``; a single chat turn
+    opened well over a dozen connections, each re-reading the schema and paying
+    pragma / page-cache warmup. Keeping one tuned connection per thread removes
+    that setup cost from the ``/api/chat`` hot path.
+    Where: Obtained through ``get_connection_pool(db_path)`` and used by
+    ``DatabaseManager._connect()``; all DatabaseManager instances pointing at the
+    same file share one pool.
+    How: Connections live in a ``threading.local`` slot and are registered with a
+    weak reference to their owning thread. Connections whose thread has exited are
+    reaped the next time a connection is opened. Each connection is created with a
+    statement cache (``cached_statements``) and configured with WAL journaling,
+    ``synchronous``, ``cache_size``, ``mmap_size`` and ``busy_timeout`` from config;
+    new database files are created with ``auto_vacuum`` (INCREMENTAL by default).
+    Checkout counters and wait time are exposed through ``stats()``.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size_kb: int = 8192,
+        mmap_size: int = 64 * 1024 * 1024,
+        statement_cache_size: int = 256,
+        busy_timeout_ms: int = 5000,
+        auto_vacuum: str = "INCREMENTAL",
+    ):
+        self.db_path = str(db_path)
+        self.auto_vacuum = auto_vacuum
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size_kb = int(cache_size_kb)
+        self.mmap_size = int(mmap_size)
+        self.statement_cache_size = int(statement_cache_size)
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        self._registry_lock = threading.Lock()
+        # thread ident -> (weakref to thread, connection)
+        self._registry: dict[int, tuple[weakref.ref, PooledConnection]] = {}
+        self._stats = {
+            "checkouts": 0,
+            "reused": 0,
+            "opened": 0,
+            "reaped": 0,
+            "wait_time_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
+
+    def _open(self) -> PooledConnection:
+        con = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,  # only the owning thread uses it; reaping may happen elsewhere
+            cached_statements=self.statement_cache_size,
+            factory=PooledConnection,
+        )
+        # Only takes effect on a brand-new file (before the first table exists)
+        con.execute(f"PRAGMA auto_vacuum={self.auto_vacuum}")
+        con.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        con.execute(f"PRAGMA synchronous={self.synchronous}")
+        # Negative cache_size is interpreted by SQLite as KiB rather than pages
+        con.execute(f"PRAGMA cache_size={-abs(self.cache_size_kb)}")
+        con.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        con.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        return con
+
+    def _reap_dead_threads(self) -> None:
+        """Close connections whose owning thread has exited (registry lock held).
+
+        The main thread is never reaped: during interpreter shutdown it already
+        reports ``is_alive() == False`` while atexit handlers still use its
+        connection.
+        """
+        main = threading.main_thread().ident
+        dead = [
+            ident for ident, (ref, _) in self._registry.items()
+            if ident != main and (ref() is None or not ref().is_alive())
+        ]
+        for ident in dead:
+            _, con = self._registry.pop(ident)
+            try:
+                con._really_close()
+            except Exception:
+                pass
+            self._stats["reaped"] += 1
+
+    def acquire(self) -> PooledConnection:
+        """Return the calling thread's connection, opening it on first use."""
+        t0 = time.perf_counter()
+        con = getattr(self._local, "con", None)
+        if con is None:
+            with self._registry_lock:
+                self._reap_dead_threads()
+                con = self._open()
+                thread = threading.current_thread()
+                self._registry[threading.get_ident()] = (weakref.ref(thread), con)
+                self._stats["opened"] += 1
+            self._local.con = con
+            reused = 0
+        else:
+            reused = 1
+        waited_ms = (time.perf_counter() - t0) * 1000.0
+        # Counters are shared across threads; the read-compare-write on
+        # max_wait_ms would lose updates without the lock.
+        with self._registry_lock:
+            self._stats["reused"] += reused
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_ms"] += waited_ms
+            if waited_ms > self._stats["max_wait_ms"]:
+                self._stats["max_wait_ms"] = waited_ms
+        return con
+
+    def close_all(self) -> None:
+        """Close every pooled connection (used at shutdown and by tests)."""
+        with self._registry_lock:
+            for _, con in self._registry.values():
+                try:
+                    con._really_close()
+                except Exception:
+                    pass
+            self._registry.clear()
+        # Force every thread (including this one) to reopen on next acquire
+        self._local = threading.local()
+
+    def stats(self) -> dict:
+        """Snapshot of pool counters for telemetry endpoints and benchmarks."""
+        with self._registry_lock:
+            open_connections = len(self._registry)
+            out = dict(self._stats)
+        out["open_connections"] = open_connections
+        out["avg_wait_ms"] = round(out["wait_time_ms"] / out["checkouts"], 4) if out["checkouts"] else 0.0
+        out["wait_time_ms"] = round(out["wait_time_ms"], 3)
+        out["max_wait_ms"] = round(out["max_wait_ms"], 3)
+        out["db_path"] = self.db_path
+        return out
+
+
+_POOLS: dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(db_path: str | Path) -> ConnectionPool:
+    """Return the shared ConnectionPool for ``db_path`` (created on first use).
+
+    Why: Several modules build their own ``DatabaseManager`` for the same file
+    (memory engine, NotebookLM engine, persona knowledge lookups); sharing one pool
+    per file keeps the one-connection-per-thread invariant across all of them.
+    Where: Called by ``DatabaseManager._connect()``.
+    How: Dictionary keyed by resolved path, guarded by a module lock; pragma values
+    are read from ``config`` with conservative fallbacks.
+    """
+    key = str(db_path)
+    if key != ":memory:":
+        key = str(Path(key).resolve())
+    pool = _POOLS.get(key)
+    if pool is not None:
+        return pool
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            import config as _config
+            pool = ConnectionPool(
+                key,
+                journal_mode=getattr(_config, "DB_JOURNAL_MODE", "WAL"),
+                synchronous=getattr(_config, "DB_SYNCHRONOUS", "NORMAL"),
+                cache_size_kb=getattr(_config, "DB_CACHE_SIZE_KB", 8192),
+                mmap_size=getattr(_config, "DB_MMAP_SIZE", 64 * 1024 * 1024),
+                statement_cache_size=getattr(_config, "DB_STATEMENT_CACHE_SIZE", 256),
+                busy_timeout_ms=getattr(_config, "DB_BUSY_TIMEOUT_MS", 5000),
+                auto_vacuum=getattr(_config, "DB_AUTO_VACUUM", "INCREMENTAL"),
+            )
+            _POOLS[key] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    """Close every pooled connection in the process (shutdown / test teardown)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+DURABILITY_LEVELS = ("sync", "batched", "fire-and-forget")
+
+
+class WriteBehindQueue:
+    """Background group-commit writer for append-only telemetry rows.
+
+    Why: ``add_conversation`` used to run three transactions (two utterances and an
+    interaction), each ending in its own commit/fsync while the request thread held
+    the global lock. Telemetry rows don't need per-row durability, so batching them
+    into one transaction every few milliseconds takes fsync off the request path.
+    Where: One instance per database file via ``get_write_queue(db_path)``; used by
+    ``DatabaseManager.execute_write`` (utterances, interactions, memory context rows).
+    How: A bounded ``queue.Queue`` feeds a daemon thread that drains up to
+    ``max_batch_rows`` statements or waits at most ``flush_ms`` before committing them
+    in a single transaction on its own pooled connection. Every submission gets a
+    sequence number; ``wait_for(seq)`` blocks until the writer committed it, which
+    is how ``flush()`` and per-thread read-your-writes barriers are built. Waiters
+    nudge the writer so a barrier costs one commit, not a full flush interval.
+    Sequence numbers are reserved under a short lock and the ``put`` happens
+    outside it, so one producer waiting for queue room never holds up the others;
+    the committed sequence is a watermark that only advances past a number once
+    every lower one was committed, failed or dropped.
+    A batch that fails to commit still advances the committed sequence (its rows
+    count as ``failed_rows``), waiters restart a dead writer thread, and the
+    read-your-writes barriers are bounded by ``barrier_timeout`` so a broken
+    writer degrades to stale reads instead of hanging the caller.
+    Durability levels:
+        - "sync": caller waits for the batch containing its write to commit
+        - "batched": caller returns immediately; when the queue is full it waits at
+          most ``barrier_timeout`` for room, then the row is dropped and counted
+        - "fire-and-forget": caller never blocks; rows are dropped when saturated
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        max_batch_rows: int = 200,
+        flush_ms: int = 50,
+        max_queue: int = 10000,
+        barrier_timeout: float = 5.0,
+    ):
+        self.db_path = str(db_path)
+        self.max_batch_rows = max(1, int(max_batch_rows))
+        self.flush_ms = max(1, int(flush_ms))
+        self.barrier_timeout = max(0.0, float(barrier_timeout))
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._seq_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._nudge = threading.Event()
+        self._local = threading.local()
+        self._enqueued_seq = 0  # highest reserved sequence number
+        self._committed_seq = 0  # every sequence number <= this one is settled
+        self._settled: list[int] = []  # heap of settled numbers above the watermark
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._stats = {
+            "submitted": 0,
+            "committed_rows": 0,
+            "batches": 0,
+            "dropped": 0,
+            "failed_rows": 0,
+            "max_batch_size": 0,
+            "commit_time_ms": 0.0,
+        }
+
+    # --- producer side ---
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._seq_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="clever-db-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, sql: str, params=(), *, many: bool = False, durability: str = "batched") -> int | None:
+        """Queue one statement; returns its sequence number (None if dropped)."""
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"unknown durability level: {durability!r}")
+        self._ensure_thread()
+        with self._seq_lock:
+            self._enqueued_seq += 1
+            seq = self._enqueued_seq
+        item = (seq, sql, params, many)
+        try:
+            if durability == "fire-and-forget":
+                self._queue.put_nowait(item)
+            else:
+                self._queue.put(item, timeout=self.barrier_timeout)
+        except queue.Full:
+            with self._seq_lock:
+                self._stats["dropped"] += 1
+            self._settle([seq])
+            return None
+        with self._seq_lock:
+            self._stats["submitted"] += 1
+        self._local.last_seq = seq
+        if durability == "sync":
+            self.wait_for(seq, self.barrier_timeout)
+        return seq
+
+    def wait_for(self, seq: int, timeout: float | None = None) -> bool:
+        """Block until ``seq`` is committed; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._committed_seq < seq:
+                if self._thread is None or not self._thread.is_alive():
+                    # Queued rows with no writer would never commit: restart it
+                    self._ensure_thread()
+                self._nudge.set()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(timeout=0.5 if remaining is None else min(0.5, remaining))
+        return True
+
+    def wait_for_own_writes(self, timeout: float | None = None) -> bool:
+        """Read-your-writes barrier: wait for the calling thread's queued writes.
+
+        ``timeout=None`` means ``barrier_timeout``; on expiry the caller reads
+        possibly stale rows rather than blocking a request indefinitely.
+        """
+        seq = getattr(self._local, "last_seq", 0)
+        if not seq or self._committed_seq >= seq:
+            return True
+        return self.wait_for(seq, self.barrier_timeout if timeout is None else timeout)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything submitted so far has been committed."""
+        with self._seq_lock:
+            seq = self._enqueued_seq
+        if not seq or self._thread is None:
+            return True
+        return self.wait_for(seq, timeout)
+
+    def pending(self) -> int:
+        return self._enqueued_seq - self._committed_seq
+
+    def stats(self) -> dict:
+        out = dict(self._stats)
+        out["pending"] = self.pending()
+        out["commit_time_ms"] = round(out["commit_time_ms"], 3)
+        out["avg_batch_size"] = round(out["committed_rows"] / out["batches"], 2) if out["batches"] else 0.0
+        return out
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending rows and stop the writer thread."""
+        self.flush(timeout)
+        self._stopping = True
+        self._nudge.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _settle(self, seqs) -> None:
+        """Mark sequence numbers committed / failed / dropped and advance the watermark."""
+        with self._cond:
+            for seq in seqs:
+                heapq.heappush(self._settled, seq)
+            while self._settled and self._settled[0] <= self._committed_seq + 1:
+                self._committed_seq = max(self._committed_seq, heapq.heappop(self._settled))
+            self._cond.notify_all()
+
+    # --- writer side ---
+    def _collect_batch(self) -> list:
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_ms / 1000.0
+        while len(batch) < self.max_batch_rows:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            if self._nudge.is_set() or self._stopping:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._nudge.wait(min(remaining, 0.005))
+        self._nudge.clear()
+        return batch
+
+    def _apply(self, con, item) -> None:
+        _, sql, params, many = item
+        if many:
+            con.executemany(sql, params)
+        else:
+            con.execute(sql, params)
+
+    def _commit_batch(self, batch: list) -> None:
+        t0 = time.perf_counter()
+        con = get_connection_pool(self.db_path).acquire()
+        failed = 0
+        try:
+            with con:
+                for item in batch:
+                    self._apply(con, item)
+        except Exception:
+            # One bad row must not lose the rest of the batch: replay individually
+            for item in batch:
+                try:
+                    with con:
+                        self._apply(con, item)
+                except Exception as e:
+                    failed += 1
+                    debugger.warning("database", f"Write-behind dropped failed write: {e}")
+        self._stats["commit_time_ms"] += (time.perf_counter() - t0) * 1000.0
+        self._stats["batches"] += 1
+        self._stats["failed_rows"] += failed
+        self._stats["committed_rows"] += len(batch) - failed
+        if len(batch) > self._stats["max_batch_size"]:
+            self._stats["max_batch_size"] = len(batch)
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            try:
+                batch = self._collect_batch()
+                if batch:
+                    self._commit_batch(batch)
+                elif self._stopping:
+                    return
+            except Exception as e:
+                # e.g. the pool could not open a connection: the batch is lost,
+                # but the writer must survive and waiters must not hang on it
+                self._stats["failed_rows"] += len(batch)
+                debugger.error("database", f"Write-behind batch of {len(batch)} rows failed: {e}")
+            finally:
+                if batch:
+                    self._settle(item[0] for item in batch)
+
+
+_WRITERS: dict[str, WriteBehindQueue] = {}
+
+
+def get_write_queue(db_path: str | Path) -> WriteBehindQueue:
+    """Return the shared write-behind queue for ``db_path`` (created on first use)."""
+    key = get_connection_pool(db_path).db_path
+    writer = _WRITERS.get(key)
+    if writer is not None:
+        return writer
+    with _POOLS_LOCK:
+        writer = _WRITERS.get(key)
+        if writer is None:
+            import config as _config
+            writer = WriteBehindQueue(
+                key,
+                max_batch_rows=getattr(_config, "DB_WRITE_BATCH_ROWS", 200),
+                flush_ms=getattr(_config, "DB_WRITE_FLUSH_MS", 50),
+                max_queue=getattr(_config, "DB_WRITE_QUEUE_SIZE", 10000),
+                barrier_timeout=getattr(_config, "DB_WRITE_BARRIER_TIMEOUT_S", 5.0),
+            )
+            _WRITERS[key] = writer
+        return writer
+
+
+def flush_all_writers(timeout: float | None = 5.0) -> None:
+    """Flush every write-behind queue (registered with atexit for clean shutdown)."""
+    for writer in list(_WRITERS.values()):
+        writer.flush(timeout)
+
+
+atexit.register(flush_all_writers)
+
 
 class DatabaseManager:
     def __init__(self, db_path: str | Path):
         self.db_path = str(db_path)
-        self._lock = threading.RLock()  # Thread-safe DB access
+        _configure_sql_tracer()
+        self._lock = TimedLock(threading.RLock())  # Thread-safe DB access (wait time traced)
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         self._init()
 
-    def _connect(self):
-        import sqlite3
-        return sqlite3.connect(self.db_path)
+    def _connect(self) -> PooledConnection:
+        """Check out this thread's pooled connection for ``self.db_path``.
+
+        Why: Callers keep the familiar ``with self._lock, self._connect() as con``
+        idiom (commit on success, rollback on error) without paying connect cost.
+        Where: Every helper in this module plus legacy direct users of ``_connect``.
+        How: Resolves the pool on each call so reassigning ``db_path`` (tests do
+        this) transparently switches to the matching pool.
+        """
+        return get_connection_pool(self.db_path).acquire()
+
+    def pool_stats(self) -> dict:
+        """Expose connection pool statistics for telemetry and benchmarks."""
+        return get_connection_pool(self.db_path).stats()
+
+    def sql_stats(self, top: int | None = 25, order_by: str = "total_ms") -> dict:
+        """Per-statement latency (calls, total / p50 / p95 ms, rows) and lock-wait stats."""
+        return _SQL_TRACER.stats(top=top, order_by=order_by)
+
+    def reset_sql_stats(self) -> dict:
+        """Return the current SQL trace snapshot, then clear it."""
+        snapshot = _SQL_TRACER.stats(top=None)
+        _SQL_TRACER.reset()
+        return snapshot
+
+    # --- Write-behind ---
+    def _default_durability(self) -> str:
+        import config as _config
+        level = getattr(_config, "DB_WRITE_DURABILITY", "batched")
+        return level if level in DURABILITY_LEVELS else "batched"
+
+    def execute_write(
+        self,
+        sql: str,
+        params=(),
+        *,
+        many: bool = False,
+        durability: str | None = None,
+    ) -> int:
+        """Execute an append-style write honoring a durability level.
+
+        Why: Lets telemetry writers (utterances, interactions, memory context rows)
+        skip per-row fsync while callers needing a row id can still ask for it.
+        Where: add_utterance / add_interaction / add_conversation and
+        memory_engine's deferred inserts.
+        How: "sync" first drains this thread's queued writes (preserving order) and
+        then executes on the caller's pooled connection, returning ``lastrowid``.
+        "batched" and "fire-and-forget" go through the shared WriteBehindQueue and
+        return 0 because the row id is not known yet.
+        """
+        level = durability or self._default_durability()
+        if level not in DURABILITY_LEVELS:
+            raise ValueError(f"unknown durability level: {level!r}")
+        writer = get_write_queue(self.db_path)
+        if level != "sync":
+            writer.submit(sql, params, many=many, durability=level)
+            return 0
+        writer.wait_for_own_writes()
+        with self._lock, self._connect() as con:
+            if many:
+                con.executemany(sql, params)
+                return 0
+            cur = con.execute(sql, params)
+            return int(cur.lastrowid) if cur.lastrowid is not None else 0
+
+    def wait_for_own_writes(self, timeout: float | None = None) -> bool:
+        """Read-your-writes barrier for the calling thread's deferred writes."""
+        return get_write_queue(self.db_path).wait_for_own_writes(timeout)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every deferred write for this database has been committed."""
+        return get_write_queue(self.db_path).flush(timeout)
+
+    def writer_stats(self) -> dict:
+        """Expose write-behind queue counters (pending, batches, drops)."""
+        return get_write_queue(self.db_path).stats()
 
     def _init(self):
         """Initialize all required database tables.
 
-        Why: Ensures single-file SQLite schema (sources, utterances, interactions, context_notes)
-        exists before any operations; supports offline, single-user constraints.
+        Why: Ensures single-file SQLite schema (sources, source_chunks, file_manifest, utterances,
+        interactions, context_notes) exists before any operations; supports offline, single-user constraints.
         Where: Called from __init__ immediately after path is prepared.
         How: Creates tables idempotently; backfills missing columns using PRAGMA
         inspection. All executed under thread lock for safety during first-run
         initialization in multi-threaded Flask contexts.
         """
         with self._lock, self._connect() as con:
-            con.execute(
-                """
-CREATE TABLE IF NOT EXISTS sources (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    filename TEXT NOT NULL,
-    path TEXT NOT NULL,
-    content TEXT NOT NULL,
-    content_hash TEXT,
-    size INTEGER,
-    modified_ts REAL,
-    UNIQUE(path)
-);
-                """
-            )
+            con.execute(self._SOURCES_DDL)
             # Backfill columns if the table pre-existed without them
-            cols = {row[1] for row in con.execute("PRAGMA table_info(sources)")}
-            if "content_hash" not in cols:
-                con.execute("ALTER TABLE sources ADD COLUMN content_hash TEXT")
-            if "size" not in cols:
-                con.execute("ALTER TABLE sources ADD COLUMN size INTEGER")
-            if "modified_ts" not in cols:
-                con.execute("ALTER TABLE sources ADD COLUMN modified_ts REAL")
+            self._backfill_source_columns(con)
             # Chat history table (utterances)
             con.execute(
                 """
@@ -118,6 +1157,9 @@ CREATE TABLE IF NOT EXISTS interactions (
 );
                 """
             )
+            # Time-range scans (history, retention rollups) use these
+            con.execute("CREATE INDEX IF NOT EXISTS idx_utterances_ts ON utterances (ts)")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_interactions_ts ON interactions (ts)")
             # Context notes table
             con.execute(
                 """
@@ -128,8 +1170,389 @@ CREATE TABLE IF NOT EXISTS context_notes (
 );
                 """
             )
+            # Chunk store for large documents (one row per (source_id, chunk_index))
+            con.execute(self._SOURCE_CHUNKS_DDL)
+            self._backfill_chunk_columns(con)
+            # File manifest: last stat signature + hash per ingested path
+            con.execute(self._FILE_MANIFEST_DDL)
+            # Full-text index mirroring sources (filename, content) and chunks
+            self._init_fts(con)
             # NOTE: No explicit commit after exiting context; managed by with-block
 
+    _SOURCES_FTS_DDL = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS sources_fts USING fts5("
+        "filename, content, content='', tokenize='unicode61 remove_diacritics 2')"
+    )
+    _SOURCE_CHUNKS_FTS_DDL = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS source_chunks_fts USING fts5("
+        "content, content='', tokenize='unicode61 remove_diacritics 2')"
+    )
+
+    def _init_fts(self, con) -> None:
+        """Create and reconcile the ``sources_fts`` FTS5 index.
+
+        Why: Knowledge lookups used ``LOWER(content) LIKE '%term%'``, a full table
+        scan that lowercases every document per chat turn; an inverted index keeps
+        search latency flat as the knowledge base grows.
+        Where: Called from ``_init`` inside its connection/transaction, and from
+        ``_ensure_fts`` when ``db_path`` was repointed.
+        How: ``sources_fts`` is a contentless FTS5 table (``content=''``) whose
+        rowid equals ``sources.id``, so it holds the inverted index only and the
+        document text is not stored a second time. Contentless rows can only be
+        removed with FTS5's ``'delete'`` command and the originally indexed
+        values, so the write helpers maintain the index through
+        ``_fts_index_sources`` / ``_fts_unindex_sources`` and ``sources.fts_hash``
+        records which ``content_hash`` is indexed. Reconciliation works on that
+        hash, not on row counts: rows never indexed (``fts_hash IS NULL``) are
+        added, and a row whose hash changed behind the helpers' back (its old
+        text is gone, so it cannot be deleted precisely) triggers a rebuild. A
+        content-storing index left by an older build is dropped and rebuilt.
+        ``source_chunks_fts`` indexes ``source_chunks`` for chunk-level
+        retrieval and is contentless too, tracked by ``source_chunks.fts_hash``. When the SQLite build lacks FTS5, ``fts_available`` is False
+        and ``search_sources`` falls back to LIKE scans.
+        """
+        try:
+            existing = con.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'sources_fts'"
+            ).fetchone()
+            if existing and "content=''" not in existing[0]:
+                con.execute("DROP TABLE sources_fts")
+                con.execute("UPDATE sources SET fts_hash = NULL")
+            con.execute(self._SOURCES_FTS_DDL)
+        except sqlite3.OperationalError:
+            self.fts_available = False
+            return
+        self.fts_available = True
+        self._fts_db_path = self.db_path
+        con.execute(self._SOURCE_CHUNKS_DDL)
+        self._backfill_chunk_columns(con)
+        stale = con.execute(
+            "SELECT 1 FROM sources WHERE fts_hash IS NOT NULL "
+            "AND fts_hash != COALESCE(content_hash, '') "
+            "AND fts_hash != ? || COALESCE(content_hash, '') LIMIT 1",
+            (self._FTS_CHUNKED,),
+        ).fetchone()
+        if stale:
+            self._fts_reset_sources(con)
+        self._fts_index_pending(con)
+        # Chunk-level index (rowid = source_chunks.id): contentless and
+        # reconciled on source_chunks.fts_hash the same way
+        existing = con.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'source_chunks_fts'"
+        ).fetchone()
+        if existing and "content=''" not in existing[0]:
+            con.execute("DROP TABLE source_chunks_fts")
+            con.execute("UPDATE source_chunks SET fts_hash = NULL")
+        con.execute(self._SOURCE_CHUNKS_FTS_DDL)
+        if con.execute(
+            "SELECT 1 FROM source_chunks WHERE fts_hash IS NOT NULL AND fts_hash != content_hash LIMIT 1"
+        ).fetchone():
+            self._fts_reset_chunks(con)
+        self._fts_index_pending_chunks(con)
+
+    def _ensure_fts(self, con) -> bool:
+        """True when the FTS5 tables can be used on ``con``.
+
+        Creates and reconciles them first if ``db_path`` was repointed after
+        ``__init__`` (tests do this), so writes never miss the index.
+        """
+        if not getattr(self, "fts_available", False):
+            return False
+        if getattr(self, "_fts_db_path", None) != self.db_path:
+            self._init_fts(con)
+        return self.fts_available
+
+    # fts_hash prefix for chunked documents: their text is searched through
+    # source_chunks_fts, so the parent entry indexes the filename only
+    _FTS_CHUNKED = "chunked:"
+
+    def _fts_index_sources(self, con, rows) -> None:
+        """Index ``(id, filename, text, content_hash, chunked)`` rows and record their hash.
+
+        A chunked document gets a filename-only entry (its body is already in
+        ``source_chunks_fts``) and an ``fts_hash`` carrying ``_FTS_CHUNKED``, so
+        ``_fts_unindex_sources`` knows which values to delete.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        con.executemany(
+            "INSERT INTO sources_fts (rowid, filename, content) VALUES (?, ?, ?)",
+            [(i, f, "" if chunked else (t or "")) for i, f, t, _h, chunked in rows],
+        )
+        con.executemany(
+            "UPDATE sources SET fts_hash = ? WHERE id = ?",
+            [((self._FTS_CHUNKED if chunked else "") + (h or ""), i) for i, _f, _t, h, chunked in rows],
+        )
+
+    def _fts_unindex_sources(self, con, source_ids) -> bool:
+        """Remove sources from ``sources_fts`` before their rows are overwritten.
+
+        The FTS5 ``'delete'`` command needs the exact values that were indexed,
+        which are decoded from the still-unchanged ``sources`` row (or are just
+        the filename for a chunked document). If a row's text no longer matches
+        its ``fts_hash`` the index is reset instead and True is returned: the
+        caller must then run ``_fts_index_pending``.
+        """
+        ids = list(dict.fromkeys(int(i) for i in source_ids))
+        if not ids:
+            return False
+        marks = ",".join("?" * len(ids))
+        rows = con.execute(
+            "SELECT id, filename, content, content_z, content_codec, content_hash, fts_hash "
+            f"FROM sources WHERE fts_hash IS NOT NULL AND id IN ({marks})",
+            ids,
+        ).fetchall()
+        deletes = []
+        for i, f, c, z, codec, content_hash, fts_hash in rows:
+            if fts_hash == self._FTS_CHUNKED + (content_hash or ""):
+                deletes.append((i, f, ""))
+            elif fts_hash == (content_hash or ""):
+                deletes.append((i, f, decode_content(c, z, codec)))
+            else:
+                self._fts_reset_sources(con)
+                return True
+        con.executemany(
+            "INSERT INTO sources_fts (sources_fts, rowid, filename, content) VALUES ('delete', ?, ?, ?)",
+            deletes,
+        )
+        con.executemany("UPDATE sources SET fts_hash = NULL WHERE id = ?", [(r[0],) for r in deletes])
+        return False
+
+    @staticmethod
+    def _fts_reset_sources(con) -> None:
+        """Empty ``sources_fts`` and mark every source as not indexed."""
+        con.execute("INSERT INTO sources_fts (sources_fts) VALUES ('delete-all')")
+        con.execute("UPDATE sources SET fts_hash = NULL WHERE fts_hash IS NOT NULL")
+
+    def _fts_index_pending(self, con, batch_size: int = 200) -> None:
+        """Index every source with ``fts_hash IS NULL`` in id-ordered batches."""
+        last_id = 0
+        while True:
+            rows = con.execute(
+                """
+SELECT id, filename, content, content_z, content_codec, content_hash,
+       EXISTS (SELECT 1 FROM source_chunks c WHERE c.source_id = sources.id)
+FROM sources WHERE fts_hash IS NULL AND id > ? ORDER BY id LIMIT ?
+                """,
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            self._fts_index_sources(
+                con,
+                [
+                    (i, f, None if chunked else decode_content(c, z, codec), h, bool(chunked))
+                    for i, f, c, z, codec, h, chunked in rows
+                ],
+            )
+
+    @staticmethod
+    def _fts_index_chunks(con, rows) -> None:
+        """Index ``(chunk_id, text, content_hash)`` rows in ``source_chunks_fts``."""
+        rows = list(rows)
+        if not rows:
+            return
+        con.executemany(
+            "INSERT INTO source_chunks_fts (rowid, content) VALUES (?, ?)", [(i, t or "") for i, t, _h in rows]
+        )
+        con.executemany("UPDATE source_chunks SET fts_hash = ? WHERE id = ?", [(h, i) for i, _t, h in rows])
+
+    def _fts_unindex_chunks(self, con, chunk_ids) -> bool:
+        """Chunk counterpart of ``_fts_unindex_sources`` (True when the index was reset)."""
+        ids = list(dict.fromkeys(int(i) for i in chunk_ids))
+        if not ids:
+            return False
+        marks = ",".join("?" * len(ids))
+        rows = con.execute(
+            "SELECT id, content, content_z, content_codec, content_hash, fts_hash "
+            f"FROM source_chunks WHERE fts_hash IS NOT NULL AND id IN ({marks})",
+            ids,
+        ).fetchall()
+        if any(fts_hash != content_hash for *_rest, content_hash, fts_hash in rows):
+            self._fts_reset_chunks(con)
+            return True
+        con.executemany(
+            "INSERT INTO source_chunks_fts (source_chunks_fts, rowid, content) VALUES ('delete', ?, ?)",
+            [(i, decode_content(c, z, codec)) for i, c, z, codec, _h, _fh in rows],
+        )
+        con.executemany("UPDATE source_chunks SET fts_hash = NULL WHERE id = ?", [(r[0],) for r in rows])
+        return False
+
+    @staticmethod
+    def _fts_reset_chunks(con) -> None:
+        """Empty ``source_chunks_fts`` and mark every chunk as not indexed."""
+        con.execute("INSERT INTO source_chunks_fts (source_chunks_fts) VALUES ('delete-all')")
+        con.execute("UPDATE source_chunks SET fts_hash = NULL WHERE fts_hash IS NOT NULL")
+
+    def _fts_index_pending_chunks(self, con, batch_size: int = 500) -> None:
+        """Index every chunk with ``fts_hash IS NULL`` in id-ordered batches."""
+        last_id = 0
+        while True:
+            rows = con.execute(
+                "SELECT id, content, content_z, content_codec, content_hash FROM source_chunks "
+                "WHERE fts_hash IS NULL AND id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            self._fts_index_chunks(con, [(i, decode_content(c, z, codec), h) for i, c, z, codec, h in rows])
+
+    @staticmethod
+    def _fts_terms(query: str) -> list[str]:
+        """Distinct lower-cased word tokens of ``query`` (at most 16, 2+ chars)."""
+        terms = []
+        for tok in re.findall(r"\w+", query.lower()):
+            if len(tok) < 2 or tok in terms:
+                continue
+            terms.append(tok)
+        return terms[:16]
+
+    @staticmethod
+    def _fts_snippet(text: str | None, terms: list[str], width: int = 320) -> str:
+        """Cut about ``width`` characters of ``text`` around the first term hit.
+
+        Contentless FTS5 tables keep no text for ``snippet()``, so search helpers
+        decode the matched row and build the excerpt here, marking cut edges
+        with "..." the way ``snippet()`` did.
+        """
+        if not text:
+            return ""
+        hit = None
+        if terms:
+            hit = re.search(r"\b(?:" + "|".join(re.escape(t) for t in terms) + ")", text, re.IGNORECASE)
+        pos = hit.start() if hit else 0
+        start = max(0, pos - width // 4)
+        end = min(len(text), start + width)
+        window = text[start:end]
+        if start > 0:
+            # Drop the partial word at the left edge (never past the hit itself)
+            cut = window.find(" ", 0, pos - start)
+            window = window[cut + 1:] if cut >= 0 else window
+        if end < len(text):
+            cut = window.rfind(" ")
+            window = window[:cut] if cut > 0 else window
+        body = " ".join(window.split())
+        return ("..." if start > 0 else "") + body + ("..." if end < len(text) else "")
+
+    @staticmethod
+    def _fts_match_expression(query: str) -> str:
+        """Turn free text into a safe FTS5 MATCH expression.
+
+        Why: User text contains FTS5 operators / punctuation that would raise
+        syntax errors if passed through verbatim.
+        Where: Used by ``search_sources`` and ``search_chunks``.
+        How: Extracts word tokens (``_fts_terms``), quotes each one, uses prefix
+        matching so "ingest" also finds "ingestion", and ORs them so bm25 ranks
+        documents matching more terms first.
+        """
+        return " OR ".join(f'"{t}"*' for t in DatabaseManager._fts_terms(query))
+
+    def search_sources(self, query: str, limit: int = 10, snippet: bool = True) -> list[dict]:
+        """Ranked full-text search over ingested sources.
+
+        Why: Backs ``/api/search``, ``utils/cli.py search`` and persona knowledge
+        retrieval with an indexed lookup instead of per-turn table scans.
+        Where: app.search(), utils/cli.cmd_search(), persona knowledge helpers.
+        How: Runs an FTS5 MATCH ordered by ``bm25`` (filename hits weighted above
+        body hits). Chunked documents index only their filename in
+        ``sources_fts``; their body matches come from ``source_chunks_fts`` and
+        are folded into one result per document (best rank wins). The indexes
+        are contentless, so snippets are cut by ``_fts_snippet`` from the best
+        matching chunk, or from the document text for unchunked sources. Falls
+        back to a LIKE scan when FTS5 is unavailable.
+
+        Returns:
+            List of dicts with id, filename, path, size, score (higher is better)
+            and, when requested, snippet.
+        """
+        terms = self._fts_terms(query or "")
+        if not terms:
+            return []
+        match = self._fts_match_expression(query or "")
+        limit = max(1, int(limit))
+        with self._lock, self._connect() as con:
+            if self._ensure_fts(con):
+                # Bare chunk_id next to MIN(rank) comes from the best-ranked hit (SQLite rule)
+                rows = con.execute(
+                    """
+WITH hits AS (
+    SELECT rowid AS source_id, bm25(sources_fts, 4.0, 1.0) AS rank, NULL AS chunk_id
+    FROM sources_fts WHERE sources_fts MATCH ?
+    UNION ALL
+    SELECT c.source_id, bm25(source_chunks_fts), c.id
+    FROM source_chunks_fts JOIN source_chunks c ON c.id = source_chunks_fts.rowid
+    WHERE source_chunks_fts MATCH ?
+)
+SELECT s.id, s.filename, s.path, s.size, MIN(h.rank) AS rank, h.chunk_id
+FROM hits h JOIN sources s ON s.id = h.source_id
+GROUP BY s.id
+ORDER BY rank
+LIMIT ?
+                    """,
+                    (match, match, limit),
+                ).fetchall()
+                texts = self._snippet_texts(con, rows) if snippet else {}
+                rows = [(*r[:5], self._fts_snippet(texts.get(r[0]), terms)) for r in rows]
+            else:
+                term = f"%{(query or '').strip().lower()}%"
+                rows = con.execute(
+                    """
+SELECT id, filename, path, size, 0.0,
+       substr(content, max(1, instr(lower(content), lower(?)) - 100), 400)
+FROM sources
+WHERE lower(content) LIKE ? OR lower(filename) LIKE ?
+LIMIT ?
+                    """,
+                    ((query or "").strip(), term, term, limit),
+                ).fetchall()
+        out = []
+        for r in rows:
+            item = {
+                "id": r[0],
+                "filename": r[1],
+                "path": r[2],
+                "size": r[3],
+                "score": round(-float(r[4] or 0.0), 4),
+            }
+            if snippet:
+                item["snippet"] = (r[5] or "").strip()
+            out.append(item)
+        return out
+
+    @staticmethod
+    def _snippet_texts(con, rows) -> dict[int, str]:
+        """Text to cut snippets from for ``search_sources`` rows, keyed by source id.
+
+        Uses the best matching chunk when the hit came from ``source_chunks_fts``,
+        the first chunk for a filename-only hit on a chunked document, and the
+        decoded document body otherwise.
+        """
+        texts: dict[int, str] = {}
+        chunk_ids = [r[5] for r in rows if r[5] is not None]
+        if chunk_ids:
+            marks = ",".join("?" * len(chunk_ids))
+            for i, c, z, codec in con.execute(
+                f"SELECT source_id, content, content_z, content_codec FROM source_chunks WHERE id IN ({marks})",
+                chunk_ids,
+            ):
+                texts[i] = decode_content(c, z, codec)
+        source_ids = [r[0] for r in rows if r[5] is None]
+        if source_ids:
+            marks = ",".join("?" * len(source_ids))
+            for i, c, z, codec, chunk_id, cc, cz, ccodec in con.execute(
+                f"""
+SELECT s.id, s.content, s.content_z, s.content_codec, c.id, c.content, c.content_z, c.content_codec
+FROM sources s LEFT JOIN source_chunks c ON c.source_id = s.id AND c.chunk_index = 0
+WHERE s.id IN ({marks})
+                """,
+                source_ids,
+            ):
+                texts[i] = decode_content(cc, cz, ccodec) if chunk_id is not None else decode_content(c, z, codec)
+        return texts
+
     def set_context_note(self, key: str, value: str, ts: float | None = None) -> None:
         """
         Store or update a context note in the database.
@@ -161,27 +1584,32 @@ CREATE TABLE IF NOT EXISTS context_notes (
         text: str,
         mode: str | None = None,
         ts: float | None = None,
+        *,
+        durability: str | None = None,
     ) -> int:
         """Insert a single conversation utterance.
 
         Why: Persist chat turns (user/assistant) for context building, analytics,
         and evolution engine metrics.
         Where: Called by persona / conversation layers and compatibility shims.
-        How: Inserts row into utterances with timestamp; returns new row id (0 if
-        unavailable). Thread-safe via instance lock.
+        How: Routes the insert through ``execute_write``; returns new row id for
+        "sync" durability (0 if unavailable or deferred to the write-behind queue).
         """
         import time as _time
         if ts is None:
             ts = _time.time()
-        with self._lock, self._connect() as con:
-            cur = con.execute(
-                "INSERT INTO utterances (role, text, mode, ts) VALUES (?, ?, ?, ?)",
-                (role, text, mode, float(ts)),
-            )
-            con.commit()
-            return int(cur.lastrowid) if cur.lastrowid is not None else 0
+        return self.execute_write(
+            "INSERT INTO utterances (role, text, mode, ts) VALUES (?, ?, ?, ?)",
+            (role, text, mode, float(ts)),
+            durability=durability,
+        )
 
-    def list_utterances(self, limit: int = 50) -> list[dict]:
+    def list_utterances(
+        self,
+        limit: int = 50,
+        after_id: int | None = None,
+        before_ts: float | None = None,
+    ) -> list[dict]:
         """
         Retrieve recent conversation utterances in reverse chronological order.
         
@@ -192,23 +1620,285 @@ CREATE TABLE IF NOT EXISTS context_notes (
             context, and analytics for conversation pattern analysis.
         
         How: Queries utterances table ordered by ID descending to get most recent
-            first, returns as dictionaries with all fields included.
+            first, returns as dictionaries with all fields included. Waits for the
+            calling thread's deferred writes first so callers see their own turns.
+            ``after_id`` continues a previous page (rows with a smaller id);
+            ``before_ts`` limits to rows older than a timestamp.
         """
+        limit = int(limit)
+        if limit <= 0:
+            return []
+        return list(
+            itertools.islice(
+                self.iter_utterances(
+                    after_id=after_id, before_ts=before_ts, order="desc", batch_size=limit
+                ),
+                limit,
+            )
+        )
+
+    def iter_utterances(
+        self,
+        after_id: int | None = None,
+        before_ts: float | None = None,
+        order: str = "asc",
+        batch_size: int = 500,
+    ):
+        """Stream utterances in id order, one keyset page at a time.
+
+        Why: Walking the full chat history with ``list_utterances`` meant one
+        huge list; analytics and exports need constant memory.
+        Where: ``list_utterances``, ``/api/history/export`` and analytics tools.
+        How: See ``_iter_keyset``; yields dicts with id, role, text, mode, ts.
+        """
+        for r in self._iter_keyset(
+            "utterances", "id, role, text, mode, ts", after_id, before_ts, order, batch_size
+        ):
+            yield {"id": r[0], "role": r[1], "text": r[2], "mode": r[3], "ts": r[4]}
+
+    def _iter_keyset(
+        self,
+        table: str,
+        cols: str,
+        after_id: int | None,
+        before_ts: float | None,
+        order: str,
+        batch_size: int,
+    ):
+        """Yield raw rows of ``table`` using keyset (``id > ?`` / ``id < ?``) pagination.
+
+        Each page is a short indexed range read on the rowid; the lock and
+        connection are released between pages, so a slow consumer never blocks
+        chat writes and memory stays bounded by ``batch_size``. ``after_id`` is
+        exclusive in iteration order (``order="desc"`` continues below it).
+        """
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        self.wait_for_own_writes()
+        desc = order == "desc"
+        op, direction = ("<", "DESC") if desc else (">", "ASC")
+        where = "" if before_ts is None else "AND ts < ? "
+        sql = f"SELECT {cols} FROM {table} WHERE id {op} ? {where}ORDER BY id {direction} LIMIT ?"
+        cursor = after_id if after_id is not None else ((1 << 63) - 1 if desc else 0)
+        batch_size = max(1, int(batch_size))
+        while True:
+            params = (int(cursor),) + (() if before_ts is None else (float(before_ts),)) + (batch_size,)
+            with self._lock, self._connect() as con:
+                rows = con.execute(sql, params).fetchall()
+            if not rows:
+                return
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            cursor = rows[-1][0]
+
+    _SOURCES_DDL = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    content TEXT NOT NULL,
+    content_hash TEXT,
+    size INTEGER,
+    modified_ts REAL,
+    content_z BLOB,
+    content_codec TEXT,
+    fts_hash TEXT,
+    UNIQUE(path)
+);
+"""
+
+    # ON DELETE CASCADE is declarative only (foreign_keys stays off); chunk rows
+    # are removed by _delete_chunks
+    _SOURCE_CHUNKS_DDL = """
+CREATE TABLE IF NOT EXISTS source_chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id INTEGER NOT NULL REFERENCES sources(id) ON DELETE CASCADE,
+    chunk_index INTEGER NOT NULL,
+    start_byte INTEGER NOT NULL,
+    end_byte INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    token_count INTEGER NOT NULL DEFAULT 0,
+    content_z BLOB,
+    content_codec TEXT,
+    fts_hash TEXT,
+    UNIQUE(source_id, chunk_index)
+);
+"""
+
+    _FILE_MANIFEST_DDL = """
+CREATE TABLE IF NOT EXISTS file_manifest (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT,
+    source_id INTEGER,
+    checked_ts REAL
+) WITHOUT ROWID;
+"""
+
+    _UPSERT_SOURCE_SQL = """
+INSERT INTO sources (filename, path, content, content_z, content_codec, content_hash, size, modified_ts)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+    filename = excluded.filename,
+    content = excluded.content,
+    content_z = excluded.content_z,
+    content_codec = excluded.content_codec,
+    content_hash = excluded.content_hash,
+    size = excluded.size,
+    modified_ts = excluded.modified_ts
+WHERE sources.content_hash IS NULL OR sources.content_hash != excluded.content_hash
+"""
+
+    @staticmethod
+    def _backfill_source_columns(con) -> None:
+        """Add ``sources`` columns introduced after the table was first created."""
+        cols = {row[1] for row in con.execute("PRAGMA table_info(sources)")}
+        for name, decl in (
+            ("content_hash", "TEXT"),
+            ("size", "INTEGER"),
+            ("modified_ts", "REAL"),
+            ("content_z", "BLOB"),
+            ("content_codec", "TEXT"),
+            ("fts_hash", "TEXT"),
+        ):
+            if name not in cols:
+                con.execute(f"ALTER TABLE sources ADD COLUMN {name} {decl}")
+
+    @staticmethod
+    def _backfill_chunk_columns(con) -> None:
+        """Add ``source_chunks`` columns introduced after the table was first created."""
+        cols = {row[1] for row in con.execute("PRAGMA table_info(source_chunks)")}
+        for name, decl in (("content_z", "BLOB"), ("content_codec", "TEXT"), ("fts_hash", "TEXT")):
+            if name not in cols:
+                con.execute(f"ALTER TABLE source_chunks ADD COLUMN {name} {decl}")
+
+    def _ensure_source_tables(self, con) -> None:
+        """Create sources / source_chunks / file_manifest if ``db_path`` was repointed."""
+        con.execute(self._SOURCES_DDL)
+        self._backfill_source_columns(con)
+        con.execute(self._SOURCE_CHUNKS_DDL)
+        self._backfill_chunk_columns(con)
+        con.execute(self._FILE_MANIFEST_DDL)
+
+    @staticmethod
+    def _source_row(row) -> tuple:
+        """Normalize one bulk-upsert row to (filename, path, content, hash, size, mtime).
+
+        Accepts a dict with the ``add_or_update_source`` keyword names or a tuple in
+        the same positional order. A missing ``content_hash`` is computed from the
+        content so unchanged rows are still detected.
+        """
+        if isinstance(row, dict):
+            filename, path = row["filename"], row["path"]
+            content = row.get("content")
+            content_hash = row.get("content_hash")
+            size = row.get("size")
+            modified_ts = row.get("modified_ts")
+        else:
+            filename, path, content, content_hash, size, modified_ts = (tuple(row) + (None,) * 6)[:6]
+        content = content or ""
+        if content_hash is None:
+            content_hash = hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest()
+        return (filename, str(path), content, content_hash, size, modified_ts)
+
+    def upsert_sources_bulk(self, rows, batch_size: int = 500) -> list[tuple[int, str]]:
+        """
+        Insert or update many sources in a handful of transactions.
+
+        Why: Ingesting a sync directory one ``add_or_update_source`` call at a time
+        pays a lock round-trip, a SELECT, a write and a commit per file; 10k files
+        meant 10k commits.
+        Where: FileIngestor.ingest_all_files / ingest_file and
+        EnhancedFileIngestor.ingest_file; ``add_or_update_source`` delegates here.
+        How: Consumes ``rows`` (dicts or tuples, any iterable, read lazily) in
+        batches of ``batch_size``. Per batch: one ``path IN (...)`` lookup of the
+        stored hashes decides each row's status, one ``executemany`` of
+        ``INSERT ... ON CONFLICT(path) DO UPDATE ... WHERE content_hash !=
+        excluded.content_hash`` writes the changed rows, ids for new rows are
+        fetched with a second ``IN`` query and the FTS index is refreshed with
+        ``executemany``. Each batch is committed once.
+
+        Returns:
+            One (id, status) tuple per input row, in input order, where status is
+            "inserted", "updated" or "unchanged".
+        """
+        batch_size = max(1, int(batch_size))
+        results: list[tuple[int, str]] = []
+        it = iter(rows)
         with self._lock, self._connect() as con:
-            cur = con.execute(
-                "SELECT id, role, text, mode, ts FROM utterances ORDER BY id DESC LIMIT ?",
-                (int(limit),),
+            # Ensure table exists even if db_path changed after initialization
+            self._ensure_source_tables(con)
+            while True:
+                batch = [self._source_row(r) for r in itertools.islice(it, batch_size)]
+                if not batch:
+                    break
+                results.extend(self._upsert_sources_batch(con, batch))
+                con.commit()
+        return results
+
+    def _upsert_sources_batch(self, con, batch: list[tuple], chunked: bool = False) -> list[tuple[int, str]]:
+        """Write one normalized batch inside the caller's transaction.
+
+        ``chunked`` is set by ``upsert_source_with_chunks``: the rows' chunks are
+        written by the caller and the FTS entry indexes the filename only. Plain
+        upserts drop the chunks of documents they replace, since those chunks
+        describe the previous text.
+        """
+        paths = list(dict.fromkeys(r[1] for r in batch))
+        marks = ",".join("?" * len(paths))
+        known = {
+            p: (int(i), h)
+            for i, p, h in con.execute(
+                f"SELECT id, path, content_hash FROM sources WHERE path IN ({marks})", paths
             )
-            return [
-                {
-                    "id": r[0],
-                    "role": r[1],
-                    "text": r[2],
-                    "mode": r[3],
-                    "ts": r[4],
-                }
-                for r in cur.fetchall()
-            ]
+        }
+        statuses: list[str] = []
+        changed: list[tuple] = []
+        replaced: list[int] = []
+        for row in batch:
+            prev = known.get(row[1])
+            if prev is None:
+                statuses.append("inserted")
+            elif prev[1] is not None and prev[1] == row[3]:
+                statuses.append("unchanged")
+                continue
+            else:
+                statuses.append("updated")
+                if prev[0] is not None:
+                    replaced.append(prev[0])
+            # Later duplicates of the same path compare against this row's hash
+            known[row[1]] = (prev[0] if prev else None, row[3])
+            changed.append(row)
+        fts = bool(changed) and self._ensure_fts(con)
+        # Contentless index: drop the old entries while the old text is still stored
+        reset = fts and self._fts_unindex_sources(con, replaced)
+        if changed:
+            con.executemany(
+                self._UPSERT_SOURCE_SQL,
+                [(r[0], r[1], *encode_content(r[2]), *r[3:]) for r in changed],
+            )
+        new_paths = [p for p, (i, _h) in known.items() if i is None]
+        if new_paths:
+            marks = ",".join("?" * len(new_paths))
+            for i, p in con.execute(
+                f"SELECT id, path FROM sources WHERE path IN ({marks})", new_paths
+            ):
+                known[p] = (int(i), known[p][1])
+        if replaced and not chunked:
+            self._delete_chunks(con, replaced)
+        if fts:
+            # Last write per path wins, matching what ON CONFLICT left in sources
+            latest = {row[1]: row for row in changed}
+            self._fts_index_sources(
+                con, [(known[p][0], r[0], r[2], r[3], chunked) for p, r in latest.items()]
+            )
+            if reset:
+                self._fts_index_pending(con)
+        return [(known[row[1]][0], status) for row, status in zip(batch, statuses)]
 
     def add_or_update_source(
         self,
@@ -223,79 +1913,547 @@ CREATE TABLE IF NOT EXISTS context_notes (
         Insert, update if content changed, or no-op.
 
         Returns (id, status) where status in {"inserted","updated","unchanged"}.
+        Single-row convenience wrapper around ``upsert_sources_bulk``.
+        """
+        return self.upsert_sources_bulk(
+            [(filename, path, content, content_hash, size, modified_ts)]
+        )[0]
+
+    @staticmethod
+    def _chunk_row(index: int, chunk) -> tuple:
+        """Normalize one chunk to (index, start_byte, end_byte, content, hash, tokens).
+
+        Accepts a dict with ``content`` plus optional ``start_byte`` / ``end_byte`` /
+        ``token_count`` or a bare string (offsets then default to 0 / encoded length).
+        Token counts default to whitespace-delimited words.
         """
+        if isinstance(chunk, str):
+            chunk = {"content": chunk}
+        content = chunk.get("content") or ""
+        encoded = content.encode("utf-8", errors="ignore")
+        start = int(chunk.get("start_byte") or 0)
+        end = chunk.get("end_byte")
+        end = int(end) if end is not None else start + len(encoded)
+        tokens = chunk.get("token_count")
+        if tokens is None:
+            tokens = len(content.split())
+        return (index, start, end, content, hashlib.sha256(encoded).hexdigest(), int(tokens))
+
+    def upsert_source_with_chunks(self, row, chunks) -> dict:
+        """
+        Store a document plus its chunks, rewriting only chunks that changed.
+
+        Why: Large documents were written as one ``sources`` row per chunk under the
+        same ``path``; ``UNIQUE(path)`` meant each chunk overwrote the previous one,
+        so only the last chunk of a PDF survived and every ingest rewrote the row N
+        times.
+        Where: EnhancedFileIngestor.ingest_file for chunked documents.
+        How: Upserts the parent ``sources`` row (same semantics as
+        ``upsert_sources_bulk``), then diffs the stored per-chunk hashes for that
+        source: unchanged chunks are left alone (offsets refreshed if they moved),
+        changed or new chunks are upserted on (source_id, chunk_index), surplus
+        trailing chunks are deleted, and ``source_chunks_fts`` follows the same
+        rows. Chunk text is compressed like ``sources.content`` (see
+        ``encode_content``). Everything happens in one transaction.
+
+        Args:
+            row: Parent source row as accepted by ``upsert_sources_bulk``.
+            chunks: Sequence of chunk dicts (``content``, ``start_byte``,
+                ``end_byte``, optional ``token_count``) or plain strings.
+
+        Returns:
+            Dict with ``id``, ``status`` (source-level status, reported as
+            "updated" when only chunks changed) and ``chunks`` counts for
+            inserted / updated / unchanged / deleted.
+        """
+        parent = self._source_row(row)
+        new_chunks = [self._chunk_row(i, c) for i, c in enumerate(chunks)]
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
         with self._lock, self._connect() as con:
-            # Ensure table exists even if db_path changed after initialization
-            con.execute(
+            self._ensure_source_tables(con)
+            source_id, status = self._upsert_sources_batch(con, [parent], chunked=True)[0]
+            fts = self._ensure_fts(con)
+            if fts and status == "unchanged":
+                # Same text stored earlier without chunks: its full-text entry
+                # would duplicate source_chunks_fts, so shrink it to the filename
+                fts_hash = con.execute(
+                    "SELECT fts_hash FROM sources WHERE id = ?", (source_id,)
+                ).fetchone()[0]
+                if not (fts_hash or "").startswith(self._FTS_CHUNKED):
+                    if self._fts_unindex_sources(con, [source_id]):
+                        self._fts_index_pending(con)
+                    else:
+                        self._fts_index_sources(con, [(source_id, parent[0], None, parent[3], True)])
+            stored = {
+                idx: (cid, h, s, e)
+                for cid, idx, h, s, e in con.execute(
+                    "SELECT id, chunk_index, content_hash, start_byte, end_byte "
+                    "FROM source_chunks WHERE source_id = ?",
+                    (source_id,),
+                )
+            }
+            changed: list[tuple] = []
+            moved: list[tuple] = []
+            for idx, start, end, content, chash, tokens in new_chunks:
+                prev = stored.get(idx)
+                if prev is not None and prev[1] == chash:
+                    counts["unchanged"] += 1
+                    if (prev[2], prev[3]) != (start, end):
+                        moved.append((start, end, prev[0]))
+                    continue
+                counts["updated" if prev is not None else "inserted"] += 1
+                changed.append((source_id, idx, start, end, content, chash, tokens))
+            surplus = [(cid,) for idx, (cid, *_rest) in stored.items() if idx >= len(new_chunks)]
+            counts["deleted"] = len(surplus)
+            # Contentless index: drop old entries while their text is still stored
+            replaced = [stored[c[1]][0] for c in changed if c[1] in stored] + [cid for (cid,) in surplus]
+            reset = fts and self._fts_unindex_chunks(con, replaced)
+            if changed:
+                con.executemany(
+                    """
+INSERT INTO source_chunks (
+    source_id, chunk_index, start_byte, end_byte, content, content_z, content_codec, content_hash, token_count
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(source_id, chunk_index) DO UPDATE SET
+    start_byte = excluded.start_byte,
+    end_byte = excluded.end_byte,
+    content = excluded.content,
+    content_z = excluded.content_z,
+    content_codec = excluded.content_codec,
+    content_hash = excluded.content_hash,
+    token_count = excluded.token_count
+WHERE source_chunks.content_hash != excluded.content_hash
+                    """,
+                    [(sid, idx, st, en, *encode_content(text), h, tok) for sid, idx, st, en, text, h, tok in changed],
+                )
+            if moved:
+                con.executemany(
+                    "UPDATE source_chunks SET start_byte = ?, end_byte = ? WHERE id = ?", moved
+                )
+            if surplus:
+                con.executemany("DELETE FROM source_chunks WHERE id = ?", surplus)
+            if fts and changed:
+                ids = {
+                    idx: cid
+                    for cid, idx in con.execute(
+                        "SELECT id, chunk_index FROM source_chunks WHERE source_id = ?",
+                        (source_id,),
+                    )
+                }
+                self._fts_index_chunks(con, [(ids[c[1]], c[4], c[5]) for c in changed])
+            if reset:
+                self._fts_index_pending_chunks(con)
+            con.commit()
+        if status == "unchanged" and (changed or surplus):
+            status = "updated"
+        return {"id": source_id, "status": status, "chunks": counts}
+
+    def _delete_chunks(self, con, source_ids) -> int:
+        """Delete every chunk of ``source_ids`` and its FTS entry; returns chunks removed.
+
+        Pooled connections leave ``foreign_keys`` off (enforcing it would make the
+        memory_relationships / document_analysis references block deletes), so
+        the ``ON DELETE CASCADE`` declared on ``source_chunks`` never fires and
+        source deletes / replacements call this instead.
+        """
+        ids = [int(i) for i in dict.fromkeys(source_ids)]
+        if not ids:
+            return 0
+        marks = ",".join("?" * len(ids))
+        if self._ensure_fts(con):
+            chunk_ids = [
+                r[0]
+                for r in con.execute(f"SELECT id FROM source_chunks WHERE source_id IN ({marks})", ids)
+            ]
+            if self._fts_unindex_chunks(con, chunk_ids):
+                con.execute(f"UPDATE source_chunks SET fts_hash = '' WHERE source_id IN ({marks})", ids)
+                self._fts_index_pending_chunks(con)
+        return con.execute(f"DELETE FROM source_chunks WHERE source_id IN ({marks})", ids).rowcount
+
+    def delete_source(self, source_id: int) -> bool:
+        """
+        Delete one source with its chunks, full-text entries and manifest row.
+
+        Why: Removing only the ``sources`` row would orphan its chunks (the
+        schema's cascade is not enforced, see ``_delete_chunks``) and leave
+        contentless index entries nothing can delete any more.
+        Where: Callers dropping a document from the knowledge base.
+        How: One transaction: unindex the parent while its text is still stored,
+        delete the chunks and their index entries, the manifest row and the source.
+
+        Returns:
+            True when a source row was deleted.
+        """
+        source_id = int(source_id)
+        with self._lock, self._connect() as con:
+            self._ensure_source_tables(con)
+            if self._ensure_fts(con) and self._fts_unindex_sources(con, [source_id]):
+                con.execute("UPDATE sources SET fts_hash = '' WHERE id = ?", (source_id,))
+                self._fts_index_pending(con)
+            self._delete_chunks(con, [source_id])
+            con.execute("DELETE FROM file_manifest WHERE source_id = ?", (source_id,))
+            deleted = con.execute("DELETE FROM sources WHERE id = ?", (source_id,)).rowcount
+            con.commit()
+        return deleted > 0
+
+    def list_source_chunks(self, source_id: int, with_content: bool = False) -> list[dict]:
+        """Return chunk metadata (index, byte offsets, hash, tokens) for one source."""
+        cols = "chunk_index, start_byte, end_byte, content_hash, token_count"
+        if with_content:
+            cols += ", content, content_z, content_codec"
+        with self._lock, self._connect() as con:
+            rows = con.execute(
+                f"SELECT {cols} FROM source_chunks WHERE source_id = ? ORDER BY chunk_index",
+                (source_id,),
+            ).fetchall()
+        keys = ["chunk_index", "start_byte", "end_byte", "content_hash", "token_count", "content"]
+        return [dict(zip(keys, (*r[:5], decode_content(*r[5:])) if with_content else r)) for r in rows]
+
+    def search_chunks(self, query: str, limit: int = 10, snippet: bool = True) -> list[dict]:
+        """Ranked full-text search returning chunk-level hits with byte offsets.
+
+        Why: For large documents a document-level hit says little about where the
+        answer is; chunk hits let callers quote or re-read just that span.
+        Where: persona knowledge retrieval (preferred over ``search_sources``).
+        How: FTS5 MATCH over ``source_chunks_fts`` ordered by ``bm25``, joined back
+        to ``source_chunks`` / ``sources`` for offsets and file metadata. The index
+        is contentless, so snippets are cut by ``_fts_snippet`` from the decoded
+        chunk text. Falls back to a LIKE scan when FTS5 is unavailable.
+
+        Returns:
+            List of dicts with source_id, chunk_index, filename, path, start_byte,
+            end_byte, token_count, score (higher is better) and optionally snippet.
+        """
+        terms = self._fts_terms(query or "")
+        if not terms:
+            return []
+        match = self._fts_match_expression(query or "")
+        limit = max(1, int(limit))
+        with self._lock, self._connect() as con:
+            if self._ensure_fts(con):
+                text_sql = "c.content, c.content_z, c.content_codec" if snippet else "NULL, NULL, NULL"
+                rows = con.execute(
+                    f"""
+SELECT c.source_id, c.chunk_index, s.filename, s.path, c.start_byte, c.end_byte, c.token_count,
+       bm25(source_chunks_fts) AS rank, {text_sql}
+FROM source_chunks_fts
+JOIN source_chunks c ON c.id = source_chunks_fts.rowid
+JOIN sources s ON s.id = c.source_id
+WHERE source_chunks_fts MATCH ?
+ORDER BY rank
+LIMIT ?
+                    """,
+                    (match, limit),
+                ).fetchall()
+                rows = [(*r[:8], self._fts_snippet(decode_content(*r[8:11]), terms)) for r in rows]
+            else:
+                term = (query or "").strip()
+                rows = con.execute(
+                    """
+SELECT c.source_id, c.chunk_index, s.filename, s.path, c.start_byte, c.end_byte, c.token_count,
+       0.0, substr(c.content, max(1, instr(lower(c.content), lower(?)) - 100), 400)
+FROM source_chunks c JOIN sources s ON s.id = c.source_id
+WHERE lower(c.content) LIKE ?
+LIMIT ?
+                    """,
+                    (term, f"%{term.lower()}%", limit),
+                ).fetchall()
+        out = []
+        for r in rows:
+            item = {
+                "source_id": r[0],
+                "chunk_index": r[1],
+                "filename": r[2],
+                "path": r[3],
+                "start_byte": r[4],
+                "end_byte": r[5],
+                "token_count": r[6],
+                "score": round(-float(r[7] or 0.0), 4),
+            }
+            if snippet:
+                item["snippet"] = (r[8] or "").strip()
+            out.append(item)
+        return out
+
+    _SOURCE_META_COLS = "id, filename, path, size, modified_ts, content_hash"
+
+    def _source_from_row(self, row, with_content: bool) -> Source:
+        """Build a ``Source`` from ``_SOURCE_META_COLS`` (+ content columns)."""
+        source = Source(
+            id=row[0],
+            filename=row[1],
+            path=row[2],
+            size=row[3],
+            modified_ts=row[4],
+            content_hash=row[5],
+            loader=None if with_content else self._load_content,
+        )
+        if with_content:
+            source.content = decode_content(row[6], row[7], row[8])
+        return source
+
+    def _select_sources(self, where: str, params: tuple, with_content: bool) -> list[Source]:
+        cols = self._SOURCE_META_COLS
+        if with_content:
+            cols += ", content, content_z, content_codec"
+        with self._lock, self._connect() as con:
+            rows = con.execute(f"SELECT {cols} FROM sources {where}", params).fetchall()
+        return [self._source_from_row(r, with_content) for r in rows]
+
+    def _load_content(self, source_id: int) -> str | None:
+        """Fetch and decompress one document body (used by lazy ``Source``)."""
+        with self._lock, self._connect() as con:
+            row = con.execute(
+                "SELECT content, content_z, content_codec FROM sources WHERE id = ?", (source_id,)
+            ).fetchone()
+        return decode_content(*row) if row else None
+
+    def get_source(self, source_id: int, with_content: bool = False) -> Source | None:
+        """Look up one source by id; ``content`` loads lazily unless requested."""
+        found = self._select_sources("WHERE id = ?", (int(source_id),), with_content)
+        return found[0] if found else None
+
+    def get_source_by_path(self, path: str, with_content: bool = False) -> Source | None:
+        """Look up one source row by its (unique, indexed) path."""
+        found = self._select_sources("WHERE path = ?", (str(path),), with_content)
+        return found[0] if found else None
+
+    def list_sources(self, limit: int | None = None) -> list[Source]:
+        """List sources (metadata only; each ``content`` loads on first access)."""
+        if limit is None:
+            return self._select_sources("ORDER BY id", (), False)
+        return self._select_sources("ORDER BY id LIMIT ?", (int(limit),), False)
+
+    def get_source_excerpt(self, source_id: int, start_byte: int = 0, max_bytes: int = 2000) -> str:
+        """
+        Return at most ``max_bytes`` of a document starting at ``start_byte``.
+
+        Why: Callers that only need a passage (chunk offsets from
+        ``search_chunks``, previews) should not pull whole documents into Python.
+        Where: Knowledge previews, chunk-hit expansion, CLI / API excerpts.
+        How: Plain rows are sliced in SQL with ``substr(CAST(content AS BLOB))``.
+        Compressed rows are streamed from ``content_z`` through incremental blob
+        I/O and a streaming decompressor that stops once ``start_byte +
+        max_bytes`` bytes are produced. Offsets are UTF-8 byte offsets; a
+        character split at either edge is dropped.
+        """
+        start = max(0, int(start_byte))
+        length = max(0, int(max_bytes))
+        with self._lock, self._connect() as con:
+            row = con.execute(
+                "SELECT content_codec FROM sources WHERE id = ?", (int(source_id),)
+            ).fetchone()
+            if row is None or length == 0:
+                return ""
+            codec = row[0]
+            if not codec:
+                data = con.execute(
+                    "SELECT substr(CAST(content AS BLOB), ?, ?) FROM sources WHERE id = ?",
+                    (start + 1, length, int(source_id)),
+                ).fetchone()[0] or b""
+            else:
+                try:
+                    blob = con.blobopen("sources", "content_z", int(source_id), readonly=True)
+                except (AttributeError, sqlite3.Error):  # Python < 3.11
+                    blob = io.BytesIO(
+                        con.execute(
+                            "SELECT content_z FROM sources WHERE id = ?", (int(source_id),)
+                        ).fetchone()[0] or b""
+                    )
+                with blob:
+                    data = _read_compressed_prefix(blob, codec, start + length)[start:]
+        return bytes(data).decode("utf-8", errors="ignore")
+
+    def compress_existing_sources(self, batch_size: int = 200) -> dict:
+        """
+        Re-encode plain-text ``sources`` and ``source_chunks`` rows with the configured codec.
+
+        Why: New rows are compressed on write; this migrates rows written
+        before compression was enabled so ``clever.db`` actually shrinks.
+        Where: Maintenance (CLI ``compress`` subcommand, retention jobs).
+        How: Walks uncompressed rows of each table by id in batches, one commit
+        per batch. The text is unchanged, so the contentless FTS entries stay
+        valid. Freed pages are reclaimed by VACUUM / incremental vacuum.
+
+        Returns:
+            Dict with rows examined / compressed and bytes before / after.
+        """
+        stats = {"examined": 0, "compressed": 0, "bytes_before": 0, "bytes_after": 0}
+        if _content_codec() == "none":
+            return stats
+        for table in ("sources", "source_chunks"):
+            last_id = 0
+            while True:
+                with self._lock, self._connect() as con:
+                    rows = con.execute(
+                        f"SELECT id, content FROM {table} WHERE content_codec IS NULL AND id > ? "
+                        "ORDER BY id LIMIT ?",
+                        (last_id, max(1, int(batch_size))),
+                    ).fetchall()
+                    if not rows:
+                        break
+                    updates = []
+                    for row_id, content in rows:
+                        last_id = row_id
+                        stats["examined"] += 1
+                        text, blob, codec = encode_content(content or "")
+                        if codec is None:
+                            continue
+                        stats["compressed"] += 1
+                        stats["bytes_before"] += len((content or "").encode("utf-8", errors="ignore"))
+                        stats["bytes_after"] += len(blob)
+                        updates.append((text, blob, codec, row_id))
+                    con.executemany(
+                        f"UPDATE {table} SET content = ?, content_z = ?, content_codec = ? WHERE id = ?",
+                        updates,
+                    )
+                    con.commit()
+        return stats
+
+    def get_manifest_entry(self, path: str) -> dict | None:
+        """Return the manifest row for ``path`` if its source row still exists."""
+        with self._lock, self._connect() as con:
+            self._ensure_source_tables(con)
+            row = con.execute(
                 """
-CREATE TABLE IF NOT EXISTS sources (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    filename TEXT NOT NULL,
-    path TEXT NOT NULL,
-    content TEXT NOT NULL,
-    content_hash TEXT,
-    size INTEGER,
-    modified_ts REAL,
-    UNIQUE(path)
-);
+SELECT m.path, m.inode, m.size, m.mtime_ns, m.content_hash, m.source_id
+FROM file_manifest m JOIN sources s ON s.id = m.source_id
+WHERE m.path = ?
+                """,
+                (str(path),),
+            ).fetchone()
+        return self._manifest_dict(row) if row else None
+
+    def load_manifest(self, prefix: str | None = None) -> dict[str, dict]:
+        """
+        Load manifest rows (optionally under a directory prefix) keyed by path.
+
+        Why: A directory ingest needs the stat signature of every known file;
+        one range scan on the primary key beats a lookup per file.
+        Where: FileIngestor.ingest_all_files before walking the tree.
+        How: ``path >= prefix AND path < prefix_upper`` uses the PK index (LIKE
+        would not, since it is case-insensitive). Rows whose source was deleted
+        are dropped via the join so those files get re-ingested.
+        """
+        sql = """
+SELECT m.path, m.inode, m.size, m.mtime_ns, m.content_hash, m.source_id
+FROM file_manifest m JOIN sources s ON s.id = m.source_id
+"""
+        params: tuple = ()
+        if prefix:
+            prefix = str(prefix).rstrip(os.sep) + os.sep
+            sql += "WHERE m.path >= ? AND m.path < ?"
+            params = (prefix, prefix[:-1] + chr(ord(os.sep) + 1))
+        with self._lock, self._connect() as con:
+            self._ensure_source_tables(con)
+            return {r[0]: self._manifest_dict(r) for r in con.execute(sql, params)}
+
+    @staticmethod
+    def _manifest_dict(row) -> dict:
+        return {
+            "path": row[0],
+            "inode": row[1],
+            "size": row[2],
+            "mtime_ns": row[3],
+            "content_hash": row[4],
+            "source_id": row[5],
+        }
+
+    @staticmethod
+    def manifest_matches(entry: dict | None, signature: tuple[int, int, int]) -> bool:
+        """True when a manifest entry has the same (inode, size, mtime_ns)."""
+        return entry is not None and (entry["inode"], entry["size"], entry["mtime_ns"]) == tuple(signature)
+
+    def record_manifest(self, entries) -> int:
+        """
+        Upsert manifest rows after files were ingested.
+
+        Args:
+            entries: Iterable of dicts with path, signature (inode, size,
+                mtime_ns), content_hash and source_id.
+
+        Returns:
+            Number of rows written (one executemany, one commit).
+        """
+        now = time.time()
+        rows = [
+            (str(e["path"]), *e["signature"], e.get("content_hash"), e.get("source_id"), now)
+            for e in entries
+        ]
+        if not rows:
+            return 0
+        with self._lock, self._connect() as con:
+            self._ensure_source_tables(con)
+            con.executemany(
                 """
-            )
-            cur = con.cursor()
-            cur.execute(
-                "SELECT id, content_hash FROM sources WHERE path = ?",
-                (path,),
-            )
-            row = cur.fetchone()
-            if row:
-                existing_id, existing_hash = row[0], row[1]
-                if existing_hash == content_hash and content_hash is not None:
-                    return int(existing_id), "unchanged"
-                # Update existing
-                cur.execute(
-                    "UPDATE sources SET filename = ?, content = ?, content_hash = ?, size = ?, modified_ts = ? WHERE id = ?",
-                    (filename, content or "", content_hash, size, modified_ts, existing_id),
-                )
-                con.commit()
-                return int(existing_id), "updated"
-            # Insert new
-            cur.execute(
-                "INSERT INTO sources (filename, path, content, content_hash, size, modified_ts) VALUES (?, ?, ?, ?, ?, ?)",
-                (filename, path, content or "", content_hash, size, modified_ts),
+INSERT INTO file_manifest (path, inode, size, mtime_ns, content_hash, source_id, checked_ts)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+    inode = excluded.inode,
+    size = excluded.size,
+    mtime_ns = excluded.mtime_ns,
+    content_hash = excluded.content_hash,
+    source_id = excluded.source_id,
+    checked_ts = excluded.checked_ts
+                """,
+                rows,
             )
             con.commit()
-            return int(cur.lastrowid) if cur.lastrowid is not None else 0, "inserted"
+        return len(rows)
 
-    def list_interactions(self, limit: int = 100) -> list[dict]:
+    def list_interactions(
+        self,
+        limit: int = 100,
+        after_id: int | None = None,
+        before_ts: float | None = None,
+    ) -> list[dict]:
         """
         Retrieve recent interaction records for analytics and learning.
         
         Why: Provides access to structured interaction data for evolution engine analysis, pattern recognition, and system learning algorithms.
         Where: Used by evolution engine, analytics dashboards, and learning systems that need to analyze user interaction patterns.
-        How: Queries interactions table in reverse chronological order, parses JSON metadata safely, returns structured dictionaries.
+        How: Newest first via ``iter_interactions``; ``parsed_data`` is returned as a plain dict so rows stay JSON-serializable (stream ``iter_interactions`` for lazy decoding). ``after_id`` / ``before_ts`` page backwards.
         """
-        import json as _json
-        with self._lock, self._connect() as con:
-            cur = con.execute(
-                "SELECT id, ts, user_input, active_mode, action_taken, parsed_data FROM interactions ORDER BY id DESC LIMIT ?",
-                (int(limit),),
-            )
-            out = []
-            for r in cur.fetchall():
-                try:
-                    pd = _json.loads(r[5] or "{}")
-                except Exception:
-                    pd = {}
-                out.append(
-                    {
-                        "id": r[0],
-                        "ts": r[1],
-                        "user_input": r[2],
-                        "active_mode": r[3],
-                        "action_taken": r[4],
-                        "parsed_data": pd,
-                    }
-                )
-            return out
+        limit = int(limit)
+        if limit <= 0:
+            return []
+        rows = itertools.islice(
+            self.iter_interactions(after_id=after_id, before_ts=before_ts, order="desc", batch_size=limit),
+            limit,
+        )
+        return [{**row, "parsed_data": row["parsed_data"].to_dict()} for row in rows]
+
+    def iter_interactions(
+        self,
+        after_id: int | None = None,
+        before_ts: float | None = None,
+        order: str = "asc",
+        batch_size: int = 500,
+    ):
+        """Stream interaction records in id order with lazily decoded ``parsed_data``.
+
+        Why: The evolution engine and exports walk the whole table; decoding every
+        JSON blob up front dominated the cost and the memory.
+        Where: ``list_interactions``, ``/api/history/export``.
+        How: Keyset pages from ``_iter_keyset``; ``parsed_data`` is a ``LazyJSON``.
+        """
+        for r in self._iter_keyset(
+            "interactions",
+            "id, ts, user_input, active_mode, action_taken, parsed_data",
+            after_id,
+            before_ts,
+            order,
+            batch_size,
+        ):
+            yield {
+                "id": r[0],
+                "ts": r[1],
+                "user_input": r[2],
+                "active_mode": r[3],
+                "action_taken": r[4],
+                "parsed_data": LazyJSON(r[5]),
+            }
 
     def add_interaction(
         self,
@@ -304,42 +2462,56 @@ CREATE TABLE IF NOT EXISTS sources (
         action_taken: str | None = None,
         parsed_data: dict | None = None,
         ts: float | None = None,
+        *,
+        durability: str | None = None,
     ) -> int:
         """
         Add a new interaction record for analytics and learning.
         
         Why: Captures structured interaction data for evolution engine analysis and system learning.
         Where: Called by conversation handlers to log user interactions for pattern analysis.
-        How: Inserts interaction data into interactions table with JSON serialization of parsed_data.
+        How: Serializes parsed_data to JSON and routes the insert through ``execute_write`` (row id only for "sync").
         """
         import json as _json
         import time as _time
         if ts is None:
             ts = _time.time()
-        with self._lock, self._connect() as con:
-            cur = con.execute(
-                "INSERT INTO interactions (ts, user_input, active_mode, action_taken, parsed_data) VALUES (?, ?, ?, ?, ?)",
-                (float(ts), user_input, active_mode, action_taken, _json.dumps(parsed_data or {})),
-            )
-            con.commit()
-            return int(cur.lastrowid) if cur.lastrowid is not None else 0
+        return self.execute_write(
+            "INSERT INTO interactions (ts, user_input, active_mode, action_taken, parsed_data) VALUES (?, ?, ?, ?, ?)",
+            (float(ts), user_input, active_mode, action_taken, _json.dumps(parsed_data or {})),
+            durability=durability,
+        )
 
     # --- Compatibility: store user+assistant exchange and an interaction ---
     def add_conversation(
-        self, user_text: str, reply_text: str, *, meta: dict | None = None
+        self,
+        user_text: str,
+        reply_text: str,
+        *,
+        meta: dict | None = None,
+        durability: str | None = None,
     ) -> None:
+        """Store a user/assistant exchange plus its interaction row.
+
+        Why: Chat endpoints log every turn; the three rows should cost one group
+        commit rather than three fsyncs under the global lock.
+        Where: Compatibility helper used by conversation layers and the module shim.
+        How: Issues the three inserts with the same durability level so the
+        write-behind queue commits them together.
+        """
         try:
             self.add_utterance(
-                "user", user_text, mode=(meta or {}).get("detected_intent")
+                "user", user_text, mode=(meta or {}).get("detected_intent"), durability=durability
             )
             self.add_utterance(
-                "assistant", reply_text, mode=(meta or {}).get("activePersona")
+                "assistant", reply_text, mode=(meta or {}).get("activePersona"), durability=durability
             )
             self.add_interaction(
                 user_input=user_text,
                 active_mode=(meta or {}).get("activePersona"),
                 action_taken=(meta or {}).get("detected_intent"),
                 parsed_data=meta or {},
+                durability=durability,
             )
         except Exception:
             pass
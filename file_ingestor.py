@@ -1,8 +1,13 @@
-import pypdf as PyPDF2  # Use pypdf (modern fork) but alias as PyPDF2 for clarity
+import hashlib
+import os
 import re
 
+import pypdf as PyPDF2  # Use pypdf (modern fork) but alias as PyPDF2 for clarity
+
+import config
+
 # --- CHANGE 1: Import the shared instances and config ---
-from database import db_manager
+from database import db_manager, stat_signature
 from nlp_processor import nlp_processor
 from evolution_engine import get_evolution_engine
 
@@ -27,35 +32,83 @@ class FileIngestor:
         if not os.path.isdir(self.base_dir):
             print(f"Warning: Ingestion directory not found at '{self.base_dir}'")
 
-    def ingest_all_files(self):
-        """Recursively process all non-hidden files under base directory."""
+    def ingest_all_files(self, batch_size: int = 500):
+        """Recursively process all non-hidden files under base directory.
+
+        Why: A full sync directory used to cost one lock round-trip and one commit
+             per file; batching keeps a 10k-file ingest to a handful of commits,
+             and the stat manifest keeps unchanged files from being read at all.
+        How: Loads the file manifest for the directory once, skips files whose
+             (inode, size, mtime_ns) signature is unchanged, reads and hashes the
+             rest as it walks, hands every ``batch_size`` prepared rows to
+             ``db_manager.upsert_sources_bulk`` and then runs the per-file
+             follow-up (NLP, evolution logging) for changed rows only.
+        """
         print(f"Starting ingestion process for directory: {self.base_dir}")
-        inserted = updated = unchanged = failed = 0
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        pending: list = []
+        manifest = db_manager.load_manifest(os.path.abspath(self.base_dir))
         for root, _, files in os.walk(self.base_dir):
             for file in files:
                 # Ignore hidden files like .DS_Store
                 if file.startswith('.'):
                     continue
-                
-                file_path = os.path.join(root, file)
+
+                file_path = os.path.abspath(os.path.join(root, file))
                 try:
-                    status = self.ingest_file(file_path)
-                    if status == "inserted":
-                        inserted += 1
-                    elif status == "updated":
-                        updated += 1
-                    elif status == "unchanged":
-                        unchanged += 1
-                    else:
-                        failed += 1
-                except Exception:
-                    print(f"Error ingesting {file_path}: {e}")
-                    failed += 1
+                    stat = os.stat(file_path)
+                except OSError:
+                    counts["failed"] += 1
+                    continue
+                if db_manager.manifest_matches(manifest.get(file_path), stat_signature(stat)):
+                    counts["unchanged"] += 1
+                    continue
+
+                prepared = self._prepare_file(file_path, stat)
+                if isinstance(prepared, str):
+                    counts["failed"] += 1
+                    continue
+                pending.append(prepared)
+                if len(pending) >= batch_size:
+                    self._store_prepared(pending, counts)
+                    pending = []
+        if pending:
+            self._store_prepared(pending, counts)
         print(
-            f"Ingestion complete. inserted={inserted} updated={updated} "
-            f"unchanged={unchanged} failed={failed}"
+            f"Ingestion complete. inserted={counts['inserted']} updated={counts['updated']} "
+            f"unchanged={counts['unchanged']} failed={counts['failed']}"
         )
-    
+        return counts
+
+    def _store_prepared(self, prepared: list, counts: dict) -> None:
+        """Upsert a batch of prepared files and run follow-up work per result."""
+        try:
+            results = db_manager.upsert_sources_bulk(item["row"] for item in prepared)
+        except Exception as e:
+            print(f"Batch ingestion failed ({len(prepared)} files): {e}")
+            counts["failed"] += len(prepared)
+            return
+        for item, (id_, status) in zip(prepared, results):
+            self._after_upsert(item, id_, status)
+            counts[status] += 1
+        self._record_manifest(prepared, results)
+
+    @staticmethod
+    def _record_manifest(prepared: list, results: list) -> None:
+        """Remember stat signatures so unchanged files are skipped next time."""
+        try:
+            db_manager.record_manifest(
+                {
+                    "path": item["row"]["path"],
+                    "signature": item["signature"],
+                    "content_hash": item["row"]["content_hash"],
+                    "source_id": id_,
+                }
+                for item, (id_, _status) in zip(prepared, results)
+            )
+        except Exception as e:
+            print(f"Manifest update failed: {e}")
+
     def clean_pdf_text(self, text: str) -> str:
         """Normalize extracted PDF text.
         Why: Remove artefacts + normalize whitespace before NLP.
@@ -76,9 +129,11 @@ class FileIngestor:
              rather than reprocessing the entire directory tree.
         Where: Called by SyncEventHandler.trigger_ingestion and can be used by
                ad-hoc maintenance scripts or tests.
-        How: Determines file type, extracts / cleans content, performs optional
-             NLP enrichment, hashes content to detect changes, upserts into the
-             database, and (on meaningful updates) triggers evolution learning.
+        How: Returns "unchanged" straight from the file manifest when the
+             (inode, size, mtime_ns) signature matches, without opening the file.
+             Otherwise determines file type, extracts / cleans content, hashes it
+             to detect changes, upserts via ``db_manager.upsert_sources_bulk`` and, only when
+             the content changed, runs NLP enrichment and evolution learning.
         
         Args:
             file_path: Absolute or relative path to the file to ingest.
@@ -88,7 +143,8 @@ class FileIngestor:
         
         Connects to:
             - database.py:
-                - `ingest_file()` -> `db_manager.add_or_update_source()`: The core function of this module is to process a file and store its contents in the database.
+                - `ingest_file()` / `ingest_all_files()` -> `db_manager.upsert_sources_bulk()`: The core function of this module is to process a file and store its contents in the database.
+                - `ingest_file()` / `ingest_all_files()` -> `db_manager.get_manifest_entry()` / `load_manifest()` / `record_manifest()`: The stat manifest lets unchanged files be skipped without reading them.
             - evolution_engine.py:
                 - `ingest_file()` -> `get_evolution_engine().log_interaction()`: After a file is successfully ingested, it logs an event to the evolution engine to signal that new knowledge has been acquired.
             - nlp_processor.py:
@@ -98,69 +154,104 @@ class FileIngestor:
             - sync_watcher.py:
                 - `SyncEventHandler` in `sync_watcher.py` creates an instance of `FileIngestor` and calls `ingest_file()` whenever a file change is detected.
         """
+        file_path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return "failed"
+        entry = db_manager.get_manifest_entry(file_path)
+        if db_manager.manifest_matches(entry, stat_signature(stat)):
+            return "unchanged"
+        prepared = self._prepare_file(file_path, stat)
+        if isinstance(prepared, str):
+            return prepared
+        try:
+            result = db_manager.upsert_sources_bulk([prepared["row"]])
+        except Exception as e:
+            print(f"Ingestion failed for {file_path}: {e}")
+            return "failed"
+        id_, status = result[0]
+        self._after_upsert(prepared, id_, status)
+        self._record_manifest([prepared], result)
+        return status
+
+    def _prepare_file(self, file_path: str, stat=None):
+        """Read, clean and hash one file into an upsert row.
+
+        Returns a dict with the ``row`` for ``upsert_sources_bulk``, the file's
+        stat ``signature`` and any NLP metadata already computed, or the status
+        string "empty" / "failed".
+        """
         try:
             file_path = os.path.abspath(file_path)
             if not os.path.isfile(file_path):
                 return "failed"
             filename = os.path.basename(file_path)
-            stat = os.stat(file_path)
-            size = stat.st_size
-            modified_ts = stat.st_mtime
+            if stat is None:
+                stat = os.stat(file_path)
 
             entities: list = []
             keywords: list = []
-
-            # Extract content + lightweight NLP
-            if filename.lower().endswith('.pd'):
+            analyzed = False
+            if filename.lower().endswith('.pdf'):
                 content, entities, keywords = self.process_pdf(file_path)
+                analyzed = True
             else:
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
-                if nlp_processor and content.strip():
-                    try:
-                        analysis = nlp_processor.process_text(content)
-                        entities = analysis.get('entities', [])
-                        keywords = analysis.get('keywords', [])
-                    except Exception:
-                        print(f"NLP analysis failed for {filename}: {e}")
-
-            if not content.strip():
-                print(f"No content extracted from {filename}")
-                return "empty"
-
-            content_hash = hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest()
-
-            # Upsert into DB; skip if unchanged
-            id_, status = db_manager.add_or_update_source(
-                filename,
-                file_path,
-                content,
-                content_hash=content_hash,
-                size=size,
-                modified_ts=modified_ts,
-            )
-
-            # Trigger Evolution Learning for meaningful content
-            if status in ["inserted", "updated"] and len(content) > 100:
-                try:
-                    # For now we just log an interaction-like event into the evolution engine
-                    evolution_engine = get_evolution_engine()
-                    evolution_engine.log_interaction({
-                        'source_file': filename,
-                        'ingest_status': status,
-                        'entities': entities,
-                        'keywords': keywords,
-                        'content_chars': len(content)
-                    })
-                except Exception:
-                    print(f"Evolution logging failed for {filename}: {e}")
-
-            print(f"{status}: {filename} (id={id_})")
-            return status
-        except Exception:
+        except Exception as e:
             print(f"Ingestion failed for {file_path}: {e}")
             return "failed"
-    
+
+        if not content.strip():
+            print(f"No content extracted from {filename}")
+            return "empty"
+
+        content_hash = hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest()
+        return {
+            "row": {
+                "filename": filename,
+                "path": file_path,
+                "content": content,
+                "content_hash": content_hash,
+                "size": stat.st_size,
+                "modified_ts": stat.st_mtime,
+            },
+            "signature": stat_signature(stat),
+            "entities": entities,
+            "keywords": keywords,
+            "analyzed": analyzed,
+        }
+
+    def _after_upsert(self, prepared: dict, id_: int, status: str) -> None:
+        """Run NLP + evolution learning for rows whose content actually changed."""
+        row = prepared["row"]
+        filename, content = row["filename"], row["content"]
+        # Trigger Evolution Learning for meaningful content
+        if status in ["inserted", "updated"] and len(content) > 100:
+            entities, keywords = prepared["entities"], prepared["keywords"]
+            if nlp_processor and not prepared["analyzed"]:
+                try:
+                    analysis = nlp_processor.process_text(content)
+                    entities = analysis.get('entities', [])
+                    keywords = analysis.get('keywords', [])
+                except Exception as e:
+                    print(f"NLP analysis failed for {filename}: {e}")
+            try:
+                # For now we just log an interaction-like event into the evolution engine
+                evolution_engine = get_evolution_engine()
+                evolution_engine.log_interaction({
+                    'source_file': filename,
+                    'ingest_status': status,
+                    'entities': entities,
+                    'keywords': keywords,
+                    'content_chars': len(content)
+                })
+            except Exception as e:
+                print(f"Evolution logging failed for {filename}: {e}")
+
+        print(f"{status}: {filename} (id={id_})")
+
     def process_pdf(self, pdf_path: str):
         """Extract text & basic NLP metadata from a PDF file."""
         content = []
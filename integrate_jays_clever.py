@@ -21,7 +21,10 @@ Integration Results:
     - Complete digital sovereignty and privacy protection
 """
 
-from typing import Dict, Any
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
 
 # Import Jay's systems
 from jays_authentic_clever import JaysAuthenticClever
@@ -39,6 +42,7 @@ class JaysCleverIntegration:
         """Initialize Jay's integrated Clever system."""
         self.authentic_clever = JaysAuthenticClever()
         self.sovereignty_system = JaysDigitalSovereignty()
+        self.verification: Optional[Dict[str, Any]] = None
         
         # Verify Jay's exclusive access
         self._verify_jay_access()
@@ -47,7 +51,9 @@ class JaysCleverIntegration:
         self._configure_authentic_environment()
         
     def _verify_jay_access(self):
-        """Verify this is Jay using his exclusive Clever."""
+        """Verify this is Jay using his exclusive Clever (once per instance; the result is cached)."""
+        if self.verification is not None:
+            return self.verification
         verification = self.sovereignty_system.verify_jay_access(
             "Jay", 
             {
@@ -61,6 +67,8 @@ class JaysCleverIntegration:
             raise PermissionError(f"🛡️  {verification['message']}")
             
         print(f"✅ {verification['message']}")
+        self.verification = verification
+        return verification
     
     def _configure_authentic_environment(self):
         """Configure environment for Jay's authentic Clever."""
@@ -79,7 +87,8 @@ class JaysCleverIntegration:
         }
         
         for var, value in authentic_env.items():
-            os.environ[var] = value
+            if os.environ.get(var) != value:  # putenv only when something changed
+                os.environ[var] = value
     
     def generate_jay_response(
         self, 
@@ -103,6 +112,9 @@ class JaysCleverIntegration:
                 'access_denied': True
             }
         
+        # Pick up edits to jays_personal_context.json (stat only; reload on mtime change)
+        self.authentic_clever.refresh_personal_context()
+
         # Generate Jay's authentic response
         response = self.authentic_clever.generate_authentic_response(
             user_input, mode, context
@@ -293,6 +305,29 @@ Run the integration test to confirm Jay's authentic Clever is active.
         
         return all_tests_passed
 
+_INTEGRATION: Optional[JaysCleverIntegration] = None
+_INTEGRATION_LOCK = threading.Lock()
+
+
+def get_jays_clever_integration(refresh: bool = False) -> JaysCleverIntegration:
+    """
+    Process-wide JaysCleverIntegration, built on first use
+
+    Why: Construction loads the personal context and sovereignty profile from
+         disk, verifies access (which rewrites jays_sovereignty.json) and sets
+         the environment; none of that belongs on the per-message path
+    Where: PersonaEngine.__init__ (when config.PERSONA_JAY_INTEGRATION is on)
+    How: Double-checked lock around one cached instance; ``refresh=True``
+         rebuilds it (e.g. after the sovereignty profile changed)
+    """
+    global _INTEGRATION
+    if _INTEGRATION is None or refresh:
+        with _INTEGRATION_LOCK:
+            if _INTEGRATION is None or refresh:
+                _INTEGRATION = JaysCleverIntegration()
+    return _INTEGRATION
+
+
 def integrate_jays_authentic_clever():
     """Execute complete integration of Jay's authentic Clever."""
     
@@ -25,7 +25,10 @@ Jay's Clever Characteristics:
     - Revolutionary intelligence disguised as friendly chat
 """
 
+import json
 import random
+from pathlib import Path
+from typing import Any, Dict, Optional
 from datetime import datetime
 
 # Import Jay's personal configuration
@@ -40,6 +43,8 @@ class JaysAuthenticClever:
     This isn't a generic AI. This is Jay's Clever. Built for one person.
     Street-smart conversation with revolutionary intelligence.
     """
+
+    CONTEXT_FILE = Path(__file__).parent / "jays_personal_context.json"
     
     def __init__(self):
         """Initialize Jay's authentic Clever personality."""
@@ -47,6 +52,8 @@ class JaysAuthenticClever:
         self.family = FAMILY_INFO
         self.personality = CLEVER_PERSONALITY
         self.conversation_memory = []
+        self._context_file = Path(self.CONTEXT_FILE)
+        self._context_mtime = None
         self.personal_context = self._load_personal_context()
         
         # Clever's authentic speech patterns
@@ -85,9 +92,22 @@ class JaysAuthenticClever:
             "The revolutionary insight is..."
         ]
         
+    def _context_file_mtime(self) -> Optional[int]:
+        try:
+            return self._context_file.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def refresh_personal_context(self) -> bool:
+        """Reload the personal context only if its file changed on disk (mtime)."""
+        if self._context_file_mtime() == self._context_mtime:
+            return False
+        self.personal_context = self._load_personal_context()
+        return True
+
     def _load_personal_context(self) -> Dict[str, Any]:
         """Load Jay's personal context and conversation history."""
-        context_file = Path(__file__).parent / "jays_personal_context.json"
+        context_file = self._context_file
         
         default_context = {
             "relationship_depth": "best_friend",
@@ -108,6 +128,7 @@ class JaysAuthenticClever:
                 for key, value in default_context.items():
                     if key not in context:
                         context[key] = value
+                self._context_mtime = self._context_file_mtime()
                 return context
             except:
                 pass
@@ -115,6 +136,7 @@ class JaysAuthenticClever:
         # Create default context
         with open(context_file, 'w') as f:
             json.dump(default_context, f, indent=2)
+        self._context_mtime = self._context_file_mtime()
             
         return default_context
     
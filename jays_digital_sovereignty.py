@@ -24,6 +24,12 @@ Jay's Digital Sovereignty Principles:
     5. AUTHENTIC CONNECTION: Real relationship, not fake AI politeness
 """
 
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict
+
 # Import Jay's configuration
 from user_config import USER_NAME, USER_EMAIL, FAMILY_INFO
 
@@ -35,13 +41,15 @@ class JaysDigitalSovereignty:
     enhancement exclusively. No corporate control, no shared access, no data
     harvesting - just Jay and his revolutionary digital brain extension.
     """
+
+    SOVEREIGNTY_FILE = Path(__file__).parent / "jays_sovereignty.json"
     
     def __init__(self):
         """Initialize Jay's digital sovereignty system."""
         self.authorized_user = USER_NAME
         self.authorized_email = USER_EMAIL
         self.family_info = FAMILY_INFO
-        self.sovereignty_file = Path(__file__).parent / "jays_sovereignty.json"
+        self.sovereignty_file = Path(self.SOVEREIGNTY_FILE)
         
         # Load or create sovereignty profile
         self.sovereignty_profile = self._load_sovereignty_profile()
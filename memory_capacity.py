@@ -0,0 +1,251 @@
+"""
+Memory Capacity Manager for Clever AI
+
+Why:
+    ``memory_nodes`` and ``memory_relationships`` grew forever and importance
+    only ever increased, so one-off keywords accumulated and every index load,
+    similarity pass and stats query paid for them.
+Where:
+    Owned by ``AdvancedMemoryEngine.capacity``; runs in bounded background
+    batches on its own ``PeriodicFlusher`` thread and is woken early when node
+    creation pushes the graph over budget. ``/api/memory/capacity`` exposes
+    stats and a manual pass.
+How:
+    Each node's retention score is
+    ``importance * 0.5 ** (idle_days / half_life) * (1 + ln(1 + accessed_count))``
+    (importance x recency x access frequency; idle time runs from the later of
+    ``last_accessed`` / ``created_at``). When the node count exceeds
+    ``MEMORY_MAX_NODES`` the lowest-scoring nodes are evicted down to
+    ``MEMORY_EVICTION_TARGET_RATIO`` of the budget, at most ``batch`` per pass,
+    and their relationships are deleted in the same transaction (cascade).
+    Edges over ``MEMORY_MAX_EDGES`` are evicted by ``strength`` decayed on
+    their age. The in-memory keyword / LSH indexes and relationship graph
+    drop evicted nodes too (the graph reloads after edge eviction); node
+    eviction holds the engine lock so it never interleaves with an ingest.
+    Every pass records the size distribution before and after.
+
+Connects to:
+    - memory_engine.py: AdvancedMemoryEngine (DB handle, indexes, flush_deferred, PeriodicFlusher)
+    - config.py: MEMORY_MAX_NODES / MEMORY_MAX_EDGES / half-life / batch / interval settings
+    - app.py: ``/api/memory/capacity`` stats and manual eviction endpoint
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import config
+
+_SECONDS_PER_DAY = 86400.0
+
+
+def decayed_importance(importance: float, last_touch: float, now: float, half_life_days: float) -> float:
+    """Importance halved every ``half_life_days`` since the node was last touched."""
+    idle_days = max(0.0, now - (last_touch or now)) / _SECONDS_PER_DAY
+    return float(importance or 0.0) * 0.5 ** (idle_days / max(half_life_days, 1e-6))
+
+
+def retention_score(importance: float, accessed_count: int, last_touch: float, now: float,
+                    half_life_days: float) -> float:
+    """importance x recency (exponential decay) x access frequency (log-damped)."""
+    frequency = 1.0 + math.log1p(max(0, int(accessed_count or 0)))
+    return decayed_importance(importance, last_touch, now, half_life_days) * frequency
+
+
+class MemoryCapacityManager:
+    """
+    Keep the memory graph within node / edge budgets
+
+    Why: Bound memory graph size so retrieval, linking and startup stay fast
+    Where: ``AdvancedMemoryEngine.capacity`` (see module docstring)
+    How: Score, pick the lowest with ``heapq.nsmallest``, delete in one batch
+    """
+
+    def __init__(
+        self,
+        engine,
+        max_nodes: Optional[int] = None,
+        max_edges: Optional[int] = None,
+        half_life_days: Optional[float] = None,
+        batch: Optional[int] = None,
+        target_ratio: Optional[float] = None,
+    ):
+        self.engine = engine
+        self.db = engine.db
+        self.max_nodes = int(max_nodes if max_nodes is not None else getattr(config, 'MEMORY_MAX_NODES', 50000))
+        self.max_edges = int(max_edges if max_edges is not None else getattr(config, 'MEMORY_MAX_EDGES', 200000))
+        self.half_life_days = float(
+            half_life_days if half_life_days is not None
+            else getattr(config, 'MEMORY_IMPORTANCE_HALF_LIFE_DAYS', 30.0)
+        )
+        self.batch = max(1, int(batch if batch is not None else getattr(config, 'MEMORY_EVICTION_BATCH', 500)))
+        self.target_ratio = float(
+            target_ratio if target_ratio is not None else getattr(config, 'MEMORY_EVICTION_TARGET_RATIO', 0.9)
+        )
+        self._run_lock = threading.Lock()
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.totals = {'passes': 0, 'evicted_nodes': 0, 'evicted_edges': 0}
+
+    # ----------------------------------------------------------------- sizing
+    def over_budget(self) -> bool:
+        """Cheap check used on the write path (node count from the keyword index)."""
+        return len(self.engine.keyword_index) > self.max_nodes
+
+    def distribution(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Size distribution of the graph
+
+        Returns node / edge counts, nodes per category, edges per type, bytes of
+        node content and quantiles of decayed importance and retention score.
+        """
+        now = time.time() if now is None else now
+        with self.db._lock, self.db._connect() as con:
+            nodes = con.execute(
+                "SELECT category, importance, accessed_count, last_accessed, created_at, length(content) "
+                "FROM memory_nodes"
+            ).fetchall()
+            edges = dict(con.execute(
+                "SELECT COALESCE(relationship_type, ''), COUNT(*) FROM memory_relationships "
+                "GROUP BY relationship_type"
+            ).fetchall())
+        decayed: List[float] = []
+        scores: List[float] = []
+        for _cat, imp, acc, last, created, _size in nodes:
+            touch = max(last or 0.0, created or 0.0)
+            decayed.append(decayed_importance(imp, touch, now, self.half_life_days))
+            scores.append(retention_score(imp, acc, touch, now, self.half_life_days))
+        return {
+            'nodes': len(nodes),
+            'edges': sum(edges.values()),
+            'content_bytes': sum(n[5] or 0 for n in nodes),
+            'nodes_by_category': dict(Counter(n[0] or '' for n in nodes).most_common(20)),
+            'edges_by_type': edges,
+            'decayed_importance': _quantiles(decayed),
+            'retention_score': _quantiles(scores),
+        }
+
+    # --------------------------------------------------------------- eviction
+    def run(self, max_batches: int = 1) -> Dict[str, Any]:
+        """
+        One bounded eviction pass (at most ``max_batches`` node + edge batches)
+
+        Why: Bring the graph back under budget without long write locks
+        Where: Background flusher tick, ``/api/memory/capacity`` POST, tests
+        How: Flush deferred access stats so scores see current counts, snapshot
+        the distribution, evict node / edge batches, snapshot again
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return {'skipped': 'running'}
+        try:
+            start = time.perf_counter()
+            self.engine.flush_deferred()
+            now = time.time()
+            before = self.distribution(now)
+            evicted_nodes = evicted_edges = 0
+            for _ in range(max(1, int(max_batches))):
+                n = self._evict_node_batch(now)
+                e = self._evict_edge_batch(now)
+                evicted_nodes += n
+                evicted_edges += e
+                if not n and not e:
+                    break
+            after = self.distribution(now) if (evicted_nodes or evicted_edges) else before
+            report = {
+                'ts': now,
+                'duration_ms': round((time.perf_counter() - start) * 1000.0, 2),
+                'evicted_nodes': evicted_nodes,
+                'evicted_edges': evicted_edges,
+                'before': before,
+                'after': after,
+            }
+            self.totals['passes'] += 1
+            self.totals['evicted_nodes'] += evicted_nodes
+            self.totals['evicted_edges'] += evicted_edges
+            self.last_run = report
+            return report
+        finally:
+            self._run_lock.release()
+
+    def maintain(self) -> None:
+        """Background tick: run a pass only when a budget is exceeded."""
+        if self.over_budget() or self._edge_count() > self.max_edges:
+            self.run()
+
+    def _edge_count(self) -> int:
+        with self.db._lock, self.db._connect() as con:
+            return con.execute("SELECT COUNT(*) FROM memory_relationships").fetchone()[0]
+
+    def _evict_node_batch(self, now: float) -> int:
+        # Under the engine lock (taken before db._lock, as ``_ingest`` does) the
+        # ingest worker can neither resolve a concept to a node being deleted nor
+        # link a new node to one still in the LSH buckets.
+        with self.engine._lock, self.db._lock, self.db._connect() as con:
+            total = con.execute("SELECT COUNT(*) FROM memory_nodes").fetchone()[0]
+            if total <= self.max_nodes:
+                return 0
+            excess = min(self.batch, total - int(self.max_nodes * self.target_ratio))
+            rows = con.execute(
+                "SELECT id, importance, accessed_count, last_accessed, created_at FROM memory_nodes"
+            ).fetchall()
+            victims = heapq.nsmallest(
+                excess,
+                rows,
+                key=lambda r: retention_score(r[1], r[2], max(r[3] or 0.0, r[4] or 0.0), now, self.half_life_days),
+            )
+            ids = [(r[0],) for r in victims]
+            for (node_id,) in ids:
+                self.engine.keyword_index.remove(node_id)
+                self.engine.semantic_index.remove(node_id)
+                self.engine.graph.remove_node(node_id)
+            # Cascade: relationships touching an evicted node go in the same transaction
+            con.executemany("DELETE FROM memory_relationships WHERE source_node = ?", ids)
+            con.executemany("DELETE FROM memory_relationships WHERE target_node = ?", ids)
+            con.executemany("DELETE FROM memory_nodes WHERE id = ?", ids)
+            con.commit()
+        return len(ids)
+
+    def _evict_edge_batch(self, now: float) -> int:
+        with self.db._lock, self.db._connect() as con:
+            total = con.execute("SELECT COUNT(*) FROM memory_relationships").fetchone()[0]
+            if total <= self.max_edges:
+                return 0
+            excess = min(self.batch, total - int(self.max_edges * self.target_ratio))
+            rows = con.execute("SELECT id, strength, created_at FROM memory_relationships").fetchall()
+            victims = heapq.nsmallest(
+                excess, rows, key=lambda r: decayed_importance(r[1], r[2], now, self.half_life_days)
+            )
+            con.executemany("DELETE FROM memory_relationships WHERE id = ?", [(r[0],) for r in victims])
+            con.commit()
+        if victims:
+            self.engine.reload_graph()
+        return len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        """Budgets, current distribution and the last pass (before / after)."""
+        return {
+            'budget': {
+                'max_nodes': self.max_nodes,
+                'max_edges': self.max_edges,
+                'target_ratio': self.target_ratio,
+                'half_life_days': self.half_life_days,
+                'batch': self.batch,
+            },
+            'current': self.distribution(),
+            'totals': dict(self.totals),
+            'last_run': self.last_run,
+        }
+
+
+def _quantiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {'min': 0.0, 'p10': 0.0, 'p50': 0.0, 'p90': 0.0, 'max': 0.0}
+    values = sorted(values)
+
+    def at(q: float) -> float:
+        return round(values[min(len(values) - 1, int(q * (len(values) - 1)))], 4)
+
+    return {'min': at(0.0), 'p10': at(0.1), 'p50': at(0.5), 'p90': at(0.9), 'max': at(1.0)}
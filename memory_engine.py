@@ -16,23 +16,46 @@ Connects to:
         - All methods with database interactions use `self.db._execute_query()` which relies on the `DatabaseManager`.
     - persona.py:
         - `generate()` -> `get_contextual_memory()`: The persona engine calls this to fetch relevant memories for generating a response.
-        - `generate()` -> `get_conversation_history()`: Called to get recent conversation turns for context.
+        - `generate()` -> `get_conversation_history()`: Called to get recent conversation turns for context (served from the in-memory `ConversationWindow`).
         - `generate()` -> `predict_preferences()`: Called to suggest the best response mode.
-        - `generate()` -> `store_interaction()`: The persona engine calls this after a response is generated to log the full interaction.
+        - `generate()` -> `submit_interaction()`: The persona engine queues the finished interaction for background persistence (`MemoryIngestQueue`).
     - nlp_processor.py: (Indirectly) The `MemoryContext` object processed by `store_interaction` is created in `persona.py` using the analysis (keywords, entities, sentiment) from the `nlp_processor`.
     - config.py: The `get_memory_engine()` factory function uses `config.DB_PATH` to initialize the `DatabaseManager`.
     - debug_config.py: `get_debugger()` is used for logging throughout the module.
+    - memory_capacity.py: `MemoryCapacityManager` keeps the node / edge counts within budget (`self.capacity`).
+    - memory_snapshot.py: `save_snapshot()` / `load_snapshot()` binary warm start validated by `memory_meta.db_id` and `change_counter`.
+    - `get_associative_memory()`: multi-hop recall over the cached `MemoryGraph` of `memory_relationships`.
 """
+import atexit
+import bisect
+import heapq
+import itertools
+import re
 import threading
 import json
+import os
+import random
+import struct
+import weakref
+import zlib
+from array import array
 from datetime import datetime
-from collections import defaultdict, Counter
+from collections import OrderedDict, defaultdict, deque
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 import config
 
 from database import DatabaseManager
 from debug_config import get_debugger
+import memory_snapshot
+from memory_capacity import MemoryCapacityManager
+
+# NumPy speeds up signature hashing and batch similarity; pure Python otherwise
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAS_NUMPY = False
 
 debugger = get_debugger()
 
@@ -85,6 +108,1107 @@ class MemoryNode:
         if self.tags is None:
             self.tags = []
 
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def tokenize(text: str, min_len: int = 3) -> List[str]:
+    """Lowercase word tokens of at least ``min_len`` chars (order kept, duplicates dropped)."""
+    seen: Dict[str, None] = {}
+    for tok in _TOKEN_RE.findall((text or "").lower()):
+        if len(tok) >= min_len:
+            seen.setdefault(tok, None)
+    return list(seen)
+
+
+class MemoryKeywordIndex:
+    """
+    In-memory inverted index over memory node content
+
+    Why: ``get_contextual_memory`` ran one ``LOWER(content) LIKE '%word%'`` full
+    scan per query word; with 100k nodes a 20-word message meant 20 table scans
+    Where: Owned by ``AdvancedMemoryEngine``; loaded at startup, kept current by
+    ``_create_memory_node`` and retrieval hits
+    How: ``postings`` maps token -> node ids; ``nodes`` holds each node's content,
+    category, importance and access count so scoring never touches SQLite.
+    A sorted vocabulary lets a query word also match longer tokens that start
+    with it ("learn" -> "learning"), the useful part of the old substring match.
+    """
+
+    def __init__(self, max_prefix_expansion: int = 32):
+        self._lock = threading.Lock()
+        self.postings: Dict[str, set] = {}
+        self.nodes: Dict[str, list] = {}  # id -> [content, category, importance, accessed_count]
+        self._vocab: List[str] = []
+        self.max_prefix_expansion = max_prefix_expansion
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add(self, node_id: str, content: str, category: str, importance: float, accessed_count: int = 0):
+        """Insert or replace one node (re-tokenizes when content changes)."""
+        with self._lock:
+            self._add(node_id, content, category, importance, accessed_count, True)
+
+    def _add(self, node_id, content, category, importance, accessed_count, keep_sorted: bool) -> None:
+        old = self.nodes.get(node_id)
+        if old is not None and old[0] != content:
+            self._unlink(node_id, old[0])
+        self.nodes[node_id] = [content, category, float(importance or 0.0), int(accessed_count or 0)]
+        if old is None or old[0] != content:
+            for tok in tokenize(content):
+                ids = self.postings.get(tok)
+                if ids is None:
+                    self.postings[tok] = ids = set()
+                    if keep_sorted:
+                        bisect.insort(self._vocab, tok)
+                ids.add(node_id)
+
+    def load(self, rows) -> int:
+        """Bulk load ``(id, content, category, importance, accessed_count)`` rows."""
+        n = 0
+        with self._lock:
+            for row in rows:
+                self._add(*row, False)
+                n += 1
+            self._vocab = sorted(self.postings)  # one sort instead of an insort per token
+        return n
+
+    def remove(self, node_id: str) -> None:
+        with self._lock:
+            old = self.nodes.pop(node_id, None)
+            if old is not None:
+                self._unlink(node_id, old[0])
+
+    def _unlink(self, node_id: str, content: str) -> None:
+        for tok in tokenize(content):
+            ids = self.postings.get(tok)
+            if ids is not None:
+                ids.discard(node_id)
+                if not ids:
+                    del self.postings[tok]
+                    i = bisect.bisect_left(self._vocab, tok)
+                    if i < len(self._vocab) and self._vocab[i] == tok:
+                        del self._vocab[i]
+
+    def update_stats(self, node_id: str, importance: Optional[float] = None, accessed_delta: int = 0) -> None:
+        with self._lock:
+            node = self.nodes.get(node_id)
+            if node is not None:
+                if importance is not None:
+                    node[2] = float(importance)
+                node[3] += accessed_delta
+
+    def _expand(self, token: str) -> List[str]:
+        """``token`` itself plus vocabulary entries it is a prefix of (bounded)."""
+        i = bisect.bisect_left(self._vocab, token)
+        out = []
+        while i < len(self._vocab) and len(out) < self.max_prefix_expansion and self._vocab[i].startswith(token):
+            out.append(self._vocab[i])
+            i += 1
+        return out
+
+    def search(self, query_tokens: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Score nodes matching any query token; best ``limit`` first
+
+        How: Posting lists of each query token (and its prefix expansions) are
+        unioned per token, then merged counting how many distinct query tokens
+        each node matched. Nodes matching more tokens rank first (the
+        intersection), ties broken by ``importance * (1 + accessed_count * 0.1)``.
+        """
+        with self._lock:
+            matched: Dict[str, int] = defaultdict(int)
+            for tok in query_tokens:
+                hits: set = set()
+                for term in self._expand(tok):
+                    hits |= self.postings[term]
+                for node_id in hits:
+                    matched[node_id] += 1
+            if not matched:
+                return []
+            nodes = self.nodes
+
+            def score(node_id: str):
+                node = nodes[node_id]
+                return (matched[node_id], node[2] * (1 + node[3] * 0.1))
+
+            best = heapq.nlargest(limit, matched, key=score)
+            return [
+                {
+                    'id': node_id,
+                    'content': nodes[node_id][0],
+                    'category': nodes[node_id][1],
+                    'importance': nodes[node_id][2],
+                    'accessed_count': nodes[node_id][3],
+                    'relevance': nodes[node_id][2] * (1 + nodes[node_id][3] * 0.1),
+                    'matched_terms': matched[node_id],
+                }
+                for node_id in best
+            ]
+
+
+_U32 = 0xFFFFFFFF
+
+
+def shingles(text: str) -> set:
+    """Feature set for similarity: word tokens plus boundary-marked character trigrams.
+
+    Trigrams let morphological variants ("learning" / "learner") overlap, which
+    plain word overlap on one- or two-word concepts never does.
+    """
+    feats = set()
+    for word in _TOKEN_RE.findall((text or "").lower()):
+        feats.add(word)
+        padded = f"^{word}$"
+        for i in range(len(padded) - 2):
+            feats.add(padded[i:i + 3])
+    return feats
+
+
+class MinHashLSH:
+    """
+    MinHash signatures plus banded LSH buckets for semantic linking
+
+    Why: ``_create_semantic_links`` compared each new concept pairwise in Python
+    against only the 20 nodes created in the last hour, so older related
+    memories were never linked
+    Where: ``AdvancedMemoryEngine.semantic_index``; signatures are persisted in
+    ``memory_nodes.signature`` and loaded at startup
+    How: A node's ``shingles`` are hashed with ``num_perm`` fixed universal hash
+    functions; the per-function minimum forms a ``uint32`` signature whose
+    agreement rate estimates Jaccard similarity. Signatures are split into
+    ``bands`` bands; nodes sharing any band land in the same bucket, so
+    candidates come from a few dict lookups regardless of graph size.
+    Candidate similarities are computed in one NumPy comparison when available
+    (pure-Python fallback otherwise).
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _U32) | 1 for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _U32) for _ in range(num_perm)]
+        if HAS_NUMPY:
+            self._a_np = np.array(self._a, dtype=np.uint64)
+            self._b_np = np.array(self._b, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()  # cleared while a background bucket build runs
+        self._ready.set()
+        self.signatures: Dict[str, Any] = {}
+        self._buckets: Dict[bytes, set] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    # -- signatures ---------------------------------------------------------
+    def signature(self, text: str) -> bytes:
+        """Serialized (``num_perm`` x uint32, little endian) signature of ``text``."""
+        feats = [zlib.crc32(f.encode("utf-8")) for f in shingles(text)]
+        if not feats:
+            return b"\xff\xff\xff\xff" * self.num_perm
+        if HAS_NUMPY:
+            x = np.array(feats, dtype=np.uint64)[:, None]
+            hashed = (x * self._a_np + self._b_np) & _U32
+            return hashed.min(axis=0).astype("<u4").tobytes()
+        mins = [min(((a * x + b) & _U32) for x in feats) for a, b in zip(self._a, self._b)]
+        return struct.pack(f"<{self.num_perm}I", *mins)
+
+    def _decode(self, sig: bytes):
+        if HAS_NUMPY:
+            return np.frombuffer(sig, dtype="<u4")
+        return struct.unpack(f"<{self.num_perm}I", sig)
+
+    def _band_keys(self, sig: bytes) -> List[bytes]:
+        step = self.rows * 4
+        return [bytes((band,)) + sig[band * step:(band + 1) * step] for band in range(self.bands)]
+
+    # -- index --------------------------------------------------------------
+    def load(self, items, background: bool = False) -> int:
+        """
+        Bulk add ``(node_id, signature)`` pairs under one lock acquisition
+
+        With ``background`` the signatures are stored immediately and the band
+        buckets (the expensive part: ``bands`` set inserts per node) are filled
+        by a daemon thread; ``add`` / ``remove`` / ``neighbours`` wait for it.
+        """
+        width = self.num_perm * 4
+        loaded: List[str] = []
+        with self._lock:
+            for node_id, sig in items:
+                if not sig or len(sig) != width:
+                    continue
+                if node_id in self.signatures:
+                    self._remove(node_id)
+                self.signatures[node_id] = (sig, self._decode(sig))
+                loaded.append(node_id)
+            if not background:
+                self._index_buckets(loaded)
+                return len(loaded)
+            self._ready.clear()
+        threading.Thread(
+            target=self._index_buckets, args=(loaded, True), name="clever-lsh-buckets", daemon=True
+        ).start()
+        return len(loaded)
+
+    def _index_buckets(self, node_ids: List[str], locked: bool = False) -> None:
+        try:
+            if locked:
+                self._lock.acquire()
+            buckets = self._buckets
+            if HAS_NUMPY and node_ids:
+                # All band keys in one buffer: per node and band, the band byte + its rows
+                step = self.rows * 4
+                sigs = np.frombuffer(b"".join(self.signatures[i][0] for i in node_ids), dtype=np.uint8)
+                sigs = sigs.reshape(len(node_ids), self.bands, step)
+                prefix = np.broadcast_to(
+                    np.arange(self.bands, dtype=np.uint8)[None, :, None], (len(node_ids), self.bands, 1)
+                )
+                flat = np.concatenate([prefix, sigs], axis=2).tobytes()
+                width = step + 1
+                keys = [flat[o:o + width] for o in range(0, len(flat), width)]
+                owners = itertools.chain.from_iterable(itertools.repeat(i, self.bands) for i in node_ids)
+                for key, node_id in zip(keys, owners):
+                    buckets[key].add(node_id)
+            else:
+                for node_id in node_ids:
+                    for key in self._band_keys(self.signatures[node_id][0]):
+                        buckets[key].add(node_id)
+        finally:
+            if locked:
+                self._lock.release()
+                self._ready.set()
+
+    def add(self, node_id: str, sig: bytes) -> None:
+        if not sig or len(sig) != self.num_perm * 4:
+            return
+        self._ready.wait()
+        with self._lock:
+            if node_id in self.signatures:
+                self._remove(node_id)
+            self.signatures[node_id] = (sig, self._decode(sig))
+            for key in self._band_keys(sig):
+                self._buckets[key].add(node_id)
+
+    def remove(self, node_id: str) -> None:
+        self._ready.wait()
+        with self._lock:
+            self._remove(node_id)
+
+    def _remove(self, node_id: str) -> None:
+        entry = self.signatures.pop(node_id, None)
+        if entry is None:
+            return
+        for key in self._band_keys(entry[0]):
+            ids = self._buckets.get(key)
+            if ids is not None:
+                ids.discard(node_id)
+                if not ids:
+                    del self._buckets[key]
+
+    def neighbours(self, sig: bytes, threshold: float = 0.3, limit: int = 20,
+                   exclude: Optional[str] = None) -> List[tuple]:
+        """``(node_id, estimated_jaccard)`` of bucket-mates at or above ``threshold``, best first."""
+        self._ready.wait()
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(sig):
+                ids = self._buckets.get(key)
+                if ids:
+                    candidates |= ids
+            candidates.discard(exclude)
+            if not candidates:
+                return []
+            ids = list(candidates)
+            query = self._decode(sig)
+            if HAS_NUMPY:
+                matrix = np.stack([self.signatures[i][1] for i in ids])
+                sims = (matrix == query).mean(axis=1).tolist()
+            else:
+                sims = [
+                    sum(1 for p, q in zip(self.signatures[i][1], query) if p == q) / self.num_perm
+                    for i in ids
+                ]
+        scored = [(node_id, sim) for node_id, sim in zip(ids, sims) if sim >= threshold]
+        return heapq.nlargest(limit, scored, key=lambda item: item[1])
+
+
+class MemoryGraph:
+    """
+    Cached CSR adjacency over ``memory_relationships`` for spreading activation
+
+    Why: Relationships were written but never read during retrieval; a multi-hop
+    walk through SQLite would cost one query per visited node
+    Where: ``AdvancedMemoryEngine.graph``; loaded at startup, updated by
+    ``_create_relationship`` and capacity eviction, read by
+    ``get_associative_memory``
+    How: Node ids map to dense ints. Edges (treated as undirected, max strength
+    over relationship types) live in CSR arrays ``indptr`` / ``indices`` /
+    ``weights`` (NumPy when available, ``array`` otherwise). Incremental edge
+    upserts go to a small overlay dict and removed nodes to a tombstone set; once
+    the overlay passes ``compact_after`` edges the CSR is rebuilt in one pass.
+    """
+
+    def __init__(self, compact_after: int = 4096):
+        self.compact_after = compact_after
+        self._lock = threading.RLock()
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._edges: Dict[tuple, float] = {}  # (lo, hi) -> weight, source of truth for rebuilds
+        self._overlay: Dict[int, Dict[int, float]] = defaultdict(dict)
+        self._overlay_edges = 0
+        self._removed: set = set()
+        self._build([])
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def _node(self, node_id: str) -> int:
+        idx = self.index.get(node_id)
+        if idx is None:
+            idx = self.index[node_id] = len(self.ids)
+            self.ids.append(node_id)
+        return idx
+
+    def load(self, rows) -> int:
+        """Bulk load ``(source_node, target_node, strength)`` rows and build the CSR."""
+        with self._lock:
+            n = 0
+            for source, target, strength in rows:
+                self._put(source, target, strength)
+                n += 1
+            self.compact()
+            return n
+
+    def _put(self, source: str, target: str, strength: float) -> Optional[tuple]:
+        if source == target or source is None or target is None:
+            return None
+        a, b = self._node(source), self._node(target)
+        self._removed.discard(a)
+        self._removed.discard(b)
+        key = (a, b) if a < b else (b, a)
+        weight = max(float(strength or 0.0), self._edges.get(key, 0.0))
+        self._edges[key] = weight
+        return key + (weight,)
+
+    def upsert_edge(self, source: str, target: str, strength: float) -> None:
+        """Add or strengthen one edge; visible immediately through the overlay."""
+        with self._lock:
+            put = self._put(source, target, strength)
+            if put is None:
+                return
+            a, b, weight = put
+            self._overlay[a][b] = weight
+            self._overlay[b][a] = weight
+            self._overlay_edges += 1
+            if self._overlay_edges >= self.compact_after:
+                self.compact()
+
+    def remove_node(self, node_id: str) -> None:
+        """Tombstone a node (evicted); its edges disappear at the next compaction."""
+        with self._lock:
+            idx = self.index.get(node_id)
+            if idx is not None:
+                self._removed.add(idx)
+
+    def compact(self) -> None:
+        """Rebuild the CSR arrays from the edge map, dropping tombstoned nodes."""
+        with self._lock:
+            if self._removed:
+                removed = self._removed
+                self._edges = {k: w for k, w in self._edges.items() if k[0] not in removed and k[1] not in removed}
+            self._build(list(self._edges.items()))
+            self._overlay = defaultdict(dict)
+            self._overlay_edges = 0
+
+    def _build(self, edges: List[tuple]) -> None:
+        n = len(self.ids)
+        degree = [0] * (n + 1)
+        for (a, b), _w in edges:
+            degree[a + 1] += 1
+            degree[b + 1] += 1
+        for i in range(n):
+            degree[i + 1] += degree[i]
+        indptr = degree
+        fill = indptr[:-1].copy() if n else []
+        indices = [0] * (2 * len(edges))
+        weights = [0.0] * (2 * len(edges))
+        for (a, b), w in edges:
+            for u, v in ((a, b), (b, a)):
+                pos = fill[u]
+                indices[pos] = v
+                weights[pos] = w
+                fill[u] += 1
+        self._install(indptr, indices, weights)
+
+    def _install(self, indptr, indices, weights) -> None:
+        """Adopt CSR arrays (from ``_build`` or a snapshot) in the active representation."""
+        if HAS_NUMPY:
+            self.indptr = np.asarray(indptr, dtype=np.int64)
+            self.indices = np.asarray(indices, dtype=np.int32)
+            self.weights = np.asarray(weights, dtype=np.float64)
+        else:
+            self.indptr = array('q', indptr)
+            self.indices = array('i', indices)
+            self.weights = array('d', weights)
+        self._built_nodes = len(indptr) - 1
+
+    def neighbours(self, idx: int):
+        """``(neighbour indices, weights)`` of node ``idx`` (CSR row + overlay)."""
+        if idx < self._built_nodes:
+            lo, hi = self.indptr[idx], self.indptr[idx + 1]
+            nbrs, ws = self.indices[lo:hi], self.weights[lo:hi]
+        else:
+            nbrs, ws = (), ()
+        extra = self._overlay.get(idx)
+        if extra:
+            merged = dict(zip((int(v) for v in nbrs), (float(w) for w in ws)))
+            merged.update(extra)
+            return list(merged), list(merged.values())
+        return nbrs, ws
+
+    def spread(self, seeds: Dict[str, float], hops: int = 2, frontier: int = 64,
+               decay: float = 0.5, min_activation: float = 1e-3) -> Dict[str, tuple]:
+        """
+        Spreading activation from ``seeds`` (node id -> initial activation)
+
+        Each hop pushes ``activation * weight * decay`` from every frontier node to
+        its neighbours; only the ``frontier`` most activated newly reached nodes
+        expand on the next hop, so work per hop is bounded regardless of degree.
+
+        Returns:
+            node id -> (activation, hop at which it was first reached)
+        """
+        with self._lock:
+            removed = self._removed
+            activation: Dict[int, float] = {}
+            reached: Dict[int, int] = {}
+            for node_id, act in seeds.items():
+                idx = self.index.get(node_id)
+                if idx is not None and idx not in removed:
+                    activation[idx] = activation.get(idx, 0.0) + float(act)
+                    reached[idx] = 0
+            current = dict(activation)
+            for hop in range(1, max(0, int(hops)) + 1):
+                incoming: Dict[int, float] = defaultdict(float)
+                for u, act in current.items():
+                    nbrs, ws = self.neighbours(u)
+                    if len(nbrs) == 0:
+                        continue
+                    if HAS_NUMPY and not isinstance(nbrs, list):
+                        pushed = (ws * (act * decay)).tolist()
+                        nbrs = nbrs.tolist()
+                    else:
+                        pushed = [w * act * decay for w in ws]
+                    for v, p in zip(nbrs, pushed):
+                        if v not in removed:
+                            incoming[v] += p
+                for v, p in incoming.items():
+                    activation[v] = activation.get(v, 0.0) + p
+                    reached.setdefault(v, hop)
+                fresh = [(v, p) for v, p in incoming.items() if p >= min_activation]
+                current = dict(heapq.nlargest(frontier, fresh, key=lambda item: item[1]))
+                if not current:
+                    break
+            return {self.ids[i]: (a, reached[i]) for i, a in activation.items()}
+
+
+class ConversationWindow:
+    """
+    Hot per-session window of recent conversation turns
+
+    Why: ``get_conversation_history`` ran an ORDER BY timestamp query on every
+    chat turn (and had to wait for the write-behind queue first) for data the
+    engine had just written itself
+    Where: ``AdvancedMemoryEngine.history``; hydrated once at startup, appended
+    by ``store_interaction``, read by ``get_conversation_history``
+    How: One bounded ``deque`` per session plus one across all sessions, each
+    kept in timestamp order. Turns are appended synchronously in the same call
+    that queues the batched INSERT, so a reader always sees its own writes
+    without draining the write-behind queue. A session window only answers
+    reads once it is known to be complete (filled by ``hydrate_session``, new
+    this process, or fully inside the startup slice); a partial one, a request
+    longer than the window or a session dropped by the LRU cap of
+    ``max_sessions`` goes to the DB.
+    """
+
+    def __init__(self, size: int = 50, max_sessions: int = 256):
+        self.size = max(1, int(size))
+        self.max_sessions = max(1, int(max_sessions))
+        self._lock = threading.Lock()
+        self._recent: deque = deque(maxlen=self.size)
+        self._sessions: "OrderedDict[str, deque]" = OrderedDict()
+        self._complete: set = set()  # sessions whose window holds all of their newest turns
+        self._hydrated = False
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    @staticmethod
+    def _insert(window: deque, turn: Dict[str, Any]) -> None:
+        if window and turn['timestamp'] < window[-1]['timestamp']:
+            ordered = sorted(list(window) + [turn], key=lambda t: t['timestamp'])
+            window.clear()
+            window.extend(ordered)  # maxlen drops the oldest
+        else:
+            window.append(turn)
+
+    def _session(self, session_id: str) -> deque:
+        window = self._sessions.get(session_id)
+        if window is None:
+            window = self._sessions[session_id] = deque(maxlen=self.size)
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                self._complete.discard(evicted)
+        else:
+            self._sessions.move_to_end(session_id)
+        return window
+
+    def append(self, session_id: str, turn: Dict[str, Any]) -> None:
+        with self._lock:
+            self._insert(self._recent, turn)
+            self._insert(self._session(session_id), turn)
+
+    def remove(self, session_id: str, turn: Dict[str, Any]) -> None:
+        """Take back a turn that was appended but will never be stored (ingest drop)."""
+        with self._lock:
+            for window in (self._recent, self._sessions.get(session_id)):
+                if window is not None and turn in window:
+                    window.remove(turn)
+
+    def hydrate(self, rows) -> int:
+        """Load the newest ``(session_id, user_input, response_text, mode, sentiment, timestamp)`` rows, newest first.
+
+        A short slice (fewer than ``size`` rows) is the whole table, so every
+        session in it is complete; otherwise only sessions that filled their
+        window are, and the rest stay partial until ``hydrate_session``.
+        """
+        with self._lock:
+            turns = [(row[0], _history_turn(row[1:])) for row in rows]
+            for session_id, turn in reversed(turns):
+                self._recent.append(turn)
+                self._session(session_id).append(turn)
+            whole_table = len(turns) < self.size
+            for session_id in {sid for sid, _ in turns}:
+                window = self._sessions.get(session_id)
+                if window is not None and (whole_table or len(window) == self.size):
+                    self._complete.add(session_id)
+            self._hydrated = True
+            return len(turns)
+
+    def mark_new(self, session_id: str) -> None:
+        """Declare a session that has no stored turns (e.g. one generated this process) complete."""
+        with self._lock:
+            self._session(session_id)
+            self._complete.add(session_id)
+
+    def hydrate_session(self, session_id: str, rows) -> None:
+        """Fill one session's window from DB rows (newest first) after a miss and mark it complete.
+
+        Turns already in the window are kept, so a turn appended while its
+        INSERT is still queued survives the refill.
+        """
+        with self._lock:
+            window = self._session(session_id)
+            merged = {tuple(t.values()): t for t in window}
+            for row in rows:
+                turn = _history_turn(row)
+                merged.setdefault(tuple(turn.values()), turn)
+            window.clear()
+            window.extend(sorted(merged.values(), key=lambda t: t['timestamp']))
+            self._complete.add(session_id)
+
+    def recent(self, limit: int, session_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Newest-first turns, or None when the window cannot answer (caller falls back to SQL)."""
+        with self._lock:
+            window = self._recent if session_id is None else self._sessions.get(session_id)
+            partial = session_id is not None and session_id not in self._complete
+            if not self._hydrated or window is None or partial or limit > self.size:
+                self.misses += 1
+                return None
+            if session_id is not None:
+                self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return [dict(turn) for turn in list(window)[::-1][:max(0, int(limit))]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': self.size,
+                'turns': len(self._recent),
+                'sessions': len(self._sessions),
+                'partial_sessions': len(self._sessions) - len(self._complete),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def _history_turn(row) -> Dict[str, Any]:
+    return {
+        'user_input': row[0],
+        'response_text': row[1],
+        'mode': row[2],
+        'sentiment': row[3],
+        'timestamp': row[4],
+    }
+
+
+class AccessStatsAccumulator:
+    """
+    In-memory accumulator for hot ``memory_nodes`` access counters
+
+    Why: Every retrieval hit and repeated concept issued its own UPDATE + commit
+    on the read path; access counts and timestamps do not need per-event
+    durability
+    Where: ``AdvancedMemoryEngine.access_stats``; fed by ``get_contextual_memory``
+    and ``_create_memory_node``, drained by the engine's periodic flusher, at
+    shutdown, when ``threshold`` nodes are pending, and before stats reads
+    How: Increments merge per node id (count delta, newest access time, latest
+    absolute importance); ``flush`` swaps the pending dict out under a lock and
+    writes it with one ``executemany`` in one transaction
+    """
+
+    _FLUSH_SQL = """
+        UPDATE memory_nodes
+        SET accessed_count = COALESCE(accessed_count, 0) + ?,
+            last_accessed = MAX(COALESCE(last_accessed, 0), ?),
+            importance = COALESCE(?, importance)
+        WHERE id = ?
+    """
+
+    def __init__(self, db: DatabaseManager, threshold: int = 500):
+        self.db = db
+        self.threshold = max(1, int(threshold))
+        self._lock = threading.Lock()
+        self._pending: Dict[str, list] = {}  # id -> [delta, last_ts, importance]
+        self._oldest_ts: Optional[float] = None
+        self._stats = {"recorded": 0, "flushes": 0, "rows_flushed": 0, "last_flush_ts": None, "last_flush_ms": 0.0}
+
+    def record(self, node_id: str, delta: int = 1, ts: Optional[float] = None,
+               importance: Optional[float] = None) -> bool:
+        """Queue an access; returns True when the pending set reached ``threshold``."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            entry = self._pending.get(node_id)
+            if entry is None:
+                self._pending[node_id] = [delta, ts, importance]
+                if self._oldest_ts is None:
+                    self._oldest_ts = ts
+            else:
+                entry[0] += delta
+                entry[1] = max(entry[1], ts)
+                if importance is not None:
+                    entry[2] = importance
+            self._stats["recorded"] += 1
+            return len(self._pending) >= self.threshold
+
+    def flush(self) -> int:
+        """Write all pending increments in one transaction; returns rows written."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            self._oldest_ts = None
+        rows = [(e[0], e[1], e[2], node_id) for node_id, e in pending.items()]
+        start = time.perf_counter()
+        try:
+            with self.db._lock, self.db._connect() as con:
+                con.executemany(self._FLUSH_SQL, rows)
+                con.commit()
+        except Exception:
+            with self._lock:  # put increments back so nothing is lost
+                for node_id, e in pending.items():
+                    cur = self._pending.get(node_id)
+                    if cur is None:
+                        self._pending[node_id] = e
+                    else:
+                        cur[0] += e[0]
+                        cur[1] = max(cur[1], e[1])
+                        cur[2] = cur[2] if cur[2] is not None else e[2]
+                oldest = min(e[1] for e in pending.values())
+                self._oldest_ts = oldest if self._oldest_ts is None else min(self._oldest_ts, oldest)
+            raise
+        with self._lock:
+            self._stats["flushes"] += 1
+            self._stats["rows_flushed"] += len(rows)
+            self._stats["last_flush_ts"] = time.time()
+            self._stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pending count, flush lag (age of the oldest unflushed access) and counters."""
+        with self._lock:
+            out = dict(self._stats)
+            out["pending"] = len(self._pending)
+            out["lag_s"] = round(time.time() - self._oldest_ts, 3) if self._oldest_ts else 0.0
+            out["threshold"] = self.threshold
+        return out
+
+
+class KeywordModeModel:
+    """
+    Persisted keyword -> response-mode counts behind ``predict_preferences``
+
+    Why: ``learning_patterns`` appended one mode string per keyword occurrence
+    forever, was lost on restart and was re-counted with ``Counter`` on every
+    prediction
+    Where: ``AdvancedMemoryEngine.mode_model``; fed by ``_learn_patterns``, read
+    by ``predict_preferences``, drained by ``flush_deferred``
+    How: Each keyword owns a fixed-size ``array`` of counts (one slot per mode,
+    at most ``slots`` modes) plus its cached argmax, so a prediction is one dict
+    lookup per keyword. Increments also merge into a pending dict that
+    ``flush`` upserts into ``keyword_mode_counts`` with one ``executemany``.
+    When more than ``max_keywords`` are tracked, the flush drops the keywords
+    with the smallest totals (memory and table) down to 90% of the cap.
+    """
+
+    _UPSERT_SQL = """
+        INSERT INTO keyword_mode_counts (keyword, mode, count) VALUES (?, ?, ?)
+        ON CONFLICT(keyword, mode) DO UPDATE SET count = count + excluded.count
+    """
+
+    def __init__(self, db: DatabaseManager, max_keywords: int = 20000, slots: int = 8):
+        self.db = db
+        self.max_keywords = max(1, int(max_keywords))
+        self.slots = max(1, int(slots))
+        self._lock = threading.Lock()
+        self.modes: List[str] = []
+        self._slot: Dict[str, int] = {}
+        self.counts: Dict[str, array] = {}
+        self.best: Dict[str, int] = {}
+        self._pending: Dict[tuple, int] = {}
+        self._stats = {"recorded": 0, "dropped": 0, "flushes": 0, "rows_flushed": 0, "pruned": 0}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def _mode_slot(self, mode: str) -> Optional[int]:
+        slot = self._slot.get(mode)
+        if slot is None and len(self.modes) < self.slots:
+            slot = self._slot[mode] = len(self.modes)
+            self.modes.append(mode)
+        return slot
+
+    def _bump(self, keyword: str, slot: int, delta: int) -> None:
+        row = self.counts.get(keyword)
+        if row is None:
+            row = self.counts[keyword] = array('I', [0] * self.slots)
+            self.best[keyword] = slot
+        row[slot] += delta
+        if row[slot] > row[self.best[keyword]]:
+            self.best[keyword] = slot
+
+    def load(self, rows) -> int:
+        """Bulk load ``(keyword, mode, count)`` rows at startup."""
+        n = 0
+        with self._lock:
+            for keyword, mode, count in rows:
+                slot = self._mode_slot(mode)
+                if slot is not None:
+                    self._bump(keyword, slot, int(count or 0))
+                    n += 1
+        return n
+
+    def record(self, keyword: str, mode: str, delta: int = 1) -> None:
+        keyword = keyword.lower()
+        with self._lock:
+            slot = self._mode_slot(mode)
+            if slot is None:
+                self._stats["dropped"] += 1
+                return
+            self._bump(keyword, slot, delta)
+            key = (keyword, mode)
+            self._pending[key] = self._pending.get(key, 0) + delta
+            self._stats["recorded"] += 1
+
+    def predict(self, keyword: str) -> Optional[str]:
+        """Most frequent mode seen with ``keyword`` (None when unseen)."""
+        slot = self.best.get(keyword.lower())
+        return None if slot is None else self.modes[slot]
+
+    def flush(self) -> int:
+        """Upsert pending increments (one transaction) and enforce the keyword cap."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            victims: List[str] = []
+            if len(self.counts) > self.max_keywords:
+                keep = int(self.max_keywords * 0.9)
+                victims = heapq.nsmallest(len(self.counts) - keep, self.counts, key=lambda k: sum(self.counts[k]))
+                for keyword in victims:
+                    del self.counts[keyword]
+                    del self.best[keyword]
+                    for mode in self.modes:
+                        pending.pop((keyword, mode), None)
+        if not pending and not victims:
+            return 0
+        try:
+            with self.db._lock, self.db._connect() as con:
+                con.executemany(self._UPSERT_SQL, [(k, m, n) for (k, m), n in pending.items()])
+                con.executemany("DELETE FROM keyword_mode_counts WHERE keyword = ?", [(k,) for k in victims])
+                con.commit()
+        except Exception:
+            with self._lock:  # put increments back so nothing is lost
+                for key, n in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + n
+            raise
+        with self._lock:
+            self._stats["flushes"] += 1
+            self._stats["rows_flushed"] += len(pending)
+            self._stats["pruned"] += len(victims)
+        return len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out.update(keywords=len(self.counts), max_keywords=self.max_keywords,
+                       modes=list(self.modes), pending=len(self._pending))
+        return out
+
+
+class PeriodicFlusher:
+    """
+    Daemon thread that runs a flush callback on an interval or on demand
+
+    Why: Deferred in-memory state (access counters and other hot aggregates)
+    needs one background writer per engine rather than one thread per buffer
+    Where: ``AdvancedMemoryEngine._flusher`` drives ``flush_deferred()``
+    How: Waits on an Event with a timeout; ``trigger()`` wakes it early (e.g. a
+    threshold was hit). Holds only a weak reference to the owner so an engine
+    that is dropped stops its thread on the next tick.
+    """
+
+    def __init__(self, owner: Any, method: str, interval_s: float, name: str = "clever-flusher"):
+        self._owner = weakref.ref(owner)
+        self._method = method
+        self.interval_s = max(0.05, float(interval_s))
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> "PeriodicFlusher":
+        self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive() and not self._stop.is_set()
+
+    def trigger(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            owner = self._owner()
+            if owner is None:
+                return
+            try:
+                getattr(owner, self._method)()
+            except Exception as e:
+                debugger.warning('memory_engine', f'Deferred flush failed: {e}')
+            del owner
+
+
+INGEST_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+
+class MemoryIngestQueue:
+    """
+    Bounded background pipeline that persists ``MemoryContext`` turns
+
+    Why: ``store_interaction`` (conversation insert, node extraction, semantic
+    linking, pattern / preference learning) ran inside ``PersonaEngine.generate``
+    under the engine lock, so every chat reply waited for memory persistence
+    Where: ``AdvancedMemoryEngine.ingest``; fed by ``submit_interaction`` (persona),
+    drained by its worker thread, ``drain()`` in tests and ``flush_all_engines``
+    at exit
+    How: A ``deque`` bounded at ``max_queue`` guarded by a Condition feeds one
+    daemon worker that calls the engine's ``_ingest``. When saturated the
+    ``policy`` decides: "block" waits up to ``block_ms`` for room and then drops
+    the new turn, "drop_oldest" evicts the oldest queued turn, "drop_newest"
+    rejects the new one immediately. ``submit``'s ``on_accept`` runs only once
+    the turn is queued and its ``on_drop`` when ``drop_oldest`` evicts it later,
+    both under the queue lock. Like ``PeriodicFlusher`` the worker holds only a
+    weak reference to the engine.
+    """
+
+    def __init__(self, engine: Any, max_queue: int = 256, policy: str = "block", block_ms: float = 50.0):
+        if policy not in INGEST_POLICIES:
+            raise ValueError(f"unknown ingest policy: {policy!r}")
+        self._owner = weakref.ref(engine)
+        self.max_queue = max(1, int(max_queue))
+        self.policy = policy
+        self.block_s = max(0.0, float(block_ms)) / 1000.0
+        self._queue: deque = deque()  # (enqueued_at, context, on_drop)
+        self._cond = threading.Condition()
+        self._busy = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "submitted": 0, "processed": 0, "dropped": 0, "failed": 0,
+            "max_depth": 0, "last_lag_ms": 0.0, "max_lag_ms": 0.0, "last_ingest_ms": 0.0,
+        }
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="clever-memory-ingest", daemon=True)
+            self._thread.start()
+
+    def submit(
+        self,
+        context: "MemoryContext",
+        on_accept: Optional[Callable[["MemoryContext"], None]] = None,
+        on_drop: Optional[Callable[["MemoryContext"], None]] = None,
+    ) -> bool:
+        """Queue one turn; returns False when the drop policy rejected it."""
+        with self._cond:
+            self._ensure_thread()
+            if len(self._queue) >= self.max_queue:
+                if self.policy == "drop_oldest":
+                    _, dropped, dropped_hook = self._queue.popleft()
+                    self._stats["dropped"] += 1
+                    if dropped_hook is not None:
+                        dropped_hook(dropped)
+                elif self.policy == "block" and self._cond.wait_for(
+                    lambda: len(self._queue) < self.max_queue, timeout=self.block_s
+                ):
+                    pass
+                else:
+                    self._stats["dropped"] += 1
+                    return False
+            self._queue.append((time.monotonic(), context, on_drop))
+            if on_accept is not None:
+                on_accept(context)
+            self._stats["submitted"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], len(self._queue))
+            self._cond.notify_all()
+        return True
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued turn has been processed; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout=timeout)
+
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, processing lag (age of the oldest queued turn) and counters."""
+        with self._cond:
+            out = dict(self._stats)
+            out["depth"] = len(self._queue)
+            out["lag_ms"] = round((time.monotonic() - self._queue[0][0]) * 1000.0, 3) if self._queue else 0.0
+            out["policy"] = self.policy
+            out["max_queue"] = self.max_queue
+        return out
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drain what is queued, then stop the worker."""
+        self.drain(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._stopping, timeout=0.5)
+                if not self._queue:
+                    if self._stopping:
+                        return
+                    continue
+                enqueued_at, context, _ = self._queue.popleft()
+                self._busy = True
+                self._cond.notify_all()  # room for blocked producers
+            owner = self._owner()
+            if owner is None:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+                return
+            start = time.monotonic()
+            try:
+                owner._ingest(context, durability="batched")
+                outcome = "processed"
+            except Exception as e:
+                outcome = "failed"
+                debugger.warning('memory_engine', f'Memory ingestion failed: {e}')
+            del owner
+            lag_ms = (start - enqueued_at) * 1000.0
+            with self._cond:
+                self._busy = False
+                self._stats[outcome] += 1
+                self._stats["last_lag_ms"] = round(lag_ms, 3)
+                self._stats["max_lag_ms"] = round(max(self._stats["max_lag_ms"], lag_ms), 3)
+                self._stats["last_ingest_ms"] = round((time.monotonic() - start) * 1000.0, 3)
+                self._cond.notify_all()
+
+
+_ENGINES: "weakref.WeakSet[AdvancedMemoryEngine]" = weakref.WeakSet()
+
+# Tables whose row changes invalidate a warm-start snapshot (memory_snapshot.py)
+SNAPSHOT_TABLES = ("memory_nodes", "memory_relationships", "user_preferences", "keyword_mode_counts")
+
+
+def flush_all_engines() -> None:
+    """Drain queued turns, flush deferred state and snapshot every live memory engine (atexit)."""
+    for engine in list(_ENGINES):
+        try:
+            engine.ingest.drain(timeout=5.0)
+            engine.flush_deferred()
+            if getattr(config, 'MEMORY_SNAPSHOT_ON_EXIT', True):
+                engine.save_snapshot()
+        except Exception as e:
+            debugger.warning('memory_engine', f'Shutdown flush failed: {e}')
+
+
+atexit.register(flush_all_engines)
+
+
+def reload_engine_graphs(db_path: Optional[str] = None) -> int:
+    """Rebuild the cached graph of every live engine on ``db_path`` (all when None); returns engines reloaded."""
+    target = None if db_path is None else os.path.realpath(str(db_path))
+    reloaded = 0
+    for engine in list(_ENGINES):
+        if target is not None and os.path.realpath(str(engine.db.db_path)) != target:
+            continue
+        try:
+            engine.reload_graph()
+            reloaded += 1
+        except Exception as e:
+            debugger.warning('memory_engine', f'Graph reload failed: {e}')
+    return reloaded
+
+
+def deferred_write_stats() -> Dict[str, Any]:
+    """Aggregate pending / lag / flush counters over live engines (for telemetry)."""
+    engines = [e.access_stats.stats() for e in list(_ENGINES)]
+    return {
+        "engines": len(engines),
+        "pending": sum(e["pending"] for e in engines),
+        "lag_s": max((e["lag_s"] for e in engines), default=0.0),
+        "flushes": sum(e["flushes"] for e in engines),
+        "rows_flushed": sum(e["rows_flushed"] for e in engines),
+        "last_flush_ms": max((e["last_flush_ms"] for e in engines), default=0.0),
+        "ingest": [e.ingest.stats() for e in list(_ENGINES)],
+    }
+
+
 class AdvancedMemoryEngine:
     """
     Advanced memory system with learning and prediction
@@ -112,25 +1236,69 @@ class AdvancedMemoryEngine:
         self.session_id = self._generate_session_id()
         self.conversation_buffer = []  # Recent conversation context
         self.semantic_cache = {}  # Cache for semantic similarity
-        self.learning_patterns = defaultdict(list)  # Pattern learning
+        self.learning_patterns = defaultdict(lambda: [0, 0.0])  # Pattern learning: [count, sum]
         self.preference_model = {}  # Jay's preferences
         self.context_window = 10  # Number of recent interactions to consider
+        self.keyword_index = MemoryKeywordIndex()  # token -> memory nodes (retrieval)
+        self.semantic_index = MinHashLSH()  # signature buckets -> link candidates
+        self.graph = MemoryGraph()  # cached relationship adjacency (associative recall)
+        self.history = ConversationWindow(  # hot turns per session
+            getattr(config, 'MEMORY_HISTORY_WINDOW', 50), getattr(config, 'MEMORY_HISTORY_SESSIONS', 256)
+        )
+        # Off-request-path persistence of chat turns (submit_interaction)
+        self.ingest = MemoryIngestQueue(
+            self,
+            max_queue=getattr(config, 'MEMORY_INGEST_QUEUE_SIZE', 256),
+            policy=getattr(config, 'MEMORY_INGEST_POLICY', 'block'),
+            block_ms=getattr(config, 'MEMORY_INGEST_BLOCK_MS', 50),
+        )
+        # Hot access counters are accumulated and written back in batches
+        self.access_stats = AccessStatsAccumulator(
+            db_manager, threshold=getattr(config, 'MEMORY_ACCESS_FLUSH_THRESHOLD', 500)
+        )
+        # keyword -> mode counts for predict_preferences (persisted, flushed with access stats)
+        self.mode_model = KeywordModeModel(
+            db_manager, max_keywords=getattr(config, 'MEMORY_MODE_MODEL_MAX_KEYWORDS', 20000)
+        )
         
-        # Initialize database schema
+        # Initialize database schema, then warm-start from a snapshot or rebuild
         self._initialize_memory_schema()
-        self._load_preferences()
+        self.snapshot_status: Dict[str, Any] = {'loaded': False, 'reason': 'disabled'}
+        if not (getattr(config, 'MEMORY_SNAPSHOT_ON_START', True) and self.load_snapshot()):
+            self._load_preferences()
+            self._load_mode_model()
+            self._load_indexes()
+        self._load_history()
+        self.history.mark_new(self.session_id)  # generated above, nothing stored under it yet
+        
+        self._flusher = PeriodicFlusher(
+            self, 'flush_deferred', getattr(config, 'MEMORY_ACCESS_FLUSH_SECONDS', 5.0),
+            name='clever-memory-flush'
+        ).start()
+        # Node / edge budgets enforced by bounded background eviction passes
+        self.capacity = MemoryCapacityManager(self)
+        self._capacity_runner = PeriodicFlusher(
+            self.capacity, 'maintain', getattr(config, 'MEMORY_EVICTION_INTERVAL_SECONDS', 60.0),
+            name='clever-memory-capacity'
+        ).start()
+        _ENGINES.add(self)
         
         debugger.info('memory_engine', f'Advanced memory engine initialized with session {self.session_id}')
     
-    def _execute_query(self, query: str, params: tuple = ()) -> List[tuple]:
+    def _execute_query(self, query: str, params: tuple = (), durability: Optional[str] = None) -> List[tuple]:
         """
         Execute database query with proper error handling
         
         Why: Provide safe database access with connection management
         Where: Used by all database operations in memory engine
-        How: Use DatabaseManager connection with proper locking
+        How: Use DatabaseManager connection with proper locking; append-only writes
+        may pass a durability level ("batched", "fire-and-forget") to go through
+        the DatabaseManager write-behind queue instead of committing inline
         """
         try:
+            if durability and durability != "sync":
+                self.db.execute_write(query, params, durability=durability)
+                return []
             with self.db._lock, self.db._connect() as con:
                 cursor = con.execute(query, params)
                 if query.strip().upper().startswith('SELECT'):
@@ -142,6 +1310,33 @@ class AdvancedMemoryEngine:
             debugger.error('memory_engine', f'Database query failed: {e}')
             raise
     
+    def _record_access(self, node_id: str, ts: Optional[float] = None, importance: Optional[float] = None):
+        """Queue an access-stat update; wake (or run) the flush past the threshold."""
+        if self.access_stats.record(node_id, ts=ts, importance=importance):
+            if self._flusher.running:
+                self._flusher.trigger()
+            else:
+                self.access_stats.flush()
+    
+    def flush_deferred(self) -> Dict[str, int]:
+        """
+        Write back all deferred in-memory state
+        
+        Why: Single entry point for the periodic flusher, shutdown and readers
+        that need the table to be current
+        Where: PeriodicFlusher tick, ``flush_all_engines`` at exit, stats reads
+        How: Flushes each deferred buffer; returns rows written per buffer
+        """
+        return {'access_stats': self.access_stats.flush(), 'mode_model': self.mode_model.flush()}
+    
+    def close(self):
+        """Drain queued turns, stop the background threads and write back deferred state."""
+        self.ingest.stop()
+        self._flusher.stop()
+        self._capacity_runner.stop()
+        self.flush_deferred()
+        _ENGINES.discard(self)
+    
     def _generate_session_id(self) -> str:
         """
         Generate unique session identifier
@@ -178,9 +1373,14 @@ class AdvancedMemoryEngine:
                         accessed_count INTEGER DEFAULT 0,
                         last_accessed REAL DEFAULT 0,
                         tags TEXT,
-                        metadata TEXT
+                        metadata TEXT,
+                        signature BLOB
                     )
                 """)
+                with self.db._lock, self.db._connect() as con:
+                    columns = {row[1] for row in con.execute("PRAGMA table_info(memory_nodes)")}
+                if 'signature' not in columns:  # tables created before MinHash linking
+                    self._execute_query("ALTER TABLE memory_nodes ADD COLUMN signature BLOB")
                 
                 # Memory relationships table
                 self._execute_query("""
@@ -224,11 +1424,54 @@ class AdvancedMemoryEngine:
                     )
                 """)
                 
+                # Keyword -> response mode counts (KeywordModeModel)
+                self._execute_query("""
+                    CREATE TABLE IF NOT EXISTS keyword_mode_counts (
+                        keyword TEXT NOT NULL,
+                        mode TEXT NOT NULL,
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (keyword, mode)
+                    ) WITHOUT ROWID
+                """)
+                
                 # Create indexes for better performance
                 self._execute_query("CREATE INDEX IF NOT EXISTS idx_memory_category ON memory_nodes (category)")
                 self._execute_query("CREATE INDEX IF NOT EXISTS idx_memory_importance ON memory_nodes (importance DESC)")
                 self._execute_query("CREATE INDEX IF NOT EXISTS idx_conversation_session ON conversation_context (session_id)")
                 self._execute_query("CREATE INDEX IF NOT EXISTS idx_conversation_timestamp ON conversation_context (timestamp DESC)")
+                self._execute_query("CREATE INDEX IF NOT EXISTS idx_memory_relationships_created ON memory_relationships (created_at)")
+                # Point lookups on the store path (see tools/query_plan_audit.py)
+                self._execute_query("CREATE INDEX IF NOT EXISTS idx_memory_nodes_content_category ON memory_nodes (content, category)")
+                self._execute_query("CREATE INDEX IF NOT EXISTS idx_memory_nodes_created ON memory_nodes (created_at)")
+                self._execute_query(
+                    "CREATE INDEX IF NOT EXISTS idx_memory_relationships_edge "
+                    "ON memory_relationships (source_node, target_node, relationship_type)"
+                )
+                # Eviction cascades delete relationships by either endpoint
+                self._execute_query("CREATE INDEX IF NOT EXISTS idx_memory_relationships_target ON memory_relationships (target_node)")
+                
+                # Change counter bumped by every row change on the tables warm state is
+                # built from; a snapshot is only trusted when its counter still matches
+                self._execute_query("""
+                    CREATE TABLE IF NOT EXISTS memory_meta (
+                        key TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL DEFAULT 0
+                    )
+                """)
+                self._execute_query("INSERT OR IGNORE INTO memory_meta (key, value) VALUES ('change_counter', 0)")
+                # Random id drawn once per database so a snapshot of another (or a
+                # recreated) database is never trusted just because counters match
+                self._execute_query(
+                    "INSERT OR IGNORE INTO memory_meta (key, value) VALUES ('db_id', ?)",
+                    (random.SystemRandom().randrange(1, 1 << 63),),
+                )
+                for table in SNAPSHOT_TABLES:
+                    for event in ('INSERT', 'UPDATE', 'DELETE'):
+                        self._execute_query(
+                            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_counter "
+                            f"AFTER {event} ON {table} BEGIN "
+                            "UPDATE memory_meta SET value = value + 1 WHERE key = 'change_counter'; END"
+                        )
                 
                 debugger.info('memory_engine', 'Memory database schema initialized successfully')
                 
@@ -241,7 +1484,8 @@ class AdvancedMemoryEngine:
         Store interaction in memory with full context
         
         Why: Capture and persist every interaction for learning and context building
-        Where: Called after each user interaction from app.py
+        Where: Called after each user interaction from app.py (synchronous path;
+        persona uses ``submit_interaction``)
         How: Store conversation data, extract insights, build relationships
         
         Args:
@@ -255,10 +1499,47 @@ class AdvancedMemoryEngine:
             - persona.py: Response context storage
             - nlp_processor.py: Semantic analysis integration
         """
+        self._remember_turn(context)
+        return self._ingest(context)
+    
+    def submit_interaction(self, context: MemoryContext) -> bool:
+        """
+        Queue an interaction for background persistence
+        
+        Why: Keep memory persistence out of chat latency
+        Where: Called by ``PersonaEngine.generate`` after the reply is built
+        How: Hand the turn to ``ingest``; once it is accepted it is appended to
+        the hot history window (the next turn's ``get_conversation_history``
+        sees it even while it is queued). A turn the drop policy rejects, or
+        later evicts from the queue, never shows up in (or leaves) the window;
+        returns False when the turn was rejected
+        """
+        return self.ingest.submit(context, on_accept=self._remember_turn, on_drop=self._forget_turn)
+    
+    @staticmethod
+    def _window_turn(context: MemoryContext) -> Dict[str, Any]:
+        return _history_turn((
+            context.user_input, context.response_text, context.mode,
+            context.sentiment, context.timestamp,
+        ))
+    
+    def _remember_turn(self, context: MemoryContext) -> None:
+        self.history.append(context.session_id, self._window_turn(context))
+    
+    def _forget_turn(self, context: MemoryContext) -> None:
+        self.history.remove(context.session_id, self._window_turn(context))
+    
+    def _ingest(self, context: MemoryContext, durability: str = "sync") -> str:
+        """Persist and learn from one turn (caller thread or the ingest worker).
+
+        The synchronous ``store_interaction`` path commits the conversation row
+        inline so it can return its id; the ingest worker has no caller waiting
+        for an id and joins the write-behind group commit instead.
+        """
         with self._lock:
             try:
                 # Store conversation context
-                context_id = self._store_conversation_context(context)
+                context_id = self._store_conversation_context(context, durability=durability)
                 
                 # Extract and store memory nodes
                 self._extract_memory_nodes(context)
@@ -274,27 +1555,37 @@ class AdvancedMemoryEngine:
                 # Update preferences
                 self._update_preferences(context)
                 
-                debugger.info('memory_engine', f'Stored interaction with ID: {context_id}')
+                if context_id:
+                    debugger.info('memory_engine', f'Stored interaction with ID: {context_id}')
+                else:
+                    # Batched path: the row id is assigned when the group commit lands
+                    debugger.info(
+                        'memory_engine',
+                        f'Stored interaction for session {context.session_id} at {context.timestamp:.3f} (row queued)'
+                    )
                 return context_id
                 
             except Exception as e:
                 debugger.error('memory_engine', f'Failed to store interaction: {e}')
                 raise
     
-    def _store_conversation_context(self, context: MemoryContext) -> str:
+    def _store_conversation_context(self, context: MemoryContext, durability: str = "sync") -> str:
         """
         Store conversation context in database
         
         Why: Persist conversation data for future retrieval and analysis
         Where: Called by store_interaction for data persistence
-        How: Insert context data into conversation_context table
+        How: "sync" commits inline and returns the new row id; "batched" (the
+        background ingest worker) queues the insert on the write-behind path so
+        the row joins the chat telemetry group commit, and returns '' because
+        the id is only assigned when that batch commits
         """
         context_metadata = {
             'context_links': context.context_links,
             'session_id': self.session_id
         }
         
-        self._execute_query("""
+        row_id = self.db.execute_write("""
             INSERT INTO conversation_context 
             (session_id, user_input, response_text, mode, sentiment, keywords, 
              entities, importance_score, timestamp, context_metadata)
@@ -310,10 +1601,9 @@ class AdvancedMemoryEngine:
             context.importance_score,
             context.timestamp,
             json.dumps(context_metadata)
-        ))
+        ), durability=durability)
         
-        # Return the last inserted row ID as string
-        return str(self._execute_query("SELECT last_insert_rowid()")[0][0])
+        return str(row_id) if row_id else ""
     
     def _extract_memory_nodes(self, context: MemoryContext):
         """
@@ -368,27 +1658,32 @@ class AdvancedMemoryEngine:
         """, (content, category))
         
         if existing:
-            # Update existing node
+            # Update existing node (the index holds importance including unflushed bumps)
             existing_id, existing_importance, accessed_count = existing[0]
+            indexed = self.keyword_index.nodes.get(existing_id)
+            if indexed is not None:
+                existing_importance = indexed[2]
             new_importance = min(1.0, existing_importance + importance * 0.1)  # Gradual importance increase
             
-            self._execute_query("""
-                UPDATE memory_nodes 
-                SET importance = ?, accessed_count = ?, last_accessed = ?
-                WHERE id = ?
-            """, (new_importance, accessed_count + 1, time.time(), existing_id))
+            self.keyword_index.update_stats(existing_id, importance=new_importance, accessed_delta=1)
+            self._record_access(existing_id, importance=new_importance)
             
             return existing_id
         else:
             # Create new node
+            signature = self.semantic_index.signature(content)
             self._execute_query("""
                 INSERT INTO memory_nodes 
-                (id, content, category, importance, created_at, tags, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                (id, content, category, importance, created_at, tags, metadata, signature)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 node_id, content, category, importance, time.time(),
-                json.dumps(tags), json.dumps({})
+                json.dumps(tags), json.dumps({}), signature
             ))
+            self.keyword_index.add(node_id, content, category, importance)
+            self.semantic_index.add(node_id, signature)
+            if self.capacity.over_budget():
+                self._capacity_runner.trigger()
             
             return node_id
     
@@ -398,18 +1693,12 @@ class AdvancedMemoryEngine:
         
         Why: Build knowledge graph with meaningful connections
         Where: Called during memory node creation
-        How: Find similar content and create weighted relationships
+        How: Look up LSH bucket-mates of the node's MinHash signature across the
+        whole memory graph and link the strongest (estimated Jaccard > 0.3)
         """
-        # Find recently created nodes for potential linking
-        recent_nodes = self._execute_query("""
-            SELECT id, content FROM memory_nodes 
-            WHERE id != ? AND created_at > ?
-            ORDER BY created_at DESC LIMIT 20
-        """, (node_id, time.time() - 3600))  # Last hour
-        
-        for other_id, other_content in recent_nodes:
-            similarity = self._calculate_similarity(content, other_content)
-            
+        entry = self.semantic_index.signatures.get(node_id)
+        sig = entry[0] if entry else self.semantic_index.signature(content)
+        for other_id, similarity in self.semantic_index.neighbours(sig, threshold=0.3, exclude=node_id):
             if similarity > 0.3:  # Minimum similarity threshold
                 self._create_relationship(node_id, other_id, 'semantic', similarity)
     
@@ -418,12 +1707,11 @@ class AdvancedMemoryEngine:
         Calculate semantic similarity between texts
         
         Why: Determine relationship strength between concepts
-        Where: Used for creating memory node relationships
-        How: Simple word overlap and length-based similarity
+        Where: Exact reference for the MinHash estimate used by semantic linking
+        How: Jaccard similarity of the ``shingles`` feature sets
         """
-        # Simple similarity based on word overlap
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+        words1 = shingles(text1)
+        words2 = shingles(text2)
         
         if not words1 or not words2:
             return 0.0
@@ -439,7 +1727,8 @@ class AdvancedMemoryEngine:
         
         Why: Build knowledge graph connections
         Where: Called during semantic linking
-        How: Store bidirectional relationship in database
+        How: Store bidirectional relationship in database and mirror it into the
+        cached ``MemoryGraph`` so associative recall sees it immediately
         """
         # Check if relationship already exists
         existing = self._execute_query("""
@@ -458,11 +1747,14 @@ class AdvancedMemoryEngine:
             """, (new_strength, source_id, target_id, relationship_type))
         else:
             # Create new relationship
+            new_strength = strength
             self._execute_query("""
                 INSERT INTO memory_relationships 
                 (source_node, target_node, relationship_type, strength, created_at)
                 VALUES (?, ?, ?, ?, ?)
             """, (source_id, target_id, relationship_type, strength, time.time()))
+        
+        self.graph.upsert_edge(source_id, target_id, new_strength)
     
     def _learn_patterns(self, context: MemoryContext):
         """
@@ -472,20 +1764,21 @@ class AdvancedMemoryEngine:
         Where: Called during interaction storage
         How: Analyze context for recurring patterns and preferences
         """
-        # Learn mode preferences based on input characteristics
+        # Learn mode preferences based on input characteristics (running count / sum)
         input_length = len(context.user_input.split())
         
-        pattern_key = f"input_length_{context.mode}"
-        self.learning_patterns[pattern_key].append(input_length)
+        pattern = self.learning_patterns[f"input_length_{context.mode}"]
+        pattern[0] += 1
+        pattern[1] += input_length
         
-        # Learn sentiment patterns
-        sentiment_pattern = f"sentiment_{context.sentiment}_{context.mode}"
-        self.learning_patterns[sentiment_pattern].append(time.time())
+        # Learn sentiment patterns (count / last seen)
+        pattern = self.learning_patterns[f"sentiment_{context.sentiment}_{context.mode}"]
+        pattern[0] += 1
+        pattern[1] = time.time()
         
-        # Learn keyword preferences
+        # Learn keyword preferences (persisted keyword -> mode counts)
         for keyword in context.keywords:
-            keyword_pattern = f"keyword_{keyword}"
-            self.learning_patterns[keyword_pattern].append(context.mode)
+            self.mode_model.record(keyword, context.mode)
     
     def _update_preferences(self, context: MemoryContext):
         """
@@ -536,6 +1829,25 @@ class AdvancedMemoryEngine:
                 VALUES (?, ?, ?, ?, ?)
             """, (key, value, category, confidence_delta, time.time()))
     
+    def _load_mode_model(self):
+        """
+        Load persisted keyword -> mode counts into ``mode_model``
+
+        Why: Mode predictions survive restarts instead of relearning from scratch
+        Where: Called once during engine initialization
+        How: Streams ``keyword_mode_counts`` with ``fetchmany``
+        """
+        try:
+            with self.db._lock, self.db._connect() as con:
+                cur = con.execute("SELECT keyword, mode, count FROM keyword_mode_counts")
+                while True:
+                    rows = cur.fetchmany(5000)
+                    if not rows:
+                        break
+                    self.mode_model.load(rows)
+        except Exception as e:
+            debugger.warning('memory_engine', f'Could not load keyword mode model: {e}')
+    
     def _load_preferences(self):
         """
         Load existing preferences from database
@@ -563,13 +1875,103 @@ class AdvancedMemoryEngine:
             debugger.warning('memory_engine', f'Could not load preferences: {e}')
             self.preference_model = {}
     
+    def _load_indexes(self):
+        """
+        Build the in-memory keyword and semantic (LSH) indexes from ``memory_nodes``
+
+        Why: Retrieval and linking read only the indexes; they must start complete
+        Where: Called once during engine initialization
+        How: Streams rows with ``fetchmany`` so startup memory stays flat; nodes
+        stored before signatures existed get one computed and written back in a
+        single ``executemany``
+        """
+        missing: List[tuple] = []
+        try:
+            with self.db._lock, self.db._connect() as con:
+                cur = con.execute(
+                    "SELECT id, content, category, importance, accessed_count, signature FROM memory_nodes"
+                )
+                while True:
+                    rows = cur.fetchmany(5000)
+                    if not rows:
+                        break
+                    self.keyword_index.load(row[:5] for row in rows)
+                    sigs = []
+                    for row in rows:
+                        sig = row[5]
+                        if sig is None:
+                            sig = self.semantic_index.signature(row[1])
+                            missing.append((sig, row[0]))
+                        sigs.append((row[0], bytes(sig)))
+                    self.semantic_index.load(sigs)
+                if missing:
+                    con.executemany("UPDATE memory_nodes SET signature = ? WHERE id = ?", missing)
+                    con.commit()
+            self.reload_graph()
+            debugger.info(
+                'memory_engine',
+                f'Indexes loaded: {len(self.keyword_index)} nodes, {len(self.graph)} edges, '
+                f'{len(missing)} signatures backfilled'
+            )
+        except Exception as e:
+            debugger.warning('memory_engine', f'Could not load memory indexes: {e}')
+
+    def save_snapshot(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Write a binary warm-start snapshot of the in-memory state
+
+        Why: The next process can skip rebuilding indexes, graph and models
+        Where: ``flush_all_engines`` at exit (``MEMORY_SNAPSHOT_ON_EXIT``), tools, tests
+        How: Delegates to ``memory_snapshot.save_snapshot`` (default path next to the DB)
+        """
+        return memory_snapshot.save_snapshot(self, path)
+
+    def load_snapshot(self, path: Optional[str] = None) -> bool:
+        """
+        Restore in-memory state from a snapshot; False when missing or stale
+
+        Why: Millisecond warm starts when the memory tables did not change
+        Where: ``__init__`` before the cold rebuild; ``snapshot_status`` records why not
+        How: Delegates to ``memory_snapshot.load_snapshot``
+        """
+        return memory_snapshot.load_snapshot(self, path)
+
+    def reload_graph(self) -> int:
+        """
+        Rebuild the cached relationship graph from ``memory_relationships``
+
+        Why: Bulk edge deletes (capacity eviction, retention pruning) happen
+        outside ``_create_relationship``; a reload resynchronises the cache
+        Where: ``_load_indexes`` at startup, capacity edge eviction, snapshot
+        save, and retention pruning through ``reload_engine_graphs``
+        How: Streams ``(source, target, strength)`` rows into a fresh ``MemoryGraph``
+        and swaps it in, so readers never see a half-built graph. The engine lock
+        is held from the read to the swap, so an edge upserted by the ingest
+        worker is either in the rows read or applied to the new graph
+        """
+        with self._lock:
+            graph = MemoryGraph(compact_after=self.graph.compact_after)
+            with self.db._lock, self.db._connect() as con:
+                cur = con.execute("SELECT source_node, target_node, strength FROM memory_relationships")
+                while True:
+                    rows = cur.fetchmany(5000)
+                    if not rows:
+                        break
+                    for row in rows:
+                        graph._put(*row)
+            graph.compact()
+            self.graph = graph
+            return len(graph)
+
     def get_contextual_memory(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """
         Retrieve contextually relevant memories
         
         Why: Provide relevant context for response generation
         Where: Called by persona engine for context-aware responses
-        How: Search memory nodes and relationships for relevant information
+        How: Tokenize the query, score candidates from the in-memory keyword
+        index (no per-word table scans), then queue the access for every hit on
+        the deferred ``access_stats`` accumulator (no write on the read path)
         
         Args:
             query: Search query or current input
@@ -582,73 +1984,139 @@ class AdvancedMemoryEngine:
             - persona.py: Context retrieval for response generation
         """
         try:
-            # Extract keywords from query
-            query_keywords = [word.lower() for word in query.split() if len(word) > 2]
-            
-            relevant_memories = []
-            
-            # Search memory nodes
-            for keyword in query_keywords:
-                memories = self._execute_query("""
-                    SELECT id, content, category, importance, accessed_count
-                    FROM memory_nodes 
-                    WHERE LOWER(content) LIKE ? 
-                    ORDER BY importance DESC, accessed_count DESC
-                    LIMIT ?
-                """, (f'%{keyword}%', max_results))
-                
-                for memory in memories:
-                    node_id, content, category, importance, accessed_count = memory
-                    
-                    # Update access count
-                    self._execute_query("""
-                        UPDATE memory_nodes 
-                        SET accessed_count = ?, last_accessed = ?
-                        WHERE id = ?
-                    """, (accessed_count + 1, time.time(), node_id))
-                    
-                    relevant_memories.append({
-                        'id': node_id,
-                        'content': content,
-                        'category': category,
-                        'importance': importance,
-                        'relevance': importance * (1 + accessed_count * 0.1)
-                    })
+            hits = self.keyword_index.search(tokenize(query), limit=max_results)
+            if not hits:
+                return []
             
-            # Remove duplicates and sort by relevance
-            unique_memories = {mem['id']: mem for mem in relevant_memories}
-            sorted_memories = sorted(unique_memories.values(), 
-                                   key=lambda x: x['relevance'], reverse=True)
+            now = time.time()
+            for hit in hits:
+                self.keyword_index.update_stats(hit['id'], accessed_delta=1)
+                self._record_access(hit['id'], ts=now)
             
-            return sorted_memories[:max_results]
+            return [{
+                'id': hit['id'],
+                'content': hit['content'],
+                'category': hit['category'],
+                'importance': hit['importance'],
+                'relevance': hit['relevance']
+            } for hit in hits]
             
         except Exception as e:
             debugger.error('memory_engine', f'Failed to retrieve contextual memory: {e}')
             return []
     
-    def get_conversation_history(self, session_limit: int = 5) -> List[Dict[str, Any]]:
+    def get_associative_memory(self, query: str, hops: int = 2, budget: int = 10) -> List[Dict[str, Any]]:
+        """
+        Multi-hop associative recall by spreading activation over the memory graph
+
+        Why: Direct keyword matches miss memories that are only related through
+        other memories; walking ``memory_relationships`` in SQL costs a query per hop
+        Where: Persona / tools wanting broader context than ``get_contextual_memory``
+        How: Seed activation from keyword-index matches (relevance normalised to
+        1.0), spread ``hops`` times over the cached CSR graph keeping at most a
+        bounded frontier per hop, then rank seeds and reached nodes by
+        ``activation * (0.5 + importance)``. Read-only: no access stats recorded.
+
+        Args:
+            query: Search query or current input
+            hops: Maximum relationship hops from the seed memories
+            budget: Maximum number of memories returned
+
+        Returns:
+            Memory dicts with ``activation``, ``hops`` (0 for seeds) and ``seed``
+        """
+        try:
+            budget = max(1, int(budget))
+            seeds = self.keyword_index.search(tokenize(query), limit=max(budget, 8))
+            if not seeds:
+                return []
+            top = max(hit['relevance'] for hit in seeds) or 1.0
+            activation = self.graph.spread(
+                {hit['id']: hit['relevance'] / top for hit in seeds},
+                hops=hops, frontier=max(budget * 4, 32),
+            )
+            nodes = self.keyword_index.nodes
+            ranked = []
+            for node_id, (act, hop) in activation.items():
+                node = nodes.get(node_id)
+                if node is not None:
+                    ranked.append((act * (0.5 + node[2]), node_id, act, hop, node))
+            ranked = heapq.nlargest(budget, ranked, key=lambda item: item[0])
+            return [{
+                'id': node_id,
+                'content': node[0],
+                'category': node[1],
+                'importance': node[2],
+                'activation': round(act, 4),
+                'hops': hop,
+                'seed': hop == 0,
+            } for _score, node_id, act, hop, node in ranked]
+        except Exception as e:
+            debugger.error('memory_engine', f'Failed to retrieve associative memory: {e}')
+            return []
+    
+    def _load_history(self):
+        """
+        Hydrate the conversation window with the newest turns (one query at startup)
+
+        Why: After this, steady-state chat turns read history without SQL
+        Where: Called once during engine initialization
+        How: Flush pending write-behind rows, then take the newest
+        ``history.size`` turns across sessions; per-session windows fill from them
+        """
+        try:
+            self.db.flush()
+            with self.db._lock, self.db._connect() as con:
+                rows = con.execute(
+                    "SELECT session_id, user_input, response_text, mode, sentiment, timestamp "
+                    "FROM conversation_context ORDER BY timestamp DESC LIMIT ?",
+                    (self.history.size,),
+                ).fetchall()
+            self.history.hydrate(rows)
+        except Exception as e:
+            debugger.warning('memory_engine', f'Could not load conversation history: {e}')
+
+    def get_conversation_history(self, session_limit: int = 5, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get recent conversation history
         
         Why: Provide conversation context for response generation
         Where: Called by persona engine for context awareness
-        How: Retrieve recent interactions from current and previous sessions
+        How: Served from the hot ``ConversationWindow`` (newest first, across all
+        sessions or one ``session_id``). A cold or partially hydrated session
+        or a limit beyond the window falls back to SQL, after waiting for this
+        thread's deferred conversation inserts (read-your-writes); the session
+        window is then refilled so later reads stay in memory
         """
         try:
-            history = self._execute_query("""
-                SELECT user_input, response_text, mode, sentiment, timestamp
-                FROM conversation_context
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (session_limit,))
+            cached = self.history.recent(session_limit, session_id)
+            if cached is not None:
+                return cached
             
-            return [{
-                'user_input': row[0],
-                'response_text': row[1],
-                'mode': row[2],
-                'sentiment': row[3],
-                'timestamp': row[4]
-            } for row in history]
+            self.db.wait_for_own_writes()
+            if session_id is None:
+                history = self._execute_query("""
+                    SELECT user_input, response_text, mode, sentiment, timestamp
+                    FROM conversation_context
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                """, (session_limit,))
+            else:
+                history = self._execute_query("""
+                    SELECT user_input, response_text, mode, sentiment, timestamp
+                    FROM conversation_context
+                    WHERE session_id = ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                """, (session_id, max(session_limit, self.history.size)))
+                if session_limit <= self.history.size:
+                    # Merge with turns still queued for ingest and serve from the window
+                    self.history.hydrate_session(session_id, history)
+                    cached = self.history.recent(session_limit, session_id)
+                    if cached is not None:
+                        return cached
+            
+            return [_history_turn(row) for row in history[:session_limit]]
             
         except Exception as e:
             debugger.error('memory_engine', f'Failed to retrieve conversation history: {e}')
@@ -660,7 +2128,8 @@ class AdvancedMemoryEngine:
         
         Why: Enable proactive response customization
         Where: Called by persona engine for predictive responses
-        How: Analyze context against learned preference patterns
+        How: Analyze context against learned preference patterns; each keyword's
+        mode comes from the cached argmax in ``mode_model`` (O(#keywords))
         """
         predictions = {
             'suggested_mode': 'Auto',
@@ -681,9 +2150,8 @@ class AdvancedMemoryEngine:
                     confidence = self.preference_model[pref_key]['confidence']
                     
                     # Find associated modes
-                    mode_patterns = self.learning_patterns.get(f"keyword_{keyword}", [])
-                    if mode_patterns:
-                        most_common_mode = Counter(mode_patterns).most_common(1)[0][0]
+                    most_common_mode = self.mode_model.predict(keyword)
+                    if most_common_mode:
                         mode_scores[most_common_mode] += confidence
                         predictions['reasoning'].append(f"Keyword '{keyword}' suggests {most_common_mode} mode")
             
@@ -707,7 +2175,13 @@ class AdvancedMemoryEngine:
         How: Aggregate statistics from all memory components
         """
         try:
-            stats = {}
+            self.db.wait_for_own_writes()
+            stats = {
+                'deferred_access': self.access_stats.stats(),
+                'history_window': self.history.stats(),
+                'snapshot': dict(self.snapshot_status),
+            }
+            self.flush_deferred()
             
             # Memory node statistics
             node_stats = self._execute_query("""
@@ -753,7 +2227,8 @@ class AdvancedMemoryEngine:
             stats['session'] = {
                 'current_session': self.session_id,
                 'buffer_size': len(self.conversation_buffer),
-                'learning_patterns': len(self.learning_patterns)
+                'learning_patterns': len(self.learning_patterns),
+                'mode_model': self.mode_model.stats()
             }
             
             return stats
@@ -0,0 +1,336 @@
+"""
+Memory Snapshot for Clever AI
+
+Why:
+    Every restart rebuilt the memory engine's in-process state from SQLite:
+    preferences, the keyword index (tokenizing every node), LSH buckets, the
+    relationship graph and the keyword -> mode model, and lost the running
+    ``learning_patterns`` outright. With tens of thousands of nodes that is
+    seconds of startup spent recomputing what the last process already had.
+Where:
+    ``AdvancedMemoryEngine.save_snapshot()`` / ``load_snapshot()`` delegate here.
+    The engine tries ``load_snapshot`` during ``__init__`` and falls back to the
+    full rebuild when it returns False; ``flush_all_engines`` saves one at exit.
+How:
+    A snapshot is one binary file: a fixed header (magic, format version, byte
+    order, MinHash shape, DB id, DB change counter, creation time) followed by named
+    sections, each a typed ``array`` dumped with ``tobytes``. All strings (node
+    ids, contents, tokens, modes, preference keys) live once in a string table
+    (UTF-8 blob + offsets) and other sections refer to them by index. The file
+    is only trusted when it was written for this database (the random
+    ``memory_meta.db_id`` drawn when the memory schema is first created) and its
+    change counter equals ``memory_meta.change_counter``, which triggers on the
+    memory tables bump on every row change; anything else (another or recreated
+    database, stale counter, other version / byte order, truncated file) means
+    "rebuild".
+    Files are written to a temporary name and moved into place atomically.
+
+Connects to:
+    - memory_engine.py: AdvancedMemoryEngine state (keyword_index, semantic_index,
+      graph, mode_model, learning_patterns) and the memory_meta db id / change counter
+    - config.py: MEMORY_SNAPSHOT_PATH / MEMORY_SNAPSHOT_ON_START / MEMORY_SNAPSHOT_ON_EXIT
+    - tools/perf_benchmark.py: cold vs snapshot startup benchmark
+"""
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import config
+
+MAGIC = b"CLVMSNAP"
+FORMAT_VERSION = 2
+# magic, version, little-endian flag, num_perm, bands, db id, change counter, created_at, sections
+_HEADER = struct.Struct("<8sHBxHHqqdI")
+# name, array typecode, item count
+_SECTION = struct.Struct("<8scxxxQ")
+
+
+class SnapshotError(ValueError):
+    """Snapshot file is unreadable, from another format or stale."""
+
+
+def snapshot_path(db_path: str) -> str:
+    """Configured snapshot location (default: next to the database file)."""
+    configured = getattr(config, 'MEMORY_SNAPSHOT_PATH', '')
+    return str(configured) if configured else f"{db_path}.memsnap"
+
+
+def change_counter(con) -> int:
+    """Current ``memory_meta.change_counter`` (0 when the row is missing)."""
+    row = con.execute("SELECT value FROM memory_meta WHERE key = 'change_counter'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def db_id(con) -> int:
+    """Random id of this database from ``memory_meta.db_id`` (0 when the row is missing)."""
+    row = con.execute("SELECT value FROM memory_meta WHERE key = 'db_id'").fetchone()
+    return int(row[0]) if row else 0
+
+
+class _StringTable:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.encoded: List[bytes] = []
+
+    def __call__(self, text: Optional[str]) -> int:
+        if text is None:
+            return -1
+        idx = self.index.get(text)
+        if idx is None:
+            idx = self.index[text] = len(self.encoded)
+            self.encoded.append(str(text).encode("utf-8"))
+        return idx
+
+    def sections(self) -> Dict[str, array]:
+        offsets = array('q', [0])
+        total = 0
+        for chunk in self.encoded:
+            total += len(chunk)
+            offsets.append(total)
+        return {'str.blob': array('B', b"".join(self.encoded)), 'str.offs': offsets}
+
+
+def _read_strings(sections: Dict[str, array]) -> List[str]:
+    blob = sections['str.blob'].tobytes()
+    offs = sections['str.offs']
+    return [blob[offs[i]:offs[i + 1]].decode("utf-8") for i in range(len(offs) - 1)]
+
+
+def save_snapshot(engine, path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Write the engine's warm state to ``path``
+
+    Why: Let the next process start from arrays instead of rebuilding
+    Where: ``AdvancedMemoryEngine.save_snapshot`` (exit hook, CLI, tests)
+    How: Flush deferred writes and reload the graph so memory matches the DB,
+    read the change counter and preferences under the DB lock, then serialize
+    each structure into typed arrays over a shared string table
+    """
+    path = path or snapshot_path(engine.db.db_path)
+    start = time.perf_counter()
+    engine.ingest.drain(timeout=5.0)
+    engine.flush_deferred()
+    engine.db.flush()
+    engine.reload_graph()  # bulk edge deletes (retention / eviction) bypass the cache
+    with engine._lock:
+        with engine.db._lock, engine.db._connect() as con:
+            counter = change_counter(con)
+            owner_id = db_id(con)
+            prefs = con.execute(
+                "SELECT key, value, confidence FROM user_preferences "
+                "WHERE confidence > 0.1 ORDER BY confidence DESC"
+            ).fetchall()
+        s = _StringTable()
+        sections: Dict[str, array] = {}
+
+        kw = engine.keyword_index
+        with kw._lock:
+            ids = list(kw.nodes)
+            position = {node_id: i for i, node_id in enumerate(ids)}
+            nodes = [kw.nodes[node_id] for node_id in ids]
+            sections['kw.id'] = array('i', (s(node_id) for node_id in ids))
+            sections['kw.text'] = array('i', (s(n[0]) for n in nodes))
+            sections['kw.cat'] = array('i', (s(n[1]) for n in nodes))
+            sections['kw.imp'] = array('d', (n[2] for n in nodes))
+            sections['kw.acc'] = array('q', (n[3] for n in nodes))
+            vocab = sorted(kw.postings)
+            ptr = array('q', [0])
+            post = array('i')
+            for tok in vocab:
+                post.extend(position[node_id] for node_id in kw.postings[tok])
+                ptr.append(len(post))
+            sections['kw.tok'] = array('i', (s(tok) for tok in vocab))
+            sections['kw.ptr'] = ptr
+            sections['kw.post'] = post
+
+        lsh = engine.semantic_index
+        with lsh._lock:
+            sig_ids = list(lsh.signatures)
+            sections['lsh.id'] = array('i', (s(node_id) for node_id in sig_ids))
+            sections['lsh.sig'] = array('B', b"".join(lsh.signatures[i][0] for i in sig_ids))
+
+        graph = engine.graph
+        with graph._lock:
+            graph.compact()
+            sections['g.id'] = array('i', (s(node_id) for node_id in graph.ids))
+            sections['g.ptr'] = array('q', graph.indptr.tolist())
+            sections['g.adj'] = array('i', graph.indices.tolist())
+            sections['g.w'] = array('d', graph.weights.tolist())
+            edges = list(graph._edges.items())
+            sections['g.ea'] = array('i', (k[0] for k, _w in edges))
+            sections['g.eb'] = array('i', (k[1] for k, _w in edges))
+            sections['g.ew'] = array('d', (w for _k, w in edges))
+
+        mm = engine.mode_model
+        with mm._lock:
+            keywords = list(mm.counts)
+            sections['mm.mode'] = array('i', (s(m) for m in mm.modes))
+            sections['mm.kw'] = array('i', (s(k) for k in keywords))
+            cnt = array('I')
+            for k in keywords:
+                cnt.extend(mm.counts[k])
+            sections['mm.cnt'] = cnt
+
+        sections['pref.key'] = array('i', (s(r[0]) for r in prefs))
+        sections['pref.val'] = array('i', (s(r[1]) for r in prefs))
+        sections['pref.cf'] = array('d', (float(r[2] or 0.0) for r in prefs))
+
+        patterns = list(engine.learning_patterns.items())
+        sections['lp.key'] = array('i', (s(k) for k, _v in patterns))
+        sections['lp.n'] = array('q', (int(v[0]) for _k, v in patterns))
+        sections['lp.sum'] = array('d', (float(v[1]) for _k, v in patterns))
+        sections.update(s.sections())
+
+    tmp = f"{path}.tmp"
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(tmp, "wb") as fh:
+        fh.write(_HEADER.pack(
+            MAGIC, FORMAT_VERSION, sys.byteorder == "little", lsh.num_perm, lsh.bands,
+            owner_id, counter, time.time(), len(sections),
+        ))
+        for name, values in sections.items():
+            fh.write(_SECTION.pack(name.encode("ascii"), values.typecode.encode("ascii"), len(values)))
+            values.tofile(fh)
+    os.replace(tmp, path)
+    return {
+        'path': path,
+        'bytes': os.path.getsize(path),
+        'change_counter': counter,
+        'nodes': len(ids),
+        'edges': len(edges),
+        'duration_ms': round((time.perf_counter() - start) * 1000.0, 2),
+    }
+
+
+def read_snapshot(path: str):
+    """Parse header and sections; raises ``SnapshotError`` on any format problem."""
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read()
+    except OSError as e:
+        raise SnapshotError(f"cannot read snapshot: {e}") from e
+    if len(data) < _HEADER.size:
+        raise SnapshotError("truncated header")
+    magic, version, little, num_perm, bands, owner_id, counter, created_at, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise SnapshotError(f"unsupported snapshot format {magic!r} v{version}")
+    if bool(little) != (sys.byteorder == "little"):
+        raise SnapshotError("snapshot written with another byte order")
+    header = {
+        'num_perm': num_perm, 'bands': bands, 'db_id': owner_id,
+        'change_counter': counter, 'created_at': created_at,
+    }
+    sections: Dict[str, array] = {}
+    pos = _HEADER.size
+    for _ in range(count):
+        if pos + _SECTION.size > len(data):
+            raise SnapshotError("truncated section header")
+        name, typecode, n = _SECTION.unpack_from(data, pos)
+        pos += _SECTION.size
+        values = array(typecode.decode("ascii"))
+        end = pos + n * values.itemsize
+        if end > len(data):
+            raise SnapshotError("truncated section")
+        values.frombytes(data[pos:end])
+        sections[name.rstrip(b"\0").decode("ascii")] = values
+        pos = end
+    return header, sections
+
+
+def load_snapshot(engine, path: Optional[str] = None) -> bool:
+    """
+    Restore warm state from ``path``; False when missing, unreadable or stale
+
+    Why: Millisecond-scale warm start when nothing changed since the save
+    Where: ``AdvancedMemoryEngine.__init__`` (before the cold rebuild) and tests
+    How: Validate header, database id and change counter, rebuild each structure into fresh
+    objects from the arrays, then swap them into the engine in one step so a
+    failure part-way leaves the engine untouched
+    """
+    from memory_engine import KeywordModeModel, MemoryGraph, MemoryKeywordIndex, MinHashLSH
+
+    path = path or snapshot_path(engine.db.db_path)
+    if not os.path.exists(path):
+        engine.snapshot_status = {'loaded': False, 'reason': 'no snapshot'}
+        return False
+    try:
+        header, sec = read_snapshot(path)
+        with engine.db._lock, engine.db._connect() as con:
+            current = change_counter(con)
+            current_db = db_id(con)
+        if not current_db or header['db_id'] != current_db:
+            raise SnapshotError("snapshot belongs to another database")
+        if header['change_counter'] != current:
+            raise SnapshotError(f"stale snapshot (counter {header['change_counter']} != {current})")
+        lsh = MinHashLSH()
+        if (header['num_perm'], header['bands']) != (lsh.num_perm, lsh.bands):
+            raise SnapshotError("MinHash shape changed")
+        strings = _read_strings(sec)
+        strings.append(None)  # string index -1 encodes None
+
+        kw = MemoryKeywordIndex(engine.keyword_index.max_prefix_expansion)
+        ids = [strings[i] for i in sec['kw.id']]
+        kw.nodes = {
+            node_id: [strings[t], strings[c], imp, acc]
+            for node_id, t, c, imp, acc in zip(ids, sec['kw.text'], sec['kw.cat'], sec['kw.imp'], sec['kw.acc'])
+        }
+        ptr, post = sec['kw.ptr'], sec['kw.post']
+        kw._vocab = [strings[i] for i in sec['kw.tok']]
+        kw.postings = {
+            tok: {ids[p] for p in post[ptr[i]:ptr[i + 1]]} for i, tok in enumerate(kw._vocab)
+        }
+
+        width = lsh.num_perm * 4
+        blob = sec['lsh.sig'].tobytes()
+        lsh.load(
+            ((strings[idx], blob[i * width:(i + 1) * width]) for i, idx in enumerate(sec['lsh.id'])),
+            background=True,  # buckets fill in behind the warm start; linking waits for them
+        )
+
+        graph = MemoryGraph(compact_after=engine.graph.compact_after)
+        graph.ids = [strings[i] for i in sec['g.id']]
+        graph.index = {node_id: i for i, node_id in enumerate(graph.ids)}
+        graph._edges = dict(zip(zip(sec['g.ea'], sec['g.eb']), sec['g.ew']))
+        graph._install(sec['g.ptr'], sec['g.adj'], sec['g.w'])
+
+        mm = KeywordModeModel(engine.db, max_keywords=engine.mode_model.max_keywords, slots=engine.mode_model.slots)
+        modes = [strings[i] for i in sec['mm.mode']]
+        if len(modes) > mm.slots:
+            raise SnapshotError("mode slot count changed")
+        for m in modes:
+            mm._mode_slot(m)
+        cnt, slots = sec['mm.cnt'], mm.slots
+        if len(cnt) != len(sec['mm.kw']) * slots:
+            raise SnapshotError("mode slot count changed")
+        for i, k in enumerate(sec['mm.kw']):
+            for slot, n in enumerate(cnt[i * slots:(i + 1) * slots]):
+                if n:
+                    mm._bump(strings[k], slot, n)
+
+        prefs = {
+            strings[k]: {'value': strings[v], 'confidence': c}
+            for k, v, c in zip(sec['pref.key'], sec['pref.val'], sec['pref.cf'])
+        }
+        patterns = defaultdict(lambda: [0, 0.0])
+        for k, n, total in zip(sec['lp.key'], sec['lp.n'], sec['lp.sum']):
+            patterns[strings[k]] = [n, total]
+    except (SnapshotError, KeyError, IndexError, ValueError, UnicodeDecodeError) as e:
+        engine.snapshot_status = {'loaded': False, 'reason': str(e)}
+        return False
+
+    with engine._lock:
+        engine.keyword_index = kw
+        engine.semantic_index = lsh
+        engine.graph = graph
+        engine.mode_model = mm
+        engine.preference_model = prefs
+        engine.learning_patterns = patterns
+    engine.snapshot_status = {'loaded': True, 'change_counter': current, 'created_at': header['created_at']}
+    return True
@@ -48,17 +48,12 @@ class NotebookLMEngine:
     def analyze_document(self, source_id: int) -> Optional[Dict[str, Any]]:
         """Basic document analysis"""
         try:
-            with self.db._lock, self.db._connect() as conn:
-                cursor = conn.execute(
-                    "SELECT id, filename, content FROM sources WHERE id = ?",
-                    (source_id,)
-                )
-                row = cursor.fetchone()
-            
-            if not row:
+            source = self.db.get_source(source_id, with_content=True)
+            if not source:
                 return None
                 
-            doc_id, filename, content = row
+            # content may be stored compressed; get_source decodes it
+            doc_id, filename, content = source.id, source.filename, source.content or ""
             word_count = len(content.split())
             summary = content[:200] + "..." if len(content) > 200 else content
             
@@ -8,8 +8,8 @@ How: Detects supported files, extracts content and metadata, chunks large docume
 
 Connects to:
     - database.py:
-        - `ingest_file()` -> `db_manager.add_or_update_source()`: The core function is to process files (including PDFs) and store their content as chunks in the database.
-        - `ingest_file()` -> `db_manager.get_source_by_path()`: Checks if a file has already been ingested and is unchanged to avoid reprocessing.
+        - `ingest_file()` -> `db_manager.upsert_sources_bulk()`: The core function is to process files (including PDFs) and store their content as chunks in the database in a single transaction.
+        - `ingest_file()` -> `db_manager.get_manifest_entry()` / `record_manifest()`: Skips files whose (inode, size, mtime_ns) stat signature is unchanged without opening them.
     - nlp_processor.py: This file is imported, but `nlp_processor` is not directly used in this version of the file. The connection is implicit for future enhancement.
     - config.py:
         - `__init__()`: Uses `config.SYNC_DIR` as a default directory for ingestion.
@@ -17,11 +17,16 @@ Connects to:
         - `watch_and_ingest()` -> `EnhancedSyncHandler`: This class uses `EnhancedFileIngestor` to process files when changes are detected by the watcher.
 """
 
+import hashlib
 import logging
- 
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import config
 
 # Core dependencies
-from database import db_manager
+from database import db_manager, stat_signature
 from nlp_processor import nlp_processor
 
 # PDF processing (optional dependency)
@@ -99,7 +104,7 @@ class EnhancedFileIngestor:
                         status = self.ingest_file(file_path)
                         stats[status] += 1
                         
-                    except Exception:
+                    except Exception as e:
                         logger.error(f"Error processing {file_path}: {e}")
                         stats["failed"] += 1
         
@@ -111,14 +116,16 @@ class EnhancedFileIngestor:
         if not os.path.exists(file_path):
             return "failed"
         
+        file_path = os.path.abspath(file_path)
         filename = os.path.basename(file_path)
         file_ext = Path(file_path).suffix.lower()
-        size = os.path.getsize(file_path)
-        modified_ts = os.path.getmtime(file_path)
+        stat = os.stat(file_path)
+        size = stat.st_size
+        modified_ts = stat.st_mtime
         
-        # Quick skip for unchanged files
-        existing = db_manager.get_source_by_path(file_path)
-        if existing and existing.size == size and existing.modified_ts == modified_ts:
+        # Quick skip for unchanged files: stat signature matches the manifest
+        signature = stat_signature(stat)
+        if db_manager.manifest_matches(db_manager.get_manifest_entry(file_path), signature):
             return "unchanged"
         
         # Extract content based on file type
@@ -132,45 +139,47 @@ class EnhancedFileIngestor:
                 print(f"⚠️  Empty content: {filename}")
                 return "failed"
                 
-        except Exception:
+        except Exception as e:
             logger.error(f"Content extraction failed for {file_path}: {e}")
             return "failed"
         
-        # Chunk large documents
+        # Chunk large documents (dicts with content + byte offsets)
         chunks = self._chunk_content(content, filename, metadata)
         
-        # Process each chunk
-        results = []
-        for i, chunk in enumerate(chunks):
-            chunk_filename = f"{filename}" if len(chunks) == 1 else f"{filename}_chunk_{i+1}"
-            
-            content_hash = hashlib.sha256(chunk.encode("utf-8", errors="ignore")).hexdigest()
-            
-            try:
-                id_, status = db_manager.add_or_update_source(
-                    chunk_filename,
-                    file_path,
-                    chunk,
-                    content_hash=content_hash,
-                    size=len(chunk),
-                    modified_ts=modified_ts,
-                )
-                results.append(status)
-                
-            except Exception:
-                logger.error(f"Database insertion failed for {chunk_filename}: {e}")
-                results.append("failed")
+        # Store the document once plus its chunks (only changed chunks are rewritten)
+        try:
+            result = db_manager.upsert_source_with_chunks(
+                {
+                    "filename": filename,
+                    "path": file_path,
+                    "content": content,
+                    "size": size,
+                    "modified_ts": modified_ts,
+                },
+                chunks,
+            )
+        except Exception as e:
+            logger.error(f"Database insertion failed for {filename}: {e}")
+            return "failed"
+        
+        db_manager.record_manifest([{
+            "path": file_path,
+            "signature": signature,
+            "content_hash": hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest(),
+            "source_id": result["id"],
+        }])
         
-        # Determine overall status
-        if all(r == "unchanged" for r in results):
+        status = result["status"]
+        if status == "unchanged":
             print(f"📄 unchanged: {filename}")
-            return "unchanged"
-        elif any(r in ["inserted", "updated"] for r in results):
-            chunks_info = f" ({len(chunks)} chunks)" if len(chunks) > 1 else ""
-            print(f"📚 processed: {filename}{chunks_info}")
-            return "updated" if any(r == "updated" for r in results) else "inserted"
         else:
-            return "failed"
+            c = result["chunks"]
+            chunks_info = (
+                f" ({len(chunks)} chunks, {c['inserted'] + c['updated']} rewritten)"
+                if len(chunks) > 1 else ""
+            )
+            print(f"📚 processed: {filename}{chunks_info}")
+        return status
     
     def _extract_pdf_content(self, file_path: str) -> Tuple[str, Dict]:
         """Extract text content from PDF file."""
@@ -212,15 +221,38 @@ class EnhancedFileIngestor:
         
         return content, metadata
     
-    def _chunk_content(self, content: str, filename: str, metadata: Dict) -> List[str]:
-        """Intelligently chunk large content into manageable pieces."""
+    def _chunk_content(self, content: str, filename: str, metadata: Dict) -> List[Dict]:
+        """Intelligently chunk large content into manageable pieces.
+        
+        Returns dicts with ``content`` plus ``start_byte`` / ``end_byte`` giving the
+        chunk's span in the UTF-8 encoded document (the metadata header added to
+        the first chunk is not part of the span), ready for
+        ``db_manager.upsert_source_with_chunks``.
+        """
         # Configuration
         MAX_CHUNK_SIZE = 4000  # characters per chunk
         MIN_CHUNK_SIZE = 500   # minimum chunk size
         OVERLAP_SIZE = 200     # overlap between chunks
         
+        ascii_only = content.isascii()
+        # (char index, byte offset) of the last converted position: chunk spans move
+        # forward through the document, so each call only encodes the text since
+        # the previous one (or the short overlap it stepped back over)
+        cursor = [0, 0]
+        
+        def byte_offset(i: int) -> int:
+            if ascii_only:
+                return i
+            char_pos, byte_pos = cursor
+            if i >= char_pos:
+                byte_pos += len(content[char_pos:i].encode("utf-8", errors="ignore"))
+            else:
+                byte_pos -= len(content[i:char_pos].encode("utf-8", errors="ignore"))
+            cursor[0], cursor[1] = i, byte_pos
+            return byte_pos
+        
         if len(content) <= MAX_CHUNK_SIZE:
-            return [content]
+            return [{"content": content, "start_byte": 0, "end_byte": byte_offset(len(content))}]
         
         chunks = []
         start = 0
@@ -245,8 +277,11 @@ class EnhancedFileIngestor:
                         if line_break > start + MIN_CHUNK_SIZE:
                             end = line_break
             
-            chunk = content[start:end].strip()
+            raw = content[start:end]
+            chunk = raw.strip()
             if chunk:
+                span_start = start + len(raw) - len(raw.lstrip())
+                span_end = span_start + len(chunk)
                 # Add metadata header to first chunk
                 if start == 0 and metadata:
                     header = f"Document: {filename}\n"
@@ -259,7 +294,11 @@ class EnhancedFileIngestor:
                     header += "\n"
                     chunk = header + chunk
                 
-                chunks.append(chunk)
+                chunks.append({
+                    "content": chunk,
+                    "start_byte": byte_offset(span_start),
+                    "end_byte": byte_offset(span_end),
+                })
             
             # Move start position with overlap
             start = max(end - OVERLAP_SIZE, start + 1)
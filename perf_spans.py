@@ -0,0 +1,174 @@
+"""
+Per-stage latency spans for Clever AI
+
+Why:
+    ``PersonaEngine.generate`` only logged one ``processing_time`` covering the
+    Jay integration attempt, NLP, memory retrieval, preference prediction,
+    document query, file search, mode handler, variation regeneration,
+    suggestions and memory submission. Without a per-stage split there is no
+    way to tell which stage to attack first.
+Where:
+    ``PersonaEngine.generate`` opens one ``SpanRecorder`` per call and wraps each
+    stage in ``rec.span(name)``; the finished breakdown lands in
+    ``PersonaResponse.debug_metrics['stages']`` and in the process-wide
+    ``StageTracker`` read by ``/api/telemetry`` and ``tools/perf_benchmark.py``.
+How:
+    A span measures wall time (``time.perf_counter``) and CPU time of the calling
+    thread (``time.thread_time``). Re-entering a stage name within one call adds
+    to it, so stages split across branches still report one figure. The tracker
+    keeps call counts, totals and the last ``samples`` wall / CPU durations per
+    stage (for p50 / p95), like ``database.SqlTracer`` does per statement.
+
+Connects to:
+    - persona.py: PersonaEngine.generate stage spans
+    - app.py: /api/telemetry ``persona_stages`` and /api/telemetry/reset
+    - tools/perf_benchmark.py: per-stage p50 / p95 next to mean_latency_sec
+    - stage_planner.py: StageTracker.estimate() as the learned stage cost model
+    - config.py: PERSONA_STAGE_SAMPLES
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import config
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class StageTracker:
+    """Process-wide rolling per-stage wall / CPU histograms.
+
+    Why: A single request's breakdown is noisy; p50 / p95 across recent calls
+    shows where time is actually spent.
+    Where: Fed by ``SpanRecorder.finish``; read by ``/api/telemetry`` and the
+    persona benchmark.
+    How: One entry per stage with call count, totals and two bounded deques of
+    the last ``samples`` wall / CPU milliseconds. ``reset()`` starts a new window.
+    """
+
+    def __init__(self, samples: int = 512):
+        self._samples = int(samples)
+        self._mu = threading.Lock()
+        self._stages: Dict[str, dict] = {}
+        self._since = time.time()
+
+    def record(self, stage: str, wall_ms: float, cpu_ms: float) -> None:
+        with self._mu:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = {
+                    "calls": 0,
+                    "wall_total_ms": 0.0,
+                    "cpu_total_ms": 0.0,
+                    "wall": deque(maxlen=self._samples),
+                    "cpu": deque(maxlen=self._samples),
+                    "last_ts": 0.0,
+                }
+            entry["calls"] += 1
+            entry["last_ts"] = time.time()
+            entry["wall_total_ms"] += wall_ms
+            entry["cpu_total_ms"] += cpu_ms
+            entry["wall"].append(wall_ms)
+            entry["cpu"].append(cpu_ms)
+
+    def estimate(self, stage: str, q: float = 0.95, max_age_s: Optional[float] = None) -> Optional[float]:
+        """Wall-ms quantile of recent samples; None when unseen or not sampled within ``max_age_s``."""
+        with self._mu:
+            entry = self._stages.get(stage)
+            if entry is None or not entry["wall"]:
+                return None
+            if max_age_s is not None and time.time() - entry["last_ts"] > max_age_s:
+                return None
+            samples = sorted(entry["wall"])
+        return percentile(samples, q)
+
+    def stats(self) -> dict:
+        """Snapshot: per-stage calls, mean and p50 / p95 wall and CPU ms."""
+        with self._mu:
+            items = [(k, v["calls"], v["wall_total_ms"], v["cpu_total_ms"], sorted(v["wall"]), sorted(v["cpu"]))
+                     for k, v in self._stages.items()]
+            since = self._since
+        stages = {}
+        for name, calls, wall_total, cpu_total, wall, cpu in items:
+            stages[name] = {
+                "calls": calls,
+                "wall_mean_ms": round(wall_total / calls, 4) if calls else 0.0,
+                "wall_p50_ms": round(percentile(wall, 0.50), 4),
+                "wall_p95_ms": round(percentile(wall, 0.95), 4),
+                "cpu_mean_ms": round(cpu_total / calls, 4) if calls else 0.0,
+                "cpu_p50_ms": round(percentile(cpu, 0.50), 4),
+                "cpu_p95_ms": round(percentile(cpu, 0.95), 4),
+            }
+        return {"since": since, "samples": self._samples, "stages": stages}
+
+    def reset(self) -> None:
+        with self._mu:
+            self._stages.clear()
+            self._since = time.time()
+
+
+_STAGE_TRACKER = StageTracker(samples=getattr(config, 'PERSONA_STAGE_SAMPLES', 512))
+
+
+def get_stage_tracker() -> StageTracker:
+    """Return the process-wide ``StageTracker``."""
+    return _STAGE_TRACKER
+
+
+class SpanRecorder:
+    """Per-call stage timer.
+
+    Why: Gives ``generate`` a one-line way to time each stage without threading
+    timestamps through the method by hand.
+    Where: Created at the top of ``PersonaEngine.generate``; ``finish()`` is
+    called once the response is assembled.
+    How: ``span(name)`` adds the block's wall / thread-CPU time to ``stages[name]``
+    (also when the block raises, and from any thread: CPU time is that of the
+    thread running the block); ``finish()`` rounds the breakdown, pushes each
+    stage into the tracker and returns it for ``debug_metrics``.
+    """
+
+    def __init__(self, tracker: Optional[StageTracker] = None):
+        self.tracker = tracker if tracker is not None else _STAGE_TRACKER
+        self.stages: Dict[str, List[float]] = {}
+        self._mu = threading.Lock()  # spans may close on retrieval worker threads
+        self._start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        wall0 = time.perf_counter()
+        cpu0 = time.thread_time()
+        try:
+            yield
+        finally:
+            wall_ms = (time.perf_counter() - wall0) * 1000.0
+            cpu_ms = (time.thread_time() - cpu0) * 1000.0
+            with self._mu:
+                acc = self.stages.setdefault(name, [0.0, 0.0])
+                acc[0] += wall_ms
+                acc[1] += cpu_ms
+
+    def finish(self, total: str = "total") -> Dict[str, Dict[str, float]]:
+        """Record every stage plus the overall ``total`` span; return the breakdown."""
+        self.stages[total] = [
+            (time.perf_counter() - self._start) * 1000.0,
+            (time.thread_time() - self._cpu_start) * 1000.0,
+        ]
+        with self._mu:
+            stages = list(self.stages.items())
+        out = {}
+        for name, (wall_ms, cpu_ms) in stages:
+            self.tracker.record(name, wall_ms, cpu_ms)
+            out[name] = {'wall_ms': round(wall_ms, 3), 'cpu_ms': round(cpu_ms, 3)}
+        return out
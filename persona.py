@@ -16,12 +16,14 @@ Where:
 
 How:
     1. Acquire fresh NLP analysis (keywords, sentiment, entities, noise metrics)
-    2. Pull contextual memories + conversation history (if memory enabled)
-    3. Optionally predict preferred response mode (Auto → specialized mode)
-    4. Detect special intents (file search) and short‑circuit if needed
-    5. Generate base response via chosen stylistic handler
-    6. Ensure surface variation (anti-repetition) + subtle genius flavor injection
-    7. Persist interaction (memory + evolution engine) and return structured `PersonaResponse`
+    2. Fan out the independent retrieval stages concurrently under a latency budget:
+       contextual memories + conversation history (if memory enabled), preferred
+       mode prediction (Auto → specialized mode), document query, file search intent
+       and knowledge lookup; late stages degrade to "no context"
+    3. Short‑circuit on file search / document answers if present
+    4. Generate base response via chosen stylistic handler
+    5. Ensure surface variation (anti-repetition) + subtle genius flavor injection
+    6. Persist interaction (memory + evolution engine) and return structured `PersonaResponse`
 
 ACTIVE COGNITION:
     (Planned / partial) Idle threads can grow a computation cache; persona references
@@ -33,7 +35,7 @@ DETAILED INTEGRATION MAP (Function‑Level Arrows):
         * generate() -> get_contextual_memory(): fetch semantically related past content
         * generate() -> get_conversation_history(): recent dialog for continuity
         * generate() -> predict_preferences(): mode prediction heuristics
-        * generate() -> store_interaction(): persist new exchange
+        * generate() -> submit_interaction(): queue new exchange for background persistence
         * generate() -> MemoryContext: structured capsule of interaction metadata
     nlp_processor.py
         * generate() -> get_nlp_processor(): lazy-init NLP processor singleton/factory
@@ -48,6 +50,10 @@ DETAILED INTEGRATION MAP (Function‑Level Arrows):
         * Indirect persistence via memory_engine using single `clever.db` invariant
     user_config.py / config.py
         * Influence runtime personalization (e.g., user name, mode defaults)
+    retrieval_orchestrator.py
+        * generate() -> RetrievalOrchestrator: memory / history / prediction / document / file / knowledge fan-out
+    perf_spans.py
+        * generate() -> SpanRecorder.span(): per-stage wall / CPU time into debug_metrics['stages']
     utils/file_search.py
         * _maybe_handle_file_search() -> search_by_extension(), search_files(): local FS intent
 
@@ -65,7 +71,7 @@ Connects to (merged fine-grained + summary):
         - generate() -> get_contextual_memory(): contextual memory injection
         - generate() -> get_conversation_history(): conversational continuity
         - generate() -> predict_preferences(): mode preference inference
-        - generate() -> store_interaction(): long-term learning persistence
+        - generate() -> submit_interaction(): long-term learning persistence (off the request path)
         - generate() -> MemoryContext: structured interaction payload
     - nlp_processor.py:
         - Deep text understanding (sentiment, entities, keywords)
@@ -81,6 +87,14 @@ Connects to (merged fine-grained + summary):
         - Single-source persistence via memory_engine into clever.db
     - user_config.py / config.py:
         - Personalization (name, defaults)
+    - integrate_jays_clever.py:
+        - __init__ -> get_jays_clever_integration(): Jay's authentic Clever, built once (config.PERSONA_JAY_INTEGRATION)
+    - retrieval_orchestrator.py:
+        - generate() -> RetrievalOrchestrator.run(): concurrent retrieval stages with per-stage deadlines
+    - stage_planner.py:
+        - generate() -> plan_stages(): optional stages that fit budget_ms, from recent stage timings
+    - perf_spans.py:
+        - generate() -> SpanRecorder: per-stage latency spans + rolling stage histograms
     - utils/file_search.py:
         - _maybe_handle_file_search() -> search_by_extension(), search_files() (local FS intent)
     - background_cognition.py (planned):
@@ -93,9 +107,13 @@ from collections import deque
 from types import SimpleNamespace
 from typing import Any, Dict, Optional, List
 
+import config
 from debug_config import get_debugger
 from memory_engine import get_memory_engine, MemoryContext
 from nlp_processor import get_nlp_processor  # Enriched NLP capability factory
+from perf_spans import SpanRecorder
+from retrieval_orchestrator import RetrievalOrchestrator
+from stage_planner import plan_stages
 from utils.file_search import search_by_extension, search_files
 
 # Academic knowledge engine for educational responses
@@ -127,6 +145,45 @@ class PersonaResponse(SimpleNamespace):
         self.particle_command = particle_command
         self.context = context or {}
 
+class TurnMemo:
+    """
+    Per-turn memo of phrasing-independent sub-results
+
+    Why: ``_ensure_variation`` re-runs the mode handler when a first line repeats;
+         without a memo every attempt redid knowledge retrieval, shape detection /
+         generation and the academic lookup although only the wording changes
+    Where: Created by ``generate`` for each turn and carried in the handler
+           context as ``turn_memo``; handlers read through ``_turn_memo(context)``
+    How: ``get(key, compute)`` computes once per key and replays the value (or the
+         exception, which a retry within the turn would only raise again) on later
+         attempts; hit / miss counts land in ``debug_metrics['turn_memo']``
+    """
+    __slots__ = ('_values', 'hits', 'misses')
+
+    def __init__(self) -> None:
+        self._values: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, compute):
+        if key in self._values:
+            self.hits += 1
+            value, error = self._values[key]
+        else:
+            self.misses += 1
+            try:
+                value, error = compute(), None
+            except Exception as e:
+                value, error = None, e
+            self._values[key] = (value, error)
+        if error is not None:
+            raise error
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
 class PersonaEngine:
     """
     Main persona engine for Clever AI.
@@ -146,7 +203,7 @@ class PersonaEngine:
             - get_memory_engine() during __init__ for capability enablement
             - get_contextual_memory() / get_conversation_history() inside generate()
             - predict_preferences() to adapt Auto mode
-            - store_interaction() to persist new conversation entry
+            - submit_interaction() to queue the new conversation entry for persistence
             - MemoryContext class to structure persistence payload
         nlp_processor.py
             - get_nlp_processor() for lazy NLP acquisition
@@ -169,6 +226,41 @@ class PersonaEngine:
         - Variation shield: short-term response duplication mitigation
     """
     
+    # Legacy shape trigger words (fallback when NLP shape detection is not confident)
+    SHAPE_COMMANDS = {
+        # Basic geometric shapes
+        'triangle': ['triangle', 'triangular'],
+        'square': ['square', 'rectangle'],
+        'pentagon': ['pentagon', 'pentagonal'],
+        'hexagon': ['hexagon', 'hexagonal'],
+        'octagon': ['octagon', 'octagonal'],
+        'polygon': ['polygon', 'polygonal'],
+        
+        # Curved shapes  
+        'circle': ['circle', 'circular', 'round'],
+        'sphere': ['sphere', 'ball', 'spherical'],
+        'torus': ['torus', 'donut', 'ring'],
+        
+        # Complex mathematical shapes
+        'dna': ['dna', 'double helix', 'genetic'],
+        'spiral': ['spiral', 'helix', 'coil'],
+        'fibonacci': ['fibonacci', 'golden spiral'],
+        'fractal': ['fractal', 'koch', 'snowflake'],
+        'star': ['star', 'pentagram', 'hexagram'],
+        
+        # Special formations (existing particle system)
+        'cube': ['cube', 'box'],
+        'wave': ['wave', 'ripple', 'sine'],
+        'scatter': ['scatter', 'spread', 'random', 'chaos']
+    }
+
+    # In-memory retrieval stages that cost less than a thread-pool hand-off; they run on the
+    # calling thread while the I/O-bound stages (knowledge, documents, file search) are in
+    # flight on the pool under their deadlines
+    INLINE_RETRIEVAL_STAGES = frozenset({
+        'memory_retrieval', 'conversation_history', 'preference_prediction',
+    })
+
     def __init__(self):
         """
         Initialize PersonaEngine with response modes and advanced memory
@@ -179,6 +271,7 @@ class PersonaEngine:
         
         Connects to:
             - memory_engine.py: Advanced memory and learning capabilities
+            - integrate_jays_clever.py: get_jays_clever_integration() (config.PERSONA_JAY_INTEGRATION)
         """
         self.modes = {
             "Auto": self._auto_style,
@@ -210,6 +303,15 @@ class PersonaEngine:
             debugger.warning('persona_engine', f'Memory system unavailable: {e}')
             self.memory_available = False
         
+        # Jay's authentic Clever: built once here, never per message
+        self.jay_integration = None
+        if getattr(config, 'PERSONA_JAY_INTEGRATION', False):
+            try:
+                from integrate_jays_clever import get_jays_clever_integration
+                self.jay_integration = get_jays_clever_integration()
+            except Exception as e:
+                debugger.warning('persona_engine', f"Jay's Clever integration unavailable: {e}")
+
         debugger.info('persona_engine', f'PersonaEngine initialized with memory: {self.memory_available}')
         # Recent response cache to reduce short-term repetition
         # Why: Prevent user-facing repetition complaints by tracking recent surface forms
@@ -281,43 +383,51 @@ class PersonaEngine:
         text: str,
         mode: str = "Auto", 
         context: Optional[Dict[str, Any]] = None,
-        history: Optional[List[Dict[str, Any]]] = None
+        history: Optional[List[Dict[str, Any]]] = None,
+        budget_ms: Optional[float] = None
     ) -> PersonaResponse:
         """
         Generate response using specified mode with advanced memory integration
         
         Why: Main entry point for AI response generation with learning capabilities
         Where: Called by app.py chat endpoint for user interactions
-        How: Route to appropriate mode handler with memory context, return structured response
+        How: Route to appropriate mode handler with memory context, return structured response.
+             With ``budget_ms`` the optional stages (document query, file search, knowledge,
+             variation regeneration, suggestions) are planned against recent stage timings
+             and the plan is returned in ``context['plan']``; None runs full depth
         
         Connects to:
             - app.py: Main application chat handling
             - memory_engine.py: Advanced memory and learning system
             - nlp_processor.py: Text analysis and processing
+            - stage_planner.py: plan_stages() for budgeted turns
         """
         
+        spans = SpanRecorder()
+
         # === JAY'S AUTHENTIC CLEVER INTEGRATION ===
         # Use Jay's street-smart genius personality instead of generic AI
-        try:
-            from integrate_jays_clever import JaysCleverIntegration
-            jay_clever = JaysCleverIntegration()
-            
-            jay_context = {
-                'user': 'Jay',
-                'mode': mode,
-                'history': history or [],
-                'timestamp': time.time()
-            }
-            if context:
-                jay_context.update(context)
-                
-            jay_response = jay_clever.generate_jay_response(text, mode, jay_context)
-            return jay_clever.create_persona_response(jay_response)
-            
-        except Exception as e:
-            # Fallback to ensure Clever always responds to Jay
-            print(f"⚠️  Jay's Clever fallback: {e}")
-            pass
+        jay_clever = self.jay_integration
+        if jay_clever is not None:
+            try:
+                with spans.span('jay_integration'):
+                    jay_context = {
+                        'user': 'Jay',
+                        'mode': mode,
+                        'history': history or [],
+                        'timestamp': time.time()
+                    }
+                    if context:
+                        jay_context.update(context)
+
+                    jay_response = jay_clever.generate_jay_response(text, mode, jay_context)
+                    jay_persona = jay_clever.create_persona_response(jay_response)
+                jay_persona.debug_metrics = {'stages': spans.finish()}  # type: ignore[attr-defined]
+                return jay_persona
+
+            except Exception as e:
+                # Fallback to ensure Clever always responds to Jay
+                debugger.warning('persona_engine', f"Jay's Clever fallback: {e}")
         # === END JAY'S AUTHENTIC CLEVER INTEGRATION ===
         
         if context is None:
@@ -328,11 +438,12 @@ class PersonaEngine:
         start_time = time.time()
         
         # Unified NLP analysis (advanced if available)
-        nlp = getattr(self, '_nlp_processor', None)
-        if nlp is None:
-            # Lazy init so startup remains lightweight
-            self._nlp_processor = nlp = get_nlp_processor()
-        analysis = nlp.process_text(text)
+        with spans.span('nlp'):
+            nlp = getattr(self, '_nlp_processor', None)
+            if nlp is None:
+                # Lazy init so startup remains lightweight
+                self._nlp_processor = nlp = get_nlp_processor()
+            analysis = nlp.process_text(text)
         keywords = analysis.get('keywords', [])
         entities = analysis.get('entities', [])
         sentiment = analysis.get('sentiment', 'neutral')
@@ -340,12 +451,20 @@ class PersonaEngine:
         needs_clarification = analysis.get('needs_clarification', False)
         # Attach extended signals for downstream reasoning
         context['nlp_analysis'] = analysis
+
+        # Which optional stages fit the latency budget (all of them when there is none);
+        # an explicit file-search / document request is always honoured
+        intents = []
+        if self._is_document_query(text, keywords):
+            intents.append('document_query')
+        if self._is_file_search(text):
+            intents.append('file_search')
+        plan = plan_stages(budget_ms, intents=intents)
+        planned = set(plan['run'])
         
         # Memory-enhanced processing
         memory_context = None
         predicted_mode = mode
-        relevant_memories = []
-        conversation_history = []
         
         debug_metrics = {
             'memory_items_considered': 0,
@@ -354,24 +473,48 @@ class PersonaEngine:
             'predicted_mode_changed': False,
         }
 
-        if self.memory_available and self.memory_engine:
+        # Independent retrieval stages fan out concurrently under a latency budget;
+        # a late or failed stage degrades to "no context" instead of holding the reply
+        retrieval_budget = plan['retrieval_budget_ms']
+        if retrieval_budget is not None:
+            retrieval_budget = min(retrieval_budget, getattr(config, 'PERSONA_RETRIEVAL_BUDGET_MS', 1000.0))
+        retrieval = RetrievalOrchestrator(spans=spans, budget_ms=retrieval_budget)
+        memory_ready = self.memory_available and self.memory_engine
+        if memory_ready:
+            memory = self.memory_engine
+            retrieval.add('memory_retrieval', lambda: memory.get_contextual_memory(text, max_results=3), [])
+            retrieval.add('conversation_history', lambda: memory.get_conversation_history(session_limit=5), [])
+            if mode == "Auto":
+                retrieval.add('preference_prediction', lambda: memory.predict_preferences(text), None)
+        # NotebookLM-inspired document querying for source-grounded responses
+        if 'document_query' in planned:
+            retrieval.add('document_query', lambda: self._maybe_handle_document_query(text, keywords, context), None)
+        # Detect file search intent before mode routing
+        if 'file_search' in planned:
+            retrieval.add('file_search', lambda: self._maybe_handle_file_search(text), None)
+        if mode in ("Auto", "Deep Dive") and 'knowledge' in planned:
+            retrieval.add('knowledge', lambda: self._retrieve_relevant_knowledge(text, keywords), None)
+        with spans.span('retrieval'):
+            fetched = retrieval.run(inline=self.INLINE_RETRIEVAL_STAGES)
+        for stage, error in retrieval.report['failed'].items():
+            debugger.warning('persona_engine', f'Retrieval stage {stage} failed: {error}')
+        if retrieval.report['timed_out']:
+            debugger.warning('persona_engine', f"Retrieval stages timed out: {retrieval.report['timed_out']}")
+        debug_metrics['retrieval'] = retrieval.report
+        debug_metrics['plan'] = plan
+
+        relevant_memories = fetched.get('memory_retrieval') or []
+        conversation_history = fetched.get('conversation_history') or []
+        debug_metrics['memory_items_considered'] = len(relevant_memories)
+        debug_metrics['conversation_history_count'] = len(conversation_history)
+        predictions = fetched.get('preference_prediction')
+        if predictions and predictions['confidence'] > 0.6:
+            predicted_mode = predictions['suggested_mode']
+            debug_metrics['predicted_mode_changed'] = (predicted_mode != mode)
+            debugger.info('persona_engine', f'Memory predicted mode: {predicted_mode} (confidence: {predictions["confidence"]:.2f})')
+
+        if memory_ready:
             try:
-                # Get relevant memories for context
-                relevant_memories = self.memory_engine.get_contextual_memory(text, max_results=3)
-                debug_metrics['memory_items_considered'] = len(relevant_memories)
-                
-                # Get conversation history for context
-                conversation_history = self.memory_engine.get_conversation_history(session_limit=5)
-                debug_metrics['conversation_history_count'] = len(conversation_history)
-                
-                # Predict optimal mode if in Auto mode
-                if mode == "Auto":
-                    predictions = self.memory_engine.predict_preferences(text)
-                    if predictions['confidence'] > 0.6:
-                        predicted_mode = predictions['suggested_mode']
-                        debug_metrics['predicted_mode_changed'] = (predicted_mode != mode)
-                        debugger.info('persona_engine', f'Memory predicted mode: {predicted_mode} (confidence: {predictions["confidence"]:.2f})')
-                
                 # Create memory context for storage
                 memory_context = MemoryContext(
                     user_input=text,
@@ -393,27 +536,26 @@ class PersonaEngine:
             'relevant_memories': relevant_memories,
             'conversation_history': conversation_history,
             'predicted_mode': predicted_mode,
-            'memory_available': self.memory_available
+            'memory_available': self.memory_available,
+            'retrieval': {
+                'timed_out': retrieval.report['timed_out'],
+                'failed': sorted(retrieval.report['failed']),
+            },
+            'plan': plan,
+            # Regeneration attempts reuse knowledge / shape / academic sub-results
+            'turn_memo': TurnMemo(),
         }
+        if 'knowledge' in retrieval.report['stages'] or 'knowledge' not in planned:
+            enhanced_context['knowledge_content'] = fetched.get('knowledge')
         
-        # NotebookLM-inspired document querying for source-grounded responses
-        document_response = None
+        document_response = fetched.get('document_query')
         document_citations = []
-        try:
-            document_response = self._maybe_handle_document_query(text, keywords, enhanced_context)
-            if document_response:
-                enhanced_context['document_response'] = document_response
-                document_citations = getattr(document_response, 'citations', [])
-                enhanced_context['document_citations'] = document_citations
-        except Exception as e:
-            debugger.warning('persona_engine', f'Document query handling failed: {e}')
+        if document_response:
+            enhanced_context['document_response'] = document_response
+            document_citations = getattr(document_response, 'citations', [])
+            enhanced_context['document_citations'] = document_citations
         
-        # Detect file search intent before mode routing
-        file_search_result = None
-        try:
-            file_search_result = self._maybe_handle_file_search(text)
-        except Exception as e:
-            debugger.warning('persona_engine', f'File search intent handling failed: {e}')
+        file_search_result = fetched.get('file_search')
 
         # Route to appropriate mode handler (skip typical generation if we produced a file search answer)
         mode_handler = self.modes.get(predicted_mode, self._auto_style)
@@ -427,15 +569,19 @@ class PersonaEngine:
             response_text = file_search_result
         elif document_response is not None:
             # Use NotebookLM-style document-grounded response
-            response_text = self._format_document_response(document_response, text, enhanced_context)
+            with spans.span('mode_handler'):
+                response_text = self._format_document_response(document_response, text, enhanced_context)
         else:
             # Generate initial draft via selected mode handler
-            response_text = mode_handler(text, keywords, enhanced_context, history)
+            with spans.span('mode_handler'):
+                response_text = mode_handler(text, keywords, enhanced_context, history)
             # Provide regeneration callable for all stochastic handlers to allow variation safeguard
             def _regen():
                 return mode_handler(text, keywords, enhanced_context, history)
             # Previously only Auto mode enforced variation; now extend to all modes to reduce repetition across context shifts
-            response_text = self._ensure_variation(response_text, _regen)
+            # Over budget: keep the cheap forced-variant fallback, skip handler regeneration
+            with spans.span('variation'):
+                response_text = self._ensure_variation(response_text, _regen if 'variation' in planned else None)
         if clarification_prefix:
             response_text = clarification_prefix + response_text
         # Post-enhance with analytical depth if deep-dive or complex query
@@ -448,14 +594,20 @@ class PersonaEngine:
         #     response_text = self._augment_with_reasoning_layers(text, response_text, analysis, enhanced_context)
         
         # Generate memory-enhanced proactive suggestions
-        suggestions = self._generate_suggestions(text, keywords, enhanced_context)
+        suggestions = []
+        if 'suggestions' in planned:
+            with spans.span('suggestions'):
+                suggestions = self._generate_suggestions(text, keywords, enhanced_context)
         
-        # Store interaction in memory
+        # Queue interaction for memory persistence (background ingest worker)
         if self.memory_available and self.memory_engine and memory_context:
             try:
                 memory_context.response_text = response_text
-                self.memory_engine.store_interaction(memory_context)
-                debugger.info('persona_engine', 'Interaction stored in memory successfully')
+                with spans.span('memory_submit'):
+                    queued = self.memory_engine.submit_interaction(memory_context)
+                debug_metrics['memory_ingest_queued'] = queued
+                if not queued:
+                    debugger.warning('persona_engine', 'Memory ingest queue saturated; interaction dropped')
             except Exception as e:
                 debugger.warning('persona_engine', f'Failed to store interaction: {e}')
         
@@ -478,6 +630,7 @@ class PersonaEngine:
             lowered_text = text.lower()
             if all(tok in lowered_text for tok in ['continues','without','notable','change']):
                 sentiment = 'neutral'
+        debug_metrics['turn_memo'] = enhanced_context.pop('turn_memo').stats()
         resp = PersonaResponse(
             text=response_text,
             mode=predicted_mode,
@@ -486,6 +639,7 @@ class PersonaEngine:
             particle_command=particle_cmd,
             context=enhanced_context
         )
+        debug_metrics['stages'] = spans.finish()
         resp.debug_metrics = debug_metrics  # type: ignore[attr-defined]
         return resp
 
@@ -556,6 +710,13 @@ class PersonaEngine:
         return None
 
     # ---------------- File search intent handling -----------------
+    FILE_SEARCH_TRIGGERS = ('find', 'locate', 'list files', 'search for')
+
+    def _is_file_search(self, user_text: str) -> bool:
+        """True when the text asks for a local file search (see ``_maybe_handle_file_search``)."""
+        lowered = user_text.lower()
+        return any(t in lowered for t in self.FILE_SEARCH_TRIGGERS)
+
     def _maybe_handle_file_search(self, user_text: str) -> Optional[str]:
         """Detect and respond to file search intent.
 
@@ -569,10 +730,9 @@ class PersonaEngine:
         Connects to:
             - utils/file_search.py: Performs actual constrained filesystem search
         """
-        lowered = user_text.lower().strip()
-        triggers = ('find', 'locate', 'list files', 'search for')
-        if not any(t in lowered for t in triggers):
+        if not self._is_file_search(user_text):
             return None
+        lowered = user_text.lower().strip()
         # Basic extraction of patterns (split words ignoring stop words)
         tokens = [t for t in lowered.replace(',', ' ').split() if t]
         # Extension detection (.py, py, .md etc.)
@@ -816,20 +976,19 @@ class PersonaEngine:
         Why: Enable Clever to reference specific information from PDFs and documents 
              to provide factual, knowledge-based responses beyond just personality
         Where: Used by response generation to augment answers with real content
-        How: Search sources table for content matching keywords and user query
+        How: One bm25-ranked FTS5 query over keywords and significant words from
+             the user's text, chunk-level first then whole documents; the top
+             hit's snippet is returned with its filename
         
         Connects to:
-            - database.py: Search sources table for relevant content
+            - database.py: db_manager.search_chunks / search_sources (FTS5 indexes)
             - file_ingestor.py: Retrieves content that was previously ingested
         """
         if not keywords and len(text.split()) < 3:
             return None
             
         try:
-            from database import DatabaseManager
-            import config
-            
-            db = DatabaseManager(config.DB_PATH)
+            from database import db_manager
             
             # Build search terms from keywords and important words in text
             search_terms = []
@@ -842,43 +1001,13 @@ class PersonaEngine:
             if not search_terms:
                 return None
                 
-            relevant_content = []
-            
-            with db._connect() as con:
-                for term in search_terms[:5]:  # Limit search terms to prevent performance issues
-                    # Search for content containing the term
-                    query = """
-                        SELECT filename, content 
-                        FROM sources 
-                        WHERE LOWER(content) LIKE LOWER(?) 
-                        ORDER BY LENGTH(content) DESC 
-                        LIMIT 3
-                    """
-                    results = con.execute(query, (f'%{term}%',)).fetchall()
-                    
-                    for filename, content in results:
-                        # Extract relevant snippet (around 200 characters)
-                        content_lower = content.lower()
-                        term_lower = term.lower()
-                        
-                        if term_lower in content_lower:
-                            start_idx = content_lower.find(term_lower)
-                            # Get context around the match
-                            snippet_start = max(0, start_idx - 100)
-                            snippet_end = min(len(content), start_idx + 300)
-                            snippet = content[snippet_start:snippet_end].strip()
-                            
-                            if len(snippet) > 50:  # Only include substantial snippets
-                                relevant_content.append({
-                                    'filename': filename,
-                                    'snippet': snippet,
-                                    'term': term
-                                })
-            
-            if relevant_content:
-                # Return the most relevant snippet
-                best_match = relevant_content[0]
-                return f"From {best_match['filename']}: {best_match['snippet']}"
+            # Chunk hits (large documents) are more focused than whole-document hits
+            query = " ".join(search_terms[:5])
+            hits = db_manager.search_chunks(query, limit=3) or db_manager.search_sources(query, limit=3)
+            for hit in hits:
+                snippet = (hit.get('snippet') or '').strip()
+                if len(snippet) > 50:  # Only include substantial snippets
+                    return f"From {hit['filename']}: {snippet}"
             
             # If no keyword matches, try semantic search
             semantic_results = self._search_knowledge_semantically(text)
@@ -891,111 +1020,52 @@ class PersonaEngine:
             
         return None
 
+    def _knowledge_for(self, text: str, keywords: List[str], context: Dict[str, Any]) -> Optional[str]:
+        """Knowledge snippet for this turn: the retrieval fan-out's result when it ran, else a fresh lookup."""
+        if 'knowledge_content' in context:
+            return context['knowledge_content']
+        return self._turn_memo(context).get('knowledge', lambda: self._retrieve_relevant_knowledge(text, keywords))
+
+    @staticmethod
+    def _turn_memo(context: Dict[str, Any]) -> TurnMemo:
+        """The turn's ``TurnMemo`` (created in ``context`` when a handler is called outside ``generate``)."""
+        memo = context.get('turn_memo')
+        if memo is None:
+            memo = context['turn_memo'] = TurnMemo()
+        return memo
+
     def _search_knowledge_semantically(self, query: str, limit: int = 3) -> List[Dict[str, Any]]:
         """
         Perform semantic search across all ingested knowledge
         
         Why: Enable deeper knowledge retrieval beyond keyword matching
         Where: Used by response generation for comprehensive knowledge access
-        How: Search across multiple fields and rank by relevance
+        How: Full-text query over filename and content ranked by bm25 (filename
+             weighted higher), returning the FTS snippet as the excerpt
         
         Connects to:
-            - database.py: Search sources table comprehensively
+            - database.py: db_manager.search_sources (sources_fts index)
         """
         try:
-            from database import DatabaseManager
-            import config
-            
-            db = DatabaseManager(config.DB_PATH)
-            results = []
-            
-            with db._connect() as con:
-                # Search in content and filename
-                query_lower = query.lower()
-                search_query = """
-                    SELECT filename, content, path 
-                    FROM sources 
-                    WHERE LOWER(content) LIKE ? OR LOWER(filename) LIKE ?
-                    ORDER BY 
-                        CASE 
-                            WHEN LOWER(filename) LIKE ? THEN 1
-                            ELSE 2
-                        END,
-                        LENGTH(content) DESC
-                    LIMIT ?
-                """
-                
-                rows = con.execute(search_query, (
-                    f'%{query_lower}%', 
-                    f'%{query_lower}%', 
-                    f'%{query_lower}%',
-                    limit
-                )).fetchall()
-                
-                for filename, content, path in rows:
-                    # Find relevant excerpts
-                    query_terms = query_lower.split()
-                    
-                    best_excerpt = ""
-                    best_score = 0
-                    
-                    # Find the best excerpt containing query terms
-                    words = content.split()
-                    for i in range(len(words) - 50):  # Check chunks of ~50 words
-                        chunk = " ".join(words[i:i+50])
-                        chunk_lower = chunk.lower()
-                        
-                        # Score based on term presence
-                        score = sum(1 for term in query_terms if term in chunk_lower)
-                        if score > best_score:
-                            best_score = score
-                            best_excerpt = chunk
-                    
-                    if best_excerpt:
-                        results.append({
-                            'filename': filename,
-                            'excerpt': best_excerpt,
-                            'relevance_score': best_score
-                        })
+            from database import db_manager
             
-            # Sort by relevance
-            results.sort(key=lambda x: x['relevance_score'], reverse=True)
-            return results
+            return [
+                {
+                    'filename': hit['filename'],
+                    'excerpt': hit.get('snippet') or '',
+                    'relevance_score': hit['score'],
+                }
+                for hit in db_manager.search_sources(query, limit=limit)
+                if hit.get('snippet')
+            ]
             
         except Exception as e:
             debugger.warning('persona_engine', f'Semantic knowledge search failed: {e}')
             return []
 
-    def _auto_style(self, text: str, keywords: List[str], context: Dict[str, Any], history: List[Dict[str, Any]]) -> str:
-        """
-        Auto mode - personal, familiar responses like talking to your lifelong friend
-
-        Why: Jay wants Clever to respond like she grew up with him and knows his family.
-        This creates an intimate, personal AI companion who remembers relationships.
-        Where: Default conversation mode that feels like chatting with childhood friend.
-        How: Use casual language, family references, street-smart speech, and personal touches.
-        """
-        analysis = context.get('nlp_analysis', {})
-        sentiment = analysis.get('sentiment', 'neutral')
-        rel_mem = context.get('relevant_memories') or []
-        
-        # Get relevant knowledge from ingested files
-        knowledge_content = self._retrieve_relevant_knowledge(text, keywords)
-        
-        # Actually process the input text to understand what the user is asking
-        text_lower = text.lower().strip()
-        
-        # Check for interface control requests
-        interface_command = self._detect_interface_control(text_lower, context)
-        if interface_command:
-            return interface_command
-        
-        # Enhanced mathematical shape detection using advanced NLP analysis
-        shape_analysis = analysis.get('detected_shapes', [])
+    def _detect_shape(self, text_lower: str, analysis: Dict[str, Any]):
+        """Shape requested by the user as ``(shape, confidence)``; NLP detection first, then legacy triggers."""
         primary_shape = analysis.get('primary_shape', None)
-        mathematical_params = analysis.get('extracted_parameters', {})
-        is_mathematical = analysis.get('mathematical_intent', False)
-        complexity_score = analysis.get('complexity_score', 0.0)
         
         # Determine detected shape with confidence-based selection
         detected_shape = None
@@ -1007,32 +1077,7 @@ class PersonaEngine:
         
         # Fallback to legacy shape detection for backwards compatibility
         if not detected_shape:
-            shape_commands = {
-                # Basic geometric shapes
-                'triangle': ['triangle', 'triangular'],
-                'square': ['square', 'rectangle'],
-                'pentagon': ['pentagon', 'pentagonal'],
-                'hexagon': ['hexagon', 'hexagonal'],
-                'octagon': ['octagon', 'octagonal'],
-                'polygon': ['polygon', 'polygonal'],
-                
-                # Curved shapes  
-                'circle': ['circle', 'circular', 'round'],
-                'sphere': ['sphere', 'ball', 'spherical'],
-                'torus': ['torus', 'donut', 'ring'],
-                
-                # Complex mathematical shapes
-                'dna': ['dna', 'double helix', 'genetic'],
-                'spiral': ['spiral', 'helix', 'coil'],
-                'fibonacci': ['fibonacci', 'golden spiral'],
-                'fractal': ['fractal', 'koch', 'snowflake'],
-                'star': ['star', 'pentagram', 'hexagram'],
-                
-                # Special formations (existing particle system)
-                'cube': ['cube', 'box'],
-                'wave': ['wave', 'ripple', 'sine'],
-                'scatter': ['scatter', 'spread', 'random', 'chaos']
-            }
+            shape_commands = self.SHAPE_COMMANDS
             
             # Check for multi-word patterns first (more specific matches)
             if any(pattern in text_lower for pattern in ['double helix', 'dna structure', 'genetic structure']):
@@ -1048,6 +1093,73 @@ class PersonaEngine:
                         detected_shape = shape
                         shape_confidence = 0.7  # Default confidence for legacy detection
                         break
+        return detected_shape, shape_confidence
+
+    def _generate_cognitive_shape(self, text: str, detected_shape: str, sentiment: str, complexity_score: float,
+                                  is_mathematical: bool, mathematical_params: Dict[str, Any], context: Dict[str, Any]):
+        """Run the cognitive shape engine for ``detected_shape``; returns ``(shape_data, cognitive_metadata)``."""
+        # Import here to avoid circular imports
+        from cognitive_shape_engine import get_cognitive_shape_engine, CognitiveShapeContext
+        
+        # Create cognitive context for intelligent shape generation
+        current_mode = context.get('predicted_mode', 'Auto')
+        cognitive_context = CognitiveShapeContext(
+            user_input=text,
+            detected_shape=detected_shape,
+            emotional_state=sentiment,  # Use detected sentiment as emotional state
+            complexity_preference=complexity_score,  # Use NLP-detected complexity
+            aesthetic_preference=current_mode.lower() if current_mode != "Auto" else "balanced",
+            conversation_context=[
+                msg.get('text', str(msg)) if isinstance(msg, dict) else str(msg) 
+                for msg in context.get('conversation_history', [])[-5:]
+            ],  # Recent conversation as strings
+            mathematical_sophistication=is_mathematical * 0.8
+        )
+
+        # Apply NLP-detected mathematical parameters to cognitive context
+        if 'sides' in mathematical_params:
+            cognitive_context.complexity_preference = min(1.0, cognitive_context.complexity_preference + 0.2)
+        if 'iterations' in mathematical_params:
+            cognitive_context.complexity_preference = min(1.0, cognitive_context.complexity_preference + 0.3)
+        if 'turns' in mathematical_params:
+            cognitive_context.complexity_preference = min(1.0, cognitive_context.complexity_preference + 0.1)
+
+        # Generate intelligent shape with cognitive enhancements
+        cognitive_engine = get_cognitive_shape_engine()
+        return cognitive_engine.generate_intelligent_shape(cognitive_context)
+
+    def _auto_style(self, text: str, keywords: List[str], context: Dict[str, Any], history: List[Dict[str, Any]]) -> str:
+        """
+        Auto mode - personal, familiar responses like talking to your lifelong friend
+
+        Why: Jay wants Clever to respond like she grew up with him and knows his family.
+        This creates an intimate, personal AI companion who remembers relationships.
+        Where: Default conversation mode that feels like chatting with childhood friend.
+        How: Use casual language, family references, street-smart speech, and personal touches.
+        """
+        analysis = context.get('nlp_analysis', {})
+        sentiment = analysis.get('sentiment', 'neutral')
+        rel_mem = context.get('relevant_memories') or []
+        
+        # Get relevant knowledge from ingested files (prefetched by generate's retrieval fan-out)
+        knowledge_content = self._knowledge_for(text, keywords, context)
+        memo = self._turn_memo(context)
+        
+        # Actually process the input text to understand what the user is asking
+        text_lower = text.lower().strip()
+        
+        # Check for interface control requests
+        interface_command = self._detect_interface_control(text_lower, context)
+        if interface_command:
+            return interface_command
+        
+        # Enhanced mathematical shape detection using advanced NLP analysis
+        mathematical_params = analysis.get('extracted_parameters', {})
+        is_mathematical = analysis.get('mathematical_intent', False)
+        complexity_score = analysis.get('complexity_score', 0.0)
+        detected_shape, shape_confidence = memo.get(
+            'shape_detection', lambda: self._detect_shape(text_lower, analysis)
+        )
         
         # Check if this is a greeting (be more specific to avoid false positives)
         greetings = ['hi', 'hello', 'hey', 'sup', 'yo', 'what\'s up', 'whats up', 'good morning', 'good afternoon', 'good evening']
@@ -1103,36 +1215,11 @@ class PersonaEngine:
             
         # Handle advanced mathematical shape commands with cognitive intelligence
         elif detected_shape:
-            # Import here to avoid circular imports
-            from cognitive_shape_engine import get_cognitive_shape_engine, CognitiveShapeContext
-            
             try:
-                # Create cognitive context for intelligent shape generation
-                current_mode = context.get('predicted_mode', 'Auto')
-                cognitive_context = CognitiveShapeContext(
-                    user_input=text,
-                    detected_shape=detected_shape,
-                    emotional_state=sentiment,  # Use detected sentiment as emotional state
-                    complexity_preference=complexity_score,  # Use NLP-detected complexity
-                    aesthetic_preference=current_mode.lower() if current_mode != "Auto" else "balanced",
-                    conversation_context=[
-                        msg.get('text', str(msg)) if isinstance(msg, dict) else str(msg) 
-                        for msg in context.get('conversation_history', [])[-5:]
-                    ],  # Recent conversation as strings
-                    mathematical_sophistication=is_mathematical * 0.8 if 'is_mathematical' in locals() else 0.5
-                )
-                
-                # Apply NLP-detected mathematical parameters to cognitive context
-                if 'sides' in mathematical_params:
-                    cognitive_context.complexity_preference = min(1.0, cognitive_context.complexity_preference + 0.2)
-                if 'iterations' in mathematical_params:
-                    cognitive_context.complexity_preference = min(1.0, cognitive_context.complexity_preference + 0.3)
-                if 'turns' in mathematical_params:
-                    cognitive_context.complexity_preference = min(1.0, cognitive_context.complexity_preference + 0.1)
-                
-                # Generate intelligent shape with cognitive enhancements
-                cognitive_engine = get_cognitive_shape_engine()
-                shape_data, cognitive_metadata = cognitive_engine.generate_intelligent_shape(cognitive_context)
+                # Shape generation depends only on the turn's input; regeneration reuses it
+                shape_data, cognitive_metadata = memo.get('shape_generation', lambda: self._generate_cognitive_shape(
+                    text, detected_shape, sentiment, complexity_score, is_mathematical, mathematical_params, context
+                ))
                 
                 # Store comprehensive cognitive shape data for frontend visualization
                 context['requested_shape'] = detected_shape
@@ -1222,7 +1309,7 @@ class PersonaEngine:
                         ]
                 
                 # Add emotional resonance to response
-                emotional_state = cognitive_context.emotional_state
+                emotional_state = sentiment
                 emotional_enhancements = {
                     'excited': "This is gonna be AMAZING!",
                     'curious': "This should satisfy that curiosity!",
@@ -1335,7 +1422,7 @@ class PersonaEngine:
                 response = f"{random.choice(question_starters)}"
                 
                 # Enhanced academic knowledge responses with comprehensive domain coverage
-                academic_response = self._get_academic_response(text_lower, analysis)
+                academic_response = self._get_academic_response(text_lower, analysis, memo)
                 if academic_response:
                     response += academic_response
                 elif any(sci_word in text_lower for sci_word in ['quantum', 'physics', 'science', 'universe', 'theory', 'relativity']):
@@ -1441,7 +1528,7 @@ class PersonaEngine:
         How: Structure response with multiple perspectives and depth
         """
         # Get relevant knowledge for deep analysis
-        knowledge_content = self._retrieve_relevant_knowledge(text, keywords)
+        knowledge_content = self._knowledge_for(text, keywords, context)
         
         deep_starters = [
             "Now we're talking - I love diving deep!",
@@ -1539,7 +1626,8 @@ class PersonaEngine:
         
         return random.choice(responses)
     
-    def _get_academic_response(self, text_lower: str, analysis: Dict[str, Any]) -> Optional[str]:
+    def _get_academic_response(self, text_lower: str, analysis: Dict[str, Any],
+                               memo: Optional[TurnMemo] = None) -> Optional[str]:
         """
         Generate academic response using comprehensive knowledge engine.
         
@@ -1550,6 +1638,8 @@ class PersonaEngine:
         Args:
             text_lower: Lowercase user input text
             analysis: NLP analysis results including academic_analysis
+            memo: Turn memo; the knowledge lookup is reused across variation
+                  attempts and only the intro / related-topic phrasing is redrawn
             
         Returns:
             Academic response string or None if no concepts detected
@@ -1568,8 +1658,10 @@ class PersonaEngine:
                 return None
             
             # Get academic engine and generate educational response
-            academic_engine = get_academic_engine()
-            knowledge_response = academic_engine.get_educational_response(academic_analysis, text_lower)
+            memo = memo if memo is not None else TurnMemo()
+            knowledge_response = memo.get('academic_lookup', lambda: get_academic_engine().get_educational_response(
+                academic_analysis, text_lower
+            ))
             
             if not knowledge_response:
                 return None
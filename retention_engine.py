@@ -0,0 +1,428 @@
+"""
+Retention Engine for Clever AI
+
+Why:
+    Chat telemetry (``utterances``, ``interactions``), the memory engine's
+    ``conversation_context`` and ``memory_relationships`` all grow without bound.
+    After months of use the single SQLite file carries years of raw rows that
+    nothing reads except as aggregates, and every time-ordered query pays for it.
+Where:
+    Runs from the CLI (``python -m utils.cli retention``) and, when
+    ``config.RETENTION_IDLE_MAINTENANCE`` is enabled (off by default, since it
+    deletes raw history), from the scheduler after each sync cycle and from an
+    idle-time daemon thread started by ``app.py`` so maintenance happens when no
+    one is chatting.
+How:
+    Rows older than a configurable window are rolled up into two small tables,
+    ``daily_rollups`` (counts per day / table / mode / sentiment) and
+    ``daily_keywords`` (top keywords per day), then deleted in bounded batches
+    (one transaction per batch). Weak memory relationships past their own window
+    are pruned without rollup beyond per-type counts. Freed pages are returned
+    to the OS with ``PRAGMA incremental_vacuum(N)`` using a page budget, which
+    only has an effect when the file uses ``auto_vacuum=INCREMENTAL`` (new files
+    do by default; older files convert once via ``enable_incremental_vacuum``).
+    ``plan()`` is the dry run: it reports rows and estimated bytes that a run
+    would reclaim without touching anything.
+
+Connects to:
+    - database.py: Uses ``DatabaseManager`` (pooled connection + lock) for all SQL
+    - memory_engine.py: Owns ``conversation_context`` / ``memory_relationships``;
+      ``reload_engine_graphs`` after relationship pruning
+    - config.py: ``RETENTION_*`` windows, batch size, vacuum page budget, idle threshold
+    - utils/cli.py: ``retention`` subcommand (run / --dry-run / --vacuum)
+    - utils/scheduler.py: Calls ``idle_step()`` after each ingestion cycle
+    - app.py: Starts ``start_idle_maintenance()`` when the server boots
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import config
+from database import DatabaseManager
+from debug_config import get_debugger
+
+debugger = get_debugger()
+
+# Rough per-row overhead (record header, rowid, index entries) used by the dry run
+_ROW_OVERHEAD_BYTES = 24
+_KEYWORDS_PER_DAY = 20
+_WORD_RE = re.compile(r"[a-zA-Z]{4,}")
+_STOPWORDS = {
+    "that", "this", "with", "have", "from", "what", "your", "about", "there",
+    "would", "could", "should", "which", "their", "they", "them", "been", "were",
+    "will", "just", "like", "when", "then", "than", "into", "some", "more",
+}
+
+# table -> retention spec
+#   ts: timestamp column, mode / sentiment: SQL expressions grouped on,
+#   keywords: how to derive keywords ("json" column, "text" column or None),
+#   size: columns summed for the byte estimate, window: config attr for the cutoff,
+#   where: extra predicate restricting which old rows are prunable
+RETENTION_TABLES: Dict[str, Dict[str, Any]] = {
+    "utterances": {
+        "ts": "ts",
+        "mode": "COALESCE(mode, role, '')",
+        "sentiment": "''",
+        "keywords": ("text", "text"),
+        "size": ["role", "text", "mode"],
+        "window": "RETENTION_RAW_DAYS",
+        "where": "",
+    },
+    "interactions": {
+        "ts": "ts",
+        "mode": "COALESCE(active_mode, '')",
+        "sentiment": "COALESCE(json_extract(CASE WHEN json_valid(parsed_data) THEN parsed_data END, '$.sentiment'), '')",
+        "keywords": None,
+        "size": ["user_input", "active_mode", "action_taken", "parsed_data"],
+        "window": "RETENTION_RAW_DAYS",
+        "where": "",
+    },
+    "conversation_context": {
+        "ts": "timestamp",
+        "mode": "COALESCE(mode, '')",
+        "sentiment": "COALESCE(sentiment, '')",
+        "keywords": ("json", "keywords"),
+        "size": ["session_id", "user_input", "response_text", "mode", "sentiment",
+                 "keywords", "entities", "context_metadata"],
+        "window": "RETENTION_RAW_DAYS",
+        "where": "",
+    },
+    "memory_relationships": {
+        "ts": "created_at",
+        "mode": "COALESCE(relationship_type, '')",
+        "sentiment": "''",
+        "keywords": None,
+        "size": ["source_node", "target_node", "relationship_type"],
+        "window": "RETENTION_RELATIONSHIP_DAYS",
+        "where": "AND COALESCE(strength, 0) < :min_strength",
+    },
+}
+
+
+class RetentionEngine:
+    """
+    Roll up, prune and vacuum the unbounded telemetry / memory tables
+
+    Why: Keep ``clever.db`` small and time-ordered queries fast after months of use
+    Where: CLI, scheduler and idle daemon (see module docstring)
+    How: Batched rollup + delete per table, then a page-budgeted incremental vacuum
+    """
+
+    def __init__(
+        self,
+        db: Optional[DatabaseManager] = None,
+        raw_days: Optional[float] = None,
+        relationship_days: Optional[float] = None,
+        batch_rows: Optional[int] = None,
+        vacuum_pages: Optional[int] = None,
+    ):
+        if db is None:
+            from database import db_manager as db
+        self.db = db
+        self.windows = {
+            "RETENTION_RAW_DAYS": float(raw_days if raw_days is not None else config.RETENTION_RAW_DAYS),
+            "RETENTION_RELATIONSHIP_DAYS": float(
+                relationship_days if relationship_days is not None else config.RETENTION_RELATIONSHIP_DAYS
+            ),
+        }
+        self.batch_rows = max(1, int(batch_rows or config.RETENTION_BATCH_ROWS))
+        self.vacuum_pages = max(1, int(vacuum_pages or config.RETENTION_VACUUM_PAGES))
+        self.min_strength = float(config.RETENTION_MIN_RELATIONSHIP_STRENGTH)
+        self.ensure_schema()
+
+    # ------------------------------------------------------------------ schema
+    def ensure_schema(self) -> None:
+        """Create rollup tables and the timestamp indexes retention scans rely on."""
+        with self.db._lock, self.db._connect() as con:
+            con.execute(
+                """
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    mode TEXT NOT NULL DEFAULT '',
+    sentiment TEXT NOT NULL DEFAULT '',
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, table_name, mode, sentiment)
+) WITHOUT ROWID
+                """
+            )
+            con.execute(
+                """
+CREATE TABLE IF NOT EXISTS daily_keywords (
+    day TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, table_name, keyword)
+) WITHOUT ROWID
+                """
+            )
+            existing = self._existing_tables(con)
+            if "memory_relationships" in existing:
+                con.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_memory_relationships_created "
+                    "ON memory_relationships (created_at)"
+                )
+            con.commit()
+
+    @staticmethod
+    def _existing_tables(con) -> set:
+        return {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    def _cutoff(self, spec: Dict[str, Any], now: float) -> float:
+        return now - self.windows[spec["window"]] * 86400.0
+
+    # ----------------------------------------------------------------- dry run
+    def plan(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Dry run: rows and estimated bytes a retention run would reclaim
+
+        Why: Let the user see what will be deleted (and how much space returns)
+        before committing to it
+        Where: ``retention --dry-run`` CLI and ``run(dry_run=True)``
+        How: Per table, COUNT and SUM(length(...)) of prunable rows via the ts
+        index, plus the pages already on the freelist
+        """
+        now = time.time() if now is None else now
+        report: Dict[str, Any] = {"dry_run": True, "tables": {}, "estimated_bytes": 0}
+        with self.db._lock, self.db._connect() as con:
+            existing = self._existing_tables(con)
+            for table, spec in RETENTION_TABLES.items():
+                if table not in existing:
+                    continue
+                size_expr = " + ".join(f"COALESCE(length({c}), 0)" for c in spec["size"])
+                rows, payload = con.execute(
+                    f"SELECT COUNT(*), COALESCE(SUM({size_expr}), 0) FROM {table} "
+                    f"WHERE {spec['ts']} < :cutoff {spec['where']}",
+                    {"cutoff": self._cutoff(spec, now), "min_strength": self.min_strength},
+                ).fetchone()
+                est = int(payload) + rows * _ROW_OVERHEAD_BYTES
+                report["tables"][table] = {"rows": rows, "estimated_bytes": est}
+                report["estimated_bytes"] += est
+            report.update(self._vacuum_state(con))
+        report["estimated_bytes"] += report["freelist_bytes"]
+        return report
+
+    # --------------------------------------------------------------------- run
+    def run(self, dry_run: bool = False, now: Optional[float] = None,
+            max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Roll up and prune rows older than each table's window
+
+        Why: Bound table sizes while keeping daily mode / sentiment / keyword history
+        Where: CLI, scheduler and idle maintenance
+        How: For each table, repeatedly take the oldest ``batch_rows`` prunable
+        rows, merge their aggregates into ``daily_rollups`` / ``daily_keywords``
+        and delete them by rowid, committing once per batch so chat writes are
+        never blocked for long. ``max_batches`` caps work per call (idle steps).
+
+        Returns:
+            Dict with per-table ``rolled_up`` counts and total ``pruned`` rows
+            (or the ``plan()`` report when ``dry_run``)
+        """
+        if dry_run:
+            return self.plan(now=now)
+        now = time.time() if now is None else now
+        self.db.flush()  # deferred telemetry rows must land before we count them
+        report: Dict[str, Any] = {"dry_run": False, "tables": {}, "pruned": 0}
+        batches = 0
+        for table, spec in RETENTION_TABLES.items():
+            pruned = 0
+            while max_batches is None or batches < max_batches:
+                n = self._rollup_batch(table, spec, self._cutoff(spec, now))
+                if n == 0:
+                    break
+                batches += 1
+                pruned += n
+            if pruned:
+                report["tables"][table] = {"rolled_up": pruned}
+                report["pruned"] += pruned
+        report["batches"] = batches
+        if "memory_relationships" in report["tables"]:
+            # Live memory engines cache the relationship graph; drop the pruned edges
+            from memory_engine import reload_engine_graphs
+            report["graphs_reloaded"] = reload_engine_graphs(self.db.db_path)
+        return report
+
+    def _rollup_batch(self, table: str, spec: Dict[str, Any], cutoff: float) -> int:
+        """Aggregate + delete one batch of the oldest prunable rows (one commit)."""
+        kw = spec["keywords"]
+        kw_col = kw[1] if kw else "NULL"
+        with self.db._lock, self.db._connect() as con:
+            if table not in self._existing_tables(con):
+                return 0
+            rows = con.execute(
+                f"SELECT rowid, {spec['ts']}, {spec['mode']}, {spec['sentiment']}, {kw_col} "
+                f"FROM {table} WHERE {spec['ts']} < :cutoff {spec['where']} "
+                f"ORDER BY {spec['ts']} LIMIT :limit",
+                {"cutoff": cutoff, "min_strength": self.min_strength, "limit": self.batch_rows},
+            ).fetchall()
+            if not rows:
+                return 0
+            counts: Counter = Counter()
+            keywords: Dict[str, Counter] = {}
+            for _rowid, ts, mode, sentiment, raw_kw in rows:
+                day = datetime.fromtimestamp(float(ts or 0)).strftime("%Y-%m-%d")
+                counts[(day, mode or "", str(sentiment or ""))] += 1
+                if kw and raw_kw:
+                    keywords.setdefault(day, Counter()).update(self._keywords(kw[0], raw_kw))
+            con.executemany(
+                """
+INSERT INTO daily_rollups (day, table_name, mode, sentiment, count) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(day, table_name, mode, sentiment) DO UPDATE SET count = count + excluded.count
+                """,
+                [(day, table, mode, sentiment, n) for (day, mode, sentiment), n in counts.items()],
+            )
+            con.executemany(
+                """
+INSERT INTO daily_keywords (day, table_name, keyword, count) VALUES (?, ?, ?, ?)
+ON CONFLICT(day, table_name, keyword) DO UPDATE SET count = count + excluded.count
+                """,
+                [
+                    (day, table, word, n)
+                    for day, counter in keywords.items()
+                    for word, n in counter.most_common(_KEYWORDS_PER_DAY)
+                ],
+            )
+            con.executemany(f"DELETE FROM {table} WHERE rowid = ?", [(r[0],) for r in rows])
+            con.commit()
+            return len(rows)
+
+    @staticmethod
+    def _keywords(kind: str, raw: str) -> List[str]:
+        if kind == "json":
+            try:
+                words = json.loads(raw)
+            except (TypeError, ValueError):
+                return []
+            return [str(w).lower() for w in words if isinstance(w, str) and w.strip()]
+        return [w for w in (m.lower() for m in _WORD_RE.findall(raw)) if w not in _STOPWORDS]
+
+    # ------------------------------------------------------------------ vacuum
+    @staticmethod
+    def _vacuum_state(con) -> Dict[str, Any]:
+        page_size = con.execute("PRAGMA page_size").fetchone()[0]
+        freelist = con.execute("PRAGMA freelist_count").fetchone()[0]
+        mode = con.execute("PRAGMA auto_vacuum").fetchone()[0]
+        return {
+            "auto_vacuum": {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}.get(mode, str(mode)),
+            "page_size": page_size,
+            "freelist_pages": freelist,
+            "freelist_bytes": page_size * freelist,
+        }
+
+    def incremental_vacuum(self, pages: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return up to ``pages`` free pages to the filesystem
+
+        Why: Deleting rows only moves pages to the freelist; the file never shrinks
+        Where: After ``run()`` (CLI ``--vacuum``) and in every idle step
+        How: ``PRAGMA incremental_vacuum(N)`` (run via executescript) when the file
+        is in INCREMENTAL mode; a no-op report otherwise
+        """
+        budget = max(1, int(pages or self.vacuum_pages))
+        with self.db._lock, self.db._connect() as con:
+            before = self._vacuum_state(con)
+            if before["auto_vacuum"] == "INCREMENTAL" and before["freelist_pages"]:
+                # executescript steps the pragma to completion; execute() frees one page
+                con.executescript(f"PRAGMA incremental_vacuum({budget});")
+            after = self._vacuum_state(con)
+        return {
+            "auto_vacuum": after["auto_vacuum"],
+            "freed_pages": before["freelist_pages"] - after["freelist_pages"],
+            "freed_bytes": (before["freelist_pages"] - after["freelist_pages"]) * after["page_size"],
+            "freelist_pages": after["freelist_pages"],
+        }
+
+    def enable_incremental_vacuum(self) -> Dict[str, Any]:
+        """
+        Convert an existing file to ``auto_vacuum=INCREMENTAL`` (one full VACUUM)
+
+        Why: The mode can only change on an empty file or through VACUUM; files
+        created before the pool set it stay in NONE mode
+        How: Set the pragma, then VACUUM once (rewrites the file; run when idle)
+        """
+        self.db.flush()
+        with self.db._lock, self.db._connect() as con:
+            state = self._vacuum_state(con)
+            if state["auto_vacuum"] != "INCREMENTAL":
+                con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                con.execute("VACUUM")
+            return self._vacuum_state(con)
+
+    # -------------------------------------------------------------------- idle
+    def seconds_since_activity(self) -> float:
+        """Seconds since the newest chat utterance / interaction row (inf if none)."""
+        with self.db._lock, self.db._connect() as con:
+            latest = con.execute(
+                "SELECT MAX(t) FROM (SELECT MAX(ts) AS t FROM utterances "
+                "UNION ALL SELECT MAX(ts) FROM interactions)"
+            ).fetchone()[0]
+        return float("inf") if latest is None else max(0.0, time.time() - float(latest))
+
+    def idle_step(self, idle_seconds: Optional[float] = None, max_batches: int = 5) -> Dict[str, Any]:
+        """
+        One bounded maintenance slice, only when the user has been idle
+
+        Why: Retention and vacuum must never compete with a live conversation
+        Where: Scheduler after each cycle and the idle daemon thread
+        How: Skips unless the last chat write is older than ``idle_seconds``;
+        otherwise prunes at most ``max_batches`` batches and vacuums one page budget
+        """
+        threshold = config.RETENTION_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        if self.seconds_since_activity() < threshold:
+            return {"skipped": "active"}
+        report = self.run(max_batches=max_batches)
+        report["vacuum"] = self.incremental_vacuum()
+        return report
+
+    # ------------------------------------------------------------------- reads
+    def daily_rollups(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Recent daily aggregates (newest first) for dashboards / introspection."""
+        with self.db._lock, self.db._connect() as con:
+            rows = con.execute(
+                "SELECT day, table_name, mode, sentiment, count FROM daily_rollups "
+                "WHERE day >= date('now', ?) ORDER BY day DESC, table_name, count DESC",
+                (f"-{int(days)} days",),
+            ).fetchall()
+        return [
+            {"day": r[0], "table": r[1], "mode": r[2], "sentiment": r[3], "count": r[4]}
+            for r in rows
+        ]
+
+
+def start_idle_maintenance(
+    engine: Optional[RetentionEngine] = None,
+    interval_s: Optional[float] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> threading.Thread:
+    """
+    Start a daemon thread that runs ``idle_step()`` periodically
+
+    Why: The Flask app has no other background scheduler; this keeps the DB
+    trimmed on machines that never run the sync scheduler
+    Where: ``app.py`` startup when ``config.RETENTION_IDLE_MAINTENANCE`` is on
+    How: Sleeps ``interval_s`` (default: the idle threshold) between steps;
+    errors are logged and the loop continues
+    """
+    stop = stop_event or threading.Event()
+    interval = float(interval_s or max(60, config.RETENTION_IDLE_SECONDS))
+
+    def _loop():
+        eng = engine or RetentionEngine()
+        while not stop.wait(interval):
+            try:
+                eng.idle_step()
+            except Exception as e:
+                debugger.error("retention_engine", f"Idle retention step failed: {e}")
+
+    thread = threading.Thread(target=_loop, name="clever-retention", daemon=True)
+    thread.stop_event = stop  # type: ignore[attr-defined]
+    thread.start()
+    return thread
@@ -0,0 +1,157 @@
+"""
+Retrieval Orchestrator for Clever AI
+
+Why:
+    ``PersonaEngine.generate`` ran contextual memory, conversation history,
+    preference prediction, document query, file search and knowledge lookup
+    one after another although none depends on another, so their latencies
+    added up and one slow stage (a cold document index, a filesystem walk)
+    held the whole reply.
+Where:
+    ``PersonaEngine.generate`` builds one ``RetrievalOrchestrator`` per turn
+    after NLP analysis and hands it the independent stages; results feed the
+    enhanced context, and the outcome (timed out / failed stages) is recorded
+    in ``PersonaResponse.context['retrieval']`` and ``debug_metrics``.
+How:
+    Stages are submitted to one process-wide thread pool (SQLite and file I/O
+    release the GIL). Each stage has its own deadline, capped by the overall
+    budget measured from the start of the fan-out; the caller waits on the
+    earliest outstanding deadline. A stage that is late or raises yields its
+    declared fallback ("no context") and is listed as ``timed_out`` / ``failed``.
+    Late workers are left to finish in the background, never cancelled
+    mid-write. Stages known to be cheap in-memory reads (hot history window,
+    keyword index, mode model) can run ``inline`` on the calling thread while the
+    pooled I/O stages are in flight: a pool hand-off costs more than they do.
+
+Connects to:
+    - persona.py: PersonaEngine.generate fan-out
+    - perf_spans.py: per-stage spans recorded from worker threads
+    - config.py: PERSONA_RETRIEVAL_WORKERS / _BUDGET_MS / _STAGE_TIMEOUT_MS / _TIMEOUTS_MS
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+import config
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_retrieval_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for retrieval stages (sized by PERSONA_RETRIEVAL_WORKERS)."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(
+                    max_workers=max(1, int(getattr(config, 'PERSONA_RETRIEVAL_WORKERS', 8))),
+                    thread_name_prefix="clever-retrieval",
+                )
+    return _POOL
+
+
+def parse_stage_timeouts(spec: str) -> Dict[str, float]:
+    """Parse ``"stage=ms,stage=ms"`` into a per-stage timeout map (bad entries ignored)."""
+    out: Dict[str, float] = {}
+    for part in (spec or "").split(","):
+        name, _, value = part.partition("=")
+        try:
+            out[name.strip()] = float(value)
+        except ValueError:
+            continue
+    return out
+
+
+class RetrievalOrchestrator:
+    """Run independent retrieval stages concurrently under deadlines.
+
+    Why: The reply should cost roughly the slowest useful stage, not the sum,
+    and never more than the latency budget.
+    Where: One instance per ``PersonaEngine.generate`` call.
+    How: ``add(name, fn, fallback)`` registers a stage; ``run()`` fans them out
+    and returns ``{name: value}`` with fallbacks for late / failed stages, plus
+    an outcome dict in ``self.report``.
+    """
+
+    def __init__(
+        self,
+        budget_ms: Optional[float] = None,
+        stage_timeout_ms: Optional[float] = None,
+        timeouts_ms: Optional[Dict[str, float]] = None,
+        pool: Optional[ThreadPoolExecutor] = None,
+        spans=None,
+    ):
+        self.budget_ms = float(budget_ms if budget_ms is not None
+                               else getattr(config, 'PERSONA_RETRIEVAL_BUDGET_MS', 1000.0))
+        self.stage_timeout_ms = float(stage_timeout_ms if stage_timeout_ms is not None
+                                      else getattr(config, 'PERSONA_RETRIEVAL_STAGE_TIMEOUT_MS', 500.0))
+        self.timeouts_ms = dict(timeouts_ms if timeouts_ms is not None
+                                else parse_stage_timeouts(getattr(config, 'PERSONA_RETRIEVAL_TIMEOUTS_MS', '')))
+        self.pool = pool
+        self.spans = spans
+        self._stages: List[Tuple[str, Callable[[], Any], Any]] = []
+        self.report: Dict[str, Any] = {}
+
+    def add(self, name: str, fn: Callable[[], Any], fallback: Any = None) -> None:
+        self._stages.append((name, fn, fallback))
+
+    def _call(self, name: str, fn: Callable[[], Any]) -> Any:
+        with (self.spans.span(name) if self.spans is not None else nullcontext()):
+            return fn()
+
+    def run(self, inline: Collection[str] = ()) -> Dict[str, Any]:
+        start = time.perf_counter()
+        budget_end = start + self.budget_ms / 1000.0
+        results: Dict[str, Any] = {}
+        timed_out: List[str] = []
+        failed: Dict[str, str] = {}
+        pending: Dict[Future, Tuple[str, Any, float]] = {}
+        pool = self.pool or get_retrieval_pool()
+
+        inline_stages = []
+        for name, fn, fallback in self._stages:
+            if name in inline:
+                inline_stages.append((name, fn, fallback))
+                continue
+            deadline = min(budget_end, start + self.timeouts_ms.get(name, self.stage_timeout_ms) / 1000.0)
+            pending[pool.submit(self._call, name, fn)] = (name, fallback, deadline)
+
+        for name, fn, fallback in inline_stages:
+            try:
+                results[name] = self._call(name, fn)
+            except Exception as e:
+                results[name] = fallback
+                failed[name] = f"{type(e).__name__}: {e}"
+
+        while pending:
+            now = time.perf_counter()
+            for fut, (name, fallback, deadline) in list(pending.items()):
+                if not fut.done() and deadline <= now:
+                    del pending[fut]
+                    results[name] = fallback
+                    timed_out.append(name)
+            if not pending:
+                break
+            next_deadline = min(deadline for _n, _f, deadline in pending.values())
+            done, _ = wait(list(pending), timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+            for fut in done:
+                name, fallback, _deadline = pending.pop(fut)
+                try:
+                    results[name] = fut.result()
+                except Exception as e:
+                    results[name] = fallback
+                    failed[name] = f"{type(e).__name__}: {e}"
+
+        self.report = {
+            'stages': [name for name, _fn, _fb in self._stages],
+            'timed_out': timed_out,
+            'failed': failed,
+            'budget_ms': self.budget_ms,
+            'wall_ms': round((time.perf_counter() - start) * 1000.0, 3),
+        }
+        return results
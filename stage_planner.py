@@ -0,0 +1,122 @@
+"""
+Stage Planner for Clever AI
+
+Why:
+    Under load every chat turn still ran every optional stage (document query,
+    file-system search, knowledge retrieval, variation regeneration, suggestion
+    generation), so interactive latency grew with contention and a caller had no
+    way to ask for a fast answer.
+Where:
+    ``PersonaEngine.generate(budget_ms=...)`` asks ``plan_stages`` which optional
+    stages fit the budget before retrieval starts; ``/api/chat`` passes the
+    caller's ``budget_ms`` (or ``CHAT_DEFAULT_BUDGET_MS`` for interactive turns)
+    and returns the chosen plan. Background callers send no budget and get the
+    full-depth pipeline.
+How:
+    The cost model is the recent per-stage wall-time quantile from
+    ``perf_spans.StageTracker`` (``PERSONA_PLANNER_QUANTILE``, default p95), so
+    estimates follow current contention. Stages not sampled within
+    ``PERSONA_PLANNER_STALE_SECONDS`` (e.g. skipped for a while) fall back to a
+    small prior so they get re-measured instead of starving. Required stages
+    (NLP, memory, mode handler, ...) form the base cost; optional stages are
+    added greedily in value order while the estimate fits. Optional stages whose
+    explicit intent matched the turn (a file search or document question) are
+    always admitted: skipping them would silently drop what the user asked for.
+    Stages fanned out on the retrieval pool overlap, so they cost their
+    maximum, not their sum. Interactive turns carry no budget unless
+    ``CHAT_DEFAULT_BUDGET_MS`` is set.
+
+Connects to:
+    - perf_spans.py: StageTracker.estimate (learned stage costs)
+    - persona.py: PersonaEngine.generate budget_ms / plan
+    - app.py: /api/chat budget_ms, priority and the returned plan
+    - config.py: PERSONA_PLANNER_QUANTILE / PERSONA_PLANNER_STALE_SECONDS / CHAT_DEFAULT_BUDGET_MS
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+import config
+from perf_spans import StageTracker, get_stage_tracker
+
+# Optional stages in value order: grounded answers and explicit intents before polish
+OPTIONAL_STAGES = ('document_query', 'file_search', 'knowledge', 'variation', 'suggestions')
+# Optional stages that run on the retrieval pool and overlap with each other
+POOLED_STAGES = frozenset({'document_query', 'file_search', 'knowledge'})
+# Stages every turn pays for
+REQUIRED_STAGES = (
+    'nlp', 'memory_retrieval', 'conversation_history', 'preference_prediction',
+    'mode_handler', 'memory_submit',
+)
+# Wall-ms priors for stages without recent samples
+PRIOR_COST_MS = {
+    'document_query': 5.0,
+    'file_search': 20.0,
+    'knowledge': 5.0,
+    'variation': 1.0,
+    'suggestions': 0.1,
+}
+
+
+def plan_stages(
+    budget_ms: Optional[float],
+    tracker: Optional[StageTracker] = None,
+    intents: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """
+    Choose the optional stages that fit ``budget_ms``
+
+    Why: Keep a turn inside its latency budget by dropping the least valuable
+         optional work first
+    Where: PersonaEngine.generate before the retrieval fan-out
+    How: Base cost from required stages, then greedy admission of optional
+         stages by value; stages named in ``intents`` are admitted whatever
+         their cost (their estimate still counts); ``budget_ms=None`` plans
+         full depth
+    """
+    intents = frozenset(intents) & frozenset(OPTIONAL_STAGES)
+    tracker = tracker or get_stage_tracker()
+    q = float(getattr(config, 'PERSONA_PLANNER_QUANTILE', 0.95))
+    max_age = float(getattr(config, 'PERSONA_PLANNER_STALE_SECONDS', 30.0))
+
+    def cost(stage: str) -> float:
+        est = tracker.estimate(stage, q=q, max_age_s=max_age)
+        return est if est is not None else PRIOR_COST_MS.get(stage, 0.0)
+
+    costs = {stage: round(cost(stage), 3) for stage in OPTIONAL_STAGES}
+    base = sum(cost(stage) for stage in REQUIRED_STAGES)
+    if budget_ms is None:
+        run = list(OPTIONAL_STAGES)
+        skipped = []
+    else:
+        run, skipped = [], []
+        serial, pooled = base, 0.0
+        for stage in OPTIONAL_STAGES:
+            forced = stage in intents
+            if stage in POOLED_STAGES:
+                fits = forced or serial + max(pooled, costs[stage]) <= budget_ms
+                if fits:
+                    pooled = max(pooled, costs[stage])
+            else:
+                fits = forced or serial + costs[stage] + pooled <= budget_ms
+                if fits:
+                    serial += costs[stage]
+            (run if fits else skipped).append(stage)
+
+    pooled_est = max((costs[s] for s in run if s in POOLED_STAGES), default=0.0)
+    serial_est = base + sum(costs[s] for s in run if s not in POOLED_STAGES)
+    return {
+        'budget_ms': budget_ms,
+        'depth': 'full' if not skipped else 'reduced',
+        'run': run,
+        'skipped': skipped,
+        'intents': [s for s in OPTIONAL_STAGES if s in intents],
+        'estimated_ms': round(serial_est + pooled_est, 3),
+        'base_ms': round(base, 3),
+        'stage_cost_ms': costs,
+        # what the retrieval fan-out may spend once the serial work is accounted for
+        # (never less than an intent-forced pooled stage is expected to need)
+        'retrieval_budget_ms': None if budget_ms is None else round(max(
+            1.0, budget_ms - serial_est, *(costs[s] for s in intents if s in POOLED_STAGES)
+        ), 3),
+    }
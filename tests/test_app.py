@@ -134,6 +134,25 @@ def test_chat_bad_request(app_client):
     assert 'error' in data
 
 
+def test_chat_budget_returns_plan(app_client):
+    """Budgeted chat turns report their stage plan; background turns run full depth.
+
+    Why: Callers under load need a fast answer and must see what was skipped
+    Where: /api/chat budget_ms / priority handling
+    How: Posts a tiny budget, a background request and an invalid budget
+    """
+    tight = app_client.post('/api/chat', json={'message': 'Explain quantum tunneling simply', 'budget_ms': 0.01})
+    assert tight.status_code == 200
+    plan = tight.get_json()['plan']
+    assert plan['depth'] == 'reduced' and 'suggestions' in plan['skipped']
+
+    full = app_client.post('/api/chat', json={'message': 'Explain quantum tunneling simply', 'priority': 'background'})
+    plan = full.get_json()['plan']
+    assert plan['depth'] == 'full' and plan['budget_ms'] is None and not plan['skipped']
+
+    assert app_client.post('/api/chat', json={'message': 'hi', 'budget_ms': 'soon'}).status_code == 400
+
+
 def test_ingest_form(app_client):
     """
     Test form submission functionality for ingestion endpoint.
@@ -0,0 +1,54 @@
+"""Bulk source upsert tests for DatabaseManager.
+
+Why: Directory ingestion relies on upsert_sources_bulk to report accurate
+per-row statuses while writing everything in a few transactions.
+Where: Unit tests for database.DatabaseManager.upsert_sources_bulk.
+How: Upsert generated rows into a temporary database, re-run with partial
+changes and assert on statuses, ids and the FTS index.
+
+Connects to:
+    - database.py: DatabaseManager.upsert_sources_bulk, add_or_update_source
+"""
+from pathlib import Path
+
+from database import DatabaseManager
+
+
+def _rows(n: int, changed: set[int] = frozenset()):
+    for i in range(n):
+        body = f"document {i} body" + (" revised" if i in changed else "")
+        yield {"filename": f"f{i}.txt", "path": f"/sync/f{i}.txt", "content": body, "size": len(body)}
+
+
+def test_bulk_statuses_and_ids(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "bulk.db")
+    first = db.upsert_sources_bulk(_rows(1200), batch_size=500)
+    assert [s for _, s in first] == ["inserted"] * 1200
+    assert len({i for i, _ in first}) == 1200
+
+    second = db.upsert_sources_bulk(_rows(1201, changed={3, 700}), batch_size=500)
+    statuses = [s for _, s in second]
+    assert statuses[3] == statuses[700] == "updated"
+    assert statuses[1200] == "inserted"
+    assert statuses.count("unchanged") == 1198
+    assert [i for i, _ in second[:1200]] == [i for i, _ in first]
+    assert db.search_sources("revised")[0]["filename"] in {"f3.txt", "f700.txt"}
+
+
+def test_single_row_wrapper_uses_hash(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "single.db")
+    db.upsert_sources_bulk(_rows(5))
+    assert db.add_or_update_source("f1.txt", "/sync/f1.txt", "document 1 body")[1] == "unchanged"
+    assert db.add_or_update_source("f1.txt", "/sync/f1.txt", "new text")[1] == "updated"
+
+
+def test_duplicate_paths_in_one_batch(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "dupes.db")
+    out = db.upsert_sources_bulk([
+        ("a", "/p", "one", None, 3, None),
+        ("a", "/p", "one", None, 3, None),
+        ("a", "/p", "two", None, 3, None),
+    ])
+    assert [s for _, s in out] == ["inserted", "unchanged", "updated"]
+    assert len({i for i, _ in out}) == 1
+    assert db.search_sources("two")[0]["id"] == out[0][0]
@@ -0,0 +1,109 @@
+"""Chunk store tests for DatabaseManager.
+
+Why: Large documents must keep every chunk (not just the last one) and
+re-ingestion should only rewrite chunks whose content changed.
+Where: Unit tests for database.DatabaseManager.upsert_source_with_chunks,
+list_source_chunks and search_chunks, plus EnhancedFileIngestor chunk spans.
+How: Store chunked documents in a temporary database, re-store edited
+versions and assert on per-chunk counts, offsets and search hits.
+
+Connects to:
+    - database.py: upsert_source_with_chunks, list_source_chunks, search_chunks
+    - pdf_ingestor.py: EnhancedFileIngestor._chunk_content
+"""
+from pathlib import Path
+
+from database import DatabaseManager
+from pdf_ingestor import EnhancedFileIngestor
+
+
+def _doc(parts):
+    return {"filename": "big.pdf", "path": "/k/big.pdf", "content": " ".join(parts)}
+
+
+def test_all_chunks_kept_and_only_changed_rewritten(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "chunks.db")
+    parts = ["alpha chapter text", "beta chapter text", "gamma chapter text"]
+    first = db.upsert_source_with_chunks(_doc(parts), parts)
+    assert first["status"] == "inserted"
+    assert first["chunks"]["inserted"] == 3
+    stored = db.list_source_chunks(first["id"])
+    assert [c["chunk_index"] for c in stored] == [0, 1, 2]
+    assert all(c["token_count"] == 3 for c in stored)
+
+    again = db.upsert_source_with_chunks(_doc(parts), parts)
+    assert again["status"] == "unchanged"
+    assert again["chunks"]["unchanged"] == 3
+
+    edited = ["alpha chapter text", "beta revised text"]
+    second = db.upsert_source_with_chunks(_doc(edited), edited)
+    assert second["id"] == first["id"]
+    assert second["status"] == "updated"
+    assert second["chunks"] == {"inserted": 0, "updated": 1, "unchanged": 1, "deleted": 1}
+    assert db.search_chunks("gamma") == []
+
+
+def test_search_chunks_returns_offsets(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "offsets.db")
+    text = ("Intro paragraph about gardens. " * 200) + "\n\n" + ("Quantum résumé section. " * 200)
+    chunks = EnhancedFileIngestor.__new__(EnhancedFileIngestor)._chunk_content(text, "q.txt", {})
+    assert len(chunks) > 1
+    result = db.upsert_source_with_chunks(
+        {"filename": "q.txt", "path": "/k/q.txt", "content": text}, chunks
+    )
+    hit = db.search_chunks("quantum")[0]
+    assert hit["source_id"] == result["id"]
+    encoded = text.encode("utf-8")
+    span = encoded[hit["start_byte"]:hit["end_byte"]].decode("utf-8")
+    assert "Quantum" in span
+    assert span == chunks[hit["chunk_index"]]["content"]
+
+
+def test_non_ascii_offsets_match_full_prefix_encoding():
+    text = "\n\n".join(f"Section {i}: café naïve résumé — {'données ' * 120}" for i in range(12))
+    chunks = EnhancedFileIngestor.__new__(EnhancedFileIngestor)._chunk_content(text, "fr.txt", {})
+    assert len(chunks) > 3
+    encoded = text.encode("utf-8")
+    for chunk in chunks:
+        assert encoded[chunk["start_byte"]:chunk["end_byte"]].decode("utf-8") == chunk["content"]
+
+
+def test_chunked_document_is_indexed_once_and_found_by_search_sources(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "once.db")
+    parts = ["alpha chapter text", "beta chapter about nebulae", "gamma chapter text"]
+    doc = db.upsert_source_with_chunks(_doc(parts), parts)
+    with db._lock, db._connect() as con:
+        fts_hash = con.execute("SELECT fts_hash FROM sources WHERE id = ?", (doc["id"],)).fetchone()[0]
+        body_hits = con.execute("SELECT rowid FROM sources_fts WHERE sources_fts MATCH 'content:nebulae'").fetchall()
+    assert fts_hash.startswith(DatabaseManager._FTS_CHUNKED)
+    assert body_hits == []  # the body lives in source_chunks_fts only
+    (hit,) = db.search_sources("nebulae")
+    assert hit["id"] == doc["id"] and "nebulae" in hit["snippet"]
+    assert db.search_sources("big")[0]["id"] == doc["id"]  # filename still searchable
+
+
+def test_previously_unchunked_text_drops_its_body_index_when_chunked(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "shrink.db")
+    parts = ["alpha chapter text", "beta chapter about nebulae"]
+    source_id, _ = db.add_or_update_source("big.pdf", "/k/big.pdf", " ".join(parts))
+    result = db.upsert_source_with_chunks(_doc(parts), parts)
+    assert result["id"] == source_id
+    assert len(db.search_sources("nebulae")) == 1
+
+
+def test_replacing_or_deleting_a_source_removes_its_chunks(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "cascade.db")
+    parts = ["alpha chapter text", "beta chapter about nebulae"]
+    doc = db.upsert_source_with_chunks(_doc(parts), parts)
+    db.add_or_update_source("big.pdf", "/k/big.pdf", "now a short note on comets")
+    assert db.list_source_chunks(doc["id"]) == []
+    assert db.search_chunks("nebulae") == [] and db.search_sources("nebulae") == []
+
+    doc = db.upsert_source_with_chunks(_doc(parts), parts)
+    assert db.delete_source(doc["id"])
+    assert not db.delete_source(doc["id"])
+    assert db.get_source(doc["id"]) is None
+    assert db.list_source_chunks(doc["id"]) == []
+    assert db.search_sources("nebulae") == [] and db.search_sources("big") == []
+    with db._lock, db._connect() as con:
+        assert con.execute("SELECT COUNT(*) FROM source_chunks_fts").fetchone()[0] == 0
@@ -0,0 +1,100 @@
+"""Compressed source storage tests for DatabaseManager.
+
+Why: Document bodies and chunks may be stored compressed; every read path (lazy Source,
+bounded excerpts, full-text search) must still see the original text.
+Where: Unit tests for database.encode_content / decode_content, Source,
+get_source, get_source_excerpt and compress_existing_sources.
+How: Store large documents in a temporary database with compression on/off
+via monkeypatched config values and compare what comes back.
+
+Connects to:
+    - database.py: DatabaseManager source read APIs and codec helpers
+    - config.py: DB_CONTENT_CODEC, DB_CONTENT_COMPRESS_MIN_BYTES
+"""
+from pathlib import Path
+
+import config
+from database import DatabaseManager
+from pdf_ingestor import EnhancedFileIngestor
+
+DOC = "".join(f"Paragraph {i}: naïve café notes about topic {i % 7}.\n" for i in range(2000))
+
+
+def test_large_documents_are_compressed_and_lazy(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(config, "DB_CONTENT_CODEC", "zlib")
+    db = DatabaseManager(tmp_path / "z.db")
+    source_id, _ = db.add_or_update_source("doc.txt", "/k/doc.txt", DOC)
+    raw = db._connect().execute(
+        "SELECT content, length(content_z), content_codec FROM sources WHERE id = ?", (source_id,)
+    ).fetchone()
+    assert raw[0] == "" and raw[2] == "zlib" and raw[1] < len(DOC) // 3
+
+    source = db.get_source(source_id)
+    assert not source.content_loaded
+    assert source.content == DOC
+    assert db.get_source_by_path("/k/doc.txt", with_content=True).content == DOC
+    assert db.search_sources("café topic")[0]["id"] == source_id
+
+
+def test_excerpts_match_byte_offsets(tmp_path: Path, monkeypatch):
+    encoded = DOC.encode("utf-8")
+    for codec in ("zlib", "none"):
+        monkeypatch.setattr(config, "DB_CONTENT_CODEC", codec)
+        db = DatabaseManager(tmp_path / f"{codec}.db")
+        source_id, _ = db.add_or_update_source("doc.txt", "/k/doc.txt", DOC)
+        assert db.get_source_excerpt(source_id, 0, 50) == encoded[:50].decode("utf-8", "ignore")
+        start = len(encoded) // 2
+        expected = encoded[start:start + 300].decode("utf-8", "ignore")
+        assert db.get_source_excerpt(source_id, start, 300) == expected
+        assert db.get_source_excerpt(source_id, len(encoded) + 10, 100) == ""
+
+
+def test_compress_existing_rows(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(config, "DB_CONTENT_CODEC", "none")
+    db = DatabaseManager(tmp_path / "migrate.db")
+    db.add_or_update_source("big.txt", "/k/big.txt", DOC)
+    db.add_or_update_source("small.txt", "/k/small.txt", "tiny")
+    monkeypatch.setattr(config, "DB_CONTENT_CODEC", "zlib")
+    stats = db.compress_existing_sources(batch_size=1)
+    assert stats["examined"] == 2 and stats["compressed"] == 1
+    assert stats["bytes_after"] < stats["bytes_before"]
+    assert db.get_source_by_path("/k/big.txt").content == DOC
+    assert db.get_source_by_path("/k/small.txt").content == "tiny"
+    assert db.compress_existing_sources()["compressed"] == 0
+
+
+def _used_bytes(db: DatabaseManager) -> int:
+    with db._lock, db._connect() as con:
+        pages, free, size = (
+            con.execute(f"PRAGMA {name}").fetchone()[0] for name in ("page_count", "freelist_count", "page_size")
+        )
+    return (pages - free) * size
+
+
+def test_compression_shrinks_the_whole_database(tmp_path: Path, monkeypatch):
+    chunker = EnhancedFileIngestor.__new__(EnhancedFileIngestor)
+    docs = [
+        "\n\n".join(f"Doc {d} paragraph {i}: naïve café notes about topic {(d * i) % 13}." * 8 for i in range(60))
+        for d in range(20)
+    ]
+    used = {}
+    for codec in ("none", "zlib"):
+        monkeypatch.setattr(config, "DB_CONTENT_CODEC", codec)
+        db = DatabaseManager(tmp_path / f"size_{codec}.db")
+        for d, text in enumerate(docs):
+            db.upsert_source_with_chunks(
+                {"filename": f"d{d}.txt", "path": f"/k/d{d}.txt", "content": text},
+                chunker._chunk_content(text, f"d{d}.txt", {}),
+            )
+        with db._lock, db._connect() as con:
+            tables = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            assert con.execute("SELECT COUNT(*) FROM source_chunks WHERE content_codec IS NOT NULL").fetchone()[0] == (
+                0 if codec == "none" else con.execute("SELECT COUNT(*) FROM source_chunks").fetchone()[0]
+            )
+        # No FTS table keeps its own copy of the text
+        assert not {"sources_fts_content", "source_chunks_fts_content"} & tables
+        used[codec] = _used_bytes(db)
+        assert db.search_chunks("café topic")
+        assert "café" in db.list_source_chunks(1, with_content=True)[1]["content"]
+    raw = sum(len(t.encode("utf-8")) for t in docs)
+    assert used["none"] - used["zlib"] > raw  # both stored copies (document + chunks) shrank
@@ -0,0 +1,89 @@
+"""Keyset pagination and streaming export tests for chat history.
+
+Why: History readers must walk the full tables in constant memory, resume
+from a cursor, and never decode ``parsed_data`` they do not read.
+Where: Unit tests for DatabaseManager.iter_* / list_* and /api/history/export.
+How: Seed a temporary database, page through it with ``after_id`` /
+``before_ts`` and stream the export endpoint (plain and gzip).
+
+Connects to:
+    - database.py: iter_utterances, iter_interactions, LazyJSON
+    - app.py: api_history_export
+"""
+import gzip
+import json
+from pathlib import Path
+
+import app as clever_app
+from database import DatabaseManager, LazyJSON
+
+
+def _seed(db: DatabaseManager, n: int = 25) -> None:
+    for i in range(n):
+        db.add_utterance("user", f"turn {i}", ts=1000.0 + i, durability="sync")
+        db.add_interaction(f"turn {i}", "Auto", "chat", {"i": i}, ts=1000.0 + i, durability="sync")
+
+
+def test_keyset_pages_cover_history_without_overlap(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "history.db")
+    _seed(db)
+    assert [u["id"] for u in db.iter_utterances(batch_size=4)] == list(range(1, 26))
+
+    first = db.list_utterances(limit=10)
+    second = db.list_utterances(limit=10, after_id=first[-1]["id"])
+    assert [u["id"] for u in first + second] == list(range(25, 5, -1))
+    assert [u["id"] for u in db.iter_utterances(after_id=20)] == [21, 22, 23, 24, 25]
+    older = db.list_utterances(limit=100, before_ts=1005.0)
+    assert [u["ts"] for u in older] == [1004.0, 1003.0, 1002.0, 1001.0, 1000.0]
+
+
+def test_parsed_data_is_decoded_lazily(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "lazy.db")
+    _seed(db, 3)
+    rows = list(db.iter_interactions(order="desc"))
+    assert not any(r["parsed_data"].decoded for r in rows)
+    assert rows[0]["parsed_data"]["i"] == 2
+    assert rows[0]["parsed_data"].decoded and not rows[1]["parsed_data"].decoded
+    assert rows[1]["parsed_data"].to_dict() == {"i": 1}
+
+
+def test_list_interactions_rows_are_json_serializable(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "plain.db")
+    _seed(db, 2)
+    rows = db.list_interactions(limit=2)
+    assert [r["parsed_data"] for r in rows] == [{"i": 1}, {"i": 0}]
+    assert json.loads(json.dumps(rows))[0]["parsed_data"] == {"i": 1}
+
+
+def test_malformed_parsed_data_exports_valid_ndjson(tmp_path: Path, monkeypatch):
+    db = DatabaseManager(tmp_path / "malformed.db")
+    _seed(db, 1)
+    with db._lock, db._connect() as con:
+        con.execute("UPDATE interactions SET parsed_data = ? WHERE id = 1", ('{"i": 0, oops}',))
+        con.commit()
+    assert LazyJSON('{"i": 0, oops}').json_text() == "{}"
+    assert LazyJSON('{"a": [1, 2]}').json_text() == '{"a": [1, 2]}'
+    monkeypatch.setattr(clever_app, "db_manager", db)
+
+    r = clever_app.app.test_client().get("/api/history/export?kind=interactions")
+    (line,) = [json.loads(line) for line in r.data.decode().splitlines()]
+    assert line["id"] == 1 and line["parsed_data"] == {}
+
+
+def test_export_streams_ndjson_and_gzip(tmp_path: Path, monkeypatch):
+    db = DatabaseManager(tmp_path / "export.db")
+    _seed(db, 5)
+    monkeypatch.setattr(clever_app, "db_manager", db)
+    client = clever_app.app.test_client()
+
+    r = client.get("/api/history/export?kind=interactions&after_id=2")
+    assert r.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in r.data.decode().splitlines()]
+    assert [row["id"] for row in lines] == [3, 4, 5]
+    assert lines[0]["parsed_data"] == {"i": 2}
+
+    r = client.get("/api/history/export?order=desc&limit=2&gzip=1")
+    assert r.headers["Content-Encoding"] == "gzip"
+    ids = [json.loads(line)["id"] for line in gzip.decompress(r.data).decode().splitlines()]
+    assert ids == [5, 4]
+    assert client.get("/api/history/export?kind=secrets").status_code == 400
@@ -0,0 +1,81 @@
+"""Connection pool tests for DatabaseManager.
+
+Why: Guard the one-connection-per-thread invariant so the chat hot path never
+regresses back to opening a fresh SQLite connection per helper call.
+Where: Unit tests for database.ConnectionPool / DatabaseManager._connect.
+How: Use a temporary database, exercise helpers repeatedly from one and several
+threads, and assert on pool statistics and pragma configuration.
+
+Connects to:
+    - database.py: ConnectionPool, get_connection_pool, DatabaseManager
+"""
+import threading
+from pathlib import Path
+
+from database import DatabaseManager, get_connection_pool
+
+
+def test_helpers_reuse_one_connection_per_thread(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "pool.db")
+    before = db.pool_stats()["opened"]
+    for i in range(20):
+        db.add_utterance("user", f"hello {i}", durability="sync")
+    db.list_utterances(limit=5)
+    stats = db.pool_stats()
+    assert stats["opened"] == before  # connection opened during _init is reused
+    assert stats["checkouts"] >= 21
+    assert stats["open_connections"] == 1
+
+
+def test_pool_applies_wal_and_survives_close(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "pragmas.db")
+    con = db._connect()
+    assert con.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+    con.close()  # legacy callers close; the pooled connection must stay usable
+    assert db._connect() is con
+    assert db._connect().execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_pool_is_shared_across_managers_and_reaps_dead_threads(tmp_path: Path):
+    path = tmp_path / "shared.db"
+    a = DatabaseManager(path)
+    b = DatabaseManager(path)
+    assert a._connect() is b._connect()
+
+    def worker():
+        a.add_utterance("user", "from thread", durability="sync")
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    pool = get_connection_pool(path)
+    assert pool.stats()["opened"] >= 4
+    # Opening from a new thread reaps the exited workers' connections
+    t = threading.Thread(target=a._connect)
+    t.start()
+    t.join()
+    assert pool.stats()["reaped"] >= 3
+    assert len(a.list_utterances(limit=10)) == 3
+
+
+def test_pool_counters_are_exact_under_concurrent_checkouts(tmp_path: Path):
+    pool = get_connection_pool(tmp_path / "counters.db")
+    pool.acquire()
+    before = pool.stats()["checkouts"]
+    per_thread = 2000
+
+    def worker():
+        for _ in range(per_thread):
+            pool.acquire()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = pool.stats()
+    assert stats["checkouts"] - before == 8 * per_thread
+    assert stats["reused"] + stats["opened"] == stats["checkouts"]
+    assert stats["max_wait_ms"] >= stats["avg_wait_ms"]
@@ -0,0 +1,78 @@
+"""Full-text search tests for DatabaseManager.search_sources.
+
+Why: Knowledge retrieval runs on every chat turn; guard the FTS5 index so
+ranking, snippets and re-indexing on update keep working.
+Where: Unit tests for database.DatabaseManager.search_sources / _init_fts.
+How: Ingest a few sources into a temporary database and assert on the
+ranked results returned for simple queries.
+
+Connects to:
+    - database.py: DatabaseManager.search_sources, add_or_update_source
+"""
+from pathlib import Path
+
+from database import DatabaseManager
+
+
+def _db(tmp_path: Path) -> DatabaseManager:
+    db = DatabaseManager(tmp_path / "search.db")
+    db.add_or_update_source("quantum.md", "/k/quantum.md", "Quantum entanglement links particle states. " * 5)
+    db.add_or_update_source("notes.md", "/k/notes.md", "Shopping list: eggs, milk and a note on quantum dots.")
+    db.add_or_update_source("garden.md", "/k/garden.md", "Tomatoes need sun and regular watering.")
+    return db
+
+
+def test_search_ranks_and_snippets(tmp_path: Path):
+    db = _db(tmp_path)
+    hits = db.search_sources("quantum entanglement")
+    assert [h["filename"] for h in hits][:2] == ["quantum.md", "notes.md"]
+    assert hits[0]["score"] >= hits[1]["score"]
+    assert "entanglement" in hits[0]["snippet"].lower()
+    assert db.search_sources("") == []
+    assert db.search_sources("zzzunknown") == []
+
+
+def test_prefix_match_and_limit(tmp_path: Path):
+    db = _db(tmp_path)
+    assert [h["filename"] for h in db.search_sources("tomato")] == ["garden.md"]
+    assert len(db.search_sources("quantum", limit=1)) == 1
+
+
+def test_update_reindexes_content(tmp_path: Path):
+    db = _db(tmp_path)
+    db.add_or_update_source("garden.md", "/k/garden.md", "Now about compost and worms.")
+    assert db.search_sources("tomatoes") == []
+    assert db.search_sources("compost")[0]["filename"] == "garden.md"
+
+
+def test_index_is_contentless(tmp_path: Path):
+    db = _db(tmp_path)
+    with db._lock, db._connect() as con:
+        tables = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "sources_fts" in tables and "sources_fts_content" not in tables
+
+
+def test_edit_behind_index_is_reconciled_on_hash(tmp_path: Path):
+    db = _db(tmp_path)
+    # Same row count, different text: written by a tool that bypassed the helpers
+    with db._lock, db._connect() as con:
+        con.execute(
+            "UPDATE sources SET content = 'Seedlings and mulch.', content_z = NULL, "
+            "content_codec = NULL, content_hash = 'edited' WHERE path = '/k/garden.md'"
+        )
+    reopened = DatabaseManager(db.db_path)
+    assert reopened.search_sources("tomatoes") == []
+    assert reopened.search_sources("mulch")[0]["filename"] == "garden.md"
+    assert reopened.search_sources("entanglement")[0]["filename"] == "quantum.md"
+
+
+def test_legacy_content_storing_index_is_replaced(tmp_path: Path):
+    db = _db(tmp_path)
+    with db._lock, db._connect() as con:
+        con.execute("DROP TABLE sources_fts")
+        con.execute("CREATE VIRTUAL TABLE sources_fts USING fts5(filename, content)")
+    reopened = DatabaseManager(db.db_path)
+    with reopened._lock, reopened._connect() as con:
+        sql = con.execute("SELECT sql FROM sqlite_master WHERE name = 'sources_fts'").fetchone()[0]
+    assert "content=''" in sql
+    assert reopened.search_sources("tomatoes")[0]["filename"] == "garden.md"
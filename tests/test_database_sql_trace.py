@@ -0,0 +1,99 @@
+"""SQL tracing tests for DatabaseManager.
+
+Why: Per-statement latency is how we find the queries that dominate a chat
+turn; the tracer must see every statement, group literal variants together
+and keep lock wait separate from statement time.
+Where: Unit tests for database.SqlTracer / TracedCursor / TimedLock.
+How: Use a temporary database, reset the process-wide tracer, run a few
+helpers and assert on the ``sql_stats()`` snapshot.
+
+Connects to:
+    - database.py: normalize_sql, get_sql_tracer, DatabaseManager.sql_stats / reset_sql_stats
+"""
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import config
+from database import DatabaseManager, TracedCursor, get_sql_tracer, normalize_sql
+
+
+@pytest.fixture(autouse=True)
+def _sql_trace_on(monkeypatch):
+    # Tracing is a diagnostic and off by default; these tests exercise it.
+    monkeypatch.setattr(config, "DB_SQL_TRACE", True)
+    yield
+    get_sql_tracer().enabled = False
+
+
+def _stmt(stats: dict, prefix: str) -> dict:
+    return next(s for s in stats["statements"] if s["sql"].startswith(prefix))
+
+
+def test_normalize_sql_groups_literals_and_in_lists():
+    a = normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'")
+    b = normalize_sql("SELECT *\n  FROM t WHERE id IN (?,?) AND name = 'y''s'")
+    assert a == b == "SELECT * FROM t WHERE id IN (?...) AND name = ?"
+    assert normalize_sql("SELECT 1 LIMIT 20") == "SELECT ? LIMIT ?"
+
+
+def test_statements_record_calls_rows_and_percentiles(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "trace.db")
+    db.reset_sql_stats()
+    for i in range(10):
+        db.add_utterance("user", f"hello {i}", durability="sync")
+    assert len(db.list_utterances(limit=4)) == 4
+    with db._lock, db._connect() as con:
+        assert sum(1 for _ in con.execute("SELECT id FROM utterances")) == 10
+
+    stats = db.sql_stats(top=None)
+    insert = _stmt(stats, "INSERT INTO utterances")
+    assert insert["calls"] == 10 and insert["rows"] == 0
+    assert insert["p95_ms"] >= insert["p50_ms"] >= 0
+    assert _stmt(stats, "SELECT id, role, text")["rows"] == 4
+    assert _stmt(stats, "SELECT id FROM utterances")["rows"] == 10
+    assert stats["lock_wait"]["acquisitions"] >= 11
+
+    snapshot = db.reset_sql_stats()
+    assert snapshot["total_calls"] >= 12
+    assert db.sql_stats()["total_calls"] == 0
+
+
+def test_lock_wait_is_recorded_separately(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "lock.db")
+    db.reset_sql_stats()
+    held = threading.Event()
+
+    def holder():
+        with db._lock:
+            held.set()
+            time.sleep(0.05)
+
+    t = threading.Thread(target=holder)
+    t.start()
+    held.wait()
+    with db._lock:
+        pass
+    t.join()
+    lock = get_sql_tracer().stats()["lock_wait"]
+    assert lock["acquisitions"] == 2
+    assert lock["max_ms"] >= 20 and lock["contended"] >= 1
+
+
+def test_tracing_off_uses_plain_cursors_and_records_nothing(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(config, "DB_SQL_TRACE", False)
+    db = DatabaseManager(tmp_path / "untraced.db")
+    db.reset_sql_stats()
+    db.add_utterance("user", "hello", durability="sync")
+    with db._lock, db._connect() as con:
+        cur = con.execute("SELECT id FROM utterances")
+        assert type(cur) is sqlite3.Cursor and not isinstance(cur, TracedCursor)
+        assert type(con.cursor()) is sqlite3.Cursor
+        cur.fetchall()
+
+    stats = db.sql_stats(top=None)
+    assert stats["enabled"] is False
+    assert stats["statements"] == []
@@ -0,0 +1,106 @@
+"""Write-behind queue tests for DatabaseManager.
+
+Why: Telemetry writes are deferred to a group-commit writer thread; these tests
+pin down the durability levels and the read-your-writes guarantee.
+Where: Unit tests for database.WriteBehindQueue via DatabaseManager helpers.
+How: Temporary database per test; inspect writer statistics and row visibility.
+
+Connects to:
+    - database.py: WriteBehindQueue, DatabaseManager.execute_write / flush
+"""
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from database import DatabaseManager, WriteBehindQueue
+
+
+def test_conversation_rows_share_one_batch_and_are_visible_to_writer_thread(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "wb.db")
+    batches_before = db.writer_stats()["batches"]
+    db.add_conversation("hi", "hello there", meta={"activePersona": "Auto"}, durability="batched")
+    # Same thread reads its own writes without an explicit flush
+    rows = db.list_utterances(limit=5)
+    assert [r["role"] for r in rows] == ["assistant", "user"]
+    assert db.list_interactions(limit=5)[0]["active_mode"] == "Auto"
+    assert db.writer_stats()["batches"] - batches_before == 1
+
+
+def test_sync_durability_returns_row_id(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "sync.db")
+    db.add_utterance("user", "queued first", durability="batched")
+    row_id = db.add_utterance("user", "sync second", durability="sync")
+    assert row_id == 2  # sync write waited for the earlier queued row
+    assert db.add_utterance("user", "deferred", durability="fire-and-forget") == 0
+    assert db.flush(timeout=5)
+    assert len(db.list_utterances(limit=10)) == 3
+
+
+def test_fire_and_forget_drops_when_saturated(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "ff.db")
+    writer = WriteBehindQueue(db.db_path, max_queue=1, flush_ms=1000)
+    writer._thread = object()  # pretend a writer exists so nothing drains the queue
+    writer._ensure_thread = lambda: None
+    assert writer.submit("SELECT 1", durability="fire-and-forget") == 1
+    assert writer.submit("SELECT 1", durability="fire-and-forget") is None
+    assert writer.stats()["dropped"] == 1
+    with pytest.raises(ValueError):
+        writer.submit("SELECT 1", durability="eventually")
+
+
+def test_writer_survives_commit_failure_and_barriers_return(tmp_path: Path, monkeypatch):
+    db = DatabaseManager(tmp_path / "fail.db")
+    writer = WriteBehindQueue(db.db_path, flush_ms=1, barrier_timeout=2.0)
+
+    def boom(batch):
+        raise RuntimeError("pool unavailable")
+
+    monkeypatch.setattr(writer, "_commit_batch", boom)
+    writer.submit("INSERT INTO utterances (role, text, ts) VALUES ('user', 'lost', 0)")
+    assert writer.wait_for_own_writes()  # batch counted as failed, not hanging
+    stats = writer.stats()
+    assert stats["failed_rows"] == 1 and stats["committed_rows"] == 0
+    assert writer._thread.is_alive()
+    monkeypatch.undo()
+    assert writer.wait_for(writer.submit("INSERT INTO utterances (role, text, ts) VALUES ('user', 'kept', 0)"), 5)
+    assert writer.stats()["committed_rows"] == 1
+
+
+def test_wait_for_restarts_dead_writer_and_drops_are_not_committed(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "restart.db")
+    writer = WriteBehindQueue(db.db_path, flush_ms=1)
+    writer._ensure_thread()
+    writer._stopping = True
+    writer._nudge.set()
+    writer._thread.join(2)
+    assert not writer._thread.is_alive()
+    # Bypass submit (which would restart the thread) to simulate a writer that died
+    writer._queue.put((1, "INSERT INTO no_such_table VALUES (1)", (), False))
+    writer._enqueued_seq = 1
+    assert writer.wait_for(1, timeout=5)
+    stats = writer.stats()
+    assert stats["failed_rows"] == 1 and stats["committed_rows"] == 0
+
+
+def test_full_queue_bounds_the_wait_without_blocking_other_submitters(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "full.db")
+    writer = WriteBehindQueue(db.db_path, max_queue=1, barrier_timeout=0.5)
+    writer._thread = object()  # nothing drains the queue
+    writer._ensure_thread = lambda: None
+    assert writer.submit("SELECT 1") == 1
+
+    blocked = threading.Thread(target=writer.submit, args=("SELECT 2",))
+    start = time.monotonic()
+    blocked.start()
+    time.sleep(0.05)
+    # The batched producer above waits for room without holding the sequence lock
+    assert writer.submit("SELECT 3", durability="fire-and-forget") is None
+    assert time.monotonic() - start < 0.4
+    blocked.join(2)
+    assert writer.stats()["dropped"] == 2
+
+    writer._queue.get_nowait()
+    writer._settle([1])  # the only queued row commits; dropped numbers are settled too
+    assert writer._committed_seq == 3 and writer.pending() == 0
@@ -0,0 +1,72 @@
+"""File manifest fast-path tests.
+
+Why: Re-ingesting an unchanged sync directory must not open, hash or NLP
+process any file; only the stat signature should be consulted.
+Where: FileIngestor / EnhancedFileIngestor with database.DatabaseManager
+manifest helpers.
+How: Point the ingestors at a temporary database, ingest a directory, then
+make file reads fail and assert the second pass reports everything unchanged.
+
+Connects to:
+    - database.py: load_manifest, get_manifest_entry, record_manifest, get_source_by_path
+    - file_ingestor.py: FileIngestor.ingest_all_files / ingest_file
+    - pdf_ingestor.py: EnhancedFileIngestor.ingest_file
+"""
+import os
+from pathlib import Path
+
+import file_ingestor
+import pdf_ingestor
+from database import DatabaseManager
+
+
+def _setup(tmp_path: Path, monkeypatch):
+    db = DatabaseManager(tmp_path / "manifest.db")
+    monkeypatch.setattr(file_ingestor, "db_manager", db)
+    monkeypatch.setattr(pdf_ingestor, "db_manager", db)
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(5):
+        (docs / f"n{i}.txt").write_text(f"note number {i}", encoding="utf-8")
+    return db, docs
+
+
+def _fail_read(*_args, **_kwargs):
+    raise AssertionError("file should not be read")
+
+
+def test_unchanged_files_are_not_read(tmp_path: Path, monkeypatch):
+    db, docs = _setup(tmp_path, monkeypatch)
+    ing = file_ingestor.FileIngestor(str(docs))
+    assert ing.ingest_all_files()["inserted"] == 5
+    assert len(db.load_manifest(str(docs))) == 5
+
+    monkeypatch.setattr(ing, "_prepare_file", _fail_read)
+    assert ing.ingest_all_files()["unchanged"] == 5
+    assert ing.ingest_file(str(docs / "n1.txt")) == "unchanged"
+
+
+def test_changed_stat_is_reingested(tmp_path: Path, monkeypatch):
+    db, docs = _setup(tmp_path, monkeypatch)
+    ing = file_ingestor.FileIngestor(str(docs))
+    ing.ingest_all_files()
+    target = docs / "n2.txt"
+    target.write_text("note number 2, edited", encoding="utf-8")
+    counts = ing.ingest_all_files()
+    assert counts["updated"] == 1 and counts["unchanged"] == 4
+    # Touching without a content change re-reads once, then is skipped again
+    st = target.stat()
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert ing.ingest_file(str(target)) == "unchanged"
+    source = db.get_source_by_path(str(target))
+    assert source is not None and source.filename == "n2.txt"
+    assert db.get_manifest_entry(str(target))["source_id"] == source.id
+
+
+def test_enhanced_ingestor_uses_manifest(tmp_path: Path, monkeypatch):
+    db, docs = _setup(tmp_path, monkeypatch)
+    ing = pdf_ingestor.EnhancedFileIngestor([str(docs)])
+    path = str(docs / "n0.txt")
+    assert ing.ingest_file(path) == "inserted"
+    monkeypatch.setattr(ing, "_extract_text_content", _fail_read)
+    assert ing.ingest_file(path) == "unchanged"
@@ -0,0 +1,69 @@
+"""Cached Jay integration tests.
+
+Why: The Jay integration used to be rebuilt on every chat message (disk reads,
+access verification that rewrites the sovereignty profile, environment writes);
+it must now be built once and only reload the personal context when it changes.
+Where: Unit tests for integrate_jays_clever.get_jays_clever_integration and
+jays_authentic_clever.JaysAuthenticClever.refresh_personal_context.
+How: Point both JSON files at tmp_path, enable config.PERSONA_JAY_INTEGRATION,
+count verifications across several turns, then touch the context file.
+
+Connects to:
+    - integrate_jays_clever.py: get_jays_clever_integration, JaysCleverIntegration
+    - jays_authentic_clever.py: refresh_personal_context
+    - persona.py: PersonaEngine.jay_integration
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import config
+import integrate_jays_clever
+from jays_authentic_clever import JaysAuthenticClever
+from jays_digital_sovereignty import JaysDigitalSovereignty
+from persona import PersonaEngine
+
+
+@pytest.fixture
+def jay_files(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(JaysAuthenticClever, "CONTEXT_FILE", tmp_path / "context.json")
+    monkeypatch.setattr(JaysDigitalSovereignty, "SOVEREIGNTY_FILE", tmp_path / "sovereignty.json")
+    monkeypatch.setattr(integrate_jays_clever, "_INTEGRATION", None)
+    for var in ("CLEVER_USER", "CLEVER_PERSONALITY", "CLEVER_RELATIONSHIP", "CLEVER_CORPORATE_AI",
+                "CLEVER_GENERIC_ASSISTANT", "CLEVER_JAYS_CLEVER", "CLEVER_FAMILY_AWARE",
+                "CLEVER_HUMOR_LEVEL", "CLEVER_AUTHENTICITY"):
+        monkeypatch.delenv(var, raising=False)
+    return tmp_path
+
+
+def test_integration_is_built_and_verified_once(jay_files, monkeypatch):
+    calls = []
+    verify = JaysDigitalSovereignty.verify_jay_access
+    monkeypatch.setattr(JaysDigitalSovereignty, "verify_jay_access",
+                        lambda self, *a, **kw: calls.append(1) or verify(self, *a, **kw))
+    monkeypatch.setattr(config, "PERSONA_JAY_INTEGRATION", True)
+
+    engine = PersonaEngine()
+    for _ in range(3):
+        resp = engine.generate("Hey Clever, what's up?")
+        assert resp.context["exclusive_to_jay"] and "jay_integration" in resp.debug_metrics["stages"]
+    assert PersonaEngine().jay_integration is engine.jay_integration
+    assert len(calls) == 1
+    assert os.environ["CLEVER_USER"] == "JAY"
+
+
+def test_personal_context_reloads_only_on_mtime_change(jay_files):
+    clever = JaysAuthenticClever()
+    path = jay_files / "context.json"
+    assert path.exists() and not clever.refresh_personal_context()
+
+    data = json.loads(path.read_text())
+    data["humor_level"] = "dry"
+    path.write_text(json.dumps(data))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert clever.refresh_personal_context()
+    assert clever.personal_context["humor_level"] == "dry"
+    assert not clever.refresh_personal_context()
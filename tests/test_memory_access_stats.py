@@ -0,0 +1,56 @@
+"""Deferred access-statistics tests for the memory engine.
+
+Why: Retrieval hits no longer write to SQLite inline; increments must still
+land exactly once, merge per node, and flush on threshold and shutdown.
+Where: Unit tests for memory_engine.AccessStatsAccumulator / flush_deferred.
+How: Use a temporary database, generate hits, inspect the accumulator
+metrics and the memory_nodes rows before and after flushing.
+
+Connects to:
+    - memory_engine.py: AccessStatsAccumulator, PeriodicFlusher, flush_all_engines
+"""
+from pathlib import Path
+
+import memory_engine
+from database import DatabaseManager
+from memory_engine import AdvancedMemoryEngine
+
+
+def _counts(db: DatabaseManager) -> dict:
+    with db._lock, db._connect() as con:
+        return dict(con.execute("SELECT content, accessed_count FROM memory_nodes").fetchall())
+
+
+def test_hits_are_merged_and_flushed_in_one_batch(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "access.db")
+    engine = AdvancedMemoryEngine(db)
+    engine._flusher.stop()
+    engine._create_memory_node("orbital mechanics", "keyword", 0.5)
+    engine._create_memory_node("orbital mechanics", "keyword", 0.5)  # repeat -> deferred bump
+    for _ in range(3):
+        engine.get_contextual_memory("orbital")
+
+    stats = engine.access_stats.stats()
+    assert stats["pending"] == 1 and stats["recorded"] == 4
+    assert stats["lag_s"] >= 0
+    assert _counts(db)["orbital mechanics"] == 0
+
+    assert engine.flush_deferred()["access_stats"] == 1
+    assert _counts(db)["orbital mechanics"] == 4
+    assert engine.access_stats.stats()["pending"] == 0
+    assert engine.flush_deferred()["access_stats"] == 0
+
+
+def test_threshold_and_shutdown_flush(tmp_path: Path, monkeypatch):
+    db = DatabaseManager(tmp_path / "threshold.db")
+    monkeypatch.setattr(memory_engine.config, "MEMORY_ACCESS_FLUSH_THRESHOLD", 2, raising=False)
+    engine = AdvancedMemoryEngine(db)
+    engine._flusher.stop()
+    engine._create_memory_node("alpha topic", "keyword", 0.5)
+    engine._create_memory_node("beta topic", "keyword", 0.5)
+    engine.get_contextual_memory("alpha beta")  # two pending nodes -> inline flush
+    assert _counts(db) == {"alpha topic": 1, "beta topic": 1}
+
+    engine.get_contextual_memory("alpha")
+    memory_engine.flush_all_engines()  # what atexit runs
+    assert _counts(db)["alpha topic"] == 2
@@ -0,0 +1,78 @@
+"""Spreading-activation recall tests for the memory engine.
+
+Why: Associative recall must reach memories that are only connected through
+relationships, from a cached graph that stays in sync with edge writes.
+Where: Unit tests for memory_engine.MemoryGraph and get_associative_memory.
+How: Spread over a hand-built chain (NumPy / pure-Python parity, overlay and
+tombstones), then recall a two-hop memory through the engine and a reload.
+
+Connects to:
+    - memory_engine.py: MemoryGraph, AdvancedMemoryEngine.get_associative_memory
+"""
+import threading
+from pathlib import Path
+
+import memory_engine
+from database import DatabaseManager
+from memory_engine import AdvancedMemoryEngine, MemoryGraph
+
+
+def _spread(graph):
+    return {k: (round(a, 6), h) for k, (a, h) in graph.spread({"a": 1.0}, hops=3).items()}
+
+
+def test_graph_spreads_over_csr_and_overlay(monkeypatch):
+    graph = MemoryGraph(compact_after=100)
+    graph.load([("a", "b", 0.8), ("b", "c", 0.5), ("b", "a", 0.2)])
+    graph.upsert_edge("c", "d", 1.0)  # overlay only, not yet compacted
+    assert graph.spread({"a": 1.0}, hops=1)["b"] == (0.4, 1)  # max strength of parallel edges, decayed once
+    result = graph.spread({"a": 1.0}, hops=3)
+    assert result["b"][1] == 1 and result["c"][1] == 2 and result["d"][1] == 3
+    assert result["a"][0] > 1.0  # activation flows back to the seed
+
+    expected = _spread(graph)
+    graph.compact()
+    assert _spread(graph) == expected
+    monkeypatch.setattr(memory_engine, "HAS_NUMPY", False)
+    graph.compact()
+    assert _spread(graph) == expected
+
+    graph.remove_node("c")
+    assert set(graph.spread({"a": 1.0}, hops=3)) == {"a", "b"}
+
+
+def test_associative_memory_reaches_linked_nodes(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "assoc.db")
+    engine = AdvancedMemoryEngine(db)
+    seed = engine._create_memory_node("telescope", "keyword", 0.6)
+    mid = engine._create_memory_node("astronomy", "keyword", 0.6)
+    far = engine._create_memory_node("orbital mechanics", "keyword", 0.6)
+    engine._create_memory_node("gardening", "keyword", 0.9)
+    engine._create_relationship(seed, mid, "semantic", 0.9)
+    engine._create_relationship(mid, far, "semantic", 0.9)
+
+    hits = engine.get_associative_memory("telescope", hops=2, budget=5)
+    assert [h["id"] for h in hits] == [seed, mid, far]
+    assert [h["hops"] for h in hits] == [0, 1, 2] and hits[0]["seed"]
+    assert len(engine.get_associative_memory("telescope", hops=1)) == 2
+
+    reloaded = AdvancedMemoryEngine(db)
+    assert len(reloaded.graph) == 2
+    assert [h["id"] for h in reloaded.get_associative_memory("telescope")] == [seed, mid, far]
+
+
+def test_graph_reload_waits_for_in_flight_edge_writes(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "reload.db")
+    engine = AdvancedMemoryEngine(db)
+    a = engine._create_memory_node("telescope", "keyword", 0.6)
+    b = engine._create_memory_node("astronomy", "keyword", 0.6)
+
+    with engine._lock:  # the ingest worker is between its INSERT and the graph upsert
+        reload = threading.Thread(target=engine.reload_graph)
+        reload.start()
+        reload.join(0.2)
+        assert reload.is_alive()
+        engine._create_relationship(a, b, "semantic", 0.9)
+    reload.join(5)
+    assert not reload.is_alive()
+    assert len(engine.graph) == 1
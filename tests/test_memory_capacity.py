@@ -0,0 +1,85 @@
+"""Capacity budget and eviction tests for the memory graph.
+
+Why: The memory graph must stay within its node / edge budgets, evicting the
+least valuable nodes first and never leaving dangling relationships.
+Where: Unit tests for memory_capacity.MemoryCapacityManager via the engine.
+How: Use a temporary database with a small budget, age some nodes, run one
+bounded pass and inspect what remains in SQLite and the in-memory indexes.
+
+Connects to:
+    - memory_capacity.py: MemoryCapacityManager, retention_score
+    - memory_engine.py: AdvancedMemoryEngine.capacity
+"""
+import threading
+import time
+from pathlib import Path
+
+from database import DatabaseManager
+from memory_capacity import MemoryCapacityManager, retention_score
+from memory_engine import AdvancedMemoryEngine
+
+
+def test_retention_score_decays_and_rewards_access():
+    now = time.time()
+    fresh = retention_score(0.5, 0, now, now, half_life_days=30)
+    stale = retention_score(0.5, 0, now - 30 * 86400, now, half_life_days=30)
+    used = retention_score(0.5, 10, now - 30 * 86400, now, half_life_days=30)
+    assert abs(stale - fresh / 2) < 1e-9
+    assert used > stale
+
+
+def test_eviction_removes_lowest_scores_and_cascades(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "capacity.db")
+    engine = AdvancedMemoryEngine(db)
+    engine.close()  # drive passes by hand
+    ids = [engine._create_memory_node(f"topic number{i}", "keyword", 0.5) for i in range(12)]
+    old = time.time() - 365 * 86400
+    with db._lock, db._connect() as con:
+        con.executemany(
+            "UPDATE memory_nodes SET created_at = ?, last_accessed = 0 WHERE id = ?",
+            [(old, node_id) for node_id in ids[:4]],
+        )
+        con.execute("UPDATE memory_nodes SET created_at = ? WHERE id = ?", (old - 365 * 86400, ids[0]))
+        con.execute(
+            "INSERT INTO memory_relationships (source_node, target_node, relationship_type, strength, created_at) "
+            "VALUES (?, ?, 'semantic', 0.9, ?)",
+            (ids[5], ids[0], time.time()),
+        )
+        con.commit()
+
+    capacity = MemoryCapacityManager(engine, max_nodes=10, max_edges=1000, batch=3, target_ratio=0.8)
+    report = capacity.run()
+    assert report["evicted_nodes"] == 3  # bounded by batch, target would be 4
+    assert report["before"]["nodes"] == 12 and report["after"]["nodes"] == 9
+    with db._lock, db._connect() as con:
+        remaining = {r[0] for r in con.execute("SELECT id FROM memory_nodes")}
+        dangling = con.execute(
+            "SELECT COUNT(*) FROM memory_relationships r LEFT JOIN memory_nodes n ON n.id = r.target_node "
+            "WHERE n.id IS NULL"
+        ).fetchone()[0]
+    assert len(set(ids[:4]) - remaining) == 3 and set(ids[4:]) <= remaining
+    assert ids[0] not in remaining and dangling == 0
+    assert len(engine.keyword_index) == 9 and len(engine.semantic_index) == 9
+
+    assert capacity.run()["evicted_nodes"] == 0  # 9 <= budget
+    assert capacity.stats()["totals"]["evicted_nodes"] == 3
+
+
+def test_node_eviction_waits_for_in_flight_ingest(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "capacity_lock.db")
+    engine = AdvancedMemoryEngine(db)
+    engine.close()
+    ids = [engine._create_memory_node(f"topic number{i}", "keyword", 0.5) for i in range(6)]
+    capacity = MemoryCapacityManager(engine, max_nodes=4, max_edges=1000, batch=10, target_ratio=0.5)
+
+    with engine._lock:  # an ingest is resolving concepts
+        worker = threading.Thread(target=capacity.run)
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive()
+        assert all(node_id in engine.keyword_index.nodes for node_id in ids)
+    worker.join(5)
+    assert not worker.is_alive()
+    evicted = [node_id for node_id in ids if node_id not in engine.keyword_index.nodes]
+    assert len(evicted) == 4
+    assert all(node_id not in engine.semantic_index.signatures for node_id in evicted)
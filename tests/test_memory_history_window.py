@@ -0,0 +1,106 @@
+"""Hot conversation-window tests for the memory engine.
+
+Why: Chat turns must read recent history from memory (zero SELECTs in steady
+state) while still seeing turns whose INSERT is queued on the write-behind path.
+Where: Unit tests for memory_engine.ConversationWindow / get_conversation_history.
+How: Store turns, read history with the SQL tracer reset, then restart the
+engine to check hydration and the cold-session fallback.
+
+Connects to:
+    - memory_engine.py: ConversationWindow, AdvancedMemoryEngine.get_conversation_history
+    - database.py: sql_stats / reset_sql_stats
+"""
+import time
+from pathlib import Path
+
+import pytest
+
+import config
+from database import DatabaseManager, get_sql_tracer
+from memory_engine import AdvancedMemoryEngine, ConversationWindow, MemoryContext
+
+
+@pytest.fixture(autouse=True)
+def _sql_trace_on(monkeypatch):
+    # SELECT counts come from the SQL tracer, which is off by default.
+    monkeypatch.setattr(config, "DB_SQL_TRACE", True)
+    yield
+    get_sql_tracer().enabled = False
+
+
+def _turn(engine, text: str, ts: float, session_id=None) -> MemoryContext:
+    return MemoryContext(
+        user_input=text, timestamp=ts, session_id=session_id or engine.session_id,
+        mode="Creative", sentiment="neutral", keywords=[], entities=[], response_text=f"re: {text}",
+    )
+
+
+def _history_selects(db: DatabaseManager) -> int:
+    return sum(s["calls"] for s in db.sql_stats(top=None)["statements"] if "FROM conversation_context" in s["sql"])
+
+
+def test_history_is_served_from_window_without_selects(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "history.db")
+    engine = AdvancedMemoryEngine(db)
+    now = time.time()
+    for i in range(6):
+        engine.store_interaction(_turn(engine, f"turn {i}", now + i))
+    engine.store_interaction(_turn(engine, "late arrival", now - 5))  # out of order
+
+    db.reset_sql_stats()
+    history = engine.get_conversation_history(session_limit=3)
+    assert [h["user_input"] for h in history] == ["turn 5", "turn 4", "turn 3"]
+    assert engine.get_conversation_history(10, session_id=engine.session_id)[-1]["user_input"] == "late arrival"
+    assert _history_selects(db) == 0
+
+
+def test_window_hydrates_at_startup_and_falls_back_for_cold_sessions(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "history.db")
+    engine = AdvancedMemoryEngine(db)
+    now = time.time()
+    engine.store_interaction(_turn(engine, "old session", now - 10, session_id="old"))
+    engine.store_interaction(_turn(engine, "current", now))
+    db.flush()
+
+    restarted = AdvancedMemoryEngine(db)
+    assert [h["user_input"] for h in restarted.get_conversation_history(2)] == ["current", "old session"]
+    restarted.history = ConversationWindow(1)  # window only holds the newest turn
+    restarted._load_history()
+    db.reset_sql_stats()
+    assert restarted.get_conversation_history(1, session_id="old")[0]["user_input"] == "old session"
+    assert restarted.get_conversation_history(1, session_id="old")[0]["user_input"] == "old session"
+    assert _history_selects(db) == 1
+    assert restarted.history.stats()["misses"] == 1
+
+
+def test_session_partly_in_startup_slice_falls_back_to_sql(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "history.db")
+    engine = AdvancedMemoryEngine(db)
+    now = time.time()
+    for i in range(8):
+        engine.store_interaction(_turn(engine, f"a{i}", now + i, session_id="A"))
+    for i in range(48):
+        engine.store_interaction(_turn(engine, f"b{i}", now + 100 + i, session_id="B"))
+    for i in (8, 9):
+        engine.store_interaction(_turn(engine, f"a{i}", now + 200 + i, session_id="A"))
+    db.flush()
+
+    restarted = AdvancedMemoryEngine(db)  # newest 50 rows hold only a8, a9 for A
+    history = restarted.get_conversation_history(5, session_id="A")
+    assert [h["user_input"] for h in history] == ["a9", "a8", "a7", "a6", "a5"]
+    db.reset_sql_stats()
+    assert len(restarted.get_conversation_history(5, session_id="B")) == 5
+    assert restarted.get_conversation_history(10, session_id="A")[-1]["user_input"] == "a0"
+    assert _history_selects(db) == 1  # B's first read; A's window is complete after its refill
+
+
+def test_session_windows_are_capped_lru():
+    window = ConversationWindow(size=5, max_sessions=2)
+    window.hydrate([])
+    for sid in ("a", "b"):
+        window.mark_new(sid)
+        window.append(sid, {"user_input": sid, "response_text": "", "mode": "", "sentiment": "", "timestamp": 1.0})
+    assert window.recent(1, "a")[0]["user_input"] == "a"  # "a" becomes most recently used
+    window.mark_new("c")
+    assert window.recent(1, "b") is None
+    assert window.recent(1, "a") is not None and window.stats()["sessions"] == 2
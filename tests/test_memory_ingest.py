@@ -0,0 +1,122 @@
+"""Background memory ingestion tests.
+
+Why: Chat turns are persisted off the request path; queued turns must stay
+visible to history reads, land after ``drain()``, and a saturated queue must
+follow its drop policy instead of stalling the caller.
+Where: Unit tests for memory_engine.MemoryIngestQueue / submit_interaction.
+How: Submit turns to a real engine and drain; then saturate a queue whose
+worker is held up and check depth, lag and drop counters per policy.
+
+Connects to:
+    - memory_engine.py: MemoryIngestQueue, AdvancedMemoryEngine.submit_interaction
+"""
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from database import DatabaseManager
+from memory_engine import AdvancedMemoryEngine, MemoryContext, MemoryIngestQueue
+
+
+def _turn(text: str, session_id: str = "s1") -> MemoryContext:
+    return MemoryContext(
+        user_input=text, timestamp=time.time(), session_id=session_id, mode="Auto",
+        sentiment="neutral", keywords=["telescope"], entities=[], response_text="ok",
+    )
+
+
+def test_submitted_turns_are_visible_then_persisted(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "ingest.db")
+    engine = AdvancedMemoryEngine(db)
+    for i in range(3):
+        assert engine.submit_interaction(_turn(f"turn {i}"))
+    assert engine.get_conversation_history(1, session_id="s1")[0]["user_input"] == "turn 2"
+
+    assert engine.ingest.drain(timeout=5)
+    db.flush()
+    with db._lock, db._connect() as con:
+        assert con.execute("SELECT COUNT(*) FROM conversation_context").fetchone()[0] == 3
+    stats = engine.ingest.stats()
+    assert stats["processed"] == 3 and stats["depth"] == 0 and stats["dropped"] == 0
+    assert engine.mode_model.predict("telescope") == "Auto"
+
+
+def test_store_interaction_returns_committed_row_id(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "ids.db")
+    engine = AdvancedMemoryEngine(db)
+    first = engine.store_interaction(_turn("first"))
+    second = engine.store_interaction(_turn("second"))
+    assert (first, second) == ("1", "2")
+    with db._lock, db._connect() as con:
+        row = con.execute("SELECT user_input FROM conversation_context WHERE id = ?", (int(second),)).fetchone()
+    assert row[0] == "second"
+
+
+class _SlowEngine:
+    def __init__(self):
+        self.release = threading.Event()
+        self.seen = []
+
+    def _ingest(self, context, durability="batched"):
+        self.release.wait(5)
+        self.seen.append(context.user_input)
+
+
+@pytest.mark.parametrize("policy,expected", [
+    ("drop_oldest", ["a", "c", "d"]),
+    ("drop_newest", ["a", "b", "c"]),
+    ("block", ["a", "b", "c"]),
+])
+def test_saturated_queue_applies_policy(policy, expected):
+    engine = _SlowEngine()
+    ingest = MemoryIngestQueue(engine, max_queue=2, policy=policy, block_ms=20)
+    assert ingest.submit(_turn("a"))
+    deadline = time.time() + 5
+    while ingest.depth() and time.time() < deadline:  # worker picked up "a" and is stuck
+        time.sleep(0.005)
+    ingest.submit(_turn("b"))
+    ingest.submit(_turn("c"))
+    accepted = ingest.submit(_turn("d"))
+    assert accepted is (policy == "drop_oldest")
+    stats = ingest.stats()
+    assert stats["depth"] == 2 and stats["dropped"] == 1 and stats["lag_ms"] > 0
+
+    engine.release.set()
+    assert ingest.drain(timeout=5)
+    assert engine.seen == expected
+    ingest.stop()
+
+
+@pytest.mark.parametrize("policy,visible", [
+    ("drop_oldest", ["c", "a"]),
+    ("drop_newest", ["b", "a"]),
+    ("block", ["b", "a"]),
+])
+def test_dropped_turns_never_stay_in_history(tmp_path: Path, policy, visible):
+    engine = AdvancedMemoryEngine(DatabaseManager(tmp_path / f"{policy}.db"))
+    slow = _SlowEngine()
+    engine.ingest = MemoryIngestQueue(slow, max_queue=1, policy=policy, block_ms=20)
+    assert engine.submit_interaction(_turn("a"))
+    deadline = time.time() + 5
+    while engine.ingest.depth() and time.time() < deadline:
+        time.sleep(0.005)
+    assert engine.submit_interaction(_turn("b"))
+    assert engine.submit_interaction(_turn("c")) is (policy == "drop_oldest")
+
+    history = engine.get_conversation_history(5, session_id="s1")
+    assert [h["user_input"] for h in history] == visible
+    assert [h["user_input"] for h in engine.get_conversation_history(5)][:2] == visible
+    slow.release.set()
+    engine.ingest.stop()
+
+
+def test_queued_ingest_logs_the_turn_not_a_blank_id(tmp_path: Path, capsys):
+    engine = AdvancedMemoryEngine(DatabaseManager(tmp_path / "log.db"))
+    capsys.readouterr()
+    assert engine.submit_interaction(_turn("logged"))
+    assert engine.ingest.drain(timeout=5)
+    out = capsys.readouterr().out
+    assert "Stored interaction for session s1" in out
+    assert "with ID: \n" not in out
@@ -0,0 +1,48 @@
+"""Keyword index tests for AdvancedMemoryEngine.get_contextual_memory.
+
+Why: Retrieval now reads an in-memory inverted index instead of running one
+LIKE scan per query word; the index must stay in step with memory_nodes.
+Where: Unit tests for memory_engine.MemoryKeywordIndex and the engine wiring.
+How: Use a temporary database, create nodes through the engine, then check
+ranking, prefix matching, access-count write-back and reload at startup.
+
+Connects to:
+    - memory_engine.py: MemoryKeywordIndex, tokenize, AdvancedMemoryEngine
+"""
+from pathlib import Path
+
+from database import DatabaseManager
+from memory_engine import AdvancedMemoryEngine, MemoryKeywordIndex, tokenize
+
+
+def test_index_ranks_by_matched_terms_then_relevance():
+    index = MemoryKeywordIndex()
+    index.load([
+        ("a", "quantum physics", "keyword", 0.9, 0),
+        ("b", "quantum computing", "keyword", 0.4, 0),
+        ("c", "learning python", "keyword", 0.5, 3),
+    ])
+    hits = index.search(tokenize("quantum computing rocks"), limit=5)
+    assert [h["id"] for h in hits] == ["b", "a"]  # b matches two terms
+    assert [h["id"] for h in index.search(tokenize("learn"))] == ["c"]  # prefix match
+    index.remove("c")
+    assert index.search(tokenize("python")) == []
+
+
+def test_engine_keeps_index_in_sync_and_writes_access_counts(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "memory.db")
+    engine = AdvancedMemoryEngine(db)
+    node_id = engine._create_memory_node("neural networks", "keyword", 0.6)
+    engine._create_memory_node("gardening tips", "keyword", 0.3)
+
+    hits = engine.get_contextual_memory("tell me about neural nets")
+    assert [h["id"] for h in hits] == [node_id]
+    engine.flush_deferred()  # access counts are written back in batches
+    with db._lock, db._connect() as con:
+        count = con.execute("SELECT accessed_count FROM memory_nodes WHERE id = ?", (node_id,)).fetchone()[0]
+    assert count == 1
+    assert engine.keyword_index.nodes[node_id][3] == 1
+
+    reloaded = AdvancedMemoryEngine(db)  # index is rebuilt from the table at startup
+    assert len(reloaded.keyword_index) == 2
+    assert reloaded.get_contextual_memory("networks")[0]["id"] == node_id
@@ -0,0 +1,47 @@
+"""Keyword -> mode model tests for the memory engine.
+
+Why: Mode predictions must survive restarts, flush in batches and keep the
+learned model bounded instead of growing one list entry per keyword use.
+Where: Unit tests for memory_engine.KeywordModeModel / predict_preferences.
+How: Record keyword/mode pairs, flush, restart the engine and predict; then
+overflow a small keyword cap and check both memory and table are trimmed.
+
+Connects to:
+    - memory_engine.py: KeywordModeModel, AdvancedMemoryEngine.predict_preferences
+"""
+from pathlib import Path
+
+from database import DatabaseManager
+from memory_engine import AdvancedMemoryEngine, KeywordModeModel
+
+
+def test_mode_counts_persist_and_drive_predictions(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "modes.db")
+    engine = AdvancedMemoryEngine(db)
+    engine._flusher.stop()
+    for mode in ("Creative", "Deep Dive", "Deep Dive"):
+        engine.mode_model.record("Quantum", mode)
+    engine.preference_model["topic_interest_quantum"] = {"confidence": 0.7}
+    assert engine.predict_preferences("tell me about quantum")["suggested_mode"] == "Deep Dive"
+    assert engine.flush_deferred()["mode_model"] == 2
+
+    restarted = AdvancedMemoryEngine(db)
+    assert restarted.mode_model.predict("quantum") == "Deep Dive"
+    assert list(restarted.mode_model.counts["quantum"])[:2] == [1, 2]
+
+
+def test_keyword_cap_trims_memory_and_table(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "modes.db")
+    AdvancedMemoryEngine(db)  # schema
+    model = KeywordModeModel(db, max_keywords=10, slots=2)
+    for i in range(12):
+        model.record(f"kw{i}", "Auto", delta=i + 1)
+    model.record("kw0", "Support")
+    model.record("kw0", "Creative")  # no slot left
+    model.flush()
+
+    stats = model.stats()
+    assert stats["keywords"] == 9 and stats["pruned"] == 3 and stats["dropped"] == 1
+    assert model.predict("kw0") is None and model.predict("kw11") == "Auto"
+    with db._lock, db._connect() as con:
+        assert con.execute("SELECT COUNT(DISTINCT keyword) FROM keyword_mode_counts").fetchone()[0] == 9
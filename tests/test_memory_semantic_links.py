@@ -0,0 +1,55 @@
+"""MinHash / LSH semantic linking tests for the memory engine.
+
+Why: Semantic links must reach related memories of any age (not just the
+last hour's 20 nodes) without pairwise Python comparisons per concept.
+Where: Unit tests for memory_engine.MinHashLSH and _create_semantic_links.
+How: Check signature estimates against exact Jaccard, NumPy / pure-Python
+parity, and that an old related node gets linked and signatures persist.
+
+Connects to:
+    - memory_engine.py: MinHashLSH, shingles, AdvancedMemoryEngine
+"""
+import time
+from pathlib import Path
+
+import memory_engine
+from database import DatabaseManager
+from memory_engine import AdvancedMemoryEngine, MinHashLSH
+
+
+def test_signature_estimates_jaccard_and_matches_fallback(monkeypatch):
+    lsh = MinHashLSH()
+    sig = lsh.signature("neural networks")
+    lsh.add("a", sig)
+    lsh.add("b", lsh.signature("neural nets"))
+    lsh.add("c", lsh.signature("gardening tips"))
+    found = dict(lsh.neighbours(sig, threshold=0.2, exclude="a"))
+    assert set(found) == {"b"}
+    assert 0.25 <= found["b"] <= 0.65  # exact Jaccard of the shingle sets is 0.44
+
+    monkeypatch.setattr(memory_engine, "HAS_NUMPY", False)
+    assert MinHashLSH().signature("neural networks") == sig
+
+
+def test_old_related_nodes_are_linked_and_signatures_persist(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "links.db")
+    engine = AdvancedMemoryEngine(db)
+    old_id = engine._create_memory_node("machine learning", "keyword", 0.6)
+    with db._lock, db._connect() as con:  # age it past the old one-hour window
+        con.execute("UPDATE memory_nodes SET created_at = ? WHERE id = ?", (time.time() - 86400 * 30, old_id))
+        con.commit()
+
+    new_id = engine._create_memory_node("machine learner", "keyword", 0.6)
+    engine._create_semantic_links(new_id, "machine learner")
+    with db._lock, db._connect() as con:
+        links = con.execute(
+            "SELECT target_node, strength FROM memory_relationships WHERE source_node = ?", (new_id,)
+        ).fetchall()
+        con.execute("UPDATE memory_nodes SET signature = NULL WHERE id = ?", (new_id,))
+        con.commit()
+    assert [t for t, _ in links] == [old_id] and links[0][1] > 0.3
+
+    reloaded = AdvancedMemoryEngine(db)  # missing signatures are backfilled at startup
+    assert len(reloaded.semantic_index) == 2
+    with db._lock, db._connect() as con:
+        assert con.execute("SELECT COUNT(*) FROM memory_nodes WHERE signature IS NULL").fetchone()[0] == 0
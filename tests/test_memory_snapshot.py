@@ -0,0 +1,85 @@
+"""Warm-start snapshot tests for the memory engine.
+
+Why: A snapshot must restore exactly what a cold rebuild would (plus the
+running learning patterns) and must never be trusted once the memory tables
+changed or the file is damaged.
+Where: Unit tests for memory_snapshot.save_snapshot / load_snapshot.
+How: Build state on a temporary database, save, boot a second engine from
+the snapshot and compare; then invalidate via a row change and truncation.
+
+Connects to:
+    - memory_snapshot.py: save_snapshot, load_snapshot, read_snapshot
+    - memory_engine.py: AdvancedMemoryEngine warm start, memory_meta db id / change counter
+"""
+from pathlib import Path
+
+from database import DatabaseManager, close_all_pools
+import memory_snapshot
+from memory_engine import AdvancedMemoryEngine
+
+
+def _engine_with_state(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "snap.db")
+    engine = AdvancedMemoryEngine(db)
+    a = engine._create_memory_node("machine learning", "keyword", 0.6)
+    b = engine._create_memory_node("machine learner", "keyword", 0.7)
+    engine._create_memory_node("gardening", "topic", 0.4)
+    engine._create_relationship(a, b, "semantic", 0.8)
+    engine.mode_model.record("machine", "Deep Dive")
+    engine._update_preference("topic_interest_machine", "machine", "topic", 0.5)
+    engine.learning_patterns["input_length_Auto"] = [3, 12.0]
+    engine.get_contextual_memory("machine")
+    return db, engine
+
+
+def test_snapshot_boot_matches_cold_state(tmp_path: Path):
+    db, engine = _engine_with_state(tmp_path)
+    saved = engine.save_snapshot()
+    assert saved["nodes"] == 3 and saved["edges"] == 1
+
+    warm = AdvancedMemoryEngine(db)
+    assert warm.snapshot_status["loaded"]
+    assert warm.get_contextual_memory("machine") == engine.get_contextual_memory("machine")
+    assert warm.get_associative_memory("learning") == engine.get_associative_memory("learning")
+    assert warm.predict_preferences("machine talk")["suggested_mode"] == "Deep Dive"
+    assert warm.learning_patterns["input_length_Auto"] == [3, 12.0]
+    new_id = warm._create_memory_node("machine learners", "keyword", 0.5)
+    assert warm.semantic_index.neighbours(warm.semantic_index.signature("machine learners"), exclude=new_id)
+
+
+def test_stale_or_damaged_snapshot_falls_back_to_rebuild(tmp_path: Path):
+    db, engine = _engine_with_state(tmp_path)
+    path = engine.save_snapshot()["path"]
+
+    engine._create_memory_node("astronomy", "keyword", 0.5)  # bumps memory_meta.change_counter
+    cold = AdvancedMemoryEngine(db)
+    assert not cold.snapshot_status["loaded"] and "stale" in cold.snapshot_status["reason"]
+    assert len(cold.keyword_index) == 4
+
+    cold.save_snapshot()
+    data = Path(path).read_bytes()
+    Path(path).write_bytes(data[: len(data) // 2])
+    damaged = AdvancedMemoryEngine(db)
+    assert not damaged.snapshot_status["loaded"] and "truncated" in damaged.snapshot_status["reason"]
+    assert len(damaged.keyword_index) == 4
+
+
+def test_snapshot_of_a_recreated_database_is_rejected(tmp_path: Path):
+    db, engine = _engine_with_state(tmp_path)
+    saved = engine.save_snapshot()
+    old = Path(saved["path"]).read_bytes()
+    engine.close()
+    close_all_pools()
+    for name in ("snap.db", "snap.db-wal", "snap.db-shm"):
+        (tmp_path / name).unlink(missing_ok=True)
+
+    db, engine = _engine_with_state(tmp_path)  # same rows, so the change counter matches again
+    engine.flush_deferred()
+    with db._lock, db._connect() as con:
+        assert memory_snapshot.change_counter(con) == saved["change_counter"]
+    engine.close()
+    Path(saved["path"]).write_bytes(old)
+    fresh = AdvancedMemoryEngine(db)
+    assert not fresh.snapshot_status["loaded"]
+    assert "another database" in fresh.snapshot_status["reason"]
+    assert set(fresh.keyword_index.nodes) == set(engine.keyword_index.nodes)
@@ -0,0 +1,50 @@
+"""Per-stage latency span tests.
+
+Why: Stage timings must add up per call, land in PersonaResponse.debug_metrics
+and feed the rolling per-stage histograms used by telemetry and the benchmark.
+Where: Unit tests for perf_spans.SpanRecorder / StageTracker and PersonaEngine.generate.
+How: Time synthetic stages (one entered twice) against a private tracker, then
+run one persona turn and check its stage breakdown.
+
+Connects to:
+    - perf_spans.py: SpanRecorder, StageTracker, get_stage_tracker
+    - persona.py: PersonaEngine.generate debug_metrics['stages']
+"""
+import time
+
+from perf_spans import SpanRecorder, StageTracker, get_stage_tracker
+from persona import PersonaEngine
+
+
+def test_spans_accumulate_and_feed_tracker():
+    tracker = StageTracker(samples=4)
+    for _ in range(6):
+        rec = SpanRecorder(tracker)
+        with rec.span("sleep"):
+            time.sleep(0.002)
+        with rec.span("sleep"):
+            time.sleep(0.002)
+        with rec.span("spin"):
+            sum(range(20000))
+        stages = rec.finish()
+        assert stages["sleep"]["wall_ms"] >= 4.0
+        assert stages["sleep"]["cpu_ms"] < stages["sleep"]["wall_ms"]
+        assert stages["total"]["wall_ms"] >= stages["sleep"]["wall_ms"] + stages["spin"]["wall_ms"]
+
+    stats = tracker.stats()
+    assert stats["samples"] == 4
+    assert stats["stages"]["sleep"]["calls"] == 6
+    assert stats["stages"]["sleep"]["wall_p50_ms"] <= stats["stages"]["sleep"]["wall_p95_ms"]
+    tracker.reset()
+    assert tracker.stats()["stages"] == {}
+
+
+def test_generate_reports_stage_breakdown():
+    engine = PersonaEngine()
+    before = get_stage_tracker().stats()["stages"].get("nlp", {}).get("calls", 0)
+    resp = engine.generate("Explain quantum tunneling simply", mode="Auto")
+    stages = resp.debug_metrics["stages"]
+    for name in ("nlp", "mode_handler", "suggestions", "total"):
+        assert name in stages and stages[name]["wall_ms"] >= 0.0
+    assert stages["total"]["wall_ms"] >= stages["nlp"]["wall_ms"]
+    assert get_stage_tracker().stats()["stages"]["nlp"]["calls"] == before + 1
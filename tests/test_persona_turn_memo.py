@@ -0,0 +1,98 @@
+"""Per-turn memo tests for variation regeneration.
+
+Why: ``_ensure_variation`` re-runs the mode handler when a first line repeats;
+the expensive sub-results (knowledge, shape detection / generation, academic
+lookup) must be computed once per turn, only the phrasing is redone.
+Where: Unit tests for persona.TurnMemo and PersonaEngine.generate / _auto_style.
+How: Force every attempt to look repeated, count calls to the memoized steps
+and check the hit / miss figures in debug_metrics.
+
+Connects to:
+    - persona.py: TurnMemo, PersonaEngine._turn_memo, _auto_style, _get_academic_response
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import persona
+from persona import PersonaEngine, TurnMemo
+
+
+def _count(monkeypatch, obj, name):
+    calls = []
+    original = getattr(obj, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(obj, name, wrapper)
+    return calls
+
+
+def test_turn_memo_computes_once():
+    memo = TurnMemo()
+    calls = []
+    assert memo.get("k", lambda: calls.append(1) or "v") == "v"
+    assert memo.get("k", lambda: calls.append(1) or "other") == "v"
+    assert calls == [1]
+    assert memo.stats() == {"hits": 1, "misses": 1}
+
+
+def test_turn_memo_replays_errors():
+    memo = TurnMemo()
+    calls = []
+
+    def boom():
+        calls.append(1)
+        raise ValueError("no engine")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            memo.get("k", boom)
+    assert calls == [1]
+
+
+def test_regeneration_reuses_shape_work(monkeypatch):
+    engine = PersonaEngine()
+    # Every draft looks like a repeat, so all variation attempts regenerate
+    monkeypatch.setattr(engine, "_response_signature", lambda text: "same")
+    engine._recent_responses.append("same")
+    detect = _count(monkeypatch, engine, "_detect_shape")
+    generate_shape = _count(monkeypatch, engine, "_generate_cognitive_shape")
+
+    resp = engine.generate("make a triangle", mode="Auto")
+
+    assert len(detect) == 1
+    assert len(generate_shape) == 1
+    assert resp.debug_metrics["turn_memo"]["hits"] >= 2
+    assert "turn_memo" not in resp.context
+
+
+def test_direct_handler_calls_share_knowledge_lookup(monkeypatch):
+    engine = PersonaEngine()
+    knowledge = _count(monkeypatch, engine, "_retrieve_relevant_knowledge")
+    context = {}
+    engine._auto_style("tell me about gardening", ["gardening"], context, [])
+    engine._auto_style("tell me about gardening", ["gardening"], context, [])
+    assert len(knowledge) == 1
+    assert isinstance(context["turn_memo"], TurnMemo)
+
+
+def test_academic_lookup_memoized(monkeypatch):
+    lookups = []
+    answer = SimpleNamespace(
+        domain=SimpleNamespace(value="physics"),
+        explanation="Energy is conserved.",
+        examples=[],
+        related_topics=["work", "power", "heat"],
+    )
+    fake_engine = SimpleNamespace(get_educational_response=lambda a, t: lookups.append(t) or answer)
+    monkeypatch.setattr(persona, "_ACADEMIC_ENGINE_AVAILABLE", True)
+    monkeypatch.setattr(persona, "get_academic_engine", lambda: fake_engine, raising=False)
+    engine = PersonaEngine()
+    analysis = {"academic_analysis": {"detected_concepts": ["energy"]}}
+    memo = TurnMemo()
+    for _ in range(3):
+        assert "Energy is conserved." in engine._get_academic_response("what is energy", analysis, memo)
+    assert len(lookups) == 1
@@ -0,0 +1,56 @@
+"""Query-plan regression tests for hot SQL paths.
+
+Why: Fail the suite when a registered hot query starts doing a full table
+SCAN, instead of discovering it months later on a large ``clever.db``.
+Where: Runs tools.query_plan_audit against a seeded temporary database.
+How: Seed a small database (threshold scaled down to match), assert there are
+no violations, that registry SQL (verbatim or by ``source_fragment``) still
+matches its module, and that a deliberately unindexed query is caught with an
+index suggestion.
+
+Connects to:
+    - tools/query_plan_audit.py: HOT_QUERIES, audit, seed_database, missing_from_source
+"""
+from pathlib import Path
+
+from tools.query_plan_audit import HOT_QUERIES, audit, missing_from_source, seed_database
+
+
+def test_hot_queries_have_no_unbounded_scans(tmp_path: Path):
+    db_path = seed_database(tmp_path / "audit.db", rows=300)
+    report = audit(db_path, threshold=100)
+    assert report["violations"] == [], report["violations"]
+    assert all(f.get("reason") for f in report["allowed"])
+
+
+def test_registry_sql_matches_source():
+    drifted = [q["name"] for q in HOT_QUERIES if missing_from_source(q)]
+    assert drifted == []
+
+
+def test_fragment_drift_is_detected():
+    entry = next(q for q in HOT_QUERIES if q["name"] == "db.sources_by_path")
+    assert not missing_from_source(entry)
+    # Registry edited without the module
+    assert missing_from_source({**entry, "sql": entry["sql"].replace("content_hash", "size")})
+    # Module edited without the registry
+    stale = ("SELECT id, path, size FROM sources WHERE path IN ({marks})",)
+    assert missing_from_source({**entry, "source_fragment": stale})
+
+
+def test_unindexed_query_is_flagged_with_covering_index(tmp_path: Path):
+    db_path = seed_database(tmp_path / "audit.db", rows=300)
+    probe = {
+        "name": "probe",
+        "module": "memory_engine.py",
+        "sql": "SELECT session_id, mode FROM conversation_context WHERE sentiment = ? ORDER BY importance_score DESC LIMIT 5",
+        "params": ("neutral",),
+    }
+    report = audit(db_path, threshold=100, queries=[probe])
+    assert not report["ok"]
+    (finding,) = report["violations"]
+    assert finding["table"] == "conversation_context"
+    assert finding["suggestion"]["index"] == (
+        "CREATE INDEX IF NOT EXISTS idx_conversation_context_sentiment_importance_score "
+        "ON conversation_context (sentiment, importance_score, session_id, mode)"
+    )
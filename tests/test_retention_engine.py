@@ -0,0 +1,107 @@
+"""Retention engine tests.
+
+Why: Pruning deletes user history; rollups must preserve the daily counts
+and the dry run must report without deleting anything.
+Where: Unit tests for retention_engine.RetentionEngine.
+How: Seed a temporary database with old and recent rows, run plan / run /
+incremental_vacuum and assert on remaining rows and aggregates.
+
+Connects to:
+    - retention_engine.py: RetentionEngine
+    - database.py: DatabaseManager (utterances / interactions)
+    - memory_engine.py: reload_engine_graphs after relationship pruning
+"""
+import json
+import time
+from pathlib import Path
+
+from database import DatabaseManager
+from memory_engine import AdvancedMemoryEngine
+from retention_engine import RetentionEngine
+
+DAY = 86400.0
+
+
+def _seed(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "retention.db")
+    now = time.time()
+    con = db._connect()
+    con.execute(
+        "CREATE TABLE conversation_context (id INTEGER PRIMARY KEY, session_id TEXT, user_input TEXT, "
+        "response_text TEXT, mode TEXT, sentiment TEXT, keywords TEXT, entities TEXT, "
+        "importance_score REAL, timestamp REAL, context_metadata TEXT)"
+    )
+    for i in range(40):
+        ts = now - 60 * DAY - i
+        con.execute("INSERT INTO utterances (role, text, mode, ts) VALUES ('user', ?, 'Auto', ?)",
+                    (f"gardening tomatoes question {i} " + "x" * 200, ts))
+        con.execute("INSERT INTO interactions (ts, user_input, active_mode, parsed_data) VALUES (?, 'q', 'Deep', ?)",
+                    (ts, json.dumps({"sentiment": "positive"})))
+        con.execute("INSERT INTO conversation_context (session_id, mode, sentiment, keywords, timestamp) "
+                    "VALUES ('s', 'Auto', 'neutral', ?, ?)", (json.dumps(["tomatoes", "soil"]), ts))
+    con.execute("INSERT INTO utterances (role, text, mode, ts) VALUES ('user', 'recent', 'Auto', ?)", (now,))
+    con.commit()
+    return db
+
+
+def test_dry_run_reports_without_deleting(tmp_path: Path):
+    db = _seed(tmp_path)
+    engine = RetentionEngine(db, raw_days=30, batch_rows=7)
+    report = engine.run(dry_run=True)
+    assert report["tables"]["utterances"]["rows"] == 40
+    assert report["tables"]["utterances"]["estimated_bytes"] > 40 * 200
+    assert report["estimated_bytes"] >= sum(t["estimated_bytes"] for t in report["tables"].values())
+    assert len(db.list_utterances(limit=100)) == 41
+
+
+def test_run_rolls_up_prunes_and_vacuums(tmp_path: Path):
+    db = _seed(tmp_path)
+    engine = RetentionEngine(db, raw_days=30, batch_rows=7)
+    report = engine.run()
+    assert report["pruned"] == 120
+    assert report["batches"] >= 120 // 7
+    assert [u["text"] for u in db.list_utterances(limit=100)] == ["recent"]
+
+    con = db._connect()
+    totals = dict(con.execute(
+        "SELECT table_name || ':' || mode || ':' || sentiment, SUM(count) FROM daily_rollups GROUP BY 1"
+    ).fetchall())
+    assert totals == {"utterances:Auto:": 40, "interactions:Deep:positive": 40,
+                      "conversation_context:Auto:neutral": 40}
+    top = con.execute(
+        "SELECT keyword, SUM(count) FROM daily_keywords WHERE table_name = 'conversation_context' "
+        "GROUP BY keyword ORDER BY 2 DESC"
+    ).fetchall()
+    assert top[0] == ("soil", 40) or top[0] == ("tomatoes", 40)
+
+    vac = engine.incremental_vacuum(pages=10_000)
+    assert vac["auto_vacuum"] == "INCREMENTAL"
+    assert vac["freed_pages"] > 0 and vac["freelist_pages"] == 0
+    assert engine.run()["pruned"] == 0
+
+
+def test_idle_step_skips_when_active(tmp_path: Path):
+    db = _seed(tmp_path)
+    engine = RetentionEngine(db, raw_days=30)
+    assert engine.idle_step(idle_seconds=3600) == {"skipped": "active"}
+    assert engine.idle_step(idle_seconds=0, max_batches=1)["pruned"] > 0
+
+
+def test_relationship_pruning_reloads_live_graphs(tmp_path: Path):
+    db = DatabaseManager(tmp_path / "graph.db")
+    memory = AdvancedMemoryEngine(db)
+    a = memory._create_memory_node("telescope", "keyword", 0.6)
+    b = memory._create_memory_node("astronomy", "keyword", 0.6)
+    c = memory._create_memory_node("orbital mechanics", "keyword", 0.6)
+    memory._create_relationship(a, b, "semantic", 0.05)
+    memory._create_relationship(b, c, "semantic", 0.9)
+    con = db._connect()
+    con.execute("UPDATE memory_relationships SET created_at = ?", (time.time() - 400 * DAY,))
+    con.commit()
+    assert len(memory.graph) == 2
+
+    report = RetentionEngine(db, relationship_days=90).run()
+    assert report["tables"]["memory_relationships"] == {"rolled_up": 1}
+    assert report["graphs_reloaded"] == 1
+    assert len(memory.graph) == 1
+    assert a not in {h["id"] for h in memory.get_associative_memory("astronomy", hops=1)}
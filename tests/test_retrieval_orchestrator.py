@@ -0,0 +1,79 @@
+"""Concurrent retrieval fan-out tests.
+
+Why: Independent retrieval stages run concurrently; a late or failing stage
+must degrade to its fallback without holding the reply, and the response
+must say which stages were dropped.
+Where: Unit tests for retrieval_orchestrator.RetrievalOrchestrator and the
+PersonaEngine.generate fan-out.
+How: Mix fast, slow, failing and inline stages under a small budget and time
+run(); then make knowledge lookup hang inside a real persona turn.
+
+Connects to:
+    - retrieval_orchestrator.py: RetrievalOrchestrator, parse_stage_timeouts
+    - persona.py: PersonaEngine.generate retrieval metadata
+"""
+import threading
+import time
+
+import config
+from persona import PersonaEngine
+from retrieval_orchestrator import RetrievalOrchestrator, parse_stage_timeouts
+
+
+def test_late_and_failing_stages_fall_back_within_deadline():
+    release = threading.Event()
+    caller = threading.get_ident()
+    seen = {}
+
+    def boom():
+        raise RuntimeError("index offline")
+
+    orch = RetrievalOrchestrator(budget_ms=400, stage_timeout_ms=300, timeouts_ms={"slow": 50})
+    orch.add("fast", lambda: "memories", [])
+    orch.add("slow", lambda: release.wait(5) and "late", None)
+    orch.add("broken", boom, [])
+    orch.add("local", lambda: seen.setdefault("thread", threading.get_ident()) and "inline", None)
+    start = time.perf_counter()
+    results = orch.run(inline={"local"})
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    assert results == {"fast": "memories", "slow": None, "broken": [], "local": "inline"}
+    assert elapsed < 0.3 and seen["thread"] == caller
+    assert orch.report["timed_out"] == ["slow"]
+    assert "index offline" in orch.report["failed"]["broken"]
+    assert parse_stage_timeouts("file_search=800, bad=x,document_query=600") == {
+        "file_search": 800.0, "document_query": 600.0,
+    }
+
+
+def test_generate_answers_without_a_hung_stage(monkeypatch):
+    release = threading.Event()
+    engine = PersonaEngine()
+    monkeypatch.setattr(config, "PERSONA_RETRIEVAL_STAGE_TIMEOUT_MS", 50.0)
+    monkeypatch.setattr(engine, "_retrieve_relevant_knowledge", lambda *a: release.wait(5) and "From x: late")
+
+    start = time.perf_counter()
+    resp = engine.generate("Explain quantum tunneling simply", mode="Auto")
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    assert resp.text and elapsed < 1.0
+    assert resp.context["retrieval"] == {"timed_out": ["knowledge"], "failed": []}
+    assert resp.context["knowledge_content"] is None
+    assert "knowledge" in resp.debug_metrics["retrieval"]["stages"]
+
+
+def test_slow_file_search_times_out_instead_of_blocking(monkeypatch):
+    release = threading.Event()
+    engine = PersonaEngine()
+    monkeypatch.setattr(config, "PERSONA_RETRIEVAL_STAGE_TIMEOUT_MS", 50.0)
+    monkeypatch.setattr(engine, "_maybe_handle_file_search", lambda text: release.wait(5) and "- late.py")
+
+    start = time.perf_counter()
+    resp = engine.generate("find python files about telescopes", mode="Auto")
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    assert resp.text and "late.py" not in resp.text and elapsed < 1.0
+    assert "file_search" in resp.context["retrieval"]["timed_out"]
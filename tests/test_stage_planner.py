@@ -0,0 +1,59 @@
+"""Deadline-aware stage planning tests.
+
+Why: A latency budget must drop the least valuable optional stages first,
+using recent stage timings, and the chosen plan must reach the caller.
+Where: Unit tests for stage_planner.plan_stages (the /api/chat budget_ms path
+is covered in test_app.py).
+How: Feed a private StageTracker known costs and plan against budgets, then
+let the samples go stale.
+
+Connects to:
+    - stage_planner.py: plan_stages
+    - perf_spans.py: StageTracker.estimate
+"""
+import config
+from perf_spans import StageTracker
+from stage_planner import OPTIONAL_STAGES, PRIOR_COST_MS, plan_stages
+
+
+def _tracker() -> StageTracker:
+    tracker = StageTracker(samples=8)
+    costs = {"nlp": 2.0, "mode_handler": 3.0, "document_query": 50.0, "knowledge": 12.0,
+             "file_search": 1.0, "variation": 10.0, "suggestions": 0.1}
+    for stage, ms in costs.items():
+        for _ in range(4):
+            tracker.record(stage, ms, ms)
+    return tracker
+
+
+def test_budget_drops_costly_optional_stages_first():
+    tracker = _tracker()
+    assert plan_stages(None, tracker)["run"] == list(OPTIONAL_STAGES)
+
+    plan = plan_stages(30.0, tracker)
+    assert plan["depth"] == "reduced"
+    assert plan["run"] == ["file_search", "knowledge", "variation", "suggestions"]
+    assert plan["skipped"] == ["document_query"]
+    assert plan["estimated_ms"] == 5.0 + 12.0 + 10.0 + 0.1  # file search overlaps knowledge
+    assert plan["retrieval_budget_ms"] == round(30.0 - 15.1, 3)
+
+    assert plan_stages(5.5, tracker)["run"] == ["suggestions"]
+
+
+def test_stale_estimates_fall_back_to_priors(monkeypatch):
+    monkeypatch.setattr(config, "PERSONA_PLANNER_STALE_SECONDS", -1.0)
+    assert plan_stages(1000.0, _tracker())["stage_cost_ms"] == PRIOR_COST_MS
+
+
+
+def test_matched_intents_are_always_admitted():
+    tracker = _tracker()
+    plan = plan_stages(5.5, tracker, intents=["file_search", "document_query"])
+    assert plan["run"] == ["document_query", "file_search"]  # no room left for suggestions
+    assert plan["intents"] == ["document_query", "file_search"]
+    assert plan["retrieval_budget_ms"] == 50.0  # the forced pooled stage gets its expected cost
+    assert "document_query" in plan_stages(30.0, tracker, intents=["document_query"])["run"]
+
+
+def test_interactive_turns_are_unbudgeted_by_default():
+    assert config.CHAT_DEFAULT_BUDGET_MS == 0
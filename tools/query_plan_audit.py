@@ -0,0 +1,492 @@
+"""Query-plan regression audit for Clever's hot SQL paths.
+
+Why: Several chat-path queries could never use an index (``LOWER(content)
+LIKE ?`` over sources and memory nodes, ``ORDER BY LENGTH(content)``) and
+nothing stopped new ones from landing. A full table SCAN is invisible on a
+fresh install and only hurts once the tables hold months of data.
+Where: Run manually (``python -m tools.query_plan_audit``) or via
+``tests/test_query_plan_audit.py`` in the normal pytest run. Point ``--db`` at
+a real ``clever.db`` to audit production-sized tables.
+How: ``HOT_QUERIES`` registers every hot-path statement from database.py,
+memory_engine.py, persona.py and notebooklm_engine.py. The audit seeds a
+temporary database with the real schema (created by the owning modules),
+runs ``EXPLAIN QUERY PLAN`` for each query and flags any full ``SCAN`` of a
+table holding more than ``threshold`` rows. Unfiltered scans that walk an
+index or the rowid in ORDER BY order and stop at a LIMIT are treated as
+bounded. For each
+violation a covering index is suggested from the query's equality, range,
+ORDER BY and selected columns; predicates that wrap a column in a function
+(``LOWER(col) LIKE``) are reported as unindexable with a rewrite hint.
+Entries may carry ``allow_scan`` (a reason string) for accepted, documented
+debt; they are reported but do not fail the audit.
+
+Connects to:
+    - database.py: DatabaseManager creates sources / chunks / manifest / telemetry schema
+    - memory_engine.py: AdvancedMemoryEngine creates memory_nodes / relationships / context
+    - notebooklm_engine.py: NotebookLMEngine creates document_analysis
+    - persona.py: Knowledge retrieval goes through the FTS queries registered here
+    - tests/test_query_plan_audit.py: Fails the suite on a new unbounded scan
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Ensure project root is on sys.path for direct script execution
+_root = Path(__file__).resolve().parent.parent
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+
+DEFAULT_THRESHOLD = 1000
+DEFAULT_SEED_ROWS = 2000
+
+# name -> owning module, SQL, sample params, optional allow_scan reason.
+# SQL is kept verbatim (modulo whitespace) with the owning module so
+# ``missing_from_source()`` can detect drift when a query is edited. Queries the
+# module assembles at runtime list the literal pieces they are built from in
+# ``source_fragment`` instead; ``{name}`` marks an interpolated part.
+HOT_QUERIES: List[Dict[str, Any]] = [
+    {
+        "name": "memory.node_lookup",
+        "module": "memory_engine.py",
+        "sql": "SELECT id, importance, accessed_count FROM memory_nodes WHERE content = ? AND category = ?",
+        "params": ("concept 7", "keyword"),
+    },
+    {
+        "name": "memory.relationship_lookup",
+        "module": "memory_engine.py",
+        "sql": "SELECT strength FROM memory_relationships WHERE source_node = ? AND target_node = ? AND relationship_type = ?",
+        "params": ("n1", "n2", "semantic"),
+    },
+    {
+        "name": "memory.relationship_update",
+        "module": "memory_engine.py",
+        "sql": "UPDATE memory_relationships SET strength = ? WHERE source_node = ? AND target_node = ? AND relationship_type = ?",
+        "params": (0.5, "n1", "n2", "semantic"),
+    },
+    {
+        "name": "memory.preference_lookup",
+        "module": "memory_engine.py",
+        "sql": "SELECT confidence FROM user_preferences WHERE key = ?",
+        "params": ("topic_interest_python",),
+    },
+    {
+        "name": "memory.conversation_history",
+        "module": "memory_engine.py",
+        "sql": (
+            "SELECT user_input, response_text, mode, sentiment, timestamp FROM conversation_context "
+            "ORDER BY timestamp DESC LIMIT ?"
+        ),
+        "params": (5,),
+    },
+    {
+        "name": "db.history_page",
+        "module": "database.py",
+        "sql": "SELECT id, role, text, mode, ts FROM utterances WHERE id < ? AND ts < ? ORDER BY id DESC LIMIT ?",
+        "params": (10 ** 9, 1e12, 50),
+        "source_fragment": (
+            "SELECT {cols} FROM {table} WHERE id {op} ? {where}ORDER BY id {direction} LIMIT ?",
+            "AND ts < ?",
+            "id, role, text, mode, ts",
+        ),
+    },
+    {
+        "name": "db.interactions_export",
+        "module": "database.py",
+        "sql": (
+            "SELECT id, ts, user_input, active_mode, action_taken, parsed_data FROM interactions "
+            "WHERE id > ? ORDER BY id ASC LIMIT ?"
+        ),
+        "params": (0, 500),
+        "source_fragment": (
+            "SELECT {cols} FROM {table} WHERE id {op} ? {where}ORDER BY id {direction} LIMIT ?",
+            "id, ts, user_input, active_mode, action_taken, parsed_data",
+        ),
+    },
+    {
+        "name": "db.sources_by_path",
+        "module": "database.py",
+        "sql": "SELECT id, path, content_hash FROM sources WHERE path IN (?, ?)",
+        "params": ("/tmp/a.txt", "/tmp/b.txt"),
+        "source_fragment": ("SELECT id, path, content_hash FROM sources WHERE path IN ({marks})",),
+    },
+    {
+        "name": "db.source_chunks",
+        "module": "database.py",
+        "sql": "SELECT chunk_index, start_byte, end_byte, content_hash, token_count FROM source_chunks WHERE source_id = ? ORDER BY chunk_index",
+        "params": (1,),
+        "source_fragment": (
+            "SELECT {cols} FROM source_chunks WHERE source_id = ? ORDER BY chunk_index",
+            "chunk_index, start_byte, end_byte, content_hash, token_count",
+        ),
+    },
+    {
+        "name": "db.manifest_prefix",
+        "module": "database.py",
+        "sql": (
+            "SELECT m.path, m.inode, m.size, m.mtime_ns, m.content_hash, m.source_id "
+            "FROM file_manifest m JOIN sources s ON s.id = m.source_id "
+            "WHERE m.path >= ? AND m.path < ?"
+        ),
+        "params": ("/tmp/", "/tmp0"),
+        "source_fragment": (
+            "SELECT m.path, m.inode, m.size, m.mtime_ns, m.content_hash, m.source_id "
+            "FROM file_manifest m JOIN sources s ON s.id = m.source_id",
+            "WHERE m.path >= ? AND m.path < ?",
+        ),
+    },
+    {
+        "name": "db.compress_backfill",
+        "module": "database.py",
+        "sql": "SELECT id, content FROM sources WHERE content_codec IS NULL AND id > ? ORDER BY id LIMIT ?",
+        "params": (0, 200),
+        "source_fragment": (
+            "SELECT id, content FROM {table} WHERE content_codec IS NULL AND id > ?",
+            "ORDER BY id LIMIT ?",
+        ),
+    },
+    {
+        "name": "db.compress_backfill_chunks",
+        "module": "database.py",
+        "sql": "SELECT id, content FROM source_chunks WHERE content_codec IS NULL AND id > ? ORDER BY id LIMIT ?",
+        "params": (0, 200),
+        "source_fragment": (
+            "SELECT id, content FROM {table} WHERE content_codec IS NULL AND id > ?",
+            "ORDER BY id LIMIT ?",
+        ),
+    },
+    {
+        "name": "persona.search_sources",
+        "module": "database.py",
+        "sql": (
+            "WITH hits AS ( "
+            "SELECT rowid AS source_id, bm25(sources_fts, 4.0, 1.0) AS rank, NULL AS chunk_id "
+            "FROM sources_fts WHERE sources_fts MATCH ? "
+            "UNION ALL "
+            "SELECT c.source_id, bm25(source_chunks_fts), c.id "
+            "FROM source_chunks_fts JOIN source_chunks c ON c.id = source_chunks_fts.rowid "
+            "WHERE source_chunks_fts MATCH ? ) "
+            "SELECT s.id, s.filename, s.path, s.size, MIN(h.rank) AS rank, h.chunk_id "
+            "FROM hits h JOIN sources s ON s.id = h.source_id "
+            "GROUP BY s.id ORDER BY rank LIMIT ?"
+        ),
+        "params": ("concept", "concept", 3),
+        "requires": "sources_fts",
+    },
+    {
+        "name": "persona.search_chunks",
+        "module": "database.py",
+        "sql": (
+            "SELECT c.source_id, c.chunk_index, s.filename, s.path, c.start_byte, c.end_byte, c.token_count, "
+            "bm25(source_chunks_fts) AS rank, NULL, NULL, NULL FROM source_chunks_fts "
+            "JOIN source_chunks c ON c.id = source_chunks_fts.rowid "
+            "JOIN sources s ON s.id = c.source_id "
+            "WHERE source_chunks_fts MATCH ? ORDER BY rank LIMIT ?"
+        ),
+        "params": ("concept", 3),
+        "source_fragment": (
+            "SELECT c.source_id, c.chunk_index, s.filename, s.path, c.start_byte, c.end_byte, c.token_count, "
+            "bm25(source_chunks_fts) AS rank, {text_sql} FROM source_chunks_fts "
+            "JOIN source_chunks c ON c.id = source_chunks_fts.rowid "
+            "JOIN sources s ON s.id = c.source_id "
+            "WHERE source_chunks_fts MATCH ? ORDER BY rank LIMIT ?",
+            "NULL, NULL, NULL",
+        ),
+        "requires": "source_chunks_fts",
+    },
+    {
+        "name": "notebooklm.get_source",
+        "module": "database.py",
+        "sql": "SELECT id, filename, path, size, modified_ts, content_hash, content, content_z, content_codec FROM sources WHERE id = ?",
+        "params": (1,),
+        "source_fragment": (
+            "SELECT {cols} FROM sources {where}",
+            "id, filename, path, size, modified_ts, content_hash",
+            "content, content_z, content_codec",
+            "WHERE id = ?",
+        ),
+    },
+]
+
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?(.*)$")
+_FUNC_PREDICATE_RE = re.compile(r"\b\w+\(\s*(?:\w+\.)?(\w+)\s*\)\s*(?:LIKE|=|GLOB)", re.IGNORECASE)
+
+
+def seed_database(path: Path, rows: int = DEFAULT_SEED_ROWS) -> Path:
+    """Create the real schema at ``path`` and fill the hot tables with ``rows`` rows each.
+
+    Why: Plans depend on the schema (indexes) the modules actually create, so
+    the owning classes build it rather than a copy of their DDL.
+    Where: ``audit()`` when no ``db_path`` is given; tests.
+    How: Instantiates DatabaseManager / AdvancedMemoryEngine / NotebookLMEngine
+    on the file, then bulk inserts synthetic rows with executemany.
+    """
+    from database import DatabaseManager
+    from memory_engine import AdvancedMemoryEngine
+    from notebooklm_engine import NotebookLMEngine
+
+    path = Path(path)
+    db = DatabaseManager(path)
+    AdvancedMemoryEngine(db)
+    NotebookLMEngine(str(path))
+    now = time.time()
+    with db._lock, db._connect() as con:
+        con.executemany(
+            "INSERT INTO sources (filename, path, content, content_hash, size) VALUES (?, ?, ?, ?, ?)",
+            [(f"f{i}.txt", f"/seed/f{i}.txt", f"concept {i} text", f"h{i}", 16) for i in range(rows)],
+        )
+        con.executemany(
+            "INSERT INTO source_chunks (source_id, chunk_index, start_byte, end_byte, content, content_hash, token_count) "
+            "VALUES (?, 0, 0, 16, ?, ?, 3)",
+            [(i + 1, f"concept {i} text", f"c{i}") for i in range(rows)],
+        )
+        con.executemany(
+            "INSERT INTO file_manifest (path, inode, size, mtime_ns, content_hash, source_id, checked_ts) "
+            "VALUES (?, ?, 16, 0, ?, ?, ?)",
+            [(f"/seed/f{i}.txt", i, f"h{i}", i + 1, now) for i in range(rows)],
+        )
+        con.executemany(
+            "INSERT INTO utterances (role, text, mode, ts) VALUES ('user', ?, 'Auto', ?)",
+            [(f"message {i}", now - i) for i in range(rows)],
+        )
+        con.executemany(
+            "INSERT INTO interactions (ts, user_input, active_mode, action_taken, parsed_data) "
+            "VALUES (?, ?, 'Auto', 'chat', '{}')",
+            [(now - i, f"message {i}") for i in range(rows)],
+        )
+        con.executemany(
+            "INSERT INTO memory_nodes (id, content, category, importance, created_at, tags, metadata) "
+            "VALUES (?, ?, 'keyword', 0.5, ?, '[]', '{}')",
+            [(f"n{i}", f"concept {i}", now - i) for i in range(rows)],
+        )
+        con.executemany(
+            "INSERT INTO memory_relationships (source_node, target_node, relationship_type, strength, created_at) "
+            "VALUES (?, ?, 'semantic', 0.5, ?)",
+            [(f"n{i}", f"n{(i + 1) % rows}", now - i) for i in range(rows)],
+        )
+        con.executemany(
+            "INSERT INTO conversation_context (session_id, user_input, response_text, mode, sentiment, "
+            "keywords, entities, importance_score, timestamp, context_metadata) "
+            "VALUES ('s', ?, 'ok', 'Auto', 'neutral', '[]', '[]', 0.5, ?, '{}')",
+            [(f"message {i}", now - i) for i in range(rows)],
+        )
+        con.executemany(
+            "INSERT INTO user_preferences (key, value, category, confidence, last_updated) VALUES (?, 'high', 'content', 0.5, ?)",
+            [(f"topic_interest_w{i}", now) for i in range(rows)],
+        )
+        con.commit()
+    return path
+
+
+def explain(con: sqlite3.Connection, sql: str, params: tuple = ()) -> List[str]:
+    """Return the ``EXPLAIN QUERY PLAN`` detail lines for ``sql``."""
+    return [row[3] for row in con.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def _table_columns(con: sqlite3.Connection, table: str) -> List[str]:
+    """Column names of ``table``, excluding an INTEGER PRIMARY KEY (rowid alias)."""
+    info = con.execute(f"PRAGMA table_info({table})").fetchall()
+    pks = [r for r in info if r[5]]
+    rowid_alias = pks[0][1] if len(pks) == 1 and pks[0][2].upper() == "INTEGER" else None
+    return [r[1] for r in info if r[1] != rowid_alias]
+
+
+def _table_rows(con: sqlite3.Connection, table: str) -> int:
+    return con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def suggest_index(sql: str, table: str, columns: List[str]) -> Dict[str, Any]:
+    """Suggest a covering index for ``table`` from the shape of ``sql``.
+
+    Why: A failing audit should say how to fix the query, not just that it scans.
+    Where: ``audit()`` for every violating scan.
+    How: Column order follows the usual rule: equality predicates, then range /
+    inequality predicates, then ORDER BY columns, then the remaining selected
+    columns so the index covers the read. Function-wrapped predicates cannot use
+    a b-tree index and produce a rewrite hint instead.
+    """
+    known = set(columns)
+    where = re.search(r"\bWHERE\b(.*?)(?:\bORDER BY\b|\bGROUP BY\b|\bLIMIT\b|$)", sql, re.IGNORECASE | re.DOTALL)
+    where_sql = where.group(1) if where else ""
+    wrapped = [c for c in _FUNC_PREDICATE_RE.findall(where_sql) if c in known]
+    if wrapped:
+        return {
+            "index": None,
+            "hint": (
+                f"predicate wraps {', '.join(sorted(set(wrapped)))} in a function; no b-tree index "
+                "can serve it. Use an FTS5 table or an in-memory keyword index instead."
+            ),
+        }
+
+    def cols(pattern: str, text: str) -> List[str]:
+        found = []
+        for col in re.findall(pattern, text, re.IGNORECASE):
+            if col in known and col not in found:
+                found.append(col)
+        return found
+
+    # != / <> never use an index, so those columns only matter for covering
+    equality = cols(r"(?:\w+\.)?(\w+)\s*(?:=|\bIN\b|\bIS\b(?!\s+NOT))", where_sql)
+    ranges = [c for c in cols(r"(?:\w+\.)?(\w+)\s*(?:>=?|<(?!>)=?|\bBETWEEN\b)", where_sql) if c not in equality]
+    order = re.search(r"\bORDER BY\b(.*?)(?:\bLIMIT\b|$)", sql, re.IGNORECASE | re.DOTALL)
+    order_cols = [c for c in cols(r"(?:\w+\.)?(\w+)", order.group(1) if order else "") if c not in equality]
+    select = re.search(r"^\s*SELECT\b(.*?)\bFROM\b", sql, re.IGNORECASE | re.DOTALL)
+    selected = cols(r"(?:\w+\.)?(\w+)", select.group(1) if select else "")
+    key = equality + [c for c in order_cols if c not in ranges] + ranges
+    if not key:
+        return {"index": None, "hint": "no filter or ordering column to index; add a LIMIT or a WHERE clause"}
+    covering = key + [c for c in selected if c not in key]
+    name = f"idx_{table}_{'_'.join(key)}"
+    return {
+        "index": f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(covering)})",
+        "hint": "equality, then ORDER BY, then range columns; trailing columns make it covering",
+    }
+
+
+def analyze_plan(plan: List[str], sql: str) -> List[Dict[str, Any]]:
+    """Classify every table SCAN in ``plan`` as bounded or full.
+
+    A scan is bounded when the query has a LIMIT, no WHERE filter and the plan
+    needs no temp b-tree for ORDER BY, i.e. rows come out in the requested
+    order and SQLite stops after LIMIT rows (``ORDER BY id DESC LIMIT ?`` over
+    the rowid). A filtered scan may read the whole table before LIMIT is met.
+    """
+    has_limit = re.search(r"\bLIMIT\b", sql, re.IGNORECASE) is not None
+    has_limit = has_limit and re.search(r"\bWHERE\b", sql, re.IGNORECASE) is None
+    sorts = any("USE TEMP B-TREE FOR ORDER BY" in step for step in plan)
+    scans = []
+    for step in plan:
+        m = _SCAN_RE.match(step)
+        if not m or "VIRTUAL TABLE" in step:
+            continue
+        scans.append({
+            "table": m.group(1),
+            "detail": step,
+            "bounded": has_limit and not sorts,
+        })
+    return scans
+
+
+def _fragment_pattern(fragment: str) -> "re.Pattern[str]":
+    """Regex matching assembled SQL for ``fragment``; ``{name}`` matches any text."""
+    parts = re.split(r"\{\w+\}", fragment)
+    return re.compile(".*?".join(re.escape(p) for p in parts))
+
+
+def missing_from_source(entry: Dict[str, Any], root: Path = _root) -> bool:
+    """True when a registry entry no longer matches its module.
+
+    Verbatim entries must appear whole in the module source. Entries with a
+    ``source_fragment`` must have every fragment in the module source, and
+    every fragment must also match the registered SQL, so an edit on either
+    side is reported.
+    """
+    text = " ".join((root / entry["module"]).read_text(encoding="utf-8").split())
+    sql = " ".join(entry["sql"].split())
+    fragments = entry.get("source_fragment")
+    if not fragments:
+        return sql not in text
+    for fragment in (" ".join(f.split()) for f in fragments):
+        if fragment not in text or not _fragment_pattern(fragment).search(sql):
+            return True
+    return False
+
+
+def audit(
+    db_path: Optional[Path] = None,
+    threshold: int = DEFAULT_THRESHOLD,
+    seed_rows: int = DEFAULT_SEED_ROWS,
+    queries: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Run ``EXPLAIN QUERY PLAN`` over the registry and report scan violations.
+
+    Returns a dict with per-query ``results`` (plan, scans, suggestion), the
+    list of ``violations`` (unbounded full scans of tables above ``threshold``
+    rows without an ``allow_scan`` reason) and ``allowed`` documented debt.
+    """
+    queries = HOT_QUERIES if queries is None else queries
+    tmp = None
+    if db_path is None:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = seed_database(Path(tmp.name) / "audit.db", rows=seed_rows)
+    con = sqlite3.connect(str(db_path))
+    try:
+        existing = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+        counts: Dict[str, int] = {}
+        report: Dict[str, Any] = {"threshold": threshold, "results": [], "violations": [], "allowed": []}
+        for entry in queries:
+            if entry.get("requires") and entry["requires"] not in existing:
+                report["results"].append({"name": entry["name"], "skipped": f"{entry['requires']} missing"})
+                continue
+            plan = explain(con, entry["sql"], entry.get("params", ()))
+            scans = analyze_plan(plan, entry["sql"])
+            result = {"name": entry["name"], "module": entry["module"], "plan": plan, "scans": []}
+            for scan in scans:
+                table = scan["table"]
+                if table not in existing:
+                    # Materialized CTE / subquery: its own steps are audited above
+                    continue
+                if table not in counts:
+                    counts[table] = _table_rows(con, table)
+                scan["rows"] = counts[table]
+                result["scans"].append(scan)
+                if scan["bounded"] or scan["rows"] <= threshold:
+                    continue
+                finding = {
+                    "name": entry["name"],
+                    "module": entry["module"],
+                    "table": table,
+                    "rows": scan["rows"],
+                    "detail": scan["detail"],
+                    "suggestion": suggest_index(entry["sql"], table, _table_columns(con, table)),
+                }
+                if entry.get("allow_scan"):
+                    finding["reason"] = entry["allow_scan"]
+                    report["allowed"].append(finding)
+                else:
+                    report["violations"].append(finding)
+            report["results"].append(result)
+        report["ok"] = not report["violations"]
+        return report
+    finally:
+        con.close()
+        if tmp is not None:
+            from database import close_all_pools
+            close_all_pools()
+            tmp.cleanup()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Audit hot-path SQL query plans for full table scans")
+    parser.add_argument("--db", type=Path, help="audit an existing database instead of a seeded one")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="rows above which a SCAN fails")
+    parser.add_argument("--seed-rows", type=int, default=DEFAULT_SEED_ROWS, help="rows per table when seeding")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = audit(args.db, threshold=args.threshold, seed_rows=args.seed_rows)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for r in report["results"]:
+            status = r.get("skipped") or ("scan" if any(not s["bounded"] for s in r["scans"]) else "ok")
+            print(f"{r['name']:<36} {status}")
+        for label, items in (("ALLOWED", report["allowed"]), ("VIOLATION", report["violations"])):
+            for f in items:
+                print(f"\n{label}: {f['name']} ({f['module']}) {f['detail']} [{f['rows']} rows]")
+                if f.get("reason"):
+                    print(f"  reason: {f['reason']}")
+                s = f["suggestion"]
+                print(f"  suggest: {s['index'] or s['hint']}")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":  # pragma: no cover - manual execution
+    sys.exit(main())
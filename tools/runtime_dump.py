@@ -10,7 +10,9 @@ Where: Invoked manually: `python -m tools.runtime_dump` from project root.
 Part of Clever's development toolkit for system introspection and debugging.
 
 How: Imports the Flask app, triggers a render of `'/'` if none recorded, then
-prints JSON snapshot from `runtime_state` to stdout for analysis.
+prints JSON snapshot from `runtime_state` to stdout for analysis. `--sql`
+adds the per-statement SQL trace (`db_sql`); `--reset-sql` clears it after
+dumping so the next run measures a fresh window.
 
 File Usage:
     - CLI debugging: Primary tool for offline system state analysis and debugging
@@ -32,8 +34,10 @@ Connects to:
     - templates/index.html: Template rendering analysis and performance tracking
     - static/js/main.js: Frontend state correlation and debugging support
     - config.py: Configuration system integration for runtime analysis
+    - database.py: db_manager.sql_stats() / reset_sql_stats() for the SQL trace
 """
 from __future__ import annotations
+import argparse
 import json
 
 from app import app, clever_persona  # type: ignore
@@ -53,9 +57,20 @@ def ensure_initial_render():
         app.view_functions['home']()  # call home handler directly
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dump Clever runtime state as JSON")
+    parser.add_argument("--sql", action="store_true", help="include per-statement SQL trace")
+    parser.add_argument("--sql-top", type=int, default=25, help="statements to include with --sql")
+    parser.add_argument("--reset-sql", action="store_true", help="clear the SQL trace after dumping")
+    args = parser.parse_args(argv)
+
     ensure_initial_render()
     snapshot = runtime_state(app, persona_engine=clever_persona)
+    if args.sql or args.reset_sql:
+        from database import db_manager
+        snapshot["db_sql"] = (
+            db_manager.reset_sql_stats() if args.reset_sql else db_manager.sql_stats(top=args.sql_top)
+        )
     print(json.dumps(snapshot, indent=2, sort_keys=True))
 
 
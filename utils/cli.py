@@ -16,7 +16,9 @@ Connects to:
     - file_ingestor.py:
         - `FileIngestor` is instantiated and its `ingest_all_files()` method is called by `cmd_ingest` to process files.
     - database.py:
-        - `db_manager` is used by `cmd_list`, `cmd_search`, and `cmd_show` to query the database for sources.
+        - `db_manager` is used by `cmd_list`, `cmd_search` (ranked `search_sources`), and `cmd_show` to query the database for sources (content loads lazily); `cmd_compress` migrates old rows to compressed storage.
+    - retention_engine.py:
+        - `cmd_retention` runs rollup / pruning, the dry-run report and incremental vacuum.
 """
 
 from __future__ import annotations
@@ -62,7 +64,7 @@ def cmd_list():
         print(f"{s.id}\t{s.filename}\t{s.size or len(s.content)}\t{s.path}")
 
 
-def cmd_search(query: str):
+def cmd_search(query: str, limit: int = 10):
     """
     Search knowledge base content for sources matching query string.
 
@@ -70,14 +72,18 @@ def cmd_search(query: str):
          exploration for research and debugging purposes.
     Where: CLI command handler for 'search' subcommand, used to locate
            specific content within ingested sources.
-    How: Passes query to database manager's search functionality,
-         displays matching sources in tabular format with metadata.
+    How: Passes query to the database manager's ranked full-text search
+         (FTS5 + bm25), prints one line per hit (id, score, filename, path)
+         followed by an indented snippet around the match.
 
     Args:
         query: Search string to match against source content and metadata
+        limit: Maximum number of hits to print
     """
-    for s in db_manager.search_sources(query):
-        print(f"{s.id}\t{s.filename}\t{s.size or len(s.content)}\t{s.path}")
+    for hit in db_manager.search_sources(query, limit=limit):
+        print(f"{hit['id']}\t{hit['score']:.3f}\t{hit['filename']}\t{hit['path']}")
+        if hit.get("snippet"):
+            print(f"\t{hit['snippet']}")
 
 
 def cmd_show(source_id: int, content: bool):
@@ -107,6 +113,64 @@ def cmd_show(source_id: int, content: bool):
         print(s.content)
 
 
+def cmd_compress(batch_size: int):
+    """
+    Compress knowledge base rows stored before content compression was enabled.
+
+    Why: New sources are compressed on write; older rows keep their plain
+         text until migrated, so the database file does not shrink on its own.
+    Where: CLI command handler for 'compress' subcommand (one-off maintenance).
+    How: Calls db_manager.compress_existing_sources and prints the byte savings.
+
+    Args:
+        batch_size: Rows re-encoded per transaction
+    """
+    stats = db_manager.compress_existing_sources(batch_size=batch_size)
+    saved = stats["bytes_before"] - stats["bytes_after"]
+    print(
+        f"examined={stats['examined']} compressed={stats['compressed']} "
+        f"bytes {stats['bytes_before']} -> {stats['bytes_after']} (saved {saved})"
+    )
+
+
+def cmd_retention(dry_run: bool, vacuum: bool, convert: bool, pages: Optional[int]):
+    """
+    Roll up and prune old telemetry / memory rows, optionally vacuuming.
+
+    Why: Keeps the single database small after months of use; the dry run
+         shows what would be removed and how many bytes would come back.
+    Where: CLI command handler for 'retention' subcommand.
+    How: Delegates to retention_engine.RetentionEngine (plan / run /
+         incremental_vacuum / enable_incremental_vacuum) and prints a summary.
+
+    Args:
+        dry_run: Only report rows and estimated bytes that would be reclaimed
+        vacuum: Run an incremental vacuum after pruning
+        convert: One-time VACUUM converting the file to auto_vacuum=INCREMENTAL
+        pages: Page budget for the incremental vacuum (default from config)
+    """
+    from retention_engine import RetentionEngine
+
+    engine = RetentionEngine()
+    if convert:
+        print(f"auto_vacuum: {engine.enable_incremental_vacuum()['auto_vacuum']}")
+    report = engine.run(dry_run=dry_run)
+    if dry_run:
+        for table, info in report["tables"].items():
+            print(f"{table}\trows={info['rows']}\t~{info['estimated_bytes']} bytes")
+        print(
+            f"freelist={report['freelist_bytes']} bytes (auto_vacuum={report['auto_vacuum']})\n"
+            f"estimated reclaimable: {report['estimated_bytes']} bytes"
+        )
+        return
+    for table, info in report["tables"].items():
+        print(f"{table}\trolled up + pruned {info['rolled_up']} rows")
+    print(f"pruned={report['pruned']} batches={report['batches']}")
+    if vacuum:
+        v = engine.incremental_vacuum(pages)
+        print(f"vacuum: freed {v['freed_pages']} pages ({v['freed_bytes']} bytes), auto_vacuum={v['auto_vacuum']}")
+
+
 def main():
     """
     Main CLI entry point with argument parsing and command dispatch.
@@ -115,8 +179,8 @@ def main():
          and file management without requiring Flask server to be running.
     Where: Entry point for the 'clever' CLI tool, enabling direct interaction
            with knowledge base and ingestion systems.
-    How: Sets up argparse with subcommands for ingest, list, search, show
-         operations, parses arguments and dispatches to appropriate handlers.
+    How: Sets up argparse with subcommands for ingest, list, search, show,
+         compress, retention operations, parses arguments and dispatches to appropriate handlers.
     """
     ap = argparse.ArgumentParser(prog="clever")
     sp = ap.add_subparsers(dest="cmd", required=True)
@@ -128,20 +192,34 @@ def main():
 
     sp_search = sp.add_parser("search")
     sp_search.add_argument("query")
+    sp_search.add_argument("--limit", type=int, default=10)
 
     sp_show = sp.add_parser("show")
     sp_show.add_argument("id", type=int)
     sp_show.add_argument("--content", action="store_true")
 
+    sp_compress = sp.add_parser("compress")
+    sp_compress.add_argument("--batch-size", type=int, default=200)
+
+    sp_retention = sp.add_parser("retention")
+    sp_retention.add_argument("--dry-run", action="store_true")
+    sp_retention.add_argument("--vacuum", action="store_true")
+    sp_retention.add_argument("--convert-vacuum", action="store_true")
+    sp_retention.add_argument("--pages", type=int)
+
     args = ap.parse_args()
     if args.cmd == "ingest":
         cmd_ingest(args.path)
     elif args.cmd == "list":
         cmd_list()
     elif args.cmd == "search":
-        cmd_search(args.query)
+        cmd_search(args.query, args.limit)
     elif args.cmd == "show":
         cmd_show(args.id, args.content)
+    elif args.cmd == "compress":
+        cmd_compress(args.batch_size)
+    elif args.cmd == "retention":
+        cmd_retention(args.dry_run, args.vacuum, args.convert_vacuum, args.pages)
 
 
 if __name__ == "__main__":
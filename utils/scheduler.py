@@ -11,6 +11,7 @@ ingestion operations with graceful shutdown capabilities.
 Connects to:
     - sync_tools.py: Remote synchronization operations
     - file_ingestor.py: Automated file processing and ingestion
+    - retention_engine.py: Idle-time rollup, pruning and incremental vacuum
     - config.py: Scheduling configuration and sync directories
     - Threading: Background service operation with stop events
 """
@@ -23,9 +24,10 @@ import threading
 import config
 from sync_tools import sync_clever_from_remote, sync_synaptic_from_remote
 from file_ingestor import FileIngestor
+from retention_engine import RetentionEngine
 
 
-def _run_cycle():
+def _run_cycle(retention: RetentionEngine | None = None):
     """
     Execute one complete sync and ingestion cycle for all configured directories.
 
@@ -34,7 +36,10 @@ def _run_cycle():
     Where: Called by run_scheduler at configured intervals to process
            both sync directories and ingest new content.
     How: Conditionally syncs from remote using rclone (if enabled), then
-         runs FileIngestor on both SYNC_DIR and SYNAPTIC_HUB_DIR.
+         runs FileIngestor on both SYNC_DIR and SYNAPTIC_HUB_DIR. Unchanged
+         files are skipped via the stat manifest, so an idle cycle is a
+         metadata-only directory scan. Finishes with one retention idle step
+         when ``retention`` is given (only if RETENTION_IDLE_MAINTENANCE is on).
     """
     # sync both (best effort) then ingest both roots
     if config.ENABLE_RCLONE:
@@ -42,6 +47,9 @@ def _run_cycle():
         sync_synaptic_from_remote()
     for d in [config.SYNC_DIR, config.SYNAPTIC_HUB_DIR]:
         FileIngestor(d).ingest_all_files()
+    # Bounded retention + incremental vacuum slice (skipped while chatting)
+    if retention is not None:
+        retention.idle_step()
 
 
 def run_scheduler(stop_event: threading.Event | None = None):
@@ -63,14 +71,15 @@ def run_scheduler(stop_event: threading.Event | None = None):
         return
     iv = max(1, int(config.RCLONE_INTERVAL_MINUTES)) * 60
     print(f"Scheduler running every {iv//60} min(s)...")
+    # One engine for the scheduler's lifetime (its constructor runs the rollup DDL)
+    retention = RetentionEngine() if config.RETENTION_IDLE_MAINTENANCE else None
     while True:
         if stop_event and stop_event.is_set():
             break
         try:
-            _run_cycle()
+            _run_cycle(retention)
         except Exception as e:
             print("scheduler cycle error:", e)
-        _run_cycle()
         # sleep in small chunks so we can exit promptly
         for _ in range(iv):
             if stop_event and stop_event.is_set():